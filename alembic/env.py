@@ -13,7 +13,7 @@ from app.core.config import settings
 from app.db.base import Base
 
 # Import all models to ensure they're registered
-from app.models import user, team, ticket, comment, knowledge_article, category, tag, audit_log, sla_settings
+from app.models import user, team, ticket, comment, knowledge_article, category, tag, audit_log, sla_settings, sla_breach_event, holiday, ticket_count, response_time_sketch, ticket_volume_rollup, number_sequence, import_job, change
 
 # this is the Alembic Config object
 config = context.config
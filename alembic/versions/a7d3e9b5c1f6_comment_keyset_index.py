@@ -0,0 +1,28 @@
+"""Index for keyset pagination of ticket comments
+
+Revision ID: a7d3e9b5c1f6
+Revises: c9f5a1b7d3e8
+Create Date: 2026-10-19 19:41:07.362914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9b5c1f6'
+down_revision: Union[str, None] = 'c9f5a1b7d3e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_comments_ticket_id_created_at', 'comments', ['ticket_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_ticket_id_created_at', table_name='comments')
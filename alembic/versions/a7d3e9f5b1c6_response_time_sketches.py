@@ -0,0 +1,41 @@
+"""Response-time quantile sketches
+
+Revision ID: a7d3e9f5b1c6
+Revises: f6c2d8e4a0b5
+Create Date: 2026-10-19 15:04:37.662190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3e9f5b1c6'
+down_revision: Union[str, None] = 'f6c2d8e4a0b5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('response_time_sketches',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('metric', sa.String(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('priority', sa.String(), nullable=False),
+    sa.Column('team_id', sa.String(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('total_seconds', sa.BigInteger(), nullable=False),
+    sa.Column('min_seconds', sa.Integer(), nullable=True),
+    sa.Column('max_seconds', sa.Integer(), nullable=True),
+    sa.Column('bins', sa.LargeBinary(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_response_time_sketches_period_day', 'response_time_sketches', ['period', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_response_time_sketches_period_day', table_name='response_time_sketches')
+    op.drop_table('response_time_sketches')
@@ -0,0 +1,38 @@
+"""Denormalized comment count and activity times on tickets
+
+Revision ID: b2f8c4a0e6d9
+Revises: a7d3e9b5c1f6
+Create Date: 2026-10-19 20:26:53.104871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2f8c4a0e6d9'
+down_revision: Union[str, None] = 'a7d3e9b5c1f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('last_public_comment_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('last_activity_at', sa.DateTime(), nullable=True))
+    # Placeholder until `manage.py backfill-ticket-activity` fills in the comments
+    op.execute("UPDATE tickets SET last_activity_at = updated_at")
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.alter_column('last_activity_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_index(op.f('ix_tickets_last_activity_at'), 'tickets', ['last_activity_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_tickets_last_activity_at'), table_name='tickets')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_column('last_activity_at')
+        batch_op.drop_column('last_public_comment_at')
+        batch_op.drop_column('comment_count')
@@ -0,0 +1,38 @@
+"""Audit log partitions and indexes
+
+Revision ID: b71c2d9e4f10
+Revises: a6a51f800395
+Create Date: 2026-10-19 09:12:41.218304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71c2d9e4f10'
+down_revision: Union[str, None] = 'a6a51f800395'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('audit_log_partitions',
+    sa.Column('month', sa.String(), nullable=False),
+    sa.Column('archive_path', sa.String(), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('first_created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_created_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('month')
+    )
+    op.create_index(op.f('ix_audit_logs_created_at'), 'audit_logs', ['created_at'], unique=False)
+    op.create_index('ix_audit_logs_entity', 'audit_logs', ['entity_type', 'entity_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_audit_logs_entity', table_name='audit_logs')
+    op.drop_index(op.f('ix_audit_logs_created_at'), table_name='audit_logs')
+    op.drop_table('audit_log_partitions')
@@ -0,0 +1,39 @@
+"""Ticket volume rollups
+
+Revision ID: b8e4f0a6c2d7
+Revises: a7d3e9f5b1c6
+Create Date: 2026-10-19 16:21:50.913406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e4f0a6c2d7'
+down_revision: Union[str, None] = 'a7d3e9f5b1c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ticket_volume_rollups',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('period', sa.String(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('category_id', sa.String(), nullable=True),
+    sa.Column('priority', sa.String(), nullable=False),
+    sa.Column('created', sa.Integer(), nullable=False),
+    sa.Column('resolved', sa.Integer(), nullable=False),
+    sa.Column('closed', sa.Integer(), nullable=False),
+    sa.Column('reopened', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_ticket_volume_rollups_period_bucket_start', 'ticket_volume_rollups', ['period', 'bucket_start'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ticket_volume_rollups_period_bucket_start', table_name='ticket_volume_rollups')
+    op.drop_table('ticket_volume_rollups')
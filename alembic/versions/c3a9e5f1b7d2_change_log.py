@@ -0,0 +1,36 @@
+"""Change log for incremental sync
+
+Revision ID: c3a9e5f1b7d2
+Revises: b2f8c4a0e6d9
+Create Date: 2026-10-19 22:41:07.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a9e5f1b7d2'
+down_revision: Union[str, None] = 'b2f8c4a0e6d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'changes',
+        sa.Column('seq', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('entity_type', sa.String(), nullable=False),
+        sa.Column('entity_id', sa.String(), nullable=False),
+        sa.Column('audience', sa.String(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('seq'),
+    )
+    op.create_index('ix_changes_audience_seq', 'changes', ['audience', 'seq'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_changes_audience_seq', table_name='changes')
+    op.drop_table('changes')
@@ -0,0 +1,40 @@
+"""SLA breach events
+
+Revision ID: c3e8f5a1d2b7
+Revises: b71c2d9e4f10
+Create Date: 2026-10-19 10:03:17.552910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e8f5a1d2b7'
+down_revision: Union[str, None] = 'b71c2d9e4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sla_breach_events',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('ticket_id', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('priority', sa.String(), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('detected_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('ticket_id', 'kind', name='uq_sla_breach_events_ticket_kind')
+    )
+    op.create_index(op.f('ix_sla_breach_events_detected_at'), 'sla_breach_events', ['detected_at'], unique=False)
+    op.create_index(op.f('ix_sla_breach_events_ticket_id'), 'sla_breach_events', ['ticket_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_sla_breach_events_ticket_id'), table_name='sla_breach_events')
+    op.drop_index(op.f('ix_sla_breach_events_detected_at'), table_name='sla_breach_events')
+    op.drop_table('sla_breach_events')
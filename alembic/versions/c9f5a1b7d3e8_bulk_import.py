@@ -0,0 +1,60 @@
+"""Bulk import jobs and ticket number sequence
+
+Revision ID: c9f5a1b7d3e8
+Revises: b8e4f0a6c2d7
+Create Date: 2026-10-19 17:05:12.284610
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9f5a1b7d3e8'
+down_revision: Union[str, None] = 'b8e4f0a6c2d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('number_sequences',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    # Continue numbering after the highest existing ticket number
+    op.execute(
+        "INSERT INTO number_sequences (name, value) "
+        "SELECT 'ticket_number', COALESCE(MAX(CAST(SUBSTR(ticket_number, 5) AS INTEGER)), 0) FROM tickets"
+    )
+    op.create_table('import_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('format', sa.String(), nullable=False),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('imported', sa.Integer(), nullable=False),
+    sa.Column('skipped', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.JSON(), nullable=True),
+    sa.Column('created_by', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.add_column(sa.Column('external_ref', sa.String(), nullable=True))
+        batch_op.create_unique_constraint('uq_tickets_external_ref', ['external_ref'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_constraint('uq_tickets_external_ref', type_='unique')
+        batch_op.drop_column('external_ref')
+    op.drop_table('import_jobs')
+    op.drop_table('number_sequences')
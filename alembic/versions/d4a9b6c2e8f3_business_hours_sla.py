@@ -0,0 +1,40 @@
+"""Business-hours SLA settings and holidays
+
+Revision ID: d4a9b6c2e8f3
+Revises: c3e8f5a1d2b7
+Create Date: 2026-10-19 11:26:05.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a9b6c2e8f3'
+down_revision: Union[str, None] = 'c3e8f5a1d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('holidays',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('calendar', sa.String(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('calendar', 'date', name='uq_holidays_calendar_date')
+    )
+    with op.batch_alter_table('sla_settings') as batch_op:
+        batch_op.add_column(sa.Column('business_hours_only', sa.Boolean(), server_default=sa.false(), nullable=False))
+        batch_op.add_column(sa.Column('calendar', sa.String(), server_default='default', nullable=False))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('sla_settings') as batch_op:
+        batch_op.drop_column('calendar')
+        batch_op.drop_column('business_hours_only')
+    op.drop_table('holidays')
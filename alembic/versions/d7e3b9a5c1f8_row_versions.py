@@ -0,0 +1,32 @@
+"""Row versions on tickets and articles
+
+Revision ID: d7e3b9a5c1f8
+Revises: c3a9e5f1b7d2
+Create Date: 2026-10-20 09:12:44.506193
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7e3b9a5c1f8'
+down_revision: Union[str, None] = 'c3a9e5f1b7d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    with op.batch_alter_table('knowledge_articles') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('knowledge_articles') as batch_op:
+        batch_op.drop_column('version')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,36 @@
+"""Persisted SLA due-at columns on tickets
+
+Revision ID: e5b1c7d3f9a4
+Revises: d4a9b6c2e8f3
+Create Date: 2026-10-19 13:02:41.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1c7d3f9a4'
+down_revision: Union[str, None] = 'd4a9b6c2e8f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.add_column(sa.Column('first_response_due_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('resolution_due_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('sla_due_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_tickets_sla_due_at'), 'tickets', ['sla_due_at'], unique=False)
+    op.create_index('ix_tickets_status_sla_due_at', 'tickets', ['status', 'sla_due_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tickets_status_sla_due_at', table_name='tickets')
+    op.drop_index(op.f('ix_tickets_sla_due_at'), table_name='tickets')
+    with op.batch_alter_table('tickets') as batch_op:
+        batch_op.drop_column('sla_due_at')
+        batch_op.drop_column('resolution_due_at')
+        batch_op.drop_column('first_response_due_at')
@@ -0,0 +1,30 @@
+"""Routing team of categories
+
+Revision ID: e8f4c0a6d2b9
+Revises: d7e3b9a5c1f8
+Create Date: 2026-10-20 14:37:21.904518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8f4c0a6d2b9'
+down_revision: Union[str, None] = 'd7e3b9a5c1f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.add_column(sa.Column('team_id', sa.String(), nullable=True))
+        batch_op.create_foreign_key('fk_categories_team_id_teams', 'teams', ['team_id'], ['id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_constraint('fk_categories_team_id_teams', type_='foreignkey')
+        batch_op.drop_column('team_id')
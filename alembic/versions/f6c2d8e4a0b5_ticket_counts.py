@@ -0,0 +1,41 @@
+"""Dashboard ticket count aggregates
+
+Revision ID: f6c2d8e4a0b5
+Revises: e5b1c7d3f9a4
+Create Date: 2026-10-19 14:10:22.307915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c2d8e4a0b5'
+down_revision: Union[str, None] = 'e5b1c7d3f9a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('ticket_counts',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('priority', sa.String(), nullable=False),
+    sa.Column('team_id', sa.String(), nullable=True),
+    sa.Column('assignee_id', sa.String(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    # Seed the counters from existing tickets
+    op.execute(
+        "INSERT INTO ticket_counts (key, status, priority, team_id, assignee_id, count) "
+        "SELECT status || '|' || priority || '|' || COALESCE(assigned_team_id, '') || '|' "
+        "|| COALESCE(assignee_id, ''), status, priority, assigned_team_id, assignee_id, COUNT(*) "
+        "FROM tickets GROUP BY status, priority, assigned_team_id, assignee_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('ticket_counts')
@@ -0,0 +1,220 @@
+"""Response compression.
+
+List and export responses are large JSON documents with many repeated
+keys, which compress to a fraction of their size. :class:`CompressionMiddleware`
+compresses responses of compressible content types with the best encoding
+the client accepts: gzip always, brotli (``br``) and zstd when the
+``brotli`` and ``zstandard`` packages are installed. Complete responses
+smaller than ``settings.COMPRESSION_MIN_SIZE`` are sent as they are, since
+compressing them saves less than it costs.
+
+Streamed responses are compressed chunk by chunk unless their endpoint is
+marked with :func:`uncompressed` (or they send ``Cache-Control:
+no-transform``); streams whose chunks must reach the client as soon as they
+are sent, such as server-sent events, should be. Responses that already
+carry a ``Content-Encoding``, like the precompressed entries of
+:mod:`app.core.response_cache`, are passed through.
+"""
+import zlib
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+
+_COMPRESSIBLE = (
+    "application/json", "application/problem+json", "application/xml", "application/javascript",
+    "application/x-ndjson", "image/svg+xml", "text/",
+)
+_NOT_COMPRESSIBLE = ("text/event-stream",)
+
+
+class _Gzip:
+    def __init__(self):
+        self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Encoding -> streaming compressor factory, for the encodings available here
+CODECS: Dict[str, Callable] = {"gzip": _Gzip}
+if brotli is not None:
+    CODECS["br"] = _Brotli
+if zstandard is not None:
+    CODECS["zstd"] = _Zstd
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a whole body with one of :data:`CODECS`."""
+    compressor = CODECS[encoding]()
+    return compressor.compress(data) + compressor.flush()
+
+
+def _preferred() -> list:
+    return [
+        encoding for encoding in (name.strip() for name in settings.COMPRESSION_ENCODINGS.split(","))
+        if encoding in CODECS
+    ]
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """The encoding to respond with for an ``Accept-Encoding`` header, or None.
+
+    The highest q-value wins; ties go to the earlier encoding of
+    ``settings.COMPRESSION_ENCODINGS``.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    best, best_quality = None, 0.0
+    for encoding in _preferred():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    return content_type.startswith(_COMPRESSIBLE) and not content_type.startswith(_NOT_COMPRESSIBLE)
+
+
+def uncompressed(endpoint: Callable) -> Callable:
+    """Mark an endpoint whose responses must never be compressed (e.g. event streams)."""
+    endpoint.compress_response = False
+    return endpoint
+
+
+def _skip(scope, status: int, headers: Headers) -> bool:
+    return (
+        status < 200 or status in (204, 304)
+        or "content-encoding" in headers
+        or not compressible(headers.get("content-type"))
+        or "no-transform" in headers.get("cache-control", "")
+        or not getattr(scope.get("endpoint"), "compress_response", True)
+    )
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            if compressor is None:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                headers = MutableHeaders(scope=start)
+                if _skip(scope, start["status"], headers) or (
+                    not more_body and len(body) < settings.COMPRESSION_MIN_SIZE
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    # The encoded bytes are not the ones the strong tag stood for
+                    headers["ETag"] = "W/" + etag
+                if not more_body:
+                    body = compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["Content-Length"]
+                compressor = CODECS[encoding]()
+                await send(start)
+
+            body = compressor.compress(message.get("body", b""))
+            if not message.get("more_body", False):
+                body += compressor.flush()
+                await send({"type": "http.response.body", "body": body})
+            elif body:
+                await send({"type": "http.response.body", "body": body, "more_body": True})
+
+        await self.app(scope, receive, send_compressed)
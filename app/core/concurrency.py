@@ -0,0 +1,49 @@
+"""Optimistic concurrency control for tickets and articles.
+
+Tickets and articles carry a ``version`` that SQLAlchemy checks and bumps
+on every ORM UPDATE (``version_id_col``): the UPDATE only matches the row
+if nobody changed it since it was loaded, so writes take no locks and a
+lost update surfaces as :class:`~sqlalchemy.orm.exc.StaleDataError`, which
+:func:`stale_data_handler` answers with 409.
+
+Responses carry the version as ``ETag``. A client that sends it back in
+``If-Match`` has its write refused with 409 (:func:`check_if_match`) when
+the resource changed since it read it, instead of overwriting that change.
+Writes without ``If-Match`` are still protected for the time between
+loading and committing the row.
+"""
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm.exc import StaleDataError
+
+CONFLICT_DETAIL = "The resource was modified by someone else; reload it and retry"
+
+
+def etag(version: int) -> str:
+    return f'"{version}"'
+
+
+def set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = etag(version)
+
+
+def check_if_match(if_match: Optional[str], version: int) -> None:
+    """Refuse a write whose ``If-Match`` names no current version of the resource.
+
+    Weak tags (``W/"3"``, as returned with compressed responses) match too:
+    the tag is the row version, not a hash of the bytes.
+    """
+    if if_match is None:
+        return
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag(version):
+            return
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=CONFLICT_DETAIL)
+
+
+async def stale_data_handler(request: Request, exc: StaleDataError) -> Response:
+    """409 for a write that lost a race with another one on the same row."""
+    return ORJSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": CONFLICT_DETAIL})
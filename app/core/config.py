@@ -7,6 +7,63 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
 
+    # Audit log retention
+    AUDIT_LOG_RETENTION_MONTHS: int = 6  # months kept in the hot audit_logs table
+    AUDIT_LOG_ARCHIVE_DIR: str = "./audit_archive"
+
+    # SLA breach scheduler
+    SLA_SCHEDULER_ENABLED: bool = True
+    SLA_SCHEDULER_MAX_SLEEP_SECONDS: int = 300  # upper bound between wake-ups
+    SLA_SCHEDULER_REBUILD_SECONDS: int = 3600  # full reload from the database, for changes made by other processes
+
+    # Business hours for business-hours SLA policies (local time of the policy's timezone)
+    BUSINESS_HOURS_START: str = "09:00"
+    BUSINESS_HOURS_END: str = "18:00"
+    BUSINESS_DAYS: str = "0,1,2,3,4"  # Monday=0 ... Sunday=6
+
+    # Bulk ticket operations
+    BULK_MAX_TICKETS: int = 10000  # ticket ids accepted per POST /api/tickets/bulk
+
+    # Per-request SQL statement counters (X-DB-Queries / Server-Timing headers)
+    QUERY_STATS_ENABLED: bool = True
+    N_PLUS_ONE_THRESHOLD: int = 10  # runs of one statement shape in a request that get logged
+
+    # Slow-query log; statements slower than this are logged with their plan (0 disables)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_EXPLAIN: bool = True
+
+    # Request profiling: X-Profile header / ?profile=1 for admins, plus random sampling
+    PROFILING_ENABLED: bool = True
+    PROFILE_INTERVAL_MS: float = 1.0  # stack sampling interval
+    PROFILE_SAMPLE_RATE: float = 0.0  # share of all requests profiled (0 disables sampling)
+    PROFILE_KEEP: int = 20  # latest on-demand and slowest sampled profiles kept
+
+    # Request, threadpool, DB pool and cache metrics on GET /metrics (Prometheus text format)
+    METRICS_ENABLED: bool = True
+
+    # Response compression: gzip, plus br/zstd when the brotli/zstandard packages are installed
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes; smaller complete responses are sent as they are
+    COMPRESSION_ENCODINGS: str = "zstd,br,gzip"  # preference order among those the client accepts
+    COMPRESSION_GZIP_LEVEL: int = 6
+
+    # Cache of dashboard and metrics responses, kept with their compressed bodies (0 disables)
+    RESPONSE_CACHE_TTL_SECONDS: float = 10.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 256
+
+    # Ticket and article change stream on /api/stream (SSE) and /api/stream/ws, per worker process
+    STREAM_BUFFER_SIZE: int = 256  # events buffered per connection before it is told to resync
+    STREAM_HEARTBEAT_SECONDS: float = 15.0  # SSE keepalive comment interval on idle connections
+    STREAM_MAX_CONNECTIONS: int = 10000
+
+    # Days of the change log (GET /api/changes) kept by `manage.py prune-changes`
+    CHANGE_LOG_RETENTION_DAYS: int = 30
+
+    # Automatic assignment of new tickets to the least-loaded operator of their category's team
+    ROUTING_ENABLED: bool = True
+    ROUTING_PRIORITY_WEIGHTS: str = "LOW:1,MEDIUM:2,HIGH:4,URGENT:8"  # workload of one open ticket
+    ROUTING_REFRESH_SECONDS: float = 60.0  # workloads reloaded from ticket_counts, picking up other workers
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
 
 
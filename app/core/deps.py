@@ -1,9 +1,10 @@
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
+from app.core import profiling
 from app.core.config import settings
 from app.core.security import verify_password
 from app.db.base import get_db
@@ -23,33 +24,52 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     return user
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """Get current authenticated user from JWT token."""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
+def user_from_token(db: Session, token: str) -> Optional[User]:
+    """The user a JWT access token was issued to, or None if it is invalid."""
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            return None
         token_data = TokenData(user_id=user_id)
     except JWTError:
-        raise credentials_exception
+        return None
     
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    return db.query(User).filter(User.id == token_data.user_id).first()
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """Get current authenticated user from JWT token."""
+    user = user_from_token(db, credentials.credentials)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    profiling.authenticated(user)
     return user
 
 
+def get_stream_user(
+    access_token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+    db: Session = Depends(get_db),
+) -> User:
+    """Authenticate by Bearer header or ``?access_token=`` (EventSource cannot send headers)."""
+    token = credentials.credentials if credentials else access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db)
+
+
 def require_role(*allowed_roles: str):
     """Dependency to check if user has required role."""
     def role_checker(current_user: User = Depends(get_current_user)) -> User:
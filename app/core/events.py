@@ -0,0 +1,308 @@
+"""In-process publish/subscribe of ticket and article changes.
+
+The ticket and article services publish an :class:`Event` after each
+committed change; ``/api/stream`` connections subscribe to them. Events
+carry the few fields a queue view needs to update a row or decide to
+refetch it, not the whole resource. An event's id is the sequence number
+its change was given in the change log (see
+:mod:`app.services.change_service`), so a client that reconnects can
+catch up with ``GET /api/changes?cursor=<last id>``.
+
+Delivery is filtered on the publishing side: a requester's subscription
+only receives events of their own tickets, never internal comments, and
+article events only while the article is (or was) visible to them.
+Subscription filters (event types, ticket, status, priority, assignee,
+team) are applied there too, so a connection is only woken for events it
+will send. A ticket event carries the values its change replaced under
+``previous`` and matches a filter on either the old or the new value, so
+a queue view filtered on ``status=OPEN`` also hears of the ticket leaving
+it. Comment events carry their ticket's filter fields.
+
+Each subscription buffers at most ``settings.STREAM_BUFFER_SIZE`` events.
+When a slow consumer lets its buffer fill up, the buffered events are
+dropped and the consumer is told to resync (refetch what it shows) instead
+of the broker holding an unbounded backlog. The broker lives in one
+process: every worker has its own, fed by the requests that worker serves.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+# Who may receive an event
+OPERATORS = "operators"  # operators and admins only
+REQUESTER = "requester"  # operators and admins, and the ticket's requester
+EVERYONE = "everyone"
+
+# Fields subscription filters can match, by query parameter
+FILTER_FIELDS = {
+    "ticket_id": "ticket_id",
+    "status": "status",
+    "priority": "priority",
+    "assignee_id": "assignee_id",
+    "team_id": "assigned_team_id",
+}
+# Ticket fields a change can move into or out of a filter
+TICKET_STATE_FIELDS = ("status", "priority", "assignee_id", "assigned_team_id")
+
+
+@dataclass(eq=False)
+class Event:
+    """One change, as sent to subscribers."""
+
+    type: str  # ticket.created, ticket.updated, comment.created, article.*
+    data: dict
+    audience: str = OPERATORS
+    requester_id: Optional[str] = None
+    id: int = 0  # change log sequence number, set when the change is recorded
+    _frame: Optional[bytes] = field(default=None, repr=False)
+    _json: Optional[str] = field(default=None, repr=False)
+
+    def payload(self) -> dict:
+        return {"id": self.id, "type": self.type, "data": self.data}
+
+    def json(self) -> str:
+        """The event as a JSON message, encoded once for all subscribers."""
+        if self._json is None:
+            self._json = orjson.dumps(self.payload()).decode()
+        return self._json
+
+    def sse(self) -> bytes:
+        """The event as a server-sent events frame, encoded once for all subscribers."""
+        if self._frame is None:
+            self._frame = b"event: %s\ndata: %s\n\n" % (self.type.encode(), orjson.dumps(self.data))
+            if self.id:
+                self._frame = b"id: %d\n" % self.id + self._frame
+        return self._frame
+
+
+class Subscription:
+    """A connection's filtered, bounded view of the event stream."""
+
+    __slots__ = (
+        "user_id", "operator", "types", "filters", "dropped",
+        "_loop", "_buffer", "_wakeup", "_notified", "_overflowed",
+    )
+
+    def __init__(
+        self,
+        user_id: str,
+        operator: bool,
+        types: FrozenSet[str] = frozenset(),
+        filters: Optional[Dict[str, FrozenSet[str]]] = None,
+    ):
+        self.user_id = user_id
+        self.operator = operator
+        self.types = types
+        self.filters = filters or {}
+        self.dropped = 0
+        self._loop = asyncio.get_running_loop()
+        self._buffer: deque = deque()
+        self._wakeup = asyncio.Event()
+        self._notified = False
+        self._overflowed = False
+
+    def accepts(self, event: Event) -> bool:
+        if self.types and event.type not in self.types and event.type.split(".", 1)[0] not in self.types:
+            return False
+        previous = event.data.get("previous") or {}
+        for name, values in self.filters.items():
+            if event.data.get(name) not in values and previous.get(name) not in values:
+                return False
+        return True
+
+    def _offer(self, event: Event) -> bool:
+        """Buffer an event (broker lock held); True if the consumer needs waking."""
+        if len(self._buffer) >= settings.STREAM_BUFFER_SIZE:
+            self.dropped += len(self._buffer)
+            broker.dropped += len(self._buffer)
+            self._buffer.clear()
+            self._overflowed = True
+        else:
+            self._buffer.append(event)
+        if self._notified:
+            return False
+        self._notified = True
+        return True
+
+    async def next(self, timeout: Optional[float]) -> Optional[Tuple[List[Event], bool]]:
+        """Wait for buffered events; (events, resync needed), or None after ``timeout`` idle seconds."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with broker._lock:
+                if self._buffer or self._overflowed:
+                    events = list(self._buffer)
+                    self._buffer.clear()
+                    overflowed, self._overflowed = self._overflowed, False
+                    self._notified = False
+                    return events, overflowed
+                self._notified = False
+                self._wakeup.clear()
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            # A wakeup scheduled for events already drained can fire late; the loop absorbs it
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+
+class Broker:
+    """Fan events out to the subscriptions allowed and asking to see them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operators: Set[Subscription] = set()
+        self._requesters: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._connections = 0
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, subscription: Subscription) -> bool:
+        """Register a subscription; False when the worker already has ``STREAM_MAX_CONNECTIONS``."""
+        with self._lock:
+            if self._connections >= settings.STREAM_MAX_CONNECTIONS:
+                return False
+            if subscription.operator:
+                self._operators.add(subscription)
+            else:
+                self._requesters[subscription.user_id].add(subscription)
+            self._connections += 1
+        return True
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._discard(subscription)
+
+    def _discard(self, subscription: Subscription) -> None:
+        subscriptions = self._operators if subscription.operator else self._requesters.get(subscription.user_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.remove(subscription)
+        self._connections -= 1
+        if not subscriptions and not subscription.operator:
+            del self._requesters[subscription.user_id]
+
+    def connections(self) -> int:
+        """Subscriptions currently registered."""
+        return self._connections
+
+    def _audience(self, event: Event) -> List[Subscription]:
+        targets = list(self._operators)
+        if event.audience == REQUESTER:
+            targets.extend(self._requesters.get(event.requester_id, ()))
+        elif event.audience == EVERYONE:
+            for subscriptions in self._requesters.values():
+                targets.extend(subscriptions)
+        return targets
+
+    def publish(self, events: Iterable[Event]) -> None:
+        """Buffer events for every subscription that may and wants to see them.
+
+        Consumers are woken with one callback per event loop rather than one
+        per subscription, since each thread-safe call writes to the loop's
+        self-pipe.
+        """
+        wake: Dict[asyncio.AbstractEventLoop, List[Subscription]] = defaultdict(list)
+        with self._lock:
+            for event in events:
+                self.published += 1
+                for subscription in self._audience(event):
+                    if subscription.accepts(event) and subscription._offer(event):
+                        wake[subscription._loop].append(subscription)
+            for loop, subscriptions in wake.items():
+                try:
+                    loop.call_soon_threadsafe(_wake, subscriptions)
+                except RuntimeError:
+                    # The loop was closed under its subscriptions
+                    for subscription in subscriptions:
+                        self._discard(subscription)
+
+    def reset(self) -> None:
+        """Drop every subscription and zero the counters."""
+        with self._lock:
+            self._operators.clear()
+            self._requesters.clear()
+            self._connections = 0
+            self.published = self.dropped = 0
+
+
+def _wake(subscriptions: List[Subscription]) -> None:
+    for subscription in subscriptions:
+        subscription._wakeup.set()
+
+
+broker = Broker()
+
+
+def publish(*events: Event) -> None:
+    """Publish committed changes to the stream subscribers of this process."""
+    broker.publish(events)
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def ticket_state(ticket) -> dict:
+    """The ticket fields filters match, captured before a change for :func:`ticket_event`."""
+    return {name: getattr(ticket, name) for name in TICKET_STATE_FIELDS}
+
+
+def ticket_event(event_type: str, ticket, previous: Optional[dict] = None) -> Event:
+    """An event describing a ticket's current state.
+
+    ``previous`` is the :func:`ticket_state` before the change; the fields
+    the change replaced are sent under ``previous``.
+    """
+    data = {
+        "ticket_id": ticket.id,
+        "ticket_number": ticket.ticket_number,
+        "requester_id": ticket.requester_id,
+        **ticket_state(ticket),
+        "updated_at": _iso(ticket.updated_at),
+    }
+    if previous:
+        changed = {name: value for name, value in previous.items() if data[name] != value}
+        if changed:
+            data["previous"] = changed
+    return Event(type=event_type, audience=REQUESTER, requester_id=ticket.requester_id, data=data)
+
+
+def comment_event(ticket, comment) -> Event:
+    """An event for a new comment; internal comments only reach operators."""
+    return Event(
+        type="comment.created",
+        audience=OPERATORS if comment.is_internal else REQUESTER,
+        requester_id=ticket.requester_id,
+        data={
+            "ticket_id": ticket.id,
+            **ticket_state(ticket),
+            "comment_id": comment.id,
+            "author_id": comment.author_id,
+            "is_internal": comment.is_internal,
+            "created_at": _iso(comment.created_at),
+        },
+    )
+
+
+def article_event(event_type: str, article, was_published: bool = False) -> Event:
+    """An event for an article; requesters only hear of articles that are or were published."""
+    visible = article.status == "PUBLISHED" or was_published
+    return Event(
+        type=event_type,
+        audience=EVERYONE if visible else OPERATORS,
+        data={
+            "article_id": article.id,
+            "status": article.status,
+            "updated_at": _iso(article.updated_at),
+        },
+    )
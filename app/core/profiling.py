@@ -0,0 +1,240 @@
+"""Sampling profiler for individual requests.
+
+An admin can profile one request by sending ``X-Profile: 1`` (or adding
+``?profile=1``); the response carries an ``X-Profile-Id`` under which the
+profile is kept. Sampling of such a request only starts once it has
+authenticated as an admin, so anyone else asking for a profile costs
+nothing; the flip side is that such a profile leaves out everything up to
+and including the user lookup in ``get_current_user``. With ``PROFILE_SAMPLE_RATE`` above zero a random share of all
+requests is profiled too, and the slowest ``PROFILE_KEEP`` of them are
+kept.
+
+While any request is being profiled a background thread samples the stacks
+of all threads every ``PROFILE_INTERVAL_MS``. A stack belongs to a request
+when it runs the request's middleware coroutine on the event loop, or runs
+in a threadpool worker under the request's context (sync dependencies such
+as ``get_current_user`` in sampled profiles, the endpoint with its service
+calls, and response validation all run there). Profiles are kept as folded stacks, the input
+format of flamegraph.pl, speedscope and similar tools.
+"""
+import contextvars
+import heapq
+import itertools
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Deque, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+try:
+    from anyio._backends._asyncio import WorkerThread
+    _WORKER_RUN = WorkerThread.run.__code__
+except (ImportError, AttributeError):  # pragma: no cover - other anyio versions
+    _WORKER_RUN = None
+
+ON_DEMAND = "on-demand"
+SAMPLED = "sampled"
+
+
+@dataclass(eq=False)
+class Profile:
+    """Stack samples of one request."""
+
+    id: str
+    mode: str  # on-demand, sampled
+    method: str
+    path: str
+    started_at: datetime
+    route: Optional[str] = None
+    status: Optional[int] = None
+    duration_ms: float = 0.0
+    samples: int = 0
+    user_role: Optional[str] = None
+    stacks: Counter = field(default_factory=Counter, repr=False)  # folded stack -> samples
+    _frame: object = field(default=None, repr=False)
+
+    def folded(self) -> str:
+        """The samples in the folded-stack format: ``outer;...;inner count`` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+_current: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar("profile", default=None)
+_lock = threading.Lock()
+_active: List[Profile] = []
+_sampler: Optional[threading.Thread] = None
+_on_demand: Deque[Profile] = deque()
+_slowest: List[Tuple[float, int, Profile]] = []  # min-heap on duration
+_sequence = itertools.count()
+
+
+def authenticated(user) -> None:
+    """Note the user of the request being profiled; an on-demand profile starts for admins only."""
+    profile = _current.get()
+    if profile is None:
+        return
+    profile.user_role = user.role
+    if profile.mode == ON_DEMAND and user.role == "admin":
+        _start(profile)
+
+
+def _label(frame) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}".replace(";", ":")
+
+
+def _owner(frames: List, profiles: List[Profile]) -> Tuple[Optional[Profile], int]:
+    """Find the profile a stack (innermost frame first) belongs to and where its request code starts."""
+    for depth, frame in enumerate(frames):
+        for profile in profiles:
+            if frame is profile._frame:
+                return profile, depth
+        if frame.f_code is _WORKER_RUN:
+            context = frame.f_locals.get("context")
+            if isinstance(context, contextvars.Context):
+                profile = context.get(_current)
+                if profile in profiles:
+                    return profile, depth
+            return None, 0
+    return None, 0
+
+
+def _sample(profiles: List[Profile], own_thread: int) -> None:
+    for thread_id, frame in sys._current_frames().items():
+        if thread_id == own_thread:
+            continue
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        profile, depth = _owner(frames, profiles)
+        if profile is None:
+            continue
+        root = "[event loop]" if frames[depth] is profile._frame else "[threadpool]"
+        # The worker's own run() frame is not request code; the middleware frame is
+        request_frames = frames[:depth + 1] if root == "[event loop]" else frames[:depth]
+        stack = ";".join([root] + [_label(f) for f in reversed(request_frames)])
+        profile.stacks[stack] += 1
+        profile.samples += 1
+
+
+def _run_sampler() -> None:
+    global _sampler
+    own_thread = threading.get_ident()
+    while True:
+        with _lock:
+            if not _active:
+                _sampler = None
+                return
+            _sample(_active, own_thread)
+        time.sleep(settings.PROFILE_INTERVAL_MS / 1000)
+
+
+def _start(profile: Profile) -> None:
+    global _sampler
+    with _lock:
+        if profile in _active:
+            return
+        _active.append(profile)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_run_sampler, name="request-profiler", daemon=True)
+            _sampler.start()
+
+
+def _finish(profile: Profile) -> None:
+    with _lock:
+        if profile not in _active:
+            # An on-demand request that never authenticated as an admin
+            return
+        _active.remove(profile)
+        if profile.mode == ON_DEMAND:
+            _on_demand.append(profile)
+            while len(_on_demand) > settings.PROFILE_KEEP:
+                _on_demand.popleft()
+        else:
+            entry = (profile.duration_ms, next(_sequence), profile)
+            if len(_slowest) < settings.PROFILE_KEEP:
+                heapq.heappush(_slowest, entry)
+            elif entry > _slowest[0]:
+                heapq.heapreplace(_slowest, entry)
+
+
+def profiles() -> List[Profile]:
+    """Kept profiles: on-demand ones newest first, then sampled ones slowest first."""
+    with _lock:
+        on_demand = list(reversed(_on_demand))
+        sampled = [profile for _, _, profile in sorted(_slowest, reverse=True)]
+    return on_demand + sampled
+
+
+def get_profile(profile_id: str) -> Optional[Profile]:
+    return next((profile for profile in profiles() if profile.id == profile_id), None)
+
+
+def reset() -> None:
+    """Forget every kept profile."""
+    with _lock:
+        _on_demand.clear()
+        _slowest.clear()
+
+
+def _requested(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            return value not in (b"", b"0", b"false")
+    query = scope.get("query_string", b"")
+    return b"profile=" in query and any(
+        part in (b"profile=1", b"profile=true") for part in query.split(b"&")
+    )
+
+
+class ProfilingMiddleware:
+    """Profile requests that ask for it, and a random sample of all requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        if _requested(scope):
+            mode = ON_DEMAND
+        elif settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+            mode = SAMPLED
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile(
+            id=uuid.uuid4().hex, mode=mode, method=scope["method"], path=scope["path"],
+            started_at=datetime.utcnow(),
+        )
+        profile._frame = sys._getframe()
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                if mode == ON_DEMAND and profile.user_role == "admin":
+                    MutableHeaders(scope=message).append("X-Profile-Id", profile.id)
+            await send(message)
+
+        token = _current.set(profile)
+        if mode == SAMPLED:
+            _start(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            profile.duration_ms = (time.perf_counter() - started) * 1000
+            route = scope.get("route")
+            profile.route = route.path if route is not None else None
+            _current.reset(token)
+            _finish(profile)
+            profile._frame = None
@@ -0,0 +1,123 @@
+"""Per-request SQL statement counters.
+
+Cursor-execute hooks on every engine add each statement to the
+:class:`QueryStats` of the request being served (tracked in a context
+variable, which FastAPI copies into the threadpool running sync
+endpoints). :class:`QueryStatsMiddleware` reports them in the
+``X-DB-Queries`` and ``Server-Timing`` response headers and logs requests
+that run the same statement shape many times, the usual sign of an N+1
+query pattern.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Statements run while serving one request."""
+
+    __slots__ = ("scope", "count", "duration", "shapes")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes = Counter()  # statement text (parameters are bound separately) -> runs
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes run at least ``threshold`` times, most repeated first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    @property
+    def route(self) -> Optional[str]:
+        """``METHOD /route/{template}`` of the request, once the router has matched it."""
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {route.path if route is not None else self.scope['path']}"
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_captures: List[List[str]] = []
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    for captured in _captures:
+        captured.append(statement)
+    stats = _current.get()
+    started = conn.info.get("query_started")
+    if stats is None or not started:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - started.pop()
+    stats.shapes[statement] += 1
+
+
+@contextmanager
+def capture_queries() -> Iterator[List[str]]:
+    """Collect every statement executed on any engine, from any thread, inside the block."""
+    captured: List[str] = []
+    _captures.append(captured)
+    try:
+        yield captured
+    finally:
+        _captures.remove(captured)
+
+
+class QueryStatsMiddleware:
+    """Count the SQL statements of each HTTP request and report them as response headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("X-DB-Queries", str(stats.count))
+                headers.append(
+                    "Server-Timing", f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+                )
+                repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+                if repeated:
+                    shape, count = repeated[0]
+                    headers.append("X-DB-Repeated-Queries", str(count))
+                    logger.warning(
+                        "Possible N+1 queries in %s %s: statement ran %d times: %s",
+                        scope["method"], scope["path"], count, shape,
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
@@ -0,0 +1,109 @@
+"""Short-lived cache of aggregate responses, kept compressed.
+
+Dashboard and metrics responses are the same for every operator and are
+expensive to compute, so :func:`cached` keeps each response body, keyed
+by path and query string, for ``settings.RESPONSE_CACHE_TTL_SECONDS``. An
+entry also keeps its body compressed in every encoding it was requested
+with, so a hit is served without running the query or the compressor;
+:class:`~app.core.compression.CompressionMiddleware` passes such responses
+through. Rebuilding the underlying aggregates calls :func:`clear`.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core import compression, telemetry
+from app.core.config import settings
+from app.core.serialization import serializer
+
+
+@dataclass(eq=False)
+class CacheEntry:
+    """A cached response body and its compressed variants."""
+
+    body: bytes
+    media_type: str
+    expires_at: float
+    encoded: Dict[str, bytes] = field(default_factory=dict)  # encoding -> compressed body
+
+    def encode(self, encoding: str) -> bytes:
+        """The body compressed with ``encoding``, compressing it on first use only."""
+        data = self.encoded.get(encoding)
+        if data is None:
+            data = self.encoded[encoding] = compression.compress(self.body, encoding)
+        return data
+
+
+_lock = threading.Lock()
+_entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+
+
+def cache_key(request: Request) -> str:
+    """Path plus sorted query string, so parameter order does not split entries."""
+    query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{query}"
+
+
+def _lookup(key: str) -> Optional[CacheEntry]:
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.expires_at <= time.monotonic():
+            del _entries[key]
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(key)
+    return entry
+
+
+def _store(key: str, entry: CacheEntry) -> None:
+    with _lock:
+        _entries[key] = entry
+        _entries.move_to_end(key)
+        while len(_entries) > settings.RESPONSE_CACHE_MAX_ENTRIES:
+            _entries.popitem(last=False)
+
+
+def _respond(request: Request, entry: CacheEntry, hit: bool) -> Response:
+    headers = {"Vary": "Accept-Encoding", "X-Cache": "HIT" if hit else "MISS"}
+    body = entry.body
+    if settings.COMPRESSION_ENABLED and len(body) >= settings.COMPRESSION_MIN_SIZE:
+        encoding = compression.negotiate(request.headers.get("accept-encoding"))
+        if encoding is not None:
+            body = entry.encode(encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=entry.media_type, headers=headers)
+
+
+def cached(request: Request, schema, build: Callable[[], Any]) -> Response:
+    """Respond with the cached response of this request, or build, dump as ``schema`` and cache it."""
+    ttl = settings.RESPONSE_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return Response(content=serializer(schema).dump_validated(build()), media_type="application/json")
+    key = cache_key(request)
+    entry = _lookup(key)
+    telemetry.record_cache("responses", entry is not None)
+    if entry is not None:
+        return _respond(request, entry, hit=True)
+    entry = CacheEntry(
+        body=serializer(schema).dump_validated(build()),
+        media_type="application/json",
+        expires_at=time.monotonic() + ttl,
+    )
+    _store(key, entry)
+    return _respond(request, entry, hit=False)
+
+
+def entries() -> Dict[str, Tuple[int, Tuple[str, ...]]]:
+    """Cached keys with their body size and the encodings kept for them."""
+    with _lock:
+        return {key: (len(entry.body), tuple(entry.encoded)) for key, entry in _entries.items()}
+
+
+def clear() -> None:
+    """Drop every cached response."""
+    with _lock:
+        _entries.clear()
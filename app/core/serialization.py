@@ -0,0 +1,158 @@
+"""Validation-free serialization of trusted ORM objects.
+
+FastAPI validates every returned object against the route's response model
+(``from_attributes``, including each nested user, category and tag), dumps
+the validated model and encodes it with the stdlib ``json`` module. For
+list endpoints that is most of the request time. Objects loaded from our
+own database already have the right types, so :class:`Serializer` copies
+the fields of a response schema straight into dicts, following a plan
+compiled once per schema, and :func:`json_response` encodes the result with
+orjson. The output is the same JSON the validated path produces; the
+schema's precompiled ``TypeAdapter`` is kept for checking that.
+"""
+import typing
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+_MISSING = object()
+
+# Field kinds of a serialization plan
+_VALUE, _MODEL, _MODEL_LIST = range(3)
+
+
+def _unwrap_optional(annotation):
+    if typing.get_origin(annotation) is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0]
+    return annotation
+
+
+def _is_model(annotation) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+class Serializer:
+    """Dump objects as a response schema without validating them."""
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.adapter = TypeAdapter(schema)
+        self._plan: List[Tuple[str, int, Optional["Serializer"], Any, bool]] = []
+        for name, field in schema.model_fields.items():
+            annotation = _unwrap_optional(field.annotation)
+            kind, nested = _VALUE, None
+            if _is_model(annotation):
+                kind, nested = _MODEL, serializer(annotation)
+            elif typing.get_origin(annotation) in (list, List):
+                (item,) = typing.get_args(annotation) or (Any,)
+                if _is_model(item):
+                    kind, nested = _MODEL_LIST, serializer(item)
+            required = field.is_required()
+            default = None if required else field.get_default(call_default_factory=True)
+            self._plan.append((name, kind, nested, default, required))
+        self._subsets = {}
+
+    def subset(self, fields: Optional[Iterable[str]]) -> "Serializer":
+        """A serializer of only ``fields``, in schema order; all fields for None.
+
+        Fields outside the subset are never read, so deferred columns and
+        relationships that were not loaded stay unloaded.
+        """
+        if fields is None:
+            return self
+        key = frozenset(fields)
+        subset = self._subsets.get(key)
+        if subset is None:
+            subset = object.__new__(Serializer)
+            subset.schema, subset.adapter, subset._subsets = self.schema, self.adapter, {}
+            subset._plan = [entry for entry in self._plan if entry[0] in key]
+            self._subsets[key] = subset
+        return subset
+
+    def dump(self, obj) -> Optional[dict]:
+        """Copy the schema's fields of an ORM object, dict or model into a dict."""
+        if obj is None:
+            return None
+        if isinstance(obj, dict):
+            loaded, source = obj, None
+        else:
+            # Loaded column and relationship values live in the instance dict;
+            # anything else (expired or lazy attributes) goes through getattr
+            loaded, source = obj.__dict__, obj
+        out = {}
+        for name, kind, nested, default, required in self._plan:
+            value = loaded.get(name, _MISSING)
+            if value is _MISSING:
+                if source is not None:
+                    value = getattr(source, name, default) if not required else getattr(source, name)
+                elif required:
+                    raise KeyError(name)
+                else:
+                    value = default
+            if kind == _MODEL:
+                value = nested.dump(value)
+            elif kind == _MODEL_LIST:
+                value = [nested.dump(item) for item in value]
+            out[name] = value
+        return out
+
+    def dump_many(self, objs) -> List[dict]:
+        dump = self.dump
+        return [dump(obj) for obj in objs]
+
+    def dump_validated(self, obj) -> bytes:
+        """JSON of the validated path FastAPI takes, for comparison."""
+        return self.adapter.dump_json(self.adapter.validate_python(obj, from_attributes=True))
+
+
+@lru_cache(maxsize=None)
+def serializer(schema) -> Serializer:
+    """The shared serializer of a response schema."""
+    return Serializer(schema)
+
+
+def json_response(schema, obj, status_code: int = 200) -> ORJSONResponse:
+    """Respond with ``obj`` dumped as ``schema`` and encoded by orjson, skipping response validation."""
+    return ORJSONResponse(serializer(schema).dump(obj), status_code=status_code)
+
+
+def parse_fields(
+    schema, fields: Optional[str], view: str = "full", summary: Sequence[str] = ()
+) -> Optional[Tuple[str, ...]]:
+    """Resolve ``?fields=`` / ``?view=summary`` to field names of ``schema``; None means every field.
+
+    ``id`` is always included and ``fields`` takes precedence over ``view``.
+    """
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in schema.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid fields: {', '.join(unknown)}. Allowed: {', '.join(schema.model_fields)}",
+            )
+    elif view == "summary":
+        names = list(summary)
+    else:
+        return None
+    return tuple(name for name in schema.model_fields if name == "id" or name in names)
+
+
+def page_response(item_schema, items, total: int, skip: int, limit: int, fields=None) -> ORJSONResponse:
+    """Respond with a page of ``items`` dumped as ``item_schema`` (only ``fields`` if given)."""
+    return ORJSONResponse({
+        "items": serializer(item_schema).subset(fields).dump_many(items),
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+    })
+
+
+def json_list_response(schema, objs, status_code: int = 200) -> ORJSONResponse:
+    """Respond with a JSON array of ``objs`` dumped as ``schema``, skipping response validation."""
+    return ORJSONResponse(serializer(schema).dump_many(objs), status_code=status_code)
@@ -0,0 +1,191 @@
+"""Slow-query log with automatic plan capture.
+
+Statements slower than ``settings.SLOW_QUERY_THRESHOLD_MS`` are logged with
+the shapes of their bound parameters, the route being served and the
+service function that ran them, plus the plan the database chose
+(``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN`` elsewhere). They are also
+aggregated per fingerprint (the statement with ``IN (...)`` lists
+collapsed) so the worst offenders by total time can be listed.
+"""
+import hashlib
+import logging
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.query_stats import current_stats
+
+logger = logging.getLogger(__name__)
+
+# Fingerprints kept; when full, the one with the least total time is dropped
+MAX_FINGERPRINTS = 500
+# Statements whose plan is captured; EXPLAIN of an INSERT is rarely informative
+_EXPLAINED = ("SELECT", "WITH", "UPDATE", "DELETE")
+_PLACEHOLDER = r"(?:\?|%s|%\(\w+\)s|:\w+)"
+_IN_LIST = re.compile(rf"IN \(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class SlowQuery:
+    """Slow runs of one statement fingerprint."""
+
+    fingerprint: str
+    statement: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    routes: Dict[str, int] = field(default_factory=dict)
+    services: Dict[str, int] = field(default_factory=dict)
+    parameters: str = ""
+    plan: Optional[str] = None  # of the slowest run
+    last_seen_at: Optional[datetime] = None
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+
+_lock = threading.Lock()
+_slow_queries: Dict[str, SlowQuery] = {}
+
+
+def normalize(statement: str) -> str:
+    """Statement text with whitespace and ``IN (?, ?, ...)`` lists collapsed."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("IN (...)", statement)
+
+
+def fingerprint(statement: str) -> str:
+    return hashlib.sha1(normalize(statement).encode()).hexdigest()[:16]
+
+
+def _type_names(values) -> str:
+    """Type names of a parameter sequence, with runs of one type collapsed (``str*500``)."""
+    runs: List[List] = []
+    for value in values:
+        name = "NULL" if value is None else type(value).__name__
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return ", ".join(name if count == 1 else f"{name}*{count}" for name, count in runs)
+
+
+def parameter_shapes(parameters, executemany: bool = False) -> str:
+    """Describe bound parameters by type only, so logs carry no user data."""
+    if executemany:
+        rows = list(parameters)
+        return f"{len(rows)} x {parameter_shapes(rows[0])}" if rows else "0 x ()"
+    if isinstance(parameters, dict):
+        return "(" + ", ".join(
+            f"{name}: {'NULL' if value is None else type(value).__name__}" for name, value in parameters.items()
+        ) + ")"
+    return f"({_type_names(parameters or ())})"
+
+
+def _caller() -> Optional[str]:
+    """``module.function`` of the innermost service (or router) frame on the stack."""
+    router = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module.startswith("app.services."):
+            return f"{module.rsplit('.', 1)[1]}.{frame.f_code.co_name}"
+        if router is None and module.startswith("app.routers."):
+            router = f"{module.rsplit('.', 1)[1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return router
+
+
+def explain(conn, statement: str, parameters) -> Optional[str]:
+    """Capture the plan of a statement on a separate cursor of the same connection."""
+    if not statement.lstrip().upper().startswith(_EXPLAINED):
+        return None
+    sqlite = conn.dialect.name == "sqlite"
+    prefix = "EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN "
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        rows = cursor.fetchall()
+    except Exception:
+        logger.debug("Could not explain statement", exc_info=True)
+        return None
+    finally:
+        cursor.close()
+    if sqlite:
+        return "\n".join(str(row[-1]) for row in rows)
+    return "\n".join(" | ".join(str(column) for column in row) for row in rows)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("slow_query_started")
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    if elapsed_ms < settings.SLOW_QUERY_THRESHOLD_MS:
+        return
+    record(conn, statement, parameters, executemany, elapsed_ms)
+
+
+def record(conn, statement: str, parameters, executemany: bool, elapsed_ms: float) -> None:
+    """Log a slow statement and add it to its fingerprint's totals."""
+    stats = current_stats()
+    route = stats.route if stats is not None else None
+    service = _caller()
+    shapes = parameter_shapes(parameters, executemany)
+    plan = None
+    if settings.SLOW_QUERY_EXPLAIN and not executemany:
+        plan = explain(conn, statement, parameters)
+    logger.warning(
+        "Slow query (%.1f ms) from %s in %s: %s; parameters %s%s",
+        elapsed_ms, route or "-", service or "-", normalize(statement), shapes,
+        f"\n{plan}" if plan else "",
+    )
+
+    key = fingerprint(statement)
+    with _lock:
+        entry = _slow_queries.get(key)
+        if entry is None:
+            if len(_slow_queries) >= MAX_FINGERPRINTS:
+                del _slow_queries[min(_slow_queries.values(), key=lambda e: e.total_ms).fingerprint]
+            entry = _slow_queries[key] = SlowQuery(fingerprint=key, statement=normalize(statement))
+        entry.count += 1
+        entry.total_ms += elapsed_ms
+        if elapsed_ms >= entry.max_ms:
+            entry.max_ms = elapsed_ms
+            entry.parameters = shapes
+            entry.plan = plan or entry.plan
+        if route:
+            entry.routes[route] = entry.routes.get(route, 0) + 1
+        if service:
+            entry.services[service] = entry.services.get(service, 0) + 1
+        entry.last_seen_at = datetime.utcnow()
+
+
+def top(limit: int = 20) -> List[SlowQuery]:
+    """Slow statement fingerprints by total time, worst first."""
+    with _lock:
+        entries = sorted(_slow_queries.values(), key=lambda entry: entry.total_ms, reverse=True)[:limit]
+        return [replace(entry, routes=dict(entry.routes), services=dict(entry.services)) for entry in entries]
+
+
+def reset() -> None:
+    """Forget every recorded slow statement."""
+    with _lock:
+        _slow_queries.clear()
@@ -0,0 +1,254 @@
+"""In-process request metrics in the Prometheus text format.
+
+:class:`TelemetryMiddleware` records in-flight requests, a latency
+histogram per route template and a counter per route and status code.
+Database pool checkout waits are timed by :func:`instrument_pool` and the
+per-session caches report hits and misses with :func:`record_cache`.
+Threadpool, pool and event stream gauges are read when ``/metrics`` is
+scraped.
+
+Everything lives in module-level state of the serving process; with several
+worker processes each one exposes its own series. Recording a request is a
+few dictionary and list updates, so it stays far below the cost of the
+request itself (see ``python manage.py benchmark-middleware``).
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import anyio.to_thread
+
+from app.core import events
+from app.core.config import settings
+
+# Upper bounds in seconds; an implicit +Inf bucket follows the last one
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Requests that match no route share one label so unknown paths cannot grow the series
+UNMATCHED_ROUTE = "<unmatched>"
+
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Counts of observations per bucket plus their sum."""
+
+    __slots__ = ("buckets", "counts", "total")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+
+    def copy(self) -> "Histogram":
+        histogram = Histogram(self.buckets)
+        histogram.counts, histogram.total = list(self.counts), self.total
+        return histogram
+
+    def cumulative(self) -> List[int]:
+        counts, running = [], 0
+        for count in self.counts:
+            running += count
+            counts.append(running)
+        return counts
+
+
+_in_flight = 0
+_latencies: Dict[Tuple[str, str], Histogram] = {}
+_responses: Counter = Counter()  # (method, route, status) -> requests
+_pool_wait = Histogram(POOL_WAIT_BUCKETS)
+_pools: List = []
+_caches: Counter = Counter()  # (cache, "hit" | "miss") -> lookups
+_cache_info: Dict[str, Callable] = {}
+
+
+def record_cache(name: str, hit: bool) -> None:
+    """Count a lookup in a named cache."""
+    with _lock:
+        _caches[name, "hit" if hit else "miss"] += 1
+
+
+def register_cache_info(name: str, cache_info: Callable) -> None:
+    """Report the hits and misses of a ``functools.lru_cache`` function under ``name``."""
+    _cache_info[name] = cache_info
+
+
+def instrument_pool(pool) -> None:
+    """Time every connection checkout of a SQLAlchemy pool, including waits for a free slot."""
+    checkout = pool.connect
+
+    def connect():
+        started = time.perf_counter()
+        try:
+            return checkout()
+        finally:
+            elapsed = time.perf_counter() - started
+            with _lock:
+                _pool_wait.observe(elapsed)
+
+    pool.connect = connect
+    _pools.append(pool)
+
+
+def reset() -> None:
+    """Forget every recorded value."""
+    global _in_flight
+    with _lock:
+        _in_flight = 0
+        _latencies.clear()
+        _responses.clear()
+        _pool_wait.counts, _pool_wait.total = [0] * len(_pool_wait.counts), 0.0
+        _caches.clear()
+
+
+class TelemetryMiddleware:
+    """Record the latency, status code and concurrency of every HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        global _in_flight
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        with _lock:
+            _in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else UNMATCHED_ROUTE)
+            with _lock:
+                _in_flight -= 1
+                histogram = _latencies.get(key)
+                if histogram is None:
+                    histogram = _latencies[key] = Histogram(LATENCY_BUCKETS)
+                histogram.observe(elapsed)
+                _responses[key + (status,)] += 1
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, object]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Writer:
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, labels: Optional[Dict[str, object]] = None) -> None:
+        self.lines.append(f"{name}{_labels(labels or {})} {_format_value(value)}")
+
+    def histogram(self, name: str, histogram: Histogram, labels: Optional[Dict[str, object]] = None) -> None:
+        labels = labels or {}
+        cumulative = histogram.cumulative()
+        for bound, count in zip(histogram.buckets + (float("inf"),), cumulative):
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            self.sample(f"{name}_bucket", count, {**labels, "le": le})
+        self.sample(f"{name}_sum", histogram.total, labels)
+        self.sample(f"{name}_count", cumulative[-1], labels)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render() -> str:
+    """Render every metric in the Prometheus text exposition format.
+
+    Must be called from the event loop, which owns the threadpool limiter.
+    """
+    limiter = anyio.to_thread.current_default_thread_limiter().statistics()
+    with _lock:
+        in_flight = _in_flight
+        latencies = {key: histogram.copy() for key, histogram in _latencies.items()}
+        responses = dict(_responses)
+        pool_wait = _pool_wait.copy()
+        caches = Counter(_caches)
+    for name, cache_info in _cache_info.items():
+        info = cache_info()
+        caches[name, "hit"] += info.hits
+        caches[name, "miss"] += info.misses
+
+    out = _Writer()
+    out.family("helpdesk_http_requests_in_flight", "gauge", "HTTP requests being served.")
+    out.sample("helpdesk_http_requests_in_flight", in_flight)
+
+    out.family("helpdesk_http_requests_total", "counter", "HTTP responses by route template and status code.")
+    for (method, route, status), count in sorted(responses.items()):
+        out.sample("helpdesk_http_requests_total", count, {"method": method, "route": route, "status": status})
+
+    out.family("helpdesk_http_request_duration_seconds", "histogram", "HTTP request latency by route template.")
+    for (method, route), histogram in sorted(latencies.items()):
+        out.histogram("helpdesk_http_request_duration_seconds", histogram, {"method": method, "route": route})
+
+    out.family("helpdesk_threadpool_threads_in_use", "gauge", "Worker threads running sync endpoints.")
+    out.sample("helpdesk_threadpool_threads_in_use", limiter.borrowed_tokens)
+    out.family("helpdesk_threadpool_threads_max", "gauge", "Worker thread limit.")
+    out.sample("helpdesk_threadpool_threads_max", int(limiter.total_tokens))
+    out.family("helpdesk_threadpool_queue_depth", "gauge", "Sync calls waiting for a free worker thread.")
+    out.sample("helpdesk_threadpool_queue_depth", limiter.tasks_waiting)
+
+    out.family(
+        "helpdesk_db_pool_checkout_wait_seconds", "histogram",
+        "Time to check a connection out of the database pool.",
+    )
+    out.histogram("helpdesk_db_pool_checkout_wait_seconds", pool_wait)
+    pools = [pool for pool in _pools if hasattr(pool, "checkedout") and hasattr(pool, "size")]
+    if pools:
+        out.family("helpdesk_db_pool_connections_checked_out", "gauge", "Database connections in use.")
+        out.sample("helpdesk_db_pool_connections_checked_out", sum(pool.checkedout() for pool in pools))
+        out.family("helpdesk_db_pool_size", "gauge", "Configured database pool size.")
+        out.sample("helpdesk_db_pool_size", sum(pool.size() for pool in pools))
+
+    names = sorted({name for name, _ in caches})
+    out.family("helpdesk_cache_requests_total", "counter", "Cache lookups by result.")
+    for name in names:
+        for result in ("hit", "miss"):
+            out.sample("helpdesk_cache_requests_total", caches[name, result], {"cache": name, "result": result})
+    out.family("helpdesk_cache_hit_ratio", "gauge", "Share of cache lookups that were hits.")
+    for name in names:
+        lookups = caches[name, "hit"] + caches[name, "miss"]
+        out.sample("helpdesk_cache_hit_ratio", caches[name, "hit"] / lookups if lookups else 0.0, {"cache": name})
+
+    out.family("helpdesk_stream_connections", "gauge", "Open /api/stream connections.")
+    out.sample("helpdesk_stream_connections", events.broker.connections())
+    out.family("helpdesk_stream_events_published_total", "counter", "Change events published to the stream.")
+    out.sample("helpdesk_stream_events_published_total", events.broker.published)
+    out.family(
+        "helpdesk_stream_events_dropped_total", "counter",
+        "Events dropped from the buffers of slow stream connections.",
+    )
+    out.sample("helpdesk_stream_events_dropped_total", events.broker.dropped)
+    return out.text()
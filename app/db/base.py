@@ -1,17 +1,30 @@
 from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
+from app.core import telemetry
 from app.core.config import settings
 
 engine = create_engine(
     settings.DATABASE_URL, connect_args={"check_same_thread": False}
 )
+telemetry.instrument_pool(engine.pool)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def insert_or_ignore(db, table):
+    """``INSERT ... ON CONFLICT DO NOTHING`` for the session's database (SQLite or PostgreSQL).
+
+    A row that conflicts with an existing key is skipped without aborting
+    the transaction; the result's ``rowcount`` counts the rows inserted.
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(table).on_conflict_do_nothing()
+
+
 def get_db():
     """Dependency to get database session."""
     db = SessionLocal()
@@ -1,15 +1,39 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.core import concurrency, telemetry
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.routers import auth, tickets, articles, admin
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.routers import auth, tickets, articles, admin, sla, dashboard, metrics, stream, changes
+from app.services.sla_scheduler import scheduler as sla_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop in-process background workers."""
+    if settings.SLA_SCHEDULER_ENABLED:
+        sla_scheduler.start()
+    yield
+    sla_scheduler.stop()
+
 
 app = FastAPI(
     title="Helpdesk & Knowledge Base API",
     description="統合ヘルプデスク＆ナレッジベースシステム",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# 同じチケット・記事への同時更新で負けた書き込みは409で返す（楽観的排他制御）
+app.add_exception_handler(StaleDataError, concurrency.stale_data_handler)
+
 # CORS設定（開発環境用）
 app.add_middleware(
     CORSMiddleware,
@@ -17,13 +41,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Has-More"],
 )
 
+# 一定サイズ以上のレスポンスをgzip（brotli/zstdが使える場合はそれも）で圧縮する
+app.add_middleware(CompressionMiddleware)
+
+# SQL文の数と所要時間をレスポンスヘッダーで返す
+app.add_middleware(QueryStatsMiddleware)
+
+# 管理者の X-Profile ヘッダー（または ?profile=1）とランダムサンプリングでリクエストをプロファイルする
+app.add_middleware(ProfilingMiddleware)
+
+# レイテンシ・ステータスコード・同時実行数を記録する（一番外側で計測）
+app.add_middleware(telemetry.TelemetryMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(tickets.router)
 app.include_router(articles.router)
 app.include_router(admin.router)
+app.include_router(sla.router)
+app.include_router(dashboard.router)
+app.include_router(metrics.router)
+app.include_router(stream.router)
+app.include_router(changes.router)
 
 
 @app.get("/")
@@ -32,6 +74,14 @@ def root():
     return {"message": "Helpdesk & Knowledge Base API", "status": "running"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Request, threadpool, database pool and cache metrics in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(telemetry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/health")
 def health():
     """Health check endpoint."""
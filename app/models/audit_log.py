@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, JSON, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -16,4 +16,24 @@ class AuditLog(Base):
     meta_data = Column(JSON, nullable=True)
     ip_address = Column(String, nullable=True)
     user_agent = Column(String, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_audit_logs_entity", "entity_type", "entity_id"),
+    )
+
+
+class AuditLogPartition(Base):
+    """Catalog entry for one archived month of audit logs.
+
+    Rows older than the retention window are moved out of ``audit_logs`` into
+    a gzip-compressed JSON Lines file per month (``YYYY-MM``).
+    """
+    __tablename__ = "audit_log_partitions"
+
+    month = Column(String, primary_key=True)  # YYYY-MM
+    archive_path = Column(String, nullable=False)
+    row_count = Column(Integer, default=0, nullable=False)
+    first_created_at = Column(DateTime, nullable=True)
+    last_created_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime
+from sqlalchemy import Column, String, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -12,4 +12,5 @@ class Category(Base):
     name = Column(String, nullable=False)
     type = Column(String, nullable=False)  # TICKET, ARTICLE, BOTH
     description = Column(String, nullable=True)
+    team_id = Column(String, ForeignKey("teams.id"), nullable=True)  # routing team of new tickets
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
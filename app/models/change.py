@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime, Index
+
+from app.db.base import Base
+
+# Audience of changes every user may see (published articles)
+EVERYONE = "*"
+
+
+class Change(Base):
+    """One committed change to a ticket, comment or article, in commit order.
+
+    ``seq`` comes from the ``changes`` number sequence, taken just before
+    the writing transaction commits, so sequence order is commit order and
+    ``seq > cursor`` never skips a change committed later. ``audience`` is
+    the requester the change is visible to, ``*`` for everyone, or NULL
+    for operators only.
+    """
+    __tablename__ = "changes"
+
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    entity_type = Column(String, nullable=False)  # ticket, comment, article
+    entity_id = Column(String, nullable=False)
+    audience = Column(String, nullable=True)
+    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        # A requester's feed: their own changes and everyone's, each read as a range from the cursor
+        Index("ix_changes_audience_seq", "audience", "seq"),
+    )
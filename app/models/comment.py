@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -19,3 +19,8 @@ class Comment(Base):
     # Relationships
     ticket = relationship("Ticket", back_populates="comments")
     author = relationship("User", foreign_keys=[author_id])
+
+    __table_args__ = (
+        # Keyset pagination of a ticket's thread: (created_at, id) after a cursor
+        Index("ix_comments_ticket_id_created_at", "ticket_id", "created_at", "id"),
+    )
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Date, DateTime, UniqueConstraint
+
+from app.db.base import Base
+
+
+class Holiday(Base):
+    __tablename__ = "holidays"
+
+    id = Column(String, primary_key=True)
+    calendar = Column(String, default="default", nullable=False)
+    date = Column(Date, nullable=False)
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("calendar", "date", name="uq_holidays_calendar_date"),
+    )
@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, JSON, ForeignKey
+
+from app.db.base import Base
+
+
+class ImportJob(Base):
+    """Progress of a bulk ticket or comment import.
+
+    ``position`` counts the input records already handled and is committed
+    together with each batch, so an interrupted import resumes right after
+    the last committed batch.
+    """
+    __tablename__ = "import_jobs"
+
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)  # tickets, comments
+    format = Column(String, nullable=False)  # csv, ndjson
+    source = Column(String, nullable=True)
+    status = Column(String, nullable=False)  # RUNNING, COMPLETED, FAILED
+    position = Column(Integer, default=0, nullable=False)
+    imported = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON, nullable=True)  # first errors: [{"record": n, "error": "..."}]
+    created_by = Column(String, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    completed_at = Column(DateTime, nullable=True)
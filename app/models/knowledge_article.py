@@ -19,7 +19,13 @@ class KnowledgeArticle(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     published_at = Column(DateTime, nullable=True)
     
+    # Row version for optimistic concurrency: every ORM UPDATE checks and bumps it.
+    # view_count is written around it, so reading an article does not change it.
+    version = Column(Integer, default=1, nullable=False)
+    
     # Relationships
     category = relationship("Category", foreign_keys=[category_id])
     author = relationship("User", foreign_keys=[author_id])
     tags = relationship("Tag", secondary="article_tags", back_populates="articles")
+    
+    __mapper_args__ = {"version_id_col": version}
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer
+
+from app.db.base import Base
+
+
+class NumberSequence(Base):
+    """Last number handed out by a named sequence (e.g. ticket numbers).
+
+    Numbers are reserved with a relative UPDATE, so concurrent writers and
+    bulk imports can take whole blocks without colliding.
+    """
+    __tablename__ = "number_sequences"
+
+    name = Column(String, primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
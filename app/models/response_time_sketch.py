@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Date, Integer, BigInteger, LargeBinary, Index
+
+from app.db.base import Base
+
+
+class ResponseTimeSketch(Base):
+    """Quantile sketch of one response-time metric for a priority, team and period.
+
+    ``bins`` holds a serialized :class:`~app.services.quantile_sketch.QuantileSketch`;
+    sketches of any set of periods merge into exact combined distributions.
+    Every value is kept in both its DAY and its MONTH sketch so long ranges
+    merge one sketch per month instead of one per day.
+    """
+    __tablename__ = "response_time_sketches"
+
+    key = Column(String, primary_key=True)  # metric|period|day|priority|team_id
+    metric = Column(String, nullable=False)  # FIRST_RESPONSE, RESOLUTION
+    period = Column(String, nullable=False)  # DAY, MONTH
+    day = Column(Date, nullable=False)  # UTC day (first day of the month for MONTH)
+    priority = Column(String, nullable=False)
+    team_id = Column(String, nullable=True)
+    count = Column(Integer, default=0, nullable=False)
+    total_seconds = Column(BigInteger, default=0, nullable=False)
+    min_seconds = Column(Integer, nullable=True)
+    max_seconds = Column(Integer, nullable=True)
+    bins = Column(LargeBinary, nullable=False)
+
+    __table_args__ = (
+        Index("ix_response_time_sketches_period_day", "period", "day"),
+    )
@@ -0,0 +1,19 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, UniqueConstraint
+
+from app.db.base import Base
+
+
+class SLABreachEvent(Base):
+    __tablename__ = "sla_breach_events"
+
+    id = Column(String, primary_key=True)
+    ticket_id = Column(String, ForeignKey("tickets.id"), nullable=False, index=True)
+    kind = Column(String, nullable=False)  # FIRST_RESPONSE, RESOLUTION
+    priority = Column(String, nullable=False)
+    due_at = Column(DateTime, nullable=False)
+    detected_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("ticket_id", "kind", name="uq_sla_breach_events_ticket_kind"),
+    )
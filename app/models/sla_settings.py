@@ -13,5 +13,7 @@ class SLASettings(Base):
     resolution_target_minutes = Column(Integer, nullable=False)
     pause_on_waiting_customer = Column(Boolean, default=True, nullable=False)
     timezone = Column(String, default="Asia/Tokyo", nullable=False)
+    business_hours_only = Column(Boolean, default=False, nullable=False)
+    calendar = Column(String, default="default", nullable=False)  # holiday calendar name
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
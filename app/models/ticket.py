@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -18,17 +18,33 @@ class Ticket(Base):
     requester_id = Column(String, ForeignKey("users.id"), nullable=False)
     assignee_id = Column(String, ForeignKey("users.id"), nullable=True)
     assigned_team_id = Column(String, ForeignKey("teams.id"), nullable=True)
+    external_ref = Column(String, unique=True, nullable=True)  # id in the system it was imported from
     
     # SLA tracking
     first_response_at = Column(DateTime, nullable=True)
     resolved_at = Column(DateTime, nullable=True)
     closed_at = Column(DateTime, nullable=True)
     waiting_customer_started_at = Column(DateTime, nullable=True)
-    total_waiting_customer_duration = Column(Integer, default=0, nullable=False)  # seconds
+    total_waiting_customer_duration = Column(Integer, default=0, nullable=False)  # seconds (working seconds under business-hours SLAs)
+    
+    # Running SLA deadlines (NULL while the clock is stopped or paused)
+    first_response_due_at = Column(DateTime, nullable=True)
+    resolution_due_at = Column(DateTime, nullable=True)
+    sla_due_at = Column(DateTime, nullable=True, index=True)  # earliest running deadline
+    
+    # Thread activity as the requester sees it; internal notes do not count.
+    # last_activity_at is the latest creation, public comment or status change.
+    comment_count = Column(Integer, default=0, nullable=False)
+    last_public_comment_at = Column(DateTime, nullable=True)
+    last_activity_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
+    # Row version for optimistic concurrency: every ORM UPDATE checks and bumps it.
+    # Derived columns (comment count, activity, SLA deadlines) are written around it.
+    version = Column(Integer, default=1, nullable=False)
+    
     # Relationships
     category = relationship("Category", foreign_keys=[category_id])
     requester = relationship("User", foreign_keys=[requester_id])
@@ -36,3 +52,8 @@ class Ticket(Base):
     assigned_team = relationship("Team", foreign_keys=[assigned_team_id])
     tags = relationship("Tag", secondary="ticket_tags", back_populates="tickets")
     comments = relationship("Comment", back_populates="ticket")
+    
+    __table_args__ = (
+        Index("ix_tickets_status_sla_due_at", "status", "sla_due_at"),
+    )
+    __mapper_args__ = {"version_id_col": version}
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer
+
+from app.db.base import Base
+
+
+class TicketCount(Base):
+    """Number of tickets in one status × priority × team × assignee cell.
+
+    Maintained in the same transaction as every ticket change that moves a
+    ticket between cells, so the dashboard never has to scan ``tickets``.
+    """
+    __tablename__ = "ticket_counts"
+
+    key = Column(String, primary_key=True)  # status|priority|team_id|assignee_id
+    status = Column(String, nullable=False)
+    priority = Column(String, nullable=False)
+    team_id = Column(String, nullable=True)
+    assignee_id = Column(String, nullable=True)
+    count = Column(Integer, default=0, nullable=False)
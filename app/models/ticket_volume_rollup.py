@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, Integer, Index
+
+from app.db.base import Base
+
+
+class TicketVolumeRollup(Base):
+    """Ticket inflow and outflow counts for one time bucket, category and priority.
+
+    Every event is counted in its HOUR bucket and in its DAY bucket (UTC);
+    weekly figures are summed from the DAY buckets.
+    """
+    __tablename__ = "ticket_volume_rollups"
+
+    key = Column(String, primary_key=True)  # period|bucket_start|category_id|priority
+    period = Column(String, nullable=False)  # HOUR, DAY
+    bucket_start = Column(DateTime, nullable=False)
+    category_id = Column(String, nullable=True)
+    priority = Column(String, nullable=False)
+    created = Column(Integer, default=0, nullable=False)
+    resolved = Column(Integer, default=0, nullable=False)
+    closed = Column(Integer, default=0, nullable=False)
+    reopened = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("ix_ticket_volume_rollups_period_bucket_start", "period", "bucket_start"),
+    )
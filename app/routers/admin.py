@@ -1,7 +1,10 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, UploadFile
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 
+from app.core import profiling, serialization, slow_queries
 from app.core.deps import get_current_admin, get_current_user
 from app.core.security import get_password_hash
 from app.db.base import get_db
@@ -10,7 +13,9 @@ from app.models.team import Team
 from app.models.category import Category
 from app.models.tag import Tag
 from app.models.sla_settings import SLASettings
-from app.models.audit_log import AuditLog
+from app.models.holiday import Holiday
+from app.services import audit_service, import_service, routing_service, sla_service, business_calendar
+from app.services.sla_scheduler import scheduler as sla_scheduler
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
 from app.schemas.admin import (
     TeamCreate,
@@ -24,7 +29,13 @@ from app.schemas.admin import (
     SLASettingsCreate,
     SLASettingsUpdate,
     SLASettingsResponse,
+    HolidayCreate,
+    HolidayResponse,
     AuditLogResponse,
+    AuditLogPartitionResponse,
+    ImportJobResponse,
+    SlowQueryResponse,
+    ProfileResponse,
 )
 import uuid
 from datetime import datetime
@@ -70,6 +81,8 @@ def create_user(
     db.add(user)
     db.commit()
     db.refresh(user)
+    if user.role == "operator" and user.team_id:
+        routing_service.balancer.invalidate()
     return user
 
 
@@ -96,6 +109,9 @@ def update_user(
     user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(user)
+    if "role" in update_data or "team_id" in update_data:
+        # Operators joined or left a team
+        routing_service.balancer.invalidate()
     return user
 
 
@@ -163,6 +179,11 @@ def list_categories(
     return categories
 
 
+def _check_routing_team(db: Session, team_id: Optional[str]) -> None:
+    if team_id is not None and db.get(Team, team_id) is None:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Team not found")
+
+
 @router.post("/categories", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
 def create_category(
     category_data: CategoryCreate,
@@ -170,11 +191,13 @@ def create_category(
     db: Session = Depends(get_db),
 ):
     """Create a new category (admin only)."""
+    _check_routing_team(db, category_data.team_id)
     category = Category(
         id=str(uuid.uuid4()),
         name=category_data.name,
         type=category_data.type,
         description=category_data.description,
+        team_id=category_data.team_id,
         created_at=datetime.utcnow(),
     )
     db.add(category)
@@ -183,6 +206,28 @@ def create_category(
     return category
 
 
+@router.patch("/categories/{category_id}", response_model=CategoryResponse)
+def update_category(
+    category_id: str,
+    category_data: CategoryUpdate,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Update category, e.g. its routing team (admin only)."""
+    category = db.query(Category).filter(Category.id == category_id).first()
+    if not category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    
+    updates = category_data.model_dump(exclude_unset=True)
+    _check_routing_team(db, updates.get("team_id"))
+    for key, value in updates.items():
+        setattr(category, key, value)
+    
+    db.commit()
+    db.refresh(category)
+    return category
+
+
 # Tag Management
 @router.get("/tags", response_model=List[TagResponse])
 def list_tags(
@@ -247,12 +292,16 @@ def create_sla_settings(
         resolution_target_minutes=sla_data.resolution_target_minutes,
         pause_on_waiting_customer=sla_data.pause_on_waiting_customer,
         timezone=sla_data.timezone,
+        business_hours_only=sla_data.business_hours_only,
+        calendar=sla_data.calendar,
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
     db.add(settings)
     db.commit()
     db.refresh(settings)
+    sla_service.recompute_due_dates(db, priority=settings.priority)
+    sla_scheduler.rebuild(db)
     return settings
 
 
@@ -268,6 +317,7 @@ def update_sla_settings(
     if not settings:
         raise HTTPException(status_code=404, detail="SLA settings not found")
     
+    old_priority = settings.priority
     update_data = sla_data.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(settings, key, value)
@@ -275,29 +325,236 @@ def update_sla_settings(
     settings.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(settings)
+    # Moving settings to another priority affects tickets of both priorities
+    sla_service.recompute_due_dates(
+        db, priority=settings.priority if settings.priority == old_priority else None
+    )
+    sla_scheduler.rebuild(db)
     return settings
 
 
+# Business Calendar
+@router.get("/holidays", response_model=List[HolidayResponse])
+def list_holidays(
+    calendar: Optional[str] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get list of holidays used by business-hours SLAs."""
+    query = db.query(Holiday)
+    if calendar:
+        query = query.filter(Holiday.calendar == calendar)
+    return query.order_by(Holiday.date).all()
+
+
+@router.post("/holidays", response_model=HolidayResponse, status_code=status.HTTP_201_CREATED)
+def create_holiday(
+    holiday_data: HolidayCreate,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Add a holiday to a business calendar (admin only)."""
+    existing = (
+        db.query(Holiday)
+        .filter(Holiday.calendar == holiday_data.calendar, Holiday.date == holiday_data.date)
+        .first()
+    )
+    if existing:
+        raise HTTPException(status_code=400, detail=f"Holiday on {holiday_data.date} already exists")
+    
+    holiday = Holiday(
+        id=str(uuid.uuid4()),
+        calendar=holiday_data.calendar,
+        date=holiday_data.date,
+        name=holiday_data.name,
+        created_at=datetime.utcnow(),
+    )
+    db.add(holiday)
+    db.commit()
+    db.refresh(holiday)
+    business_calendar.invalidate_holidays(db)
+    sla_service.recompute_due_dates(db)
+    sla_scheduler.rebuild(db)
+    return holiday
+
+
+@router.delete("/holidays/{holiday_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_holiday(
+    holiday_id: str,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Remove a holiday (admin only)."""
+    holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
+    if not holiday:
+        raise HTTPException(status_code=404, detail="Holiday not found")
+    
+    db.delete(holiday)
+    db.commit()
+    business_calendar.invalidate_holidays(db)
+    sla_service.recompute_due_dates(db)
+    sla_scheduler.rebuild(db)
+    return None
+
+
 # Audit Log
 @router.get("/audit-logs", response_model=List[AuditLogResponse])
 def list_audit_logs(
     entity_type: Optional[str] = Query(None),
     entity_id: Optional[str] = Query(None),
     action: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    until: Optional[datetime] = Query(None),
+    include_archived: bool = Query(False),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
     current_user: User = Depends(get_current_admin),
     db: Session = Depends(get_db),
 ):
-    """Get audit logs (admin only, read-only)."""
-    query = db.query(AuditLog)
-    
-    if entity_type:
-        query = query.filter(AuditLog.entity_type == entity_type)
-    if entity_id:
-        query = query.filter(AuditLog.entity_id == entity_id)
-    if action:
-        query = query.filter(AuditLog.action == action)
-    
-    logs = query.order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
-    return logs
+    """Get audit logs (admin only, read-only).
+
+    Archived months are searched only when ``include_archived`` is set.
+    """
+    return audit_service.search_audit_logs(
+        db,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        action=action,
+        since=since,
+        until=until,
+        include_archived=include_archived,
+        skip=skip,
+        limit=limit,
+    )
+
+
+@router.get("/audit-logs/partitions", response_model=List[AuditLogPartitionResponse])
+def list_audit_log_partitions(
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Get archived audit log partitions (admin only)."""
+    return audit_service.get_partitions(db)
+
+
+@router.post("/audit-logs/archive", response_model=List[AuditLogPartitionResponse])
+def archive_audit_logs(
+    retain_months: Optional[int] = Query(None, ge=1),
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Move audit logs older than the retention window into archives (admin only)."""
+    return audit_service.archive_audit_logs(db, retain_months=retain_months)
+
+
+# Bulk Import
+@router.post(
+    "/imports",
+    response_model=ImportJobResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={422: {"model": ImportJobResponse, "description": "The import failed; the job can be resumed"}},
+)
+def import_records(
+    file: UploadFile = File(...),
+    kind: str = Query("tickets", pattern="^(tickets|comments)$"),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    job_id: Optional[str] = Query(None),
+    batch_size: int = Query(import_service.BATCH_SIZE, ge=1, le=10000),
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Import tickets or comments from a CSV or NDJSON upload (admin only).
+
+    A failed import answers 422 with the FAILED job and its errors; pass its
+    ``job_id`` with the corrected file to resume it after its last committed
+    batch. Indexes are never deferred here, since the application keeps
+    serving queries during the import (see ``manage.py import-tickets``).
+    """
+    if job_id:
+        job = import_service.get_job(db, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Import job not found")
+        if job.status == "COMPLETED":
+            raise HTTPException(status_code=400, detail="Import job already completed")
+    else:
+        job = import_service.create_job(db, kind, format, source=file.filename, user=current_user)
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        import_service.run_import(db, job, stream, user=current_user, batch_size=batch_size)
+    except Exception:
+        # The job is stored as FAILED with the error and can be resumed
+        db.refresh(job)
+        return serialization.json_response(
+            ImportJobResponse, job, status_code=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    finally:
+        stream.detach()
+    sla_scheduler.rebuild(db)
+    return job
+
+
+@router.get("/imports", response_model=List[ImportJobResponse])
+def list_imports(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Get bulk import jobs, newest first (admin only)."""
+    return import_service.list_jobs(db, skip=skip, limit=limit)
+
+
+@router.get("/imports/{job_id}", response_model=ImportJobResponse)
+def get_import(
+    job_id: str,
+    current_user: User = Depends(get_current_admin),
+    db: Session = Depends(get_db),
+):
+    """Get the progress of a bulk import job (admin only)."""
+    job = import_service.get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+# Slow queries
+@router.get("/slow-queries", response_model=List[SlowQueryResponse])
+def list_slow_queries(
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_admin),
+):
+    """Get the slow statement fingerprints of this process by total time (admin only)."""
+    return slow_queries.top(limit)
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def reset_slow_queries(current_user: User = Depends(get_current_admin)):
+    """Forget the recorded slow statements (admin only)."""
+    slow_queries.reset()
+    return None
+
+
+# Request profiles
+@router.get("/profiles", response_model=List[ProfileResponse])
+def list_profiles(
+    mode: Optional[str] = Query(None, pattern="^(on-demand|sampled)$"),
+    current_user: User = Depends(get_current_admin),
+):
+    """Get the kept request profiles of this process (admin only).
+
+    On-demand profiles come newest first, sampled ones slowest first.
+    """
+    return [profile for profile in profiling.profiles() if mode is None or profile.mode == mode]
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_admin),
+):
+    """Get a request profile as folded stacks for flame graph tools (admin only)."""
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.folded())
@@ -1,7 +1,8 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 
+from app.core import concurrency, serialization
 from app.core.deps import get_current_user, get_current_operator
 from app.db.base import get_db
 from app.models.user import User
@@ -10,6 +11,7 @@ from app.schemas.knowledge_article import (
     KnowledgeArticleUpdate,
     KnowledgeArticleResponse,
     PaginatedArticleResponse,
+    ARTICLE_SUMMARY_FIELDS,
 )
 from app.services import article_service
 
@@ -41,10 +43,18 @@ def list_articles(
     category_id: Optional[str] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(25, ge=1, le=100),
+    fields: Optional[str] = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get list of articles with filters."""
+    """Get list of articles with filters.
+
+    ``fields`` (comma-separated ``KnowledgeArticleResponse`` fields) or
+    ``view=summary`` return only those fields of each article, and only they
+    are loaded.
+    """
+    fields = serialization.parse_fields(KnowledgeArticleResponse, fields, view, ARTICLE_SUMMARY_FIELDS)
     # Requesters can only see published articles
     if current_user.role == "requester":
         status = "PUBLISHED"
@@ -56,6 +66,7 @@ def list_articles(
         category_id=category_id,
         skip=skip,
         limit=limit,
+        fields=fields,
     )
     
     # Get total count
@@ -66,21 +77,17 @@ def list_articles(
         category_id=category_id,
     )
     
-    return {
-        "items": articles,
-        "total": total,
-        "skip": skip,
-        "limit": limit,
-    }
+    return serialization.page_response(KnowledgeArticleResponse, articles, total, skip, limit, fields)
 
 
 @router.get("/{article_id}", response_model=KnowledgeArticleResponse)
 def get_article(
     article_id: str,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get article by ID."""
+    """Get article by ID; the ``ETag`` is its version, for ``If-Match`` on later writes."""
     article = article_service.get_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
@@ -93,6 +100,7 @@ def get_article(
     if article.status == "PUBLISHED":
         article = article_service.increment_view_count(db, article)
     
+    concurrency.set_etag(response, article.version)
     return article
 
 
@@ -100,13 +108,16 @@ def get_article(
 def update_article(
     article_id: str,
     article_data: KnowledgeArticleUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_operator),
     db: Session = Depends(get_db),
 ):
-    """Update article (operator/admin only)."""
+    """Update article (operator/admin only; 409 if ``If-Match`` names an outdated version)."""
     article = article_service.get_article(db, article_id)
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
+    concurrency.check_if_match(if_match, article.version)
     
     # Prepare update data
     updates = article_data.model_dump(exclude_unset=True)
@@ -126,7 +137,9 @@ def update_article(
                     db.add(tag)
                 article.tags.append(tag)
     
-    return article_service.update_article(db, article, current_user.id, **updates)
+    article = article_service.update_article(db, article, current_user.id, **updates)
+    concurrency.set_etag(response, article.version)
+    return article
 
 
 @router.post("/{article_id}/publish", response_model=KnowledgeArticleResponse)
@@ -174,19 +187,5 @@ def delete_article(
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    article.status = "ARCHIVED"
-    article.updated_at = __import__("datetime").datetime.utcnow()
-    db.commit()
-    
-    # Create audit log
-    from app.services.article_service import _create_audit_log
-    _create_audit_log(
-        db,
-        user_id=current_user.id,
-        action="ARTICLE_ARCHIVED",
-        entity_type="ARTICLE",
-        entity_id=article.id,
-        metadata={"title": article.title},
-    )
-    
+    article_service.archive_article(db, article, current_user.id)
     return None
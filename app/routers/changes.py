@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core import serialization
+from app.core.deps import get_current_user
+from app.db.base import get_db
+from app.models.user import User
+from app.schemas.change import ChangeFeedResponse
+from app.services import change_service
+
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+
+@router.get("", response_model=ChangeFeedResponse)
+def get_changes(
+    cursor: Optional[int] = Query(None, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get tickets, comments and articles changed after ``cursor``, in commit order.
+
+    Without ``cursor`` no changes are returned, only the cursor of the
+    latest change: take it before a full download, then pass each
+    ``next_cursor`` back while ``has_more`` is true. Requesters get changes
+    of their own tickets (public comments only) and of published articles.
+    A cursor older than the retained change log gets 410; download again.
+    """
+    if cursor is None:
+        return {"changes": [], "next_cursor": change_service.head(db), "has_more": False}
+    try:
+        feed = change_service.get_changes(db, current_user, cursor, limit)
+    except change_service.CursorExpired:
+        raise HTTPException(status_code=410, detail="Cursor expired; download again and resume from a new cursor")
+    return serialization.json_response(ChangeFeedResponse, feed)
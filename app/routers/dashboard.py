@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.orm import Session
+
+from app.core import response_cache
+from app.core.deps import get_current_operator
+from app.db.base import get_db
+from app.models.user import User
+from app.schemas.dashboard import DashboardSummaryResponse
+from app.services import dashboard_service
+
+router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
+
+
+@router.get("/summary", response_model=DashboardSummaryResponse)
+def get_dashboard_summary(
+    request: Request,
+    include_closed: bool = Query(False),
+    current_user: User = Depends(get_current_operator),
+    db: Session = Depends(get_db),
+):
+    """Get ticket counts by status, priority, team and assignee (operator/admin only).
+
+    Only open tickets are counted unless ``include_closed`` is set. The
+    response is cached for ``RESPONSE_CACHE_TTL_SECONDS``.
+    """
+    return response_cache.cached(
+        request, DashboardSummaryResponse,
+        lambda: dashboard_service.get_summary(db, include_closed=include_closed),
+    )
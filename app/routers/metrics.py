@@ -0,0 +1,83 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+
+from app.core import response_cache
+from app.core.deps import get_current_operator
+from app.db.base import get_db
+from app.models.user import User
+from app.schemas.metrics import ResponseTimesResponse, VolumeResponse
+from app.services import metrics_service
+
+router = APIRouter(prefix="/api/metrics", tags=["metrics"])
+
+
+def _parse_group_by(group_by: str, allowed: dict) -> tuple:
+    fields = tuple(field.strip() for field in group_by.split(",") if field.strip())
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid group_by: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    return fields
+
+
+@router.get("/response-times", response_model=ResponseTimesResponse)
+def get_response_times(
+    request: Request,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    group_by: str = Query("priority"),
+    current_user: User = Depends(get_current_operator),
+    db: Session = Depends(get_db),
+):
+    """Get first-response and resolution time percentiles (operator/admin only).
+
+    ``from``/``to`` are inclusive UTC days (default: the last 30 days) and
+    ``group_by`` is a comma-separated subset of ``priority``, ``team`` and ``day``.
+    The response is cached for ``RESPONSE_CACHE_TTL_SECONDS``.
+    """
+    fields = _parse_group_by(group_by, metrics_service.GROUP_BY_FIELDS)
+    date_to = date_to or datetime.utcnow().date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    return response_cache.cached(request, ResponseTimesResponse, lambda: {
+        "date_from": date_from,
+        "date_to": date_to,
+        "group_by": list(fields),
+        "groups": metrics_service.get_response_times(db, date_from, date_to, fields),
+    })
+
+
+@router.get("/volume", response_model=VolumeResponse)
+def get_volume(
+    request: Request,
+    bucket: str = Query("day", pattern="^(hour|day|week)$"),
+    since: Optional[datetime] = Query(None, alias="from"),
+    until: Optional[datetime] = Query(None, alias="to"),
+    group_by: str = Query(""),
+    current_user: User = Depends(get_current_operator),
+    db: Session = Depends(get_db),
+):
+    """Get created/resolved/closed/reopened ticket counts per time bucket (operator/admin only).
+
+    ``from`` is inclusive and ``to`` exclusive (UTC; default: the last 30
+    days). ``group_by`` is a comma-separated subset of ``category`` and
+    ``priority``. Only buckets with activity are returned. The response is
+    cached for ``RESPONSE_CACHE_TTL_SECONDS``.
+    """
+    fields = _parse_group_by(group_by, metrics_service.VOLUME_GROUP_BY_FIELDS)
+    until = until or datetime.utcnow()
+    since = since or until - timedelta(days=30)
+    if since >= until:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    return response_cache.cached(request, VolumeResponse, lambda: {
+        "bucket": bucket,
+        "since": since,
+        "until": until,
+        "group_by": list(fields),
+        "buckets": metrics_service.get_volume(db, since, until, bucket, fields),
+    })
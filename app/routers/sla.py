@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.deps import get_current_operator
+from app.db.base import get_db
+from app.models.sla_breach_event import SLABreachEvent
+from app.models.user import User
+from app.schemas.sla import SLAStatusResponse, SLABreachEventResponse
+from app.services import sla_service
+
+router = APIRouter(prefix="/api/sla", tags=["sla"])
+
+
+@router.get("/status", response_model=SLAStatusResponse)
+def get_sla_status(
+    priority: Optional[str] = Query(None),
+    breached_only: bool = Query(False),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: User = Depends(get_current_operator),
+    db: Session = Depends(get_db),
+):
+    """Get SLA status of all open tickets, most urgent first (operator/admin only)."""
+    return sla_service.get_sla_status(
+        db,
+        priority=priority,
+        breached_only=breached_only,
+        skip=skip,
+        limit=limit,
+    )
+
+
+@router.get("/breaches", response_model=List[SLABreachEventResponse])
+def list_breaches(
+    ticket_id: Optional[str] = Query(None),
+    since: Optional[datetime] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(get_current_operator),
+    db: Session = Depends(get_db),
+):
+    """Get recorded SLA breach events, newest first (operator/admin only)."""
+    query = db.query(SLABreachEvent)
+    if ticket_id:
+        query = query.filter(SLABreachEvent.ticket_id == ticket_id)
+    if since:
+        query = query.filter(SLABreachEvent.detected_at >= since)
+    return query.order_by(SLABreachEvent.detected_at.desc()).offset(skip).limit(limit).all()
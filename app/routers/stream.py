@@ -0,0 +1,138 @@
+from typing import AsyncIterator, Dict, FrozenSet, Optional
+
+import anyio
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.core import events
+from app.core.compression import uncompressed
+from app.core.config import settings
+from app.core.deps import get_stream_user, user_from_token
+from app.db.base import get_db
+from app.models.user import User
+
+router = APIRouter(prefix="/api/stream", tags=["stream"])
+
+# WebSocket close code for a refused token (policy violation) and a full worker (try again later)
+WS_UNAUTHORIZED = 1008
+WS_TRY_AGAIN_LATER = 1013
+
+
+class StreamFilters:
+    """Subscription filters from the query string; each takes a comma-separated list."""
+
+    def __init__(
+        self,
+        types: Optional[str] = Query(None, description="Event types or prefixes, e.g. ticket,comment.created"),
+        ticket_id: Optional[str] = Query(None),
+        status: Optional[str] = Query(None),
+        priority: Optional[str] = Query(None),
+        assignee_id: Optional[str] = Query(None),
+        team_id: Optional[str] = Query(None),
+    ):
+        self.types = _split(types)
+        given = {"ticket_id": ticket_id, "status": status, "priority": priority,
+                 "assignee_id": assignee_id, "team_id": team_id}
+        self.fields: Dict[str, FrozenSet[str]] = {
+            events.FILTER_FIELDS[name]: _split(value) for name, value in given.items() if value
+        }
+
+    def subscription(self, user: User) -> events.Subscription:
+        return events.Subscription(
+            user.id, user.role in ("operator", "admin"), types=self.types, filters=self.fields
+        )
+
+
+def _split(value: Optional[str]) -> FrozenSet[str]:
+    return frozenset(part.strip() for part in value.split(",") if part.strip()) if value else frozenset()
+
+
+def _sse(event_type: str, data: dict) -> bytes:
+    return b"event: %s\ndata: %s\n\n" % (event_type.encode(), orjson.dumps(data))
+
+
+async def event_stream(subscription: events.Subscription) -> AsyncIterator[bytes]:
+    """Server-sent events of a subscription until the client goes away."""
+    if not events.broker.subscribe(subscription):
+        yield _sse("error", {"detail": "Too many stream connections"})
+        return
+    try:
+        yield b"retry: 5000\n" + _sse("ready", {"user_id": subscription.user_id})
+        while True:
+            batch = await subscription.next(settings.STREAM_HEARTBEAT_SECONDS)
+            if batch is None:
+                # Keeps proxies from closing the idle connection
+                yield b": keepalive\n\n"
+                continue
+            pending, resync = batch
+            chunk = b"".join(event.sse() for event in pending)
+            if resync:
+                chunk = _sse("resync", {"dropped": subscription.dropped}) + chunk
+            if chunk:
+                yield chunk
+    finally:
+        events.broker.unsubscribe(subscription)
+
+
+@router.get("")
+@uncompressed
+async def stream_events(
+    filters: StreamFilters = Depends(),
+    current_user: User = Depends(get_stream_user),
+):
+    """Stream ticket, comment and article changes as server-sent events.
+
+    Authenticate with the Bearer header or ``?access_token=``. Requesters
+    only receive events of their own tickets and published articles. After
+    a ``resync`` event (the connection fell behind and events were dropped)
+    or a reconnect, refetch what is shown.
+    """
+    if events.broker.connections() >= settings.STREAM_MAX_CONNECTIONS:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many stream connections")
+    return StreamingResponse(
+        event_stream(filters.subscription(current_user)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def stream_events_ws(
+    websocket: WebSocket,
+    access_token: Optional[str] = Query(None),
+    filters: StreamFilters = Depends(),
+    db: Session = Depends(get_db),
+):
+    """The event stream over a WebSocket, one JSON message per event (``?access_token=`` authenticates)."""
+    user = user_from_token(db, access_token) if access_token else None
+    subscription = filters.subscription(user) if user is not None else None
+    # End the read transaction so the idle socket does not keep a pooled connection
+    db.rollback()
+    if subscription is None:
+        await websocket.close(code=WS_UNAUTHORIZED)
+        return
+    if not events.broker.subscribe(subscription):
+        await websocket.close(code=WS_TRY_AGAIN_LATER)
+        return
+    try:
+        await websocket.accept()
+        await websocket.send_json({"type": "ready", "data": {"user_id": subscription.user_id}})
+
+        async def send_events():
+            while True:
+                pending, resync = await subscription.next(None)
+                if resync:
+                    await websocket.send_json({"type": "resync", "data": {"dropped": subscription.dropped}})
+                for event in pending:
+                    await websocket.send_text(event.json())
+
+        async with anyio.create_task_group() as tasks:
+            tasks.start_soon(send_events)
+            # Client messages are ignored; reading them notices the disconnect
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+            tasks.cancel_scope.cancel()
+    finally:
+        events.broker.unsubscribe(subscription)
@@ -1,7 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, Query
 from sqlalchemy.orm import Session
 
+from app.core import concurrency, serialization
+from app.core.config import settings
 from app.core.deps import get_current_user, get_current_operator
 from app.db.base import get_db
 from app.models.user import User
@@ -10,11 +12,14 @@ from app.schemas.ticket import (
     TicketUpdate,
     TicketResponse,
     TicketStatusTransition,
+    TicketBulkRequest,
+    TicketBulkResponse,
     CommentCreate,
     CommentResponse,
     PaginatedTicketResponse,
+    TICKET_SUMMARY_FIELDS,
 )
-from app.services import ticket_service
+from app.services import ticket_service, ticket_bulk_service, sla_service
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 
@@ -35,6 +40,7 @@ def create_ticket(
         category_id=ticket_data.category_id,
         tag_names=ticket_data.tags,
     )
+    sla_service.attach_sla(db, [ticket])
     return ticket
 
 
@@ -44,12 +50,23 @@ def list_tickets(
     priority: Optional[str] = Query(None),
     assignee_id: Optional[str] = Query(None),
     category_id: Optional[str] = Query(None),
+    sort: str = Query("created_at", pattern="^(created_at|sla_due|last_activity|comment_count)$"),
     skip: int = Query(0, ge=0),
     limit: int = Query(25, ge=1, le=100),
+    fields: Optional[str] = Query(None),
+    view: str = Query("full", pattern="^(full|summary)$"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get list of tickets with filters."""
+    """Get list of tickets with filters.
+
+    ``sort=sla_due`` lists the tickets whose SLA deadline comes first at the top,
+    ``sort=last_activity`` the most recently active and ``sort=comment_count``
+    the most discussed.
+    ``fields`` (comma-separated ``TicketResponse`` fields) or ``view=summary``
+    return only those fields of each ticket, and only they are loaded.
+    """
+    fields = serialization.parse_fields(TicketResponse, fields, view, TICKET_SUMMARY_FIELDS)
     # Requesters can only see their own tickets
     requester_id = None if current_user.role in ["operator", "admin"] else current_user.id
     
@@ -60,9 +77,13 @@ def list_tickets(
         assignee_id=assignee_id,
         requester_id=requester_id,
         category_id=category_id,
+        sort=sort,
         skip=skip,
         limit=limit,
+        fields=fields,
     )
+    if fields is None or "sla" in fields:
+        sla_service.attach_sla(db, tickets)
     
     # Get total count
     total = ticket_service.count_tickets(
@@ -74,21 +95,70 @@ def list_tickets(
         category_id=category_id,
     )
     
+    return serialization.page_response(TicketResponse, tickets, total, skip, limit, fields)
+
+
+@router.post("/bulk", response_model=TicketBulkResponse)
+def bulk_update_tickets(
+    bulk_data: TicketBulkRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Transition, assign or tag many tickets in one transaction.
+
+    Each ticket gets its own result; tickets that are missing, that the
+    user may not change, or that someone else changed during a transition
+    (409) are reported and skipped, the rest are applied.
+    Assign and tag are operator/admin only, like their single-ticket forms.
+    """
+    if not bulk_data.ticket_ids:
+        raise HTTPException(status_code=400, detail="ticket_ids must not be empty")
+    if len(bulk_data.ticket_ids) > settings.BULK_MAX_TICKETS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.BULK_MAX_TICKETS} tickets per request"
+        )
+    
+    if bulk_data.operation == "transition":
+        if not bulk_data.status:
+            raise HTTPException(status_code=400, detail="status is required for transition")
+        results = ticket_bulk_service.bulk_transition(
+            db, bulk_data.ticket_ids, bulk_data.status, current_user
+        )
+    elif bulk_data.operation in ["assign", "tag"]:
+        if current_user.role not in ["operator", "admin"]:
+            raise HTTPException(status_code=403, detail="Not authorized to perform this operation")
+        if bulk_data.operation == "assign":
+            results = ticket_bulk_service.bulk_assign(
+                db, bulk_data.ticket_ids, bulk_data.assignee_id, bulk_data.assigned_team_id, current_user
+            )
+        else:
+            if not bulk_data.add_tags and not bulk_data.remove_tags:
+                raise HTTPException(status_code=400, detail="add_tags or remove_tags is required for tag")
+            results = ticket_bulk_service.bulk_tag(
+                db, bulk_data.ticket_ids, bulk_data.add_tags, bulk_data.remove_tags, current_user
+            )
+    else:
+        raise HTTPException(
+            status_code=400, detail="Invalid operation. Must be one of: transition, assign, tag"
+        )
+    
+    succeeded = sum(1 for result in results if result["success"])
     return {
-        "items": tickets,
-        "total": total,
-        "skip": skip,
-        "limit": limit,
+        "operation": bulk_data.operation,
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
     }
 
 
 @router.get("/{ticket_id}", response_model=TicketResponse)
 def get_ticket(
     ticket_id: str,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get ticket by ID."""
+    """Get ticket by ID; the ``ETag`` is its version, for ``If-Match`` on later writes."""
     ticket = ticket_service.get_ticket(db, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
@@ -97,6 +167,8 @@ def get_ticket(
     if current_user.role == "requester" and ticket.requester_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this ticket")
     
+    sla_service.attach_sla(db, [ticket])
+    concurrency.set_etag(response, ticket.version)
     return ticket
 
 
@@ -104,13 +176,20 @@ def get_ticket(
 def update_ticket(
     ticket_id: str,
     ticket_data: TicketUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_operator),
     db: Session = Depends(get_db),
 ):
-    """Update ticket fields (operator/admin only)."""
+    """Update ticket fields (operator/admin only).
+
+    With ``If-Match``, the update is refused with 409 if the ticket changed
+    since that version was read.
+    """
     ticket = ticket_service.get_ticket(db, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    concurrency.check_if_match(if_match, ticket.version)
     
     # Prepare update data
     updates = ticket_data.model_dump(exclude_unset=True)
@@ -131,70 +210,60 @@ def update_ticket(
                     db.add(tag)
                 ticket.tags.append(tag)
     
-    return ticket_service.update_ticket(db, ticket, current_user.id, **updates)
+    ticket = ticket_service.update_ticket(db, ticket, current_user.id, **updates)
+    sla_service.attach_sla(db, [ticket])
+    concurrency.set_etag(response, ticket.version)
+    return ticket
 
 
 @router.post("/{ticket_id}/transition", response_model=TicketResponse)
 def transition_status(
     ticket_id: str,
     transition_data: TicketStatusTransition,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Transition ticket status."""
+    """Transition ticket status (409 if ``If-Match`` names an outdated version)."""
     ticket = ticket_service.get_ticket(db, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
     
-    # Check permission
-    if current_user.role == "requester":
-        # Requesters can only change their own tickets
-        if ticket.requester_id != current_user.id:
-            raise HTTPException(status_code=403, detail="Not authorized to change ticket status")
-        
-        # Requesters can only perform specific status transitions
-        allowed_transitions = {
-            "WAITING_CUSTOMER": ["IN_PROGRESS"],  # Customer provides additional info
-            "RESOLVED": ["CLOSED"],               # Customer confirms resolution
-        }
-        
-        current_status = ticket.status
-        if current_status not in allowed_transitions:
-            raise HTTPException(
-                status_code=403, 
-                detail=f"Cannot change status from {current_status}. Only allowed from WAITING_CUSTOMER or RESOLVED."
-            )
-        
-        if transition_data.status not in allowed_transitions[current_status]:
-            raise HTTPException(
-                status_code=403,
-                detail=f"Cannot transition from {current_status} to {transition_data.status}"
-            )
-    
-    # Validate status transition
-    valid_statuses = ["OPEN", "IN_PROGRESS", "WAITING_CUSTOMER", "RESOLVED", "CLOSED", "CANCELED"]
-    if transition_data.status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
+    # Check permission and status
+    error = ticket_service.check_transition(ticket, transition_data.status, current_user)
+    if error:
+        raise HTTPException(status_code=error[0], detail=error[1])
+    concurrency.check_if_match(if_match, ticket.version)
     
-    return ticket_service.transition_ticket_status(
+    ticket = ticket_service.transition_ticket_status(
         db, ticket, transition_data.status, current_user.id
     )
+    sla_service.attach_sla(db, [ticket])
+    concurrency.set_etag(response, ticket.version)
+    return ticket
 
 
 @router.post("/{ticket_id}/assign", response_model=TicketResponse)
 def assign_ticket(
     ticket_id: str,
+    response: Response,
     assignee_id: Optional[str] = None,
     assigned_team_id: Optional[str] = None,
+    if_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_operator),
     db: Session = Depends(get_db),
 ):
-    """Assign ticket to user or team (operator/admin only)."""
+    """Assign ticket to user or team (operator/admin only; 409 on an outdated ``If-Match``)."""
     ticket = ticket_service.get_ticket(db, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    concurrency.check_if_match(if_match, ticket.version)
     
-    return ticket_service.assign_ticket(db, ticket, assignee_id, assigned_team_id, current_user.id)
+    ticket = ticket_service.assign_ticket(db, ticket, assignee_id, assigned_team_id, current_user.id)
+    sla_service.attach_sla(db, [ticket])
+    concurrency.set_etag(response, ticket.version)
+    return ticket
 
 
 @router.post("/{ticket_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
@@ -226,10 +295,22 @@ def create_comment(
 @router.get("/{ticket_id}/comments", response_model=List[CommentResponse])
 def get_comments(
     ticket_id: str,
+    after: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    """Get comments for a ticket."""
+    """Get comments for a ticket, oldest first, ``limit`` at a time.
+
+    ``X-Next-Cursor`` points after the last returned comment and
+    ``X-Has-More`` tells whether more follow. Passing the cursor back as
+    ``after`` returns the next page; polling clients keep passing the latest
+    cursor to fetch only comments added since.
+    """
+    try:
+        position = ticket_service.decode_comment_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     ticket = ticket_service.get_ticket(db, ticket_id)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
@@ -241,5 +322,14 @@ def get_comments(
     # Include internal comments only for operators/admins
     include_internal = current_user.role in ["operator", "admin"]
     
-    comments = ticket_service.get_ticket_comments(db, ticket_id, include_internal)
-    return comments
+    comments = ticket_service.get_ticket_comments(
+        db, ticket_id, include_internal, after=position, limit=limit + 1
+    )
+    has_more = len(comments) > limit
+    comments = comments[:limit]
+    response = serialization.json_list_response(CommentResponse, comments)
+    cursor = ticket_service.encode_comment_cursor(comments[-1]) if comments else after
+    if cursor:
+        response.headers["X-Next-Cursor"] = cursor
+    response.headers["X-Has-More"] = "true" if has_more else "false"
+    return response
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr
-from datetime import datetime
+from datetime import date, datetime
 
 
 class TeamBase(BaseModel):
@@ -29,14 +29,18 @@ class CategoryBase(BaseModel):
     name: str
     type: str  # TICKET, ARTICLE, BOTH
     description: Optional[str] = None
+    team_id: Optional[str] = None  # new tickets are routed to this team's operators
 
 
 class CategoryCreate(CategoryBase):
     pass
 
 
-class CategoryUpdate(CategoryBase):
-    pass
+class CategoryUpdate(BaseModel):
+    name: Optional[str] = None
+    type: Optional[str] = None
+    description: Optional[str] = None
+    team_id: Optional[str] = None
 
 
 class CategoryResponse(CategoryBase):
@@ -69,6 +73,8 @@ class SLASettingsBase(BaseModel):
     resolution_target_minutes: int
     pause_on_waiting_customer: bool = True
     timezone: str = "Asia/Tokyo"
+    business_hours_only: bool = False
+    calendar: str = "default"
 
 
 class SLASettingsCreate(SLASettingsBase):
@@ -80,6 +86,8 @@ class SLASettingsUpdate(BaseModel):
     resolution_target_minutes: Optional[int] = None
     pause_on_waiting_customer: Optional[bool] = None
     timezone: Optional[str] = None
+    business_hours_only: Optional[bool] = None
+    calendar: Optional[str] = None
 
 
 class SLASettingsResponse(SLASettingsBase):
@@ -91,6 +99,20 @@ class SLASettingsResponse(SLASettingsBase):
         from_attributes = True
 
 
+class HolidayCreate(BaseModel):
+    date: date
+    name: str
+    calendar: str = "default"
+
+
+class HolidayResponse(HolidayCreate):
+    id: str
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 class AuditLogResponse(BaseModel):
     id: str
     user_id: str
@@ -104,3 +126,67 @@ class AuditLogResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class AuditLogPartitionResponse(BaseModel):
+    month: str
+    archive_path: str
+    row_count: int
+    first_created_at: Optional[datetime]
+    last_created_at: Optional[datetime]
+    archived_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class ImportJobResponse(BaseModel):
+    id: str
+    kind: str  # tickets, comments
+    format: str  # csv, ndjson
+    source: Optional[str]
+    status: str  # RUNNING, COMPLETED, FAILED
+    position: int
+    imported: int
+    skipped: int
+    failed: int
+    errors: Optional[List[dict]]
+    created_by: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
+
+
+class SlowQueryResponse(BaseModel):
+    fingerprint: str
+    statement: str  # whitespace and IN (...) lists collapsed
+    count: int
+    total_ms: float
+    mean_ms: float
+    max_ms: float
+    routes: Dict[str, int]  # "METHOD /route/{template}" -> slow runs
+    services: Dict[str, int]  # "module.function" -> slow runs
+    parameters: str  # bound parameter types of the slowest run
+    plan: Optional[str]  # query plan of the slowest run
+    last_seen_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class ProfileResponse(BaseModel):
+    id: str
+    mode: str  # on-demand, sampled
+    method: str
+    path: str
+    route: Optional[str]
+    status: Optional[int]
+    duration_ms: float
+    samples: int
+    started_at: datetime
+
+    class Config:
+        from_attributes = True
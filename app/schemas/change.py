@@ -0,0 +1,21 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.schemas.knowledge_article import KnowledgeArticleResponse
+from app.schemas.ticket import CommentResponse, TicketResponse
+
+
+class ChangeResponse(BaseModel):
+    seq: int
+    entity_type: str  # ticket, comment, article
+    entity_id: str
+    deleted: bool = False  # tombstone: drop the entity (archived, or no longer visible)
+    ticket: Optional[TicketResponse] = None
+    comment: Optional[CommentResponse] = None
+    article: Optional[KnowledgeArticleResponse] = None
+
+
+class ChangeFeedResponse(BaseModel):
+    changes: List[ChangeResponse]
+    next_cursor: int
+    has_more: bool
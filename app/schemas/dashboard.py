@@ -0,0 +1,31 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class DashboardTeamCount(BaseModel):
+    team_id: Optional[str] = None
+    team_name: Optional[str] = None
+    count: int
+
+
+class DashboardAssigneeCount(BaseModel):
+    assignee_id: Optional[str] = None
+    assignee_name: Optional[str] = None
+    count: int
+
+
+class DashboardCell(BaseModel):
+    status: str
+    priority: str
+    team_id: Optional[str] = None
+    assignee_id: Optional[str] = None
+    count: int
+
+
+class DashboardSummaryResponse(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
+    by_team: List[DashboardTeamCount]
+    by_assignee: List[DashboardAssigneeCount]
+    cells: List[DashboardCell]
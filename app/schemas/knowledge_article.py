@@ -32,12 +32,19 @@ class KnowledgeArticleResponse(KnowledgeArticleBase):
     created_at: datetime
     updated_at: datetime
     published_at: Optional[datetime] = None
+    version: int = 1  # also the ETag; send it back in If-Match
     tags: List[TagResponse] = []
     
     class Config:
         from_attributes = True
 
 
+# Fields of ?view=summary on article lists
+ARTICLE_SUMMARY_FIELDS = (
+    "id", "title", "status", "category_id", "author_id", "view_count", "created_at", "updated_at", "published_at",
+)
+
+
 class PaginatedArticleResponse(BaseModel):
     items: List[KnowledgeArticleResponse]
     total: int
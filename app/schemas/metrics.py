@@ -0,0 +1,44 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class ResponseTimeStats(BaseModel):
+    count: int
+    mean_seconds: Optional[float] = None
+    p50_seconds: Optional[float] = None
+    p90_seconds: Optional[float] = None
+    p99_seconds: Optional[float] = None
+
+
+class ResponseTimeGroup(BaseModel):
+    priority: Optional[str] = None
+    team_id: Optional[str] = None
+    day: Optional[date] = None
+    first_response: ResponseTimeStats
+    resolution: ResponseTimeStats
+
+
+class ResponseTimesResponse(BaseModel):
+    date_from: date
+    date_to: date
+    group_by: List[str]
+    groups: List[ResponseTimeGroup]
+
+
+class VolumeBucket(BaseModel):
+    bucket_start: datetime
+    category_id: Optional[str] = None
+    priority: Optional[str] = None
+    created: int
+    resolved: int
+    closed: int
+    reopened: int
+
+
+class VolumeResponse(BaseModel):
+    bucket: str
+    since: datetime
+    until: datetime
+    group_by: List[str]
+    buckets: List[VolumeBucket]
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class TicketSLAResponse(BaseModel):
+    paused: bool
+    paused_seconds: int
+    first_response_state: str  # ON_TRACK, AT_RISK, PAUSED, BREACHED, MET
+    first_response_elapsed_seconds: int
+    first_response_remaining_seconds: int
+    first_response_due_at: datetime
+    resolution_state: str  # ON_TRACK, AT_RISK, PAUSED, BREACHED, MET
+    resolution_elapsed_seconds: int
+    resolution_remaining_seconds: int
+    resolution_due_at: datetime
+
+
+class SLAStatusItem(TicketSLAResponse):
+    ticket_id: str
+    priority: str
+    status: str
+
+
+class SLAPrioritySummary(BaseModel):
+    total: int
+    first_response_breached: int
+    resolution_breached: int
+    at_risk: int
+
+
+class SLAStatusResponse(BaseModel):
+    total: int
+    first_response_breached: int
+    resolution_breached: int
+    at_risk: int
+    paused: int
+    by_priority: Dict[str, SLAPrioritySummary]
+    items: List[SLAStatusItem]
+    matched: int
+    skip: int
+    limit: int
+
+
+class SLABreachEventResponse(BaseModel):
+    id: str
+    ticket_id: str
+    kind: str  # FIRST_RESPONSE, RESOLUTION
+    priority: str
+    due_at: datetime
+    detected_at: datetime
+    
+    class Config:
+        from_attributes = True
@@ -2,6 +2,8 @@ from datetime import datetime
 from typing import Optional, List, Generic, TypeVar
 from pydantic import BaseModel
 
+from app.schemas.sla import TicketSLAResponse
+
 T = TypeVar('T')
 
 
@@ -30,6 +32,30 @@ class TicketStatusTransition(BaseModel):
     status: str  # OPEN, IN_PROGRESS, WAITING_CUSTOMER, RESOLVED, CLOSED, CANCELED
 
 
+class TicketBulkRequest(BaseModel):
+    ticket_ids: List[str]
+    operation: str  # transition, assign, tag
+    status: Optional[str] = None  # transition
+    assignee_id: Optional[str] = None  # assign
+    assigned_team_id: Optional[str] = None  # assign
+    add_tags: List[str] = []  # tag
+    remove_tags: List[str] = []  # tag
+
+
+class TicketBulkItemResult(BaseModel):
+    ticket_id: str
+    success: bool
+    status_code: int
+    detail: Optional[str] = None
+
+
+class TicketBulkResponse(BaseModel):
+    operation: str
+    succeeded: int
+    failed: int
+    results: List[TicketBulkItemResult]
+
+
 class TagResponse(BaseModel):
     id: str
     name: str
@@ -76,14 +102,29 @@ class TicketResponse(BaseModel):
     closed_at: Optional[datetime] = None
     waiting_customer_started_at: Optional[datetime] = None
     total_waiting_customer_duration: int = 0
+    first_response_due_at: Optional[datetime] = None
+    resolution_due_at: Optional[datetime] = None
+    sla_due_at: Optional[datetime] = None
+    sla: Optional[TicketSLAResponse] = None
+    comment_count: int = 0
+    last_public_comment_at: Optional[datetime] = None
+    last_activity_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
+    version: int = 1  # also the ETag; send it back in If-Match
     tags: List[TagResponse] = []
     
     class Config:
         from_attributes = True
 
 
+# Fields of ?view=summary on ticket lists
+TICKET_SUMMARY_FIELDS = (
+    "id", "ticket_number", "title", "status", "priority", "requester_id", "assignee_id", "assigned_team_id",
+    "sla_due_at", "comment_count", "last_activity_at", "created_at", "updated_at", "version",
+)
+
+
 class CommentBase(BaseModel):
     content: str
     is_internal: bool = False
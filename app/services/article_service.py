@@ -1,11 +1,23 @@
 import uuid
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy.orm import Session, joinedload
+from typing import Iterable, Optional, List
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, joinedload, load_only
 
+from app.core import events
+from app.models.category import Category
 from app.models.knowledge_article import KnowledgeArticle
 from app.models.tag import Tag
+from app.models.user import User
 from app.models.audit_log import AuditLog
+from app.services import change_service
+
+# Relationships a projected article list may load, with the columns their response schemas read
+_PROJECTED_RELATIONSHIPS = {
+    "category": (KnowledgeArticle.category, (Category.id, Category.name, Category.type)),
+    "author": (KnowledgeArticle.author, (User.id, User.name, User.email, User.role)),
+    "tags": (KnowledgeArticle.tags, (Tag.id, Tag.name)),
+}
 
 
 def create_article(
@@ -39,11 +51,14 @@ def create_article(
             article.tags.append(tag)
     
     db.add(article)
+    event = events.article_event("article.created", article)
+    change_service.record(db, event)
     db.commit()
     db.refresh(article)
     
     # Reload article with relationships
     article = get_article(db, article.id)
+    events.publish(event)
     
     # Create audit log
     _create_audit_log(
@@ -79,14 +94,35 @@ def get_articles(
     category_id: Optional[str] = None,
     skip: int = 0,
     limit: int = 25,
+    fields: Optional[Iterable[str]] = None,
+    ids: Optional[Iterable[str]] = None,
 ) -> List[KnowledgeArticle]:
-    """Get articles with filters."""
-    query = db.query(KnowledgeArticle).options(
-        joinedload(KnowledgeArticle.category),
-        joinedload(KnowledgeArticle.author),
-        joinedload(KnowledgeArticle.tags),
-    )
+    """Get articles with filters.
+
+    ``fields`` (names of ``KnowledgeArticleResponse`` fields) limits the
+    SELECT to those columns, deferring ``content``, and loads only the
+    requested relationships. ``ids`` restricts the result to those articles.
+    """
+    if fields is None:
+        options = [
+            joinedload(KnowledgeArticle.category),
+            joinedload(KnowledgeArticle.author),
+            joinedload(KnowledgeArticle.tags),
+        ]
+    else:
+        fields = set(fields)
+        columns = {KnowledgeArticle.id} | {
+            getattr(KnowledgeArticle, name) for name in fields if name in KnowledgeArticle.__table__.c
+        }
+        options = [load_only(*columns)] + [
+            joinedload(relationship).load_only(*related_columns)
+            for name, (relationship, related_columns) in _PROJECTED_RELATIONSHIPS.items()
+            if name in fields
+        ]
+    query = db.query(KnowledgeArticle).options(*options)
     
+    if ids is not None:
+        query = query.filter(KnowledgeArticle.id.in_(list(ids)))
     if status:
         query = query.filter(KnowledgeArticle.status == status)
     if author_id:
@@ -104,7 +140,7 @@ def count_articles(
     category_id: Optional[str] = None,
 ) -> int:
     """Count articles with filters."""
-    query = db.query(KnowledgeArticle)
+    query = db.query(func.count(KnowledgeArticle.id))
     
     if status:
         query = query.filter(KnowledgeArticle.status == status)
@@ -113,7 +149,7 @@ def count_articles(
     if category_id:
         query = query.filter(KnowledgeArticle.category_id == category_id)
     
-    return query.count()
+    return query.scalar()
 
 
 def update_article(
@@ -131,8 +167,13 @@ def update_article(
             setattr(article, key, value)
     
     article.updated_at = datetime.utcnow()
+    event = events.article_event("article.updated", article) if old_values else None
+    if event:
+        change_service.record(db, event)
     db.commit()
     db.refresh(article)
+    if event:
+        events.publish(event)
     
     # Create audit log
     if old_values:
@@ -157,8 +198,11 @@ def publish_article(
     article.status = "PUBLISHED"
     article.published_at = datetime.utcnow()
     article.updated_at = datetime.utcnow()
+    event = events.article_event("article.published", article)
+    change_service.record(db, event)
     db.commit()
     db.refresh(article)
+    events.publish(event)
     
     # Create audit log
     _create_audit_log(
@@ -181,8 +225,11 @@ def unpublish_article(
     """Unpublish an article (back to draft)."""
     article.status = "DRAFT"
     article.updated_at = datetime.utcnow()
+    event = events.article_event("article.unpublished", article, was_published=True)
+    change_service.record(db, event)
     db.commit()
     db.refresh(article)
+    events.publish(event)
     
     # Create audit log
     _create_audit_log(
@@ -197,12 +244,48 @@ def unpublish_article(
     return article
 
 
+def archive_article(
+    db: Session,
+    article: KnowledgeArticle,
+    user_id: str,
+) -> KnowledgeArticle:
+    """Archive an article (soft delete)."""
+    was_published = article.status == "PUBLISHED"
+    article.status = "ARCHIVED"
+    article.updated_at = datetime.utcnow()
+    event = events.article_event("article.archived", article, was_published=was_published)
+    change_service.record(db, event)
+    db.commit()
+    events.publish(event)
+    
+    # Create audit log
+    _create_audit_log(
+        db,
+        user_id=user_id,
+        action="ARTICLE_ARCHIVED",
+        entity_type="ARTICLE",
+        entity_id=article.id,
+        metadata={"title": article.title},
+    )
+    
+    return article
+
+
 def increment_view_count(
     db: Session,
     article: KnowledgeArticle,
 ) -> KnowledgeArticle:
-    """Increment article view count."""
-    article.view_count += 1
+    """Increment article view count.
+
+    A relative UPDATE outside the row version, so concurrent readers neither
+    lose counts nor conflict with each other or with editors.
+    """
+    db.execute(
+        update(KnowledgeArticle)
+        .where(KnowledgeArticle.id == article.id)
+        .values(view_count=KnowledgeArticle.view_count + 1)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
     db.refresh(article)
     return article
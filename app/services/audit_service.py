@@ -0,0 +1,254 @@
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.audit_log import AuditLog, AuditLogPartition
+
+
+def month_key(dt: datetime) -> str:
+    """Return the partition key (YYYY-MM) for a timestamp."""
+    return f"{dt.year:04d}-{dt.month:02d}"
+
+
+def _month_start(dt: datetime) -> datetime:
+    return datetime(dt.year, dt.month, 1)
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    """Shift a month-start timestamp by a number of months."""
+    index = dt.year * 12 + (dt.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def retention_cutoff(now: datetime, retain_months: int) -> datetime:
+    """First instant kept in the hot table (start of the oldest retained month)."""
+    return _add_months(_month_start(now), -(retain_months - 1))
+
+
+def _archive_path(archive_dir: str, month: str) -> str:
+    return os.path.join(archive_dir, f"audit_logs-{month}.jsonl.gz")
+
+
+# Columns written to the archives, in record order
+_ARCHIVED_COLUMNS = (
+    AuditLog.id,
+    AuditLog.user_id,
+    AuditLog.action,
+    AuditLog.entity_type,
+    AuditLog.entity_id,
+    AuditLog.meta_data,
+    AuditLog.ip_address,
+    AuditLog.user_agent,
+    AuditLog.created_at,
+)
+
+
+def _serialize(log) -> dict:
+    return {
+        "id": log.id,
+        "user_id": log.user_id,
+        "action": log.action,
+        "entity_type": log.entity_type,
+        "entity_id": log.entity_id,
+        "meta_data": log.meta_data,
+        "ip_address": log.ip_address,
+        "user_agent": log.user_agent,
+        "created_at": log.created_at.isoformat(),
+    }
+
+
+def _deserialize(row: dict) -> AuditLog:
+    """Build a detached AuditLog from an archived record."""
+    return AuditLog(**{**row, "created_at": datetime.fromisoformat(row["created_at"])})
+
+
+def archive_audit_logs(
+    db: Session,
+    retain_months: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    now: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> List[AuditLogPartition]:
+    """Move audit logs older than the retention window into monthly archives.
+
+    Each month is appended to its own gzip JSON Lines file, then removed from
+    ``audit_logs`` in the same step, so the hot table only ever holds the most
+    recent ``retain_months`` months. Rows are streamed ``batch_size`` at a
+    time as plain tuples and written one batch per call, so memory does not
+    grow with the size of a month. Archive files are append-only: running
+    the job again for a month that already has an archive adds a new gzip
+    member to the end of the file.
+    """
+    retain_months = retain_months or settings.AUDIT_LOG_RETENTION_MONTHS
+    archive_dir = archive_dir or settings.AUDIT_LOG_ARCHIVE_DIR
+    cutoff = retention_cutoff(now or datetime.utcnow(), retain_months)
+
+    oldest = (
+        db.query(AuditLog.created_at)
+        .filter(AuditLog.created_at < cutoff)
+        .order_by(AuditLog.created_at.asc())
+        .first()
+    )
+    if not oldest:
+        return []
+
+    os.makedirs(archive_dir, exist_ok=True)
+    archived = []
+    start = _month_start(oldest[0])
+    while start < cutoff:
+        end = _add_months(start, 1)
+        partition = _archive_month(db, start, end, archive_dir, batch_size)
+        if partition:
+            archived.append(partition)
+        start = end
+    return archived
+
+
+def _archive_month(
+    db: Session,
+    start: datetime,
+    end: datetime,
+    archive_dir: str,
+    batch_size: int,
+) -> Optional[AuditLogPartition]:
+    month = month_key(start)
+    rows = db.execute(
+        select(*_ARCHIVED_COLUMNS)
+        .where(AuditLog.created_at >= start, AuditLog.created_at < end)
+        .order_by(AuditLog.created_at.asc())
+        .execution_options(yield_per=batch_size)
+    )
+
+    path = _archive_path(archive_dir, month)
+    count = 0
+    first_created_at = last_created_at = None
+    with gzip.open(path, "at", encoding="utf-8") as archive:
+        for batch in rows.partitions():
+            archive.writelines(json.dumps(_serialize(log), ensure_ascii=False) + "\n" for log in batch)
+            if first_created_at is None:
+                first_created_at = batch[0].created_at
+            last_created_at = batch[-1].created_at
+            count += len(batch)
+    if count == 0:
+        return None
+
+    db.query(AuditLog).filter(
+        AuditLog.created_at >= start, AuditLog.created_at < end
+    ).delete(synchronize_session=False)
+
+    partition = db.query(AuditLogPartition).filter(AuditLogPartition.month == month).first()
+    if not partition:
+        partition = AuditLogPartition(month=month, archive_path=path, row_count=0)
+        db.add(partition)
+    partition.row_count += count
+    if partition.first_created_at is None or first_created_at < partition.first_created_at:
+        partition.first_created_at = first_created_at
+    if partition.last_created_at is None or last_created_at > partition.last_created_at:
+        partition.last_created_at = last_created_at
+    partition.archived_at = datetime.utcnow()
+    db.commit()
+    db.refresh(partition)
+    return partition
+
+
+def get_partitions(db: Session) -> List[AuditLogPartition]:
+    """List archived partitions, newest month first."""
+    return db.query(AuditLogPartition).order_by(AuditLogPartition.month.desc()).all()
+
+
+def iter_archived_audit_logs(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    newest_first: bool = True,
+) -> Iterator[AuditLog]:
+    """Scan archived audit logs, opening only partitions overlapping the range.
+
+    Oldest first, each archive is streamed line by line. Newest first needs
+    a partition's records reversed, so its lines are held (still unparsed)
+    while it is read.
+    """
+    query = db.query(AuditLogPartition)
+    if since:
+        query = query.filter(AuditLogPartition.last_created_at >= since)
+    if until:
+        query = query.filter(AuditLogPartition.first_created_at < until)
+    order = AuditLogPartition.month.desc() if newest_first else AuditLogPartition.month.asc()
+
+    for partition in query.order_by(order).all():
+        if not os.path.exists(partition.archive_path):
+            continue
+        # A record is archived in the partition of its month only, so
+        # duplicates are looked for within one partition at a time
+        seen = set()
+        with gzip.open(partition.archive_path, "rt", encoding="utf-8") as archive:
+            lines = (line for line in archive if line.strip())
+            if newest_first:
+                lines = reversed(list(lines))
+            for line in lines:
+                record = json.loads(line)
+                # A job interrupted between writing and deleting can leave duplicates
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                log = _deserialize(record)
+                if since and log.created_at < since:
+                    continue
+                if until and log.created_at >= until:
+                    continue
+                yield log
+
+
+def search_audit_logs(
+    db: Session,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[str] = None,
+    action: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    include_archived: bool = False,
+    skip: int = 0,
+    limit: int = 50,
+) -> List[AuditLog]:
+    """Search audit logs newest first, reading archives only when asked to.
+
+    Archived partitions are always older than anything left in the hot table,
+    so results continue from the archives once the hot rows are exhausted.
+    """
+    query = db.query(AuditLog)
+    if entity_type:
+        query = query.filter(AuditLog.entity_type == entity_type)
+    if entity_id:
+        query = query.filter(AuditLog.entity_id == entity_id)
+    if action:
+        query = query.filter(AuditLog.action == action)
+    if since:
+        query = query.filter(AuditLog.created_at >= since)
+    if until:
+        query = query.filter(AuditLog.created_at < until)
+
+    logs = query.order_by(AuditLog.created_at.desc()).offset(skip).limit(limit).all()
+    if not include_archived or len(logs) == limit:
+        return logs
+
+    hot_total = skip + len(logs) if logs else query.count()
+    archived_skip = max(0, skip - hot_total)
+    for log in iter_archived_audit_logs(db, since=since, until=until):
+        if entity_type and log.entity_type != entity_type:
+            continue
+        if entity_id and log.entity_id != entity_id:
+            continue
+        if action and log.action != action:
+            continue
+        if archived_skip:
+            archived_skip -= 1
+            continue
+        logs.append(log)
+        if len(logs) == limit:
+            break
+    return logs
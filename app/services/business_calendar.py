@@ -0,0 +1,182 @@
+import threading
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core import telemetry
+from app.core.config import settings
+from app.models.holiday import Holiday
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Years of working intervals precomputed around the requested instants
+_PADDING_DAYS = 366
+
+
+def _parse_time(value: str) -> time:
+    hour, minute = value.split(":")
+    return time(int(hour), int(minute))
+
+
+class BusinessCalendar:
+    """Working-time calendar backed by precomputed prefix sums.
+
+    Working intervals (one per business day, in UTC epoch seconds) are laid
+    out in sorted arrays together with the cumulative working seconds before
+    each interval. The working time between any two instants is then the
+    difference of two binary searches, O(log n), and every method accepts
+    NumPy arrays so a whole batch of tickets is handled in one call.
+    """
+
+    def __init__(
+        self,
+        timezone: str,
+        start: time,
+        end: time,
+        workdays: Tuple[int, ...],
+        holidays: Tuple[date, ...] = (),
+    ):
+        if not workdays:
+            raise ValueError("A business calendar needs at least one working weekday")
+        self.timezone = timezone
+        self.start = start
+        self.end = end
+        self.workdays = frozenset(workdays)
+        self.holidays = frozenset(holidays)
+        self._first_day: Optional[date] = None
+        self._last_day: Optional[date] = None
+        self._arrays: tuple = ()
+        self._daily_seconds = max(
+            (datetime.combine(date.min, end) - datetime.combine(date.min, start)).seconds, 1
+        )
+        self._lock = threading.Lock()
+
+    def _build(self, first_day: date, last_day: date) -> None:
+        tz = ZoneInfo(self.timezone)
+        opens, closes = [], []
+        day = first_day
+        while day <= last_day:
+            if day.weekday() in self.workdays and day not in self.holidays:
+                opened = datetime.combine(day, self.start, tzinfo=tz).astimezone(dt_timezone.utc)
+                closed = datetime.combine(day, self.end, tzinfo=tz).astimezone(dt_timezone.utc)
+                opens.append(int(opened.timestamp()))
+                closes.append(int(closed.timestamp()))
+            day += timedelta(days=1)
+
+        opens = np.array(opens, dtype=np.int64)
+        durations = np.array(closes, dtype=np.int64) - opens
+        # cumulative[i]: working seconds before interval i; the last slot is the total
+        cumulative = np.concatenate(([0], np.cumsum(durations))).astype(np.int64)
+        # Swapped in one assignment so concurrent readers never mix generations
+        self._arrays = (opens, durations, cumulative)
+        self._first_day, self._last_day = first_day, last_day
+
+    def _covering(self, seconds: np.ndarray, extra_days: int = 0) -> tuple:
+        """Get interval arrays that cover every instant in ``seconds``."""
+        if seconds.size:
+            low = (_EPOCH + timedelta(seconds=int(seconds.min()))).date() - timedelta(days=1)
+            high = (_EPOCH + timedelta(seconds=int(seconds.max()))).date() + timedelta(days=1 + extra_days)
+            with self._lock:
+                if self._first_day is None or low < self._first_day or self._last_day < high:
+                    first_day = low - timedelta(days=_PADDING_DAYS)
+                    last_day = high + timedelta(days=_PADDING_DAYS)
+                    if self._first_day is not None:
+                        first_day = min(first_day, self._first_day)
+                        last_day = max(last_day, self._last_day)
+                    self._build(first_day, last_day)
+        return self._arrays
+
+    @staticmethod
+    def _before(arrays: tuple, seconds: np.ndarray) -> np.ndarray:
+        opens, durations, cumulative = arrays
+        index = np.searchsorted(opens, seconds, side="right") - 1
+        clamped = np.maximum(index, 0)
+        inside = np.clip(seconds - opens[clamped], 0, durations[clamped])
+        return np.where(index >= 0, cumulative[clamped] + inside, 0)
+
+    def working_seconds_before(self, seconds) -> np.ndarray:
+        """Working seconds between the calendar origin and each instant."""
+        seconds = np.asarray(seconds, dtype=np.int64)
+        return self._before(self._covering(seconds), seconds)
+
+    def elapsed(self, start, end) -> np.ndarray:
+        """Working seconds between ``start`` and ``end`` (epoch seconds)."""
+        start = np.asarray(start, dtype=np.int64)
+        end = np.asarray(end, dtype=np.int64)
+        arrays = self._covering(np.concatenate((start.ravel(), end.ravel())))
+        return np.maximum(self._before(arrays, end) - self._before(arrays, start), 0)
+
+    def add(self, start, working_seconds) -> np.ndarray:
+        """Instant reached after ``working_seconds`` of working time from ``start``."""
+        start = np.asarray(start, dtype=np.int64)
+        working_seconds = np.maximum(np.asarray(working_seconds, dtype=np.int64), 0)
+        # Cover enough calendar days for the longest addition, with slack for holidays
+        extra_days = 0
+        if working_seconds.size:
+            weekly = self._daily_seconds * len(self.workdays)
+            extra_days = 2 * 7 * int(working_seconds.max()) // weekly + 7
+        arrays = self._covering(np.concatenate((start.ravel(), start.ravel())), extra_days)
+        opens, _, cumulative = arrays
+        target = self._before(arrays, start) + working_seconds
+        # First interval whose end reaches the target
+        index = np.minimum(np.searchsorted(cumulative[1:], target, side="left"), len(opens) - 1)
+        due = opens[index] + (target - cumulative[index])
+        # Adding nothing stays put instead of jumping to the next opening
+        return np.where(working_seconds > 0, due, start)
+
+    def elapsed_between(self, start: datetime, end: datetime) -> int:
+        """Scalar form of :meth:`elapsed` for naive UTC datetimes."""
+        return int(self.elapsed(to_seconds(start), to_seconds(end)))
+
+    def add_to(self, start: datetime, working_seconds: int) -> datetime:
+        """Scalar form of :meth:`add` for naive UTC datetimes."""
+        return from_seconds(int(self.add(to_seconds(start), working_seconds)))
+
+
+def to_seconds(value: datetime) -> int:
+    return (value - _EPOCH) // timedelta(seconds=1)
+
+
+def from_seconds(seconds: int) -> datetime:
+    return _EPOCH + timedelta(seconds=int(seconds))
+
+
+@lru_cache(maxsize=32)
+def get_calendar(timezone: str, holidays: Tuple[date, ...] = ()) -> BusinessCalendar:
+    """Get a shared calendar for a timezone and holiday set."""
+    return BusinessCalendar(
+        timezone=timezone,
+        start=_parse_time(settings.BUSINESS_HOURS_START),
+        end=_parse_time(settings.BUSINESS_HOURS_END),
+        workdays=tuple(int(day) for day in settings.BUSINESS_DAYS.split(",")),
+        holidays=holidays,
+    )
+
+
+telemetry.register_cache_info("business_calendars", get_calendar.cache_info)
+
+
+def get_holidays(db: Session, calendar: str) -> Tuple[date, ...]:
+    """Get the holidays of a named calendar, cached for the lifetime of the session."""
+    cache = db.info.setdefault("holidays", {})
+    telemetry.record_cache("holidays", calendar in cache)
+    if calendar not in cache:
+        rows = db.query(Holiday.date).filter(Holiday.calendar == calendar).order_by(Holiday.date).all()
+        cache[calendar] = tuple(row[0] for row in rows)
+    return cache[calendar]
+
+
+def invalidate_holidays(db: Session) -> None:
+    """Drop cached holidays after they have been changed."""
+    db.info.pop("holidays", None)
+
+
+def calendar_for_policy(db: Session, policy) -> Optional[BusinessCalendar]:
+    """Get the business calendar an SLA policy runs on, or None for wall-clock SLAs."""
+    if policy is None or not policy.business_hours_only:
+        return None
+    return get_calendar(policy.timezone, get_holidays(db, policy.calendar))
@@ -0,0 +1,211 @@
+"""Change log of tickets, comments and articles for incremental sync.
+
+Every service write that publishes a stream event also appends it to the
+``changes`` table in the same transaction (:func:`record`). Sequence
+numbers are taken from the ``changes`` number sequence right before the
+commit; the sequence row stays locked until then, so changes commit in
+sequence order and a client that has read up to ``cursor`` only needs
+``seq > cursor``. Reading a page is a range scan of the primary key (or of
+``ix_changes_audience_seq`` for requesters) plus one IN query per entity
+type, so it costs the same however long the log is.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from app.core import events
+from app.models.change import EVERYONE, Change
+from app.models.comment import Comment
+from app.models.number_sequence import NumberSequence
+from app.models.user import User
+from app.services import article_service, sla_service, ticket_service
+
+CHANGE_SEQUENCE = "changes"
+# Highest sequence number removed by :func:`prune_changes`; older cursors cannot be served
+PRUNED_SEQUENCE = "changes_pruned"
+
+TICKET, COMMENT, ARTICLE = "ticket", "comment", "article"
+
+# Event type prefix -> data field holding the entity id
+_ENTITY_IDS = {TICKET: "ticket_id", COMMENT: "comment_id", ARTICLE: "article_id"}
+
+Entry = Tuple[str, str, Optional[str]]  # entity type, entity id, audience
+
+
+class CursorExpired(Exception):
+    """The changes after a cursor have been pruned; the client must resync."""
+
+
+def _audience(event: events.Event) -> Optional[str]:
+    if event.audience == events.REQUESTER:
+        return event.requester_id
+    if event.audience == events.EVERYONE:
+        return EVERYONE
+    return None
+
+
+def append(db: Session, entries: List[Entry]) -> int:
+    """Append changes in the caller's transaction and return the first sequence number.
+
+    Pending writes are flushed first, so the sequence row is only held
+    locked for the INSERT and the commit that follows. The sequence starts
+    with the (empty) table, so its first use needs no seeding query.
+    """
+    if not entries:
+        return 0
+    db.flush()
+    count = len(entries)
+    value = db.execute(
+        update(NumberSequence)
+        .where(NumberSequence.name == CHANGE_SEQUENCE)
+        .values(value=NumberSequence.value + count)
+        .returning(NumberSequence.value)
+    ).scalar()
+    if value is None:
+        value = count
+        db.add(NumberSequence(name=CHANGE_SEQUENCE, value=value))
+        db.flush()
+    first = value - count + 1
+    now = datetime.utcnow()
+    db.execute(insert(Change), [
+        {"seq": first + offset, "entity_type": entity_type, "entity_id": entity_id,
+         "audience": audience, "changed_at": now}
+        for offset, (entity_type, entity_id, audience) in enumerate(entries)
+    ])
+    return first
+
+
+def record(db: Session, *changes: events.Event) -> None:
+    """Append the changes of stream events, giving each event its sequence number as id."""
+    entries = []
+    for event in changes:
+        entity_type = event.type.split(".", 1)[0]
+        entries.append((entity_type, event.data[_ENTITY_IDS[entity_type]], _audience(event)))
+    first = append(db, entries)
+    for offset, event in enumerate(changes):
+        event.id = first + offset
+
+
+def head(db: Session) -> int:
+    """Sequence number of the latest change; a cursor to start from after a full download.
+
+    Read from the sequence rather than the table, which :func:`prune_changes`
+    may have emptied.
+    """
+    return (
+        db.query(NumberSequence.value).filter(NumberSequence.name == CHANGE_SEQUENCE).scalar() or 0
+    )
+
+
+def _pruned(db: Session) -> int:
+    return db.query(NumberSequence.value).filter(NumberSequence.name == PRUNED_SEQUENCE).scalar() or 0
+
+
+def _page(db: Session, user: User, cursor: int, limit: int) -> List[Change]:
+    if user.role in ("operator", "admin"):
+        return db.query(Change).filter(Change.seq > cursor).order_by(Change.seq).limit(limit).all()
+    # One index range per audience, merged, instead of an OR the planner would scan
+    rows = []
+    for audience in (user.id, EVERYONE):
+        rows.extend(
+            db.query(Change)
+            .filter(Change.audience == audience, Change.seq > cursor)
+            .order_by(Change.seq)
+            .limit(limit)
+            .all()
+        )
+    rows.sort(key=lambda change: change.seq)
+    return rows[:limit]
+
+
+def _load(db: Session, latest: Dict[Tuple[str, str], Change]) -> Dict[Tuple[str, str], object]:
+    ids: Dict[str, List[str]] = {TICKET: [], COMMENT: [], ARTICLE: []}
+    for entity_type, entity_id in latest:
+        ids[entity_type].append(entity_id)
+    loaded = {}
+    if ids[TICKET]:
+        tickets = ticket_service.get_tickets(db, ids=ids[TICKET], limit=len(ids[TICKET]))
+        sla_service.attach_sla(db, tickets)
+        loaded.update(((TICKET, ticket.id), ticket) for ticket in tickets)
+    if ids[COMMENT]:
+        comments = db.query(Comment).options(joinedload(Comment.author)).filter(Comment.id.in_(ids[COMMENT]))
+        loaded.update(((COMMENT, comment.id), comment) for comment in comments)
+    if ids[ARTICLE]:
+        articles = article_service.get_articles(db, ids=ids[ARTICLE], limit=len(ids[ARTICLE]))
+        loaded.update(((ARTICLE, article.id), article) for article in articles)
+    return loaded
+
+
+def _visible(user: User, entity_type: str, entity) -> bool:
+    if entity is None:
+        return False
+    if entity_type == ARTICLE:
+        if entity.status == "ARCHIVED":
+            return False
+        return user.role in ("operator", "admin") or entity.status == "PUBLISHED"
+    return True
+
+
+def get_changes(db: Session, user: User, cursor: int, limit: int = 100) -> dict:
+    """Changes after ``cursor`` visible to ``user``, oldest first, with the current state of each entity.
+
+    An entity changed several times within the page is returned once, at
+    its latest change. Archived articles, and for requesters articles that
+    are no longer published, come back as tombstones (``deleted``).
+    Raises :class:`CursorExpired` when changes after ``cursor`` were pruned.
+    """
+    if cursor < _pruned(db):
+        raise CursorExpired(cursor)
+    rows = _page(db, user, cursor, limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    latest: Dict[Tuple[str, str], Change] = {}
+    for row in rows:
+        key = (row.entity_type, row.entity_id)
+        latest.pop(key, None)
+        latest[key] = row
+    loaded = _load(db, latest)
+    changes = []
+    for (entity_type, entity_id), row in latest.items():
+        entity = loaded.get((entity_type, entity_id))
+        change = {"seq": row.seq, "entity_type": entity_type, "entity_id": entity_id, "deleted": False}
+        if _visible(user, entity_type, entity):
+            change[entity_type] = entity
+        else:
+            change["deleted"] = True
+        changes.append(change)
+    return {
+        "changes": changes,
+        "next_cursor": rows[-1].seq if rows else cursor,
+        "has_more": has_more,
+    }
+
+
+def prune_changes(db: Session, before: datetime, batch_size: int = 10000) -> int:
+    """Delete changes recorded before ``before``, oldest first, a batch per transaction.
+
+    Returns the rows removed. Cursors older than the last removed change
+    get :class:`CursorExpired`.
+    """
+    total = 0
+    while True:
+        rows = db.execute(select(Change.seq, Change.changed_at).order_by(Change.seq).limit(batch_size)).all()
+        expired = 0
+        while expired < len(rows) and rows[expired].changed_at < before:
+            expired += 1
+        if not expired:
+            return total
+        last = rows[expired - 1].seq
+        db.execute(delete(Change).where(Change.seq <= last))
+        result = db.execute(
+            update(NumberSequence).where(NumberSequence.name == PRUNED_SEQUENCE).values(value=last)
+        )
+        if result.rowcount == 0:
+            db.add(NumberSequence(name=PRUNED_SEQUENCE, value=last))
+        db.commit()
+        total += expired
+        if expired < len(rows):
+            return total
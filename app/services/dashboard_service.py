@@ -0,0 +1,158 @@
+from collections import Counter, defaultdict
+from typing import Iterable, Optional, Tuple
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core import response_cache
+from app.db.base import insert_or_ignore
+from app.models.team import Team
+from app.models.ticket import Ticket
+from app.models.ticket_count import TicketCount
+from app.models.user import User
+from app.services.sla_service import OPEN_STATUSES
+
+Cell = Tuple[str, str, Optional[str], Optional[str]]
+
+
+def ticket_cell(ticket: Ticket) -> Optional[Cell]:
+    """Get the dashboard cell a ticket is counted in (None before it exists)."""
+    if ticket.status is None:
+        return None
+    return ticket.status, ticket.priority, ticket.assigned_team_id, ticket.assignee_id
+
+
+def _cell_key(cell: Cell) -> str:
+    return "|".join(value or "" for value in cell)
+
+
+def _bump(db: Session, cell: Cell, delta: int) -> None:
+    key = _cell_key(cell)
+    # Relative UPDATE so concurrent writers never overwrite each other
+    statement = update(TicketCount).where(TicketCount.key == key).values(count=TicketCount.count + delta)
+    if db.execute(statement).rowcount:
+        return
+    status, priority, team_id, assignee_id = cell
+    inserted = db.execute(insert_or_ignore(db, TicketCount.__table__), {
+        "key": key,
+        "status": status,
+        "priority": priority,
+        "team_id": team_id,
+        "assignee_id": assignee_id,
+        "count": delta,
+    }).rowcount
+    if not inserted:
+        # Another transaction created the cell in between; add to its count
+        db.execute(statement)
+
+
+def move_ticket(db: Session, before: Optional[Cell], ticket: Ticket) -> None:
+    """Move a ticket between dashboard cells.
+
+    Call before committing the ticket change, with the cell captured by
+    :func:`ticket_cell` before the change (None for a new ticket), so the
+    counters are committed in the same transaction.
+    """
+    move_tickets(db, [(before, ticket_cell(ticket))])
+
+
+def move_tickets(db: Session, moves: Iterable[Tuple[Optional[Cell], Optional[Cell]]]) -> None:
+    """Apply many (before, after) cell moves with one UPDATE per affected cell."""
+    deltas = Counter()
+    for before, after in moves:
+        if before == after:
+            continue
+        if before is not None:
+            deltas[before] -= 1
+        if after is not None:
+            deltas[after] += 1
+    for cell, delta in deltas.items():
+        if delta:
+            _bump(db, cell, delta)
+
+
+def rebuild_ticket_counts(db: Session) -> int:
+    """Recount every dashboard cell from the tickets table."""
+    rows = (
+        db.query(
+            Ticket.status,
+            Ticket.priority,
+            Ticket.assigned_team_id,
+            Ticket.assignee_id,
+            func.count(Ticket.id),
+        )
+        .group_by(Ticket.status, Ticket.priority, Ticket.assigned_team_id, Ticket.assignee_id)
+        .all()
+    )
+    db.query(TicketCount).delete(synchronize_session=False)
+    db.add_all(
+        TicketCount(
+            key=_cell_key(row[:4]),
+            status=row[0],
+            priority=row[1],
+            team_id=row[2],
+            assignee_id=row[3],
+            count=row[4],
+        )
+        for row in rows
+    )
+    db.commit()
+    response_cache.clear()
+    return len(rows)
+
+
+def get_summary(db: Session, include_closed: bool = False) -> dict:
+    """Summarize ticket counts by status, priority, team and assignee.
+
+    Reads only the non-empty cells of ``ticket_counts``, whose size depends on
+    the number of teams and assignees rather than on the number of tickets.
+    """
+    query = (
+        db.query(
+            TicketCount.status,
+            TicketCount.priority,
+            TicketCount.team_id,
+            Team.name,
+            TicketCount.assignee_id,
+            User.name,
+            TicketCount.count,
+        )
+        .outerjoin(Team, Team.id == TicketCount.team_id)
+        .outerjoin(User, User.id == TicketCount.assignee_id)
+        .filter(TicketCount.count > 0)
+    )
+    if not include_closed:
+        query = query.filter(TicketCount.status.in_(OPEN_STATUSES))
+    query = query.order_by(TicketCount.key)
+
+    total = 0
+    by_status = defaultdict(int)
+    by_priority = defaultdict(int)
+    by_team = {}
+    by_assignee = {}
+    cells = []
+    for status, priority, team_id, team_name, assignee_id, assignee_name, count in query.all():
+        total += count
+        by_status[status] += count
+        by_priority[priority] += count
+        team = by_team.setdefault(team_id, {"team_id": team_id, "team_name": team_name, "count": 0})
+        team["count"] += count
+        assignee = by_assignee.setdefault(
+            assignee_id, {"assignee_id": assignee_id, "assignee_name": assignee_name, "count": 0}
+        )
+        assignee["count"] += count
+        cells.append({
+            "status": status,
+            "priority": priority,
+            "team_id": team_id,
+            "assignee_id": assignee_id,
+            "count": count,
+        })
+
+    return {
+        "total": total,
+        "by_status": dict(by_status),
+        "by_priority": dict(by_priority),
+        "by_team": sorted(by_team.values(), key=lambda item: -item["count"]),
+        "by_assignee": sorted(by_assignee.values(), key=lambda item: -item["count"]),
+        "cells": cells,
+    }
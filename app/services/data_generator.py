@@ -0,0 +1,528 @@
+"""Synthetic helpdesk data at production scale, for load and performance testing.
+
+Rows are generated with numpy from a seeded generator (the same seed and
+sizes always produce the same data) and written with executemany INSERTs,
+one transaction per batch. The distributions follow a real helpdesk
+roughly: a few requesters file most tickets (Zipf), tickets arrive mostly
+on weekday business hours, and each ticket's first response and resolution
+times are drawn relative to its priority's SLA targets, so the status of a
+ticket follows from its age: recent tickets are still open, old ones are
+resolved or closed, and a share of them breached their SLA.
+"""
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.security import get_password_hash
+from app.models.audit_log import AuditLog
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.knowledge_article import KnowledgeArticle
+from app.models.sla_settings import SLASettings
+from app.models.tag import Tag, article_tags, ticket_tags
+from app.models.team import Team
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services import dashboard_service, metrics_service, sla_service, ticket_service
+
+# Password of every generated user
+PASSWORD = "testpass123"
+BATCH_SIZE = 10000
+# Tickets drawn from one random stream; fixed so the data does not depend on batch_size
+BLOCK_SIZE = 1000
+
+PRIORITY_WEIGHTS = {"LOW": 0.35, "MEDIUM": 0.4, "HIGH": 0.2, "URGENT": 0.05}
+# Targets (minutes) used when no SLA settings exist yet; the same as seed.py
+DEFAULT_SLA_TARGETS = {"LOW": (480, 2880), "MEDIUM": (240, 1440), "HIGH": (120, 480), "URGENT": (30, 240)}
+# Zipf exponents: requesters filing tickets, and popularity of categories and tags
+REQUESTER_SKEW = 1.0
+POPULARITY_SKEW = 1.0
+# Share of tickets that are canceled, that wait on the customer once, and that
+# stall for weeks (the open backlog)
+CANCEL_RATE = 0.03
+WAITING_RATE = 0.25
+STALL_RATE = 0.03
+# Resolved tickets are closed this long after resolution
+CLOSE_AFTER = timedelta(days=3)
+# Relative weight of each weekday (Monday first) and hour of day (UTC+9 business hours)
+WEEKDAY_WEIGHTS = np.array([1.2, 1.1, 1.0, 1.0, 0.9, 0.15, 0.1])
+HOUR_WEIGHTS = np.array([6, 9, 9, 8, 6, 9, 9, 8, 6, 3, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 2], dtype=np.float64)
+
+FAMILY_NAMES = [
+    "佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤",
+    "吉田", "山田", "佐々木", "山口", "松本", "井上", "木村", "林", "斎藤", "清水",
+]
+GIVEN_NAMES = [
+    "太郎", "花子", "翔", "陽菜", "蓮", "結衣", "大輔", "美咲", "健太", "さくら",
+    "拓也", "葵", "直樹", "愛", "悠斗", "彩", "誠", "由美", "亮", "真由",
+]
+TEAM_NAMES = ["サポート", "インフラ", "アプリケーション", "セキュリティ", "ネットワーク", "アカウント管理", "業務システム"]
+CATEGORY_NAMES = [
+    "システム障害", "操作方法", "アカウント", "ネットワーク", "ハードウェア", "ソフトウェア導入",
+    "権限申請", "メール", "セキュリティ", "データ復旧", "請求・契約", "その他",
+]
+TAG_WORDS = [
+    "緊急", "ネットワーク", "認証", "パフォーマンス", "バグ", "機能要望", "ドキュメント", "VPN", "メール",
+    "プリンター", "モバイル", "Windows", "Mac", "権限", "バックアップ", "障害", "問い合わせ", "設定変更",
+]
+SYSTEMS = [
+    "VPN", "社内メール", "勤怠管理システム", "経費精算システム", "ファイルサーバー", "会議室予約",
+    "ノートPC", "プリンター", "社内Wi-Fi", "シングルサインオン", "顧客管理システム", "チャットツール",
+]
+PROBLEMS = [
+    "にログインできません", "が頻繁に切断されます", "の動作が遅いです", "でエラーが表示されます",
+    "の設定方法を教えてください", "のパスワードを再設定したい", "にアクセスする権限がありません",
+    "が起動しません", "のデータが同期されません", "の画面が真っ白になります",
+]
+WHEN = ["今朝から", "昨日の午後から", "先週から", "本日10時頃から", "アップデート後から", "在宅勤務中に"]
+ERRORS = ["接続がタイムアウトしました", "認証に失敗しました", "内部サーバーエラー", "アクセスが拒否されました"]
+DETAILS = [
+    "エラーメッセージは「{error}」です。",
+    "再起動を試しましたが改善しません。",
+    "同じ部署の他のメンバーも同様の状況です。",
+    "業務に支障が出ているため、早めの対応をお願いします。",
+    "手順書を確認しましたが該当する記載が見つかりませんでした。",
+    "別の端末からも試しましたが同じ結果でした。",
+]
+OPERATOR_REPLIES = [
+    "お問い合わせありがとうございます。確認いたします。",
+    "ログを確認したところ、{system}側の設定に問題がありました。",
+    "お手数ですが、エラー画面のスクリーンショットを添付いただけますか。",
+    "設定を修正しました。再度お試しください。",
+    "現象を再現できました。担当チームに確認中です。",
+]
+REQUESTER_REPLIES = [
+    "ご確認ありがとうございます。",
+    "スクリーンショットを添付します。",
+    "再度試したところ解消しました。",
+    "まだ同じエラーが出ます。",
+    "承知しました。よろしくお願いします。",
+]
+INTERNAL_NOTES = [
+    "{system}のベンダーに問い合わせ済み。",
+    "同様の問い合わせが複数件あり。障害の可能性あり。",
+    "次回リリースで修正予定。",
+]
+ARTICLE_TITLES = ["{system}の使い方", "{system}でエラーが出る場合の対処", "{system}のよくある質問", "{system}の初期設定手順"]
+
+
+def _ids(rng: np.random.Generator, count: int) -> List[str]:
+    """Deterministic UUID4 strings drawn from the generator."""
+    data = np.frombuffer(rng.bytes(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    data[:, 6] = data[:, 6] & 0x0F | 0x40  # version 4
+    data[:, 8] = data[:, 8] & 0x3F | 0x80  # RFC 4122 variant
+    h = data.tobytes().hex()
+    return [
+        f"{h[i:i + 8]}-{h[i + 8:i + 12]}-{h[i + 12:i + 16]}-{h[i + 16:i + 20]}-{h[i + 20:i + 32]}"
+        for i in range(0, 32 * count, 32)
+    ]
+
+
+def _zipf_weights(count: int, skew: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1) ** skew
+    return weights / weights.sum()
+
+
+def _insert(db: Session, table, rows: List[dict], batch_size: int = BATCH_SIZE) -> None:
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(table), rows[start:start + batch_size])
+
+
+def _name(rng: np.random.Generator) -> str:
+    return FAMILY_NAMES[rng.integers(len(FAMILY_NAMES))] + " " + GIVEN_NAMES[rng.integers(len(GIVEN_NAMES))]
+
+
+def _numbered(words: List[str], count: int, suffix: str = "") -> List[str]:
+    """``count`` distinct names: the words first, then numbered variants."""
+    return [
+        f"{words[i % len(words)]}{suffix}" + (f"{i // len(words) + 1}" if i >= len(words) else "")
+        for i in range(count)
+    ]
+
+
+def _sla_targets(db: Session, now: datetime) -> Dict[str, tuple]:
+    """First-response and resolution targets per priority, creating default settings if none exist."""
+    policies = sla_service.get_sla_policies(db)
+    if not policies:
+        db.execute(insert(SLASettings), [
+            {
+                "id": str(uuid.uuid4()),
+                "priority": priority,
+                "first_response_target_minutes": first_response,
+                "resolution_target_minutes": resolution,
+                "pause_on_waiting_customer": True,
+                "timezone": "Asia/Tokyo",
+                "business_hours_only": False,
+                "calendar": "default",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for priority, (first_response, resolution) in DEFAULT_SLA_TARGETS.items()
+        ])
+        db.commit()
+        sla_service.invalidate_sla_policies(db)
+        return dict(DEFAULT_SLA_TARGETS)
+    return {
+        priority: (policy.first_response_target_minutes, policy.resolution_target_minutes)
+        for priority, policy in policies.items()
+    }
+
+
+def _arrival_offsets(rng: np.random.Generator, count: int, days: int, start: datetime) -> np.ndarray:
+    """Ticket creation times (seconds after ``start``), weighted by weekday and hour, sorted."""
+    weekdays = (start.weekday() + np.arange(days)) % 7
+    day_weights = WEEKDAY_WEIGHTS[weekdays]
+    day = rng.choice(days, size=count, p=day_weights / day_weights.sum())
+    hour = rng.choice(24, size=count, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    offsets = day * 86400.0 + hour * 3600.0 + rng.random(count) * 3600.0
+    return np.sort(offsets)
+
+
+def _text(rng: np.random.Generator, templates: List[str], system: str) -> str:
+    return templates[rng.integers(len(templates))].format(system=system, error=ERRORS[rng.integers(len(ERRORS))])
+
+
+def _description(rng: np.random.Generator, system: str, problem: str) -> str:
+    sentences = [f"{WHEN[rng.integers(len(WHEN))]}{system}{problem}。"]
+    for index in rng.choice(len(DETAILS), size=rng.integers(1, 4), replace=False):
+        sentences.append(DETAILS[index].format(error=ERRORS[rng.integers(len(ERRORS))]))
+    return "".join(sentences)
+
+
+def generate(
+    db: Session,
+    users: int = 1000,
+    operators: int = 50,
+    admins: int = 2,
+    teams: int = 5,
+    categories: int = 12,
+    tags: int = 50,
+    tickets: int = 10000,
+    comments_per_ticket: float = 3.0,
+    articles: int = 200,
+    days: int = 365,
+    seed: int = 0,
+    batch_size: int = BATCH_SIZE,
+    now: Optional[datetime] = None,
+    rebuild_aggregates: bool = True,
+) -> Dict[str, int]:
+    """Generate a synthetic helpdesk dataset and return the rows written per table.
+
+    Users are ``requester000001@gen<seed>.example.com``,
+    ``operator0001@gen<seed>.example.com`` and ``admin01@gen<seed>.example.com``,
+    all with the password ``testpass123``. Tickets are spread over the last
+    ``days`` days. With ``rebuild_aggregates`` the SLA due dates, dashboard
+    counts, response-time sketches and volume rollups are rebuilt afterwards.
+    """
+    rng = np.random.default_rng([seed, 0])
+    now = (now or datetime.utcnow()).replace(microsecond=0)
+    start = now - timedelta(days=days)
+    domain = f"gen{seed}.example.com"
+    if db.query(User.id).filter(User.email.like(f"%@{domain}")).first():
+        raise ValueError(f"Data for seed {seed} already exists; use another seed or an empty database")
+
+    written = dict.fromkeys(
+        ("users", "teams", "categories", "tags", "tickets", "ticket_tags", "comments", "articles", "audit_logs"), 0
+    )
+    targets = _sla_targets(db, now)
+
+    # Reference data
+    team_ids = _ids(rng, teams)
+    _insert(db, Team.__table__, [
+        {"id": team_id, "name": name, "description": f"{name}の問い合わせ対応", "created_at": start, "updated_at": start}
+        for team_id, name in zip(team_ids, _numbered(TEAM_NAMES, teams, "チーム"))
+    ])
+    category_ids = _ids(rng, categories)
+    category_team = [team_ids[i] for i in rng.integers(teams, size=categories)]
+    _insert(db, Category.__table__, [
+        {"id": category_id, "name": name, "type": "BOTH", "created_at": start}
+        for category_id, name in zip(category_ids, _numbered(CATEGORY_NAMES, categories))
+    ])
+    tag_names = _numbered(TAG_WORDS, tags)
+    tag_map = dict(db.query(Tag.name, Tag.id).filter(Tag.name.in_(tag_names)).all())
+    new_tags = [
+        {"id": tag_id, "name": name, "created_at": start}
+        for tag_id, name in zip(_ids(rng, tags), tag_names)
+        if name not in tag_map
+    ]
+    _insert(db, Tag.__table__, new_tags)
+    tag_map.update((tag["name"], tag["id"]) for tag in new_tags)
+    tag_ids = [tag_map[name] for name in tag_names]
+
+    password_hash = get_password_hash(PASSWORD)
+    requester_ids, operator_ids, admin_ids = _ids(rng, users), _ids(rng, operators), _ids(rng, admins)
+    operator_team = [team_ids[i % teams] for i in range(operators)]
+    user_rows = (
+        [("requester", user_id, f"requester{i + 1:06d}", None) for i, user_id in enumerate(requester_ids)]
+        + [("operator", user_id, f"operator{i + 1:04d}", operator_team[i]) for i, user_id in enumerate(operator_ids)]
+        + [("admin", user_id, f"admin{i + 1:02d}", None) for i, user_id in enumerate(admin_ids)]
+    )
+    _insert(db, User.__table__, [
+        {
+            "id": user_id,
+            "email": f"{local}@{domain}",
+            "name": _name(rng),
+            "role": role,
+            "team_id": team_id,
+            "password_hash": password_hash,
+            "created_at": start,
+            "updated_at": start,
+        }
+        for role, user_id, local, team_id in user_rows
+    ])
+    db.commit()
+    written.update(users=len(user_rows), teams=teams, categories=categories, tags=len(new_tags))
+
+    team_operators = {team_id: [] for team_id in team_ids}
+    for operator_id, team_id in zip(operator_ids, operator_team):
+        team_operators[team_id].append(operator_id)
+
+    # Requesters by popularity rank, in random order so rank is not tied to creation order
+    requester_rank = rng.permutation(users)
+    requester_weights = _zipf_weights(users, REQUESTER_SKEW)
+    category_weights = _zipf_weights(categories, POPULARITY_SKEW)
+    tag_weights = _zipf_weights(tags, POPULARITY_SKEW)
+    priorities = list(PRIORITY_WEIGHTS)
+    priority_weights = np.array(list(PRIORITY_WEIGHTS.values()))
+
+    offsets = _arrival_offsets(rng, tickets, days, start)
+    pending = {"tickets": [], "ticket_tags": [], "comments": [], "audit_logs": []}
+    for block, block_start in enumerate(range(0, tickets, BLOCK_SIZE)):
+        block_rng = np.random.default_rng([seed, 1, block])
+        count = min(BLOCK_SIZE, tickets - block_start)
+        first_number = ticket_service.allocate_ticket_numbers(db, count)
+        requesters = requester_rank[block_rng.choice(users, size=count, p=requester_weights)]
+        rows = _ticket_batch(
+            block_rng, first_number, offsets[block_start:block_start + count], start, now, targets,
+            priorities, priority_weights, [requester_ids[i] for i in requesters],
+            category_ids, category_weights, category_team, team_operators,
+            tag_ids, tag_weights, comments_per_ticket,
+        )
+        for key, values in rows.items():
+            pending[key].extend(values)
+        if len(pending["tickets"]) >= batch_size or block_start + count >= tickets:
+            for table, key in (
+                (Ticket.__table__, "tickets"), (ticket_tags, "ticket_tags"),
+                (Comment.__table__, "comments"), (AuditLog.__table__, "audit_logs"),
+            ):
+                _insert(db, table, pending[key], batch_size)
+                written[key] += len(pending[key])
+                pending[key] = []
+            db.commit()
+
+    article_rng = np.random.default_rng([seed, 2])
+    article_rows, article_tag_rows, article_audit_rows = _article_batch(
+        article_rng, articles, start, now, operator_ids, category_ids, category_weights, tag_ids, tag_weights
+    )
+    _insert(db, KnowledgeArticle.__table__, article_rows, batch_size)
+    _insert(db, article_tags, article_tag_rows, batch_size)
+    _insert(db, AuditLog.__table__, article_audit_rows, batch_size)
+    db.commit()
+    written["articles"] = len(article_rows)
+    written["audit_logs"] += len(article_audit_rows)
+
+    if rebuild_aggregates:
+        sla_service.recompute_due_dates(db)
+        dashboard_service.rebuild_ticket_counts(db)
+        metrics_service.rebuild_response_time_sketches(db)
+        metrics_service.backfill_volume_rollups(db, since=start, until=now)
+    return written
+
+
+def _ticket_batch(
+    rng, first_number, offsets, start, now, targets, priorities, priority_weights, requesters,
+    category_ids, category_weights, category_team, team_operators, tag_ids, tag_weights, comments_per_ticket,
+) -> Dict[str, List[dict]]:
+    """Rows of one batch of tickets with their tags, comments and audit logs."""
+    count = len(offsets)
+    ids = _ids(rng, count)
+    priority_index = rng.choice(len(priorities), size=count, p=priority_weights)
+    category_index = rng.choice(len(category_ids), size=count, p=category_weights)
+    has_category = rng.random(count) > 0.1
+    first_response_targets = np.array([targets[p][0] for p in priorities])[priority_index] * 60.0
+    resolution_targets = np.array([targets[p][1] for p in priorities])[priority_index] * 60.0
+    # Most tickets meet their SLA; the log-normal tail breaches it
+    first_response_delay = first_response_targets * rng.lognormal(np.log(0.4), 0.8, count)
+    waiting = np.where(rng.random(count) < WAITING_RATE, rng.exponential(8 * 3600.0, count), 0.0)
+    resolution_delay = np.maximum(
+        resolution_targets * rng.lognormal(np.log(0.5), 0.9, count), first_response_delay + 60
+    ) + waiting
+    stalled = rng.random(count) < STALL_RATE
+    resolution_delay = np.where(stalled, resolution_delay + rng.exponential(30 * 86400.0, count), resolution_delay)
+    canceled = rng.random(count) < CANCEL_RATE
+    tag_counts = rng.choice(4, size=count, p=[0.3, 0.4, 0.2, 0.1])
+    comment_counts = rng.poisson(max(comments_per_ticket - 1, 0), count) + 1
+    system_index = rng.integers(len(SYSTEMS), size=count)
+    problem_index = rng.integers(len(PROBLEMS), size=count)
+    comment_ids = iter(_ids(rng, int(comment_counts.sum())))
+
+    tickets, pairs, comments, audit_logs = [], [], [], []
+    for i in range(count):
+        ticket_id, requester_id = ids[i], requesters[i]
+        priority = priorities[priority_index[i]]
+        created_at = start + timedelta(seconds=int(offsets[i]))
+        system, problem = SYSTEMS[system_index[i]], PROBLEMS[problem_index[i]]
+        ticket_number = ticket_service.format_ticket_number(first_number + i)
+        category_id = category_ids[category_index[i]] if has_category[i] else None
+        team_id = category_team[category_index[i]] if has_category[i] else None
+        pool = team_operators.get(team_id) or [op for ops in team_operators.values() for op in ops]
+        assignee_id = pool[rng.integers(len(pool))] if pool else None
+
+        first_response_at = created_at + timedelta(seconds=int(first_response_delay[i]))
+        resolved_at = created_at + timedelta(seconds=int(resolution_delay[i]))
+        waiting_started_at = first_response_at + (resolved_at - first_response_at) / 3
+        changes = [("OPEN", "IN_PROGRESS", first_response_at, assignee_id)]
+        row = {
+            "id": ticket_id,
+            "ticket_number": ticket_number,
+            "title": f"{system}{problem}",
+            "description": _description(rng, system, problem),
+            "priority": priority,
+            "category_id": category_id,
+            "requester_id": requester_id,
+            "assignee_id": None,
+            "assigned_team_id": team_id,
+            "external_ref": None,
+            "first_response_at": None,
+            "resolved_at": None,
+            "closed_at": None,
+            "waiting_customer_started_at": None,
+            "total_waiting_customer_duration": 0,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        if canceled[i]:
+            row["status"] = "CANCELED"
+            changes = [("OPEN", "CANCELED", min(first_response_at, now), requester_id)]
+        elif first_response_at > now:
+            row["status"] = "OPEN"
+            changes = []
+        else:
+            row.update(assignee_id=assignee_id, first_response_at=first_response_at)
+            if waiting[i]:
+                changes.append(("IN_PROGRESS", "WAITING_CUSTOMER", waiting_started_at, assignee_id))
+            if resolved_at > now:
+                if waiting[i] and waiting_started_at <= now:
+                    row.update(status="WAITING_CUSTOMER", waiting_customer_started_at=waiting_started_at)
+                else:
+                    row["status"] = "IN_PROGRESS"
+                    changes = changes[:1]
+            else:
+                if waiting[i]:
+                    changes.append(("WAITING_CUSTOMER", "IN_PROGRESS", waiting_started_at + timedelta(
+                        seconds=int(waiting[i])), requester_id))
+                    row["total_waiting_customer_duration"] = int(waiting[i])
+                changes.append((changes[-1][1], "RESOLVED", resolved_at, assignee_id))
+                row.update(status="RESOLVED", resolved_at=resolved_at)
+                if resolved_at + CLOSE_AFTER <= now:
+                    closed_at = resolved_at + CLOSE_AFTER
+                    changes.append(("RESOLVED", "CLOSED", closed_at, requester_id))
+                    row.update(status="CLOSED", closed_at=closed_at)
+        changes = [change for change in changes if change[2] <= now and change[3]]
+        row["updated_at"] = changes[-1][2] if changes else created_at
+        row.update(comment_count=0, last_public_comment_at=None, last_activity_at=row["updated_at"])
+        tickets.append(row)
+
+        for index in set(rng.choice(len(tag_ids), size=tag_counts[i], p=tag_weights).tolist()):
+            pairs.append({"ticket_id": ticket_id, "tag_id": tag_ids[index]})
+
+        audit_logs.append({
+            "user_id": requester_id, "action": "TICKET_CREATED", "entity_type": "TICKET",
+            "entity_id": ticket_id, "meta_data": {"ticket_number": ticket_number, "title": row["title"]},
+            "created_at": created_at,
+        })
+        for old_status, new_status, at, user_id in changes:
+            audit_logs.append({
+                "user_id": user_id, "action": "STATUS_CHANGED", "entity_type": "TICKET",
+                "entity_id": ticket_id, "meta_data": {"old_status": old_status, "new_status": new_status},
+                "created_at": at,
+            })
+
+        if row["first_response_at"] is None:
+            continue
+        # The first response is the operator's reply; the rest of the thread follows until resolution
+        end = min(row["resolved_at"] or now, now)
+        span = max((end - first_response_at).total_seconds(), 0)
+        times = np.sort(rng.random(comment_counts[i] - 1) * span)
+        thread = [(first_response_at, assignee_id, False, _text(rng, OPERATOR_REPLIES, system))]
+        for k, seconds in enumerate(times):
+            at = first_response_at + timedelta(seconds=int(seconds))
+            if k % 2 == 0:
+                thread.append((at, requester_id, False, _text(rng, REQUESTER_REPLIES, system)))
+            elif rng.random() < 0.2:
+                thread.append((at, assignee_id, True, _text(rng, INTERNAL_NOTES, system)))
+            else:
+                thread.append((at, assignee_id, False, _text(rng, OPERATOR_REPLIES, system)))
+        public = [at for at, _, is_internal, _ in thread if not is_internal]
+        row.update(
+            comment_count=len(public),
+            last_public_comment_at=public[-1],
+            last_activity_at=max(row["last_activity_at"], public[-1]),
+        )
+        for comment_id, (at, author_id, is_internal, content) in zip(comment_ids, thread):
+            comments.append({
+                "id": comment_id, "ticket_id": ticket_id, "author_id": author_id, "content": content,
+                "is_internal": is_internal, "created_at": at, "updated_at": at,
+            })
+            audit_logs.append({
+                "user_id": author_id, "action": "COMMENT_ADDED", "entity_type": "TICKET",
+                "entity_id": ticket_id, "meta_data": {"comment_id": comment_id, "is_internal": is_internal},
+                "created_at": at,
+            })
+
+    for log, log_id in zip(audit_logs, _ids(rng, len(audit_logs))):
+        log["id"] = log_id
+    return {"tickets": tickets, "ticket_tags": pairs, "comments": comments, "audit_logs": audit_logs}
+
+
+def _article_batch(rng, count, start, now, operator_ids, category_ids, category_weights, tag_ids, tag_weights):
+    """Rows of the knowledge articles, their tags and audit logs."""
+    if not count or not operator_ids:
+        return [], [], []
+    ids = _ids(rng, count)
+    span = (now - start).total_seconds()
+    statuses = rng.choice(["DRAFT", "PUBLISHED", "ARCHIVED"], size=count, p=[0.2, 0.7, 0.1])
+    category_index = rng.choice(len(category_ids), size=count, p=category_weights)
+    # A few articles get most of the views
+    views = (rng.pareto(1.2, count) * 20).astype(np.int64)
+    articles, pairs, audit_logs = [], [], []
+    for i in range(count):
+        system = SYSTEMS[rng.integers(len(SYSTEMS))]
+        author_id = operator_ids[rng.integers(len(operator_ids))]
+        created_at = start + timedelta(seconds=int(rng.random() * span))
+        published_at = None
+        if statuses[i] != "DRAFT":
+            published_at = min(created_at + timedelta(hours=int(rng.integers(1, 72))), now)
+        title = _text(rng, ARTICLE_TITLES, system)
+        articles.append({
+            "id": ids[i],
+            "title": title,
+            "content": "".join(
+                _text(rng, OPERATOR_REPLIES, system) for _ in range(rng.integers(3, 8))
+            ),
+            "status": str(statuses[i]),
+            "category_id": category_ids[category_index[i]],
+            "author_id": author_id,
+            "view_count": int(views[i]) if published_at else 0,
+            "created_at": created_at,
+            "updated_at": published_at or created_at,
+            "published_at": published_at,
+        })
+        for index in set(rng.choice(len(tag_ids), size=rng.integers(0, 4), p=tag_weights).tolist()):
+            pairs.append({"article_id": ids[i], "tag_id": tag_ids[index]})
+        audit_logs.append({
+            "user_id": author_id, "action": "ARTICLE_CREATED", "entity_type": "ARTICLE", "entity_id": ids[i],
+            "meta_data": {"title": title, "status": "DRAFT"}, "created_at": created_at,
+        })
+        if published_at:
+            audit_logs.append({
+                "user_id": author_id, "action": "ARTICLE_PUBLISHED", "entity_type": "ARTICLE",
+                "entity_id": ids[i], "meta_data": {"title": title}, "created_at": published_at,
+            })
+    for log, log_id in zip(audit_logs, _ids(rng, len(audit_logs))):
+        log["id"] = log_id
+    return articles, pairs, audit_logs
@@ -0,0 +1,424 @@
+import csv
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.comment import Comment
+from app.models.import_job import ImportJob
+from app.models.tag import Tag, ticket_tags
+from app.models.team import Team
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services import (
+    change_service, dashboard_service, metrics_service, routing_service, sla_service, ticket_service,
+)
+
+KINDS = ("tickets", "comments")
+FORMATS = ("csv", "ndjson")
+
+# Records per transaction: one executemany INSERT per table and one checkpoint
+BATCH_SIZE = 2000
+# Per-record errors kept on the job; later ones are only counted
+MAX_ERRORS = 100
+# Separator of the tags column in CSV input (NDJSON takes a list)
+CSV_TAG_SEPARATOR = "|"
+
+_DATETIME_FIELDS = ("created_at", "updated_at", "first_response_at", "resolved_at", "closed_at")
+
+
+class RecordError(ValueError):
+    """An input record that cannot be imported."""
+
+
+def _ndjson_record(line: str) -> Union[dict, RecordError]:
+    try:
+        record = json.loads(line)
+    except ValueError as exc:
+        return RecordError(f"Invalid JSON: {exc}")
+    if not isinstance(record, dict):
+        return RecordError(f"Expected a JSON object, got {type(record).__name__}")
+    return record
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Union[dict, RecordError]]:
+    """Parse input records one at a time, without reading the whole stream.
+
+    An NDJSON line that is not a JSON object is yielded as a
+    :class:`RecordError`, so it fails on its own instead of ending the stream.
+    """
+    if fmt == "csv":
+        for row in csv.DictReader(stream):
+            yield {key: value for key, value in row.items() if value not in ("", None)}
+    elif fmt == "ndjson":
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield _ndjson_record(line)
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+
+def _batches(records: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _datetime(record: dict, field: str, default: Optional[datetime] = None) -> Optional[datetime]:
+    value = record.get(field)
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return value
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise RecordError(f"Invalid {field}: {value}")
+    # Stored naive in UTC like every other timestamp
+    if parsed.tzinfo is not None:
+        parsed = (parsed - parsed.utcoffset()).replace(tzinfo=None)
+    return parsed
+
+
+def _tags(record: dict) -> List[str]:
+    tags = record.get("tags") or []
+    if isinstance(tags, str):
+        tags = tags.split(CSV_TAG_SEPARATOR)
+    return list(dict.fromkeys(tag.strip() for tag in tags if tag and tag.strip()))
+
+
+def _record_error(job: ImportJob, errors: list, position: int, exc: Exception) -> None:
+    job.failed += 1
+    if len(errors) < MAX_ERRORS:
+        errors.append({"record": position, "error": str(exc)})
+
+
+def _lookup(db: Session, column, values: Iterable[str], key_column) -> Dict[str, str]:
+    """Map ``column`` values to ``key_column`` with one IN query per batch."""
+    values = list({value for value in values if value})
+    if not values:
+        return {}
+    return dict(db.execute(select(column, key_column).where(column.in_(values))).all())
+
+
+def create_job(
+    db: Session,
+    kind: str,
+    fmt: str,
+    source: Optional[str] = None,
+    user: Optional[User] = None,
+) -> ImportJob:
+    """Register a new import job."""
+    if kind not in KINDS:
+        raise ValueError(f"Unsupported import kind: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    now = datetime.utcnow()
+    job = ImportJob(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        format=fmt,
+        source=source,
+        status="RUNNING",
+        position=0,
+        imported=0,
+        skipped=0,
+        failed=0,
+        errors=[],
+        created_by=user.id if user else None,
+        created_at=now,
+        updated_at=now,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _ticket_rows(db: Session, records: List[Tuple[int, dict]], job: ImportJob, errors: list):
+    """Resolve a batch of ticket records into ticket rows and their tag names."""
+    refs = [str(record["external_ref"]) for _, record in records if record.get("external_ref")]
+    existing = set(db.scalars(select(Ticket.external_ref).where(Ticket.external_ref.in_(refs)))) if refs else set()
+    users = _lookup(
+        db, User.email,
+        (record.get(field) for _, record in records for field in ("requester_email", "assignee_email")),
+        User.id,
+    )
+    categories = _lookup(db, Category.name, (record.get("category") for _, record in records), Category.id)
+    teams = _lookup(db, Team.name, (record.get("team") for _, record in records), Team.id)
+
+    rows, tags, seen = [], [], set()
+    now = datetime.utcnow()
+    for position, record in records:
+        try:
+            external_ref = str(record["external_ref"]) if record.get("external_ref") else None
+            if external_ref is not None and (external_ref in existing or external_ref in seen):
+                job.skipped += 1
+                continue
+            for field in ("title", "description", "requester_email"):
+                if not record.get(field):
+                    raise RecordError(f"Missing {field}")
+            status = record.get("status", "OPEN")
+            if status not in ticket_service.VALID_STATUSES:
+                raise RecordError(f"Invalid status: {status}")
+            priority = record.get("priority", "MEDIUM")
+            if priority not in sla_service.PRIORITIES:
+                raise RecordError(f"Invalid priority: {priority}")
+            requester_id = users.get(record["requester_email"])
+            if requester_id is None:
+                raise RecordError(f"Unknown requester: {record['requester_email']}")
+            assignee_id = None
+            if record.get("assignee_email"):
+                assignee_id = users.get(record["assignee_email"])
+                if assignee_id is None:
+                    raise RecordError(f"Unknown assignee: {record['assignee_email']}")
+            category_id = None
+            if record.get("category"):
+                category_id = categories.get(record["category"])
+                if category_id is None:
+                    raise RecordError(f"Unknown category: {record['category']}")
+            team_id = None
+            if record.get("team"):
+                team_id = teams.get(record["team"])
+                if team_id is None:
+                    raise RecordError(f"Unknown team: {record['team']}")
+            dates = {field: _datetime(record, field) for field in _DATETIME_FIELDS}
+        except (RecordError, KeyError, TypeError) as exc:
+            _record_error(job, errors, position, exc)
+            continue
+
+        created_at = dates["created_at"] or now
+        if external_ref is not None:
+            seen.add(external_ref)
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "title": record["title"],
+            "description": record["description"],
+            "status": status,
+            "priority": priority,
+            "category_id": category_id,
+            "requester_id": requester_id,
+            "assignee_id": assignee_id,
+            "assigned_team_id": team_id,
+            "external_ref": external_ref,
+            "first_response_at": dates["first_response_at"],
+            "resolved_at": dates["resolved_at"],
+            "closed_at": dates["closed_at"],
+            "waiting_customer_started_at": created_at if status == "WAITING_CUSTOMER" else None,
+            "total_waiting_customer_duration": 0,
+            "created_at": created_at,
+            "updated_at": dates["updated_at"] or created_at,
+            "last_activity_at": max(
+                at for at in (created_at, dates["resolved_at"], dates["closed_at"]) if at is not None
+            ),
+        })
+        tags.append(_tags(record))
+    return rows, tags
+
+
+def _import_tickets(db: Session, job: ImportJob, records: List[Tuple[int, dict]], errors: list) -> None:
+    rows, tags = _ticket_rows(db, records, job, errors)
+    if not rows:
+        return
+
+    first = ticket_service.allocate_ticket_numbers(db, len(rows))
+    for offset, row in enumerate(rows):
+        row["ticket_number"] = ticket_service.format_ticket_number(first + offset)
+    db.execute(insert(Ticket), rows)
+
+    names = list({name for names in tags for name in names})
+    tag_ids = _lookup(db, Tag.name, names, Tag.id)
+    missing = [{"id": str(uuid.uuid4()), "name": name, "created_at": datetime.utcnow()}
+               for name in names if name not in tag_ids]
+    if missing:
+        db.execute(insert(Tag), missing)
+        tag_ids.update((tag["name"], tag["id"]) for tag in missing)
+    pairs = [
+        {"ticket_id": row["id"], "tag_id": tag_ids[name]}
+        for row, names in zip(rows, tags)
+        for name in names
+    ]
+    if pairs:
+        db.execute(insert(ticket_tags), pairs)
+
+    # Aggregates follow the imported history in the same transaction as the rows
+    tickets = [SimpleNamespace(**row) for row in rows]
+    dashboard_service.move_tickets(db, [(None, dashboard_service.ticket_cell(ticket)) for ticket in tickets])
+    volume_events = []
+    for ticket in tickets:
+        volume_events.append((ticket, "created", ticket.created_at))
+        if ticket.resolved_at:
+            volume_events.append((ticket, "resolved", ticket.resolved_at))
+        if ticket.closed_at:
+            volume_events.append((ticket, "closed", ticket.closed_at))
+    metrics_service.record_volumes(db, volume_events)
+    for metric, field in (
+        (metrics_service.FIRST_RESPONSE, "first_response_at"),
+        (metrics_service.RESOLUTION, "resolved_at"),
+    ):
+        entries = [(ticket, getattr(ticket, field)) for ticket in tickets if getattr(ticket, field)]
+        if entries:
+            metrics_service.record_response_times(db, metric, entries)
+    change_service.append(db, [(change_service.TICKET, row["id"], row["requester_id"]) for row in rows])
+    job.imported += len(rows)
+
+
+def _import_comments(db: Session, job: ImportJob, records: List[Tuple[int, dict]], errors: list) -> None:
+    refs = [str(record["ticket_ref"]) for _, record in records if record.get("ticket_ref")]
+    numbers = [record["ticket_number"] for _, record in records if record.get("ticket_number")]
+    by_ref = _lookup(db, Ticket.external_ref, refs, Ticket.id)
+    by_number = _lookup(db, Ticket.ticket_number, numbers, Ticket.id)
+    authors = _lookup(db, User.email, (record.get("author_email") for _, record in records), User.id)
+
+    rows = []
+    now = datetime.utcnow()
+    for position, record in records:
+        try:
+            if record.get("ticket_ref"):
+                ticket_id = by_ref.get(str(record["ticket_ref"]))
+            else:
+                ticket_id = by_number.get(record.get("ticket_number"))
+            if ticket_id is None:
+                raise RecordError(f"Unknown ticket: {record.get('ticket_ref') or record.get('ticket_number')}")
+            if not record.get("content"):
+                raise RecordError("Missing content")
+            author_id = authors.get(record.get("author_email"))
+            if author_id is None:
+                raise RecordError(f"Unknown author: {record.get('author_email')}")
+            created_at = _datetime(record, "created_at", now)
+            updated_at = _datetime(record, "updated_at", created_at)
+        except (RecordError, TypeError) as exc:
+            _record_error(job, errors, position, exc)
+            continue
+        is_internal = record.get("is_internal", False)
+        if isinstance(is_internal, str):
+            is_internal = is_internal.strip().lower() in ("1", "true", "yes")
+        rows.append({
+            "id": str(uuid.uuid4()),
+            "ticket_id": ticket_id,
+            "author_id": author_id,
+            "content": record["content"],
+            "is_internal": bool(is_internal),
+            "created_at": created_at,
+            "updated_at": updated_at,
+        })
+    if rows:
+        db.execute(insert(Comment), rows)
+        ticket_ids = {row["ticket_id"] for row in rows}
+        ticket_service.refresh_ticket_activity(db, ticket_ids)
+        requesters = _lookup(db, Ticket.id, ticket_ids, Ticket.requester_id)
+        change_service.append(db, [
+            (change_service.COMMENT, row["id"], None if row["is_internal"] else requesters[row["ticket_id"]])
+            for row in rows
+        ] + [(change_service.TICKET, ticket_id, requesters[ticket_id]) for ticket_id in ticket_ids])
+    job.imported += len(rows)
+
+
+def _deferrable_indexes(kind: str):
+    """Secondary (non-unique) indexes of the imported table.
+
+    Unique indexes stay in place because duplicate detection relies on them.
+    """
+    table = Ticket.__table__ if kind == "tickets" else Comment.__table__
+    return [index for index in table.indexes if not index.unique]
+
+
+def _finalize(db: Session, job: ImportJob, user: Optional[User]) -> None:
+    if job.kind == "tickets":
+        # Open imported tickets get their running SLA deadlines in one vectorized pass
+        sla_service.recompute_due_dates(db)
+    job.status = "COMPLETED"
+    job.completed_at = job.updated_at = datetime.utcnow()
+    db.commit()
+    if job.kind == "tickets":
+        # Imported tickets may be assigned to operators
+        routing_service.balancer.invalidate()
+    if user is not None:
+        ticket_service.create_audit_log(
+            db, user.id, "IMPORT_COMPLETED", "IMPORT_JOB", job.id,
+            {"kind": job.kind, "imported": job.imported, "skipped": job.skipped, "failed": job.failed},
+        )
+
+
+def run_import(
+    db: Session,
+    job: ImportJob,
+    stream: TextIO,
+    user: Optional[User] = None,
+    batch_size: int = BATCH_SIZE,
+    defer_indexes: bool = False,
+) -> ImportJob:
+    """Import tickets or comments from a CSV or NDJSON stream.
+
+    Records are parsed lazily and written ``batch_size`` at a time with
+    executemany INSERTs; users, categories, teams, tags and parent tickets of
+    each batch are resolved with one IN query per table. Every batch commits
+    together with ``job.position``, so running the same job again over the
+    same input skips what was already imported. Tickets whose
+    ``external_ref`` already exists are skipped as well.
+
+    With ``defer_indexes`` the table's secondary indexes are dropped for the
+    load and rebuilt once at the end, which pays off for very large imports.
+    Only use it offline (``manage.py import-tickets``): until the indexes
+    are rebuilt every query of a running application on the table scans it.
+    """
+    import_batch = _import_tickets if job.kind == "tickets" else _import_comments
+    errors = list(job.errors or [])
+    indexes = _deferrable_indexes(job.kind) if defer_indexes else []
+    if job.status != "RUNNING":
+        job.status = "RUNNING"
+        db.commit()
+
+    try:
+        for index in indexes:
+            index.drop(bind=db.connection(), checkfirst=True)
+        db.commit()
+
+        records = iter_records(stream, job.format)
+        skip = job.position
+        for batch in _batches(
+            ((position, record) for position, record in enumerate(records) if position >= skip),
+            batch_size,
+        ):
+            parsed = []
+            for position, record in batch:
+                if isinstance(record, RecordError):
+                    _record_error(job, errors, position, record)
+                else:
+                    parsed.append((position, record))
+            import_batch(db, job, parsed, errors)
+            job.position = batch[-1][0] + 1
+            job.errors = list(errors)
+            job.updated_at = datetime.utcnow()
+            db.commit()
+    except Exception as exc:
+        db.rollback()
+        job.status = "FAILED"
+        job.errors = (errors + [{"record": job.position, "error": str(exc)}])[:MAX_ERRORS + 1]
+        job.updated_at = datetime.utcnow()
+        db.commit()
+        raise
+    finally:
+        for index in indexes:
+            index.create(bind=db.connection(), checkfirst=True)
+        db.commit()
+
+    _finalize(db, job, user)
+    return job
+
+
+def get_job(db: Session, job_id: str) -> Optional[ImportJob]:
+    return db.query(ImportJob).filter(ImportJob.id == job_id).first()
+
+
+def list_jobs(db: Session, skip: int = 0, limit: int = 50) -> List[ImportJob]:
+    return db.query(ImportJob).order_by(ImportJob.created_at.desc()).offset(skip).limit(limit).all()
@@ -0,0 +1,496 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, func, insert, or_, update
+from sqlalchemy.orm import Session
+
+from app.core import response_cache
+from app.db.base import insert_or_ignore
+from app.models.audit_log import AuditLog
+from app.models.response_time_sketch import ResponseTimeSketch
+from app.models.ticket import Ticket
+from app.models.ticket_volume_rollup import TicketVolumeRollup
+from app.services.audit_service import iter_archived_audit_logs
+from app.services.quantile_sketch import BIN_DTYPE, QuantileSketch, decode_bins, quantiles
+from app.services.sla_service import OPEN_STATUSES
+
+FIRST_RESPONSE = "FIRST_RESPONSE"
+RESOLUTION = "RESOLUTION"
+
+HOUR = "HOUR"
+DAY = "DAY"
+MONTH = "MONTH"
+
+# group_by values and the result field each one fills
+GROUP_BY_FIELDS = {"priority": "priority", "team": "team_id", "day": "day"}
+VOLUME_GROUP_BY_FIELDS = {"category": "category_id", "priority": "priority"}
+QUANTILES = (0.5, 0.9, 0.99)
+
+VOLUME_EVENTS = ("created", "resolved", "closed", "reopened")
+VOLUME_BUCKETS = ("hour", "day", "week")
+
+
+def _sketch_key(metric: str, period: str, day: date, priority: str, team_id: Optional[str]) -> str:
+    return f"{metric}|{period}|{day.isoformat()}|{priority}|{team_id or ''}"
+
+
+def _periods(day: date) -> Tuple[Tuple[str, date], ...]:
+    """The DAY and MONTH sketches a value observed on ``day`` belongs to."""
+    return (DAY, day), (MONTH, day.replace(day=1))
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def record_response_time(db: Session, ticket: Ticket, metric: str, at: datetime) -> None:
+    """Add a ticket's first-response or resolution time to its day and month sketches.
+
+    Call before committing the change that sets ``first_response_at`` or
+    ``resolved_at`` so the sketches are updated in the same transaction.
+    """
+    record_response_times(db, metric, [(ticket, at)])
+
+
+def _locked_sketch(db: Session, key: str) -> Optional[ResponseTimeSketch]:
+    return (
+        db.query(ResponseTimeSketch)
+        .filter(ResponseTimeSketch.key == key)
+        .with_for_update()
+        .populate_existing()
+        .one_or_none()
+    )
+
+
+def record_response_times(db: Session, metric: str, entries: Iterable[Tuple[Ticket, datetime]]) -> None:
+    """Add many (ticket, at) response times, rewriting each affected sketch once.
+
+    The bins have to be merged in Python, so each sketch row is read with
+    ``SELECT ... FOR UPDATE`` and concurrent writers to the same period
+    queue on the row instead of overwriting each other's values. A sketch
+    that does not exist yet is inserted with ``ON CONFLICT DO NOTHING``: if
+    another transaction created it first, the values are merged into that
+    row instead.
+    """
+    groups: Dict[Tuple[str, date, str, Optional[str]], List[int]] = defaultdict(list)
+    for ticket, at in entries:
+        seconds = max(int((at - ticket.created_at).total_seconds()), 0)
+        for period, start in _periods(at.date()):
+            groups[(period, start, ticket.priority, ticket.assigned_team_id)].append(seconds)
+
+    # Sorted so concurrent writers lock shared rows in the same order
+    for (period, start, priority, team_id), values in sorted(groups.items(), key=lambda item: _sketch_key(metric, *item[0])):
+        key = _sketch_key(metric, period, start, priority, team_id)
+        row = _locked_sketch(db, key)
+        if row is None:
+            inserted = db.execute(insert_or_ignore(db, ResponseTimeSketch).values(
+                key=key,
+                metric=metric,
+                period=period,
+                day=start,
+                priority=priority,
+                team_id=team_id,
+                count=len(values),
+                total_seconds=sum(values),
+                min_seconds=min(values),
+                max_seconds=max(values),
+                bins=QuantileSketch().add(values).to_bytes(),
+            )).rowcount
+            if inserted:
+                continue
+            row = _locked_sketch(db, key)
+        row.bins = QuantileSketch.from_bytes(row.bins).add(values).to_bytes()
+        row.count += len(values)
+        row.total_seconds += sum(values)
+        row.min_seconds = min(row.min_seconds, min(values))
+        row.max_seconds = max(row.max_seconds, max(values))
+    # Flushed right away so a later call for the same period finds the rows
+    db.flush()
+
+
+def rebuild_response_time_sketches(db: Session, batch_size: int = 10000) -> int:
+    """Recompute every response-time sketch from ticket history."""
+    groups: Dict[Tuple[str, str, date, str, Optional[str]], List[int]] = defaultdict(list)
+    rows = (
+        db.query(
+            Ticket.priority,
+            Ticket.assigned_team_id,
+            Ticket.created_at,
+            Ticket.first_response_at,
+            Ticket.resolved_at,
+        )
+        .filter((Ticket.first_response_at.isnot(None)) | (Ticket.resolved_at.isnot(None)))
+        .yield_per(batch_size)
+    )
+    for priority, team_id, created_at, first_response_at, resolved_at in rows:
+        for metric, at in ((FIRST_RESPONSE, first_response_at), (RESOLUTION, resolved_at)):
+            if at is None:
+                continue
+            seconds = max(int((at - created_at).total_seconds()), 0)
+            for period, start in _periods(at.date()):
+                groups[(metric, period, start, priority, team_id)].append(seconds)
+
+    db.query(ResponseTimeSketch).delete(synchronize_session=False)
+    rows = [
+        {
+            "key": _sketch_key(*group),
+            "metric": group[0],
+            "period": group[1],
+            "day": group[2],
+            "priority": group[3],
+            "team_id": group[4],
+            "count": len(values),
+            "total_seconds": sum(values),
+            "min_seconds": min(values),
+            "max_seconds": max(values),
+            "bins": QuantileSketch().add(values).to_bytes(),
+        }
+        for group, values in groups.items()
+    ]
+    for i in range(0, len(rows), batch_size):
+        db.execute(insert(ResponseTimeSketch), rows[i:i + batch_size])
+    db.commit()
+    response_cache.clear()
+    return len(groups)
+
+
+def _range_filter(date_from: date, date_to: date, by_day: bool):
+    """Cover [date_from, date_to] with whole MONTH sketches and DAY sketches at the edges."""
+    def days(start: date, end: date):
+        return and_(
+            ResponseTimeSketch.period == DAY,
+            ResponseTimeSketch.day >= start,
+            ResponseTimeSketch.day <= end,
+        )
+
+    months_start = date_from if date_from.day == 1 else _next_month(date_from)
+    months_end = date_to.replace(day=1)  # exclusive, unless date_to ends its month
+    if date_to + timedelta(days=1) == _next_month(date_to):
+        months_end = _next_month(date_to)
+    if by_day or months_start >= months_end:
+        return days(date_from, date_to)
+    return or_(
+        and_(
+            ResponseTimeSketch.period == MONTH,
+            ResponseTimeSketch.day >= months_start,
+            ResponseTimeSketch.day < months_end,
+        ),
+        days(date_from, months_start - timedelta(days=1)),
+        days(months_end, date_to),
+    )
+
+
+def _stats(indexes: np.ndarray, counts: np.ndarray, total_seconds: int, min_seconds, max_seconds) -> dict:
+    count = int(counts.sum()) if len(counts) else 0
+    estimates = quantiles(indexes, counts, QUANTILES)
+    # Bin values are approximate; the exact extremes bound them
+    estimates = [
+        None if value is None else min(max(value, min_seconds), max_seconds) for value in estimates
+    ]
+    return {
+        "count": count,
+        "mean_seconds": total_seconds / count if count else None,
+        "p50_seconds": estimates[0],
+        "p90_seconds": estimates[1],
+        "p99_seconds": estimates[2],
+    }
+
+
+def get_response_times(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    group_by: Tuple[str, ...] = ("priority",),
+) -> List[dict]:
+    """Get first-response and resolution time percentiles between two days (inclusive).
+
+    Whole months inside the range are read from MONTH sketches, so a
+    multi-year range touches a few dozen rows per group. Sketches are merged
+    per group in one vectorized pass: the stored bins of every matching row
+    are concatenated and decoded together, then summed per (group, metric,
+    bin) with a single ``np.unique``.
+    """
+    rows = (
+        db.query(
+            ResponseTimeSketch.metric,
+            ResponseTimeSketch.day,
+            ResponseTimeSketch.priority,
+            ResponseTimeSketch.team_id,
+            ResponseTimeSketch.total_seconds,
+            ResponseTimeSketch.min_seconds,
+            ResponseTimeSketch.max_seconds,
+            ResponseTimeSketch.bins,
+        )
+        .filter(_range_filter(date_from, date_to, by_day="day" in group_by))
+        .all()
+    )
+
+    group_ids: Dict[tuple, int] = {}
+    metric_ids = {FIRST_RESPONSE: 0, RESOLUTION: 1}
+    row_slots, row_sizes = [], []
+    totals = defaultdict(int)
+    minimums, maximums = {}, {}
+    for metric, day, priority, team_id, total_seconds, min_seconds, max_seconds, bins in rows:
+        dims = {"priority": priority, "team": team_id, "day": day}
+        group = tuple(dims[field] for field in group_by)
+        slot = group_ids.setdefault(group, len(group_ids)) * 2 + metric_ids[metric]
+        row_slots.append(slot)
+        row_sizes.append(len(bins) // BIN_DTYPE.itemsize)
+        totals[slot] += total_seconds
+        minimums[slot] = min(minimums.get(slot, min_seconds), min_seconds)
+        maximums[slot] = max(maximums.get(slot, max_seconds), max_seconds)
+
+    merged = {}
+    if rows:
+        indexes, counts = decode_bins(b"".join(row[-1] for row in rows))
+        slots = np.repeat(np.array(row_slots, dtype=np.int64), row_sizes)
+        # Bin indexes stay well below 2**16, so (slot, index) packs into one key
+        combined, inverse = np.unique((slots << 16) + indexes, return_inverse=True)
+        summed = np.bincount(inverse, weights=counts).astype(np.int64)
+        combined_slots = combined >> 16
+        bounds = np.searchsorted(combined_slots, np.arange(len(group_ids) * 2 + 1))
+        for slot in range(len(group_ids) * 2):
+            start, end = bounds[slot], bounds[slot + 1]
+            merged[slot] = (combined[start:end] & 0xFFFF, summed[start:end])
+
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    results = []
+    for group, group_id in sorted(group_ids.items(), key=lambda item: tuple(str(v) for v in item[0])):
+        result = {GROUP_BY_FIELDS[field]: value for field, value in zip(group_by, group)}
+        for metric, field in ((FIRST_RESPONSE, "first_response"), (RESOLUTION, "resolution")):
+            slot = group_id * 2 + metric_ids[metric]
+            indexes, counts = merged.get(slot, empty)
+            result[field] = _stats(
+                indexes, counts, totals.get(slot, 0), minimums.get(slot), maximums.get(slot)
+            )
+        results.append(result)
+    return results
+
+
+def _volume_key(period: str, bucket_start: datetime, category_id: Optional[str], priority: str) -> str:
+    return f"{period}|{bucket_start.isoformat()}|{category_id or ''}|{priority}"
+
+
+def _volume_buckets(at: datetime) -> Tuple[Tuple[str, datetime], ...]:
+    """The HOUR and DAY buckets an event at ``at`` is counted in."""
+    hour = at.replace(minute=0, second=0, microsecond=0)
+    return (HOUR, hour), (DAY, hour.replace(hour=0))
+
+
+def status_volume_events(old_status: str, new_status: str) -> List[str]:
+    """Volume events caused by a status transition."""
+    events = []
+    if new_status == "RESOLVED" and old_status != "RESOLVED":
+        events.append("resolved")
+    if new_status == "CLOSED" and old_status != "CLOSED":
+        events.append("closed")
+    if old_status in ("RESOLVED", "CLOSED") and new_status in OPEN_STATUSES:
+        events.append("reopened")
+    return events
+
+
+def record_volume(db: Session, ticket: Ticket, event: str, at: datetime) -> None:
+    """Count a created/resolved/closed/reopened event in its hourly and daily rollups.
+
+    Call before committing the ticket change so the counters are committed
+    in the same transaction.
+    """
+    record_volumes(db, [(ticket, event, at)])
+
+
+def record_volumes(db: Session, entries: Iterable[Tuple[Ticket, str, datetime]]) -> None:
+    """Count many (ticket, event, at) events with one UPDATE per affected bucket."""
+    deltas: Dict[Tuple[str, datetime, Optional[str], str], Counter] = defaultdict(Counter)
+    for ticket, event, at in entries:
+        for period, bucket_start in _volume_buckets(at):
+            deltas[(period, bucket_start, ticket.category_id, ticket.priority)][event] += 1
+
+    for (period, bucket_start, category_id, priority), events in deltas.items():
+        key = _volume_key(period, bucket_start, category_id, priority)
+        # Relative UPDATE so concurrent writers never overwrite each other
+        statement = (
+            update(TicketVolumeRollup)
+            .where(TicketVolumeRollup.key == key)
+            .values({
+                getattr(TicketVolumeRollup, event): getattr(TicketVolumeRollup, event) + count
+                for event, count in events.items()
+            })
+        )
+        if db.execute(statement).rowcount:
+            continue
+        inserted = db.execute(insert_or_ignore(db, TicketVolumeRollup.__table__), {
+            "key": key,
+            "period": period,
+            "bucket_start": bucket_start,
+            "category_id": category_id,
+            "priority": priority,
+            **{name: events.get(name, 0) for name in VOLUME_EVENTS},
+        }).rowcount
+        if not inserted:
+            # Another transaction created the bucket in between; add to its counts
+            db.execute(statement)
+
+
+def _status_changes(db: Session, start: datetime, end: datetime):
+    """Yield (created_at, old_status, new_status, ticket_id) of status changes in a window."""
+    rows = (
+        db.query(AuditLog.created_at, AuditLog.meta_data, AuditLog.entity_id)
+        .filter(
+            AuditLog.action == "STATUS_CHANGED",
+            AuditLog.entity_type == "TICKET",
+            AuditLog.created_at >= start,
+            AuditLog.created_at < end,
+        )
+        .yield_per(1000)
+    )
+    for created_at, meta_data, ticket_id in rows:
+        yield created_at, meta_data.get("old_status"), meta_data.get("new_status"), ticket_id
+    for log in iter_archived_audit_logs(db, since=start, until=end, newest_first=False):
+        if log.action == "STATUS_CHANGED" and log.entity_type == "TICKET":
+            yield log.created_at, log.meta_data.get("old_status"), log.meta_data.get("new_status"), log.entity_id
+
+
+def backfill_volume_rollups(
+    db: Session,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    lookup_batch_size: int = 500,
+) -> int:
+    """Rebuild the volume rollups from ticket history, one calendar month per transaction.
+
+    Created events come from ``tickets.created_at``; resolved, closed and
+    reopened events come from STATUS_CHANGED audit logs, including archived
+    months. Each chunk replaces its buckets and commits, so an interrupted
+    backfill can simply be run again. Returns the number of months processed.
+    """
+    if since is None:
+        oldest = db.query(func.min(Ticket.created_at)).scalar()
+        if oldest is None:
+            return 0
+        since = oldest
+    until = until or datetime.utcnow()
+    start = datetime(since.year, since.month, 1)
+
+    months = 0
+    while start < until:
+        end = datetime.combine(_next_month(start.date()), datetime.min.time())
+        counts: Dict[Tuple[str, datetime, Optional[str], str], Dict[str, int]] = defaultdict(
+            lambda: dict.fromkeys(VOLUME_EVENTS, 0)
+        )
+
+        created = (
+            db.query(Ticket.created_at, Ticket.category_id, Ticket.priority)
+            .filter(Ticket.created_at >= start, Ticket.created_at < end)
+            .yield_per(1000)
+        )
+        for created_at, category_id, priority in created:
+            for period, bucket_start in _volume_buckets(created_at):
+                counts[(period, bucket_start, category_id, priority)]["created"] += 1
+
+        changes = [
+            (at, events, ticket_id)
+            for at, old_status, new_status, ticket_id in _status_changes(db, start, end)
+            for events in [status_volume_events(old_status, new_status)]
+            if events
+        ]
+        ticket_ids = list({ticket_id for _, _, ticket_id in changes})
+        tickets = {}
+        for i in range(0, len(ticket_ids), lookup_batch_size):
+            batch = ticket_ids[i:i + lookup_batch_size]
+            for ticket_id, category_id, priority in (
+                db.query(Ticket.id, Ticket.category_id, Ticket.priority).filter(Ticket.id.in_(batch))
+            ):
+                tickets[ticket_id] = (category_id, priority)
+        for at, events, ticket_id in changes:
+            if ticket_id not in tickets:
+                continue
+            category_id, priority = tickets[ticket_id]
+            for period, bucket_start in _volume_buckets(at):
+                for event in events:
+                    counts[(period, bucket_start, category_id, priority)][event] += 1
+
+        db.query(TicketVolumeRollup).filter(
+            TicketVolumeRollup.bucket_start >= start, TicketVolumeRollup.bucket_start < end
+        ).delete(synchronize_session=False)
+        rows = [
+            {
+                "key": _volume_key(*group),
+                "period": group[0],
+                "bucket_start": group[1],
+                "category_id": group[2],
+                "priority": group[3],
+                **values,
+            }
+            for group, values in counts.items()
+        ]
+        if rows:
+            db.execute(insert(TicketVolumeRollup), rows)
+        db.commit()
+        months += 1
+        start = end
+    response_cache.clear()
+    return months
+
+
+def get_volume(
+    db: Session,
+    since: datetime,
+    until: datetime,
+    bucket: str = "day",
+    group_by: Tuple[str, ...] = (),
+) -> List[dict]:
+    """Get created/resolved/closed/reopened counts per time bucket in [since, until).
+
+    Hourly figures read HOUR rollups; daily and weekly (ISO weeks starting on
+    Monday, UTC) figures read DAY rollups, so the cost depends on the number
+    of buckets in the range, never on the number of tickets. Every bucket
+    overlapping the range is counted whole.
+    """
+    period = HOUR if bucket == "hour" else DAY
+    # Hour or day buckets overlapping the range
+    since = since.replace(minute=0, second=0, microsecond=0)
+    if period == DAY:
+        since = since.replace(hour=0)
+    if bucket == "week":
+        # Week buckets overlapping the range, from the Monday of each end
+        since -= timedelta(days=since.weekday())
+        last_monday = until.replace(hour=0, minute=0, second=0, microsecond=0)
+        last_monday -= timedelta(days=last_monday.weekday())
+        until = last_monday + timedelta(days=7) if until > last_monday else last_monday
+    dimensions = [getattr(TicketVolumeRollup, VOLUME_GROUP_BY_FIELDS[field]) for field in group_by]
+    rows = (
+        db.query(
+            TicketVolumeRollup.bucket_start,
+            *dimensions,
+            *(func.sum(getattr(TicketVolumeRollup, event)) for event in VOLUME_EVENTS),
+        )
+        .filter(
+            TicketVolumeRollup.period == period,
+            TicketVolumeRollup.bucket_start >= since,
+            TicketVolumeRollup.bucket_start < until,
+        )
+        .group_by(TicketVolumeRollup.bucket_start, *dimensions)
+        .all()
+    )
+
+    buckets: Dict[tuple, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(VOLUME_EVENTS, 0))
+    for row in rows:
+        bucket_start = row[0]
+        if bucket == "week":
+            bucket_start -= timedelta(days=bucket_start.weekday())
+        group = tuple(row[1:1 + len(group_by)])
+        totals = buckets[(bucket_start, group)]
+        for event, value in zip(VOLUME_EVENTS, row[1 + len(group_by):]):
+            totals[event] += int(value or 0)
+
+    results = []
+    for (bucket_start, group), totals in sorted(
+        buckets.items(), key=lambda item: (item[0][0], tuple(str(v) for v in item[0][1]))
+    ):
+        result = {"bucket_start": bucket_start}
+        result.update({VOLUME_GROUP_BY_FIELDS[field]: value for field, value in zip(group_by, group)})
+        result.update(totals)
+        results.append(result)
+    return results
@@ -0,0 +1,200 @@
+"""Automatic assignment of new tickets to the least-loaded operator.
+
+A ticket created in a category with a routing team (``Category.team_id``)
+is assigned to that team and to the operator of the team with the lowest
+workload: the open tickets assigned to them, weighted by priority
+(``settings.ROUTING_PRIORITY_WEIGHTS``). A team without operators gets the
+ticket unassigned, for its members to pick up. Every decision is written
+to the audit log as ``TICKET_ROUTED`` with the workload it was based on.
+
+Workloads are read from the ``ticket_counts`` aggregate, so loading them
+costs the same however many tickets there are, and are kept in memory in
+a min-heap per team. The ticket services report each committed change
+that moves a ticket between operators, statuses or priorities
+(:meth:`WorkloadBalancer.move`), which pushes the operator's new workload
+in O(log n); superseded heap entries are skipped lazily when they surface,
+like in :mod:`app.services.sla_scheduler`. A routing decision is a heap
+peek; the new ticket's weight is added once it is committed, like any
+other change, so a rolled-back ticket never loads its operator. Every
+worker keeps its own heaps, so they are
+reloaded every ``settings.ROUTING_REFRESH_SECONDS`` to pick up what the
+other workers assigned.
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.ticket import Ticket
+from app.models.ticket_count import TicketCount
+from app.models.user import User
+from app.services.dashboard_service import Cell
+from app.services.sla_service import OPEN_STATUSES
+
+LEAST_LOADED = "least_loaded"
+TEAM_ONLY = "team_only"  # the team has no operators; the ticket waits in the team queue
+
+
+def priority_weights() -> Dict[str, int]:
+    weights = {}
+    for item in settings.ROUTING_PRIORITY_WEIGHTS.split(","):
+        priority, _, weight = item.partition(":")
+        weights[priority.strip()] = int(weight)
+    return weights
+
+
+def _workload(cell: Optional[Cell], weights: Dict[str, int]) -> Tuple[Optional[str], int]:
+    """The operator a dashboard cell's tickets load, and the weight of one of them."""
+    if cell is None:
+        return None, 0
+    status, priority, _, assignee_id = cell
+    if assignee_id is None or status not in OPEN_STATUSES:
+        return assignee_id, 0
+    return assignee_id, weights.get(priority, 1)
+
+
+class WorkloadBalancer:
+    """Operator workloads of each team in min-heaps, for least-loaded routing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loads: Dict[str, int] = {}  # operator id -> weighted open tickets
+        self._teams: Dict[str, str] = {}  # operator id -> team id
+        self._members: Dict[str, int] = {}  # team id -> operators
+        self._heaps: Dict[str, List[Tuple[int, int, str]]] = {}  # team id -> (load, entry, operator id)
+        self._entries: Dict[str, int] = {}  # operator id -> their current heap entry
+        self._counter = itertools.count()
+        self._loaded_at: Optional[float] = None
+
+    def invalidate(self) -> None:
+        """Reload workloads on the next routing decision (e.g. after team membership changed)."""
+        with self._lock:
+            self._loaded_at = None
+
+    def rebuild(self, db: Session) -> int:
+        """Reload operators and their workloads; returns the number of operators."""
+        weights = priority_weights()
+        teams = dict(
+            db.query(User.id, User.team_id).filter(User.role == "operator", User.team_id.isnot(None)).all()
+        )
+        loads = dict.fromkeys(teams, 0)
+        for assignee_id, priority, count in (
+            db.query(TicketCount.assignee_id, TicketCount.priority, func.sum(TicketCount.count))
+            .filter(TicketCount.status.in_(OPEN_STATUSES), TicketCount.assignee_id.in_(list(teams)))
+            .group_by(TicketCount.assignee_id, TicketCount.priority)
+        ):
+            loads[assignee_id] += weights.get(priority, 1) * count
+
+        with self._lock:
+            self._teams = teams
+            self._loads = loads
+            self._members = {}
+            self._heaps = {}
+            self._entries = {}
+            for operator_id, team_id in teams.items():
+                entry = self._entries[operator_id] = next(self._counter)
+                self._heaps.setdefault(team_id, []).append((loads[operator_id], entry, operator_id))
+                self._members[team_id] = self._members.get(team_id, 0) + 1
+            for heap in self._heaps.values():
+                heapq.heapify(heap)
+            self._loaded_at = time.monotonic()
+        return len(teams)
+
+    def _update(self, operator_id: Optional[str], delta: int) -> None:
+        if not delta or operator_id not in self._loads:
+            return
+        self._loads[operator_id] += delta
+        entry = self._entries[operator_id] = next(self._counter)
+        team_id = self._teams[operator_id]
+        heap = self._heaps[team_id]
+        heapq.heappush(heap, (self._loads[operator_id], entry, operator_id))
+        if len(heap) > 2 * self._members[team_id] + 64:
+            heap = [item for item in heap if self._entries[item[2]] == item[1]]
+            heapq.heapify(heap)
+            self._heaps[team_id] = heap
+
+    def _least_loaded(self, team_id: str) -> Optional[Tuple[int, str]]:
+        heap = self._heaps.get(team_id)
+        while heap:
+            load, entry, operator_id = heap[0]
+            if self._entries[operator_id] == entry:
+                return load, operator_id
+            heapq.heappop(heap)
+        return None
+
+    def _stale(self) -> bool:
+        return self._loaded_at is None or time.monotonic() - self._loaded_at > settings.ROUTING_REFRESH_SECONDS
+
+    def pick(self, db: Session, team_id: str) -> Tuple[Optional[str], int, int]:
+        """Find the least-loaded operator of a team for a new ticket.
+
+        Returns the operator (None if the team has none), their workload,
+        and the number of operators in the team. The ticket's weight is
+        added by :meth:`move` after it is committed.
+        """
+        if self._stale():
+            self.rebuild(db)
+        with self._lock:
+            least = self._least_loaded(team_id)
+            if least is None:
+                return None, 0, 0
+            load, operator_id = least
+            return operator_id, load, self._members[team_id]
+
+    def move(self, before: Optional[Cell], after: Optional[Cell]) -> None:
+        """Account for a committed ticket change, given its dashboard cells before and after."""
+        self.move_many([(before, after)])
+
+    def move_many(self, moves: Iterable[Tuple[Optional[Cell], Optional[Cell]]]) -> None:
+        weights = priority_weights()
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for before, after in moves:
+                old_operator, old_weight = _workload(before, weights)
+                new_operator, new_weight = _workload(after, weights)
+                if old_operator == new_operator:
+                    self._update(new_operator, new_weight - old_weight)
+                else:
+                    self._update(old_operator, -old_weight)
+                    self._update(new_operator, new_weight)
+
+    def workloads(self) -> Dict[str, int]:
+        """Current workload of every operator that can be routed to."""
+        with self._lock:
+            return dict(self._loads)
+
+
+balancer = WorkloadBalancer()
+
+
+def route_ticket(db: Session, ticket: Ticket) -> Optional[dict]:
+    """Assign a new ticket by its category's routing team.
+
+    Sets ``assigned_team_id`` and, when the team has an operator,
+    ``assignee_id``. Returns the decision for the audit log, or None when
+    the ticket is not routed (routing off, no category or no team).
+    """
+    if not settings.ROUTING_ENABLED or ticket.category_id is None:
+        return None
+    team_id = db.query(Category.team_id).filter(Category.id == ticket.category_id).scalar()
+    if team_id is None:
+        return None
+    operator_id, load, members = balancer.pick(db, team_id)
+    ticket.assigned_team_id = team_id
+    ticket.assignee_id = operator_id
+    return {
+        "strategy": LEAST_LOADED if operator_id else TEAM_ONLY,
+        "category_id": ticket.category_id,
+        "team_id": team_id,
+        "assignee_id": operator_id,
+        "priority": ticket.priority,
+        "workload": load,
+        "candidates": members,
+    }
@@ -0,0 +1,225 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.base import SessionLocal, insert_or_ignore
+from app.models.sla_breach_event import SLABreachEvent
+from app.models.ticket import Ticket
+from app.services import sla_service
+
+logger = logging.getLogger(__name__)
+
+FIRST_RESPONSE = "FIRST_RESPONSE"
+RESOLUTION = "RESOLUTION"
+
+
+class SLABreachScheduler:
+    """In-process scheduler that fires SLA breach events at their deadlines.
+
+    Deadlines live in a min-heap keyed by due time. Updating a ticket pushes
+    its new deadlines in O(log n); superseded heap entries are skipped lazily
+    when they surface, and the heap is compacted once they dominate it. A
+    background thread sleeps until the earliest deadline (or until an earlier
+    one is scheduled) instead of polling the ticket table.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._heap: List[Tuple[datetime, int, str, str]] = []
+        self._deadlines: Dict[Tuple[str, str], datetime] = {}
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, ticket_id: str, kind: str, due_at: Optional[datetime]) -> None:
+        """Set (or clear, when ``due_at`` is None) one deadline of a ticket."""
+        key = (ticket_id, kind)
+        with self._condition:
+            if due_at is None:
+                self._deadlines.pop(key, None)
+                return
+            if self._deadlines.get(key) == due_at:
+                return
+            self._deadlines[key] = due_at
+            wake = not self._heap or due_at < self._heap[0][0]
+            heapq.heappush(self._heap, (due_at, next(self._counter), ticket_id, kind))
+            if len(self._heap) > 2 * len(self._deadlines) + 1024:
+                self._compact()
+            if wake:
+                self._condition.notify()
+
+    def update_ticket(self, ticket: Ticket) -> None:
+        """Reschedule a ticket from its persisted due-at columns."""
+        self.schedule(ticket.id, FIRST_RESPONSE, ticket.first_response_due_at)
+        self.schedule(ticket.id, RESOLUTION, ticket.resolution_due_at)
+
+    def _compact(self) -> None:
+        self._heap = [
+            entry for entry in self._heap
+            if self._deadlines.get((entry[2], entry[3])) == entry[0]
+        ]
+        heapq.heapify(self._heap)
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            due_at, _, ticket_id, kind = self._heap[0]
+            if self._deadlines.get((ticket_id, kind)) == due_at:
+                return
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[datetime]:
+        """Get the earliest pending deadline."""
+        with self._condition:
+            self._discard_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[Tuple[str, str, datetime]]:
+        """Remove and return every deadline at or before ``now``."""
+        due = []
+        with self._condition:
+            while True:
+                self._discard_stale()
+                if not self._heap or self._heap[0][0] > now:
+                    return due
+                due_at, _, ticket_id, kind = heapq.heappop(self._heap)
+                del self._deadlines[(ticket_id, kind)]
+                due.append((ticket_id, kind, due_at))
+
+    def fire_due(self, db: Session, now: Optional[datetime] = None) -> List[SLABreachEvent]:
+        """Persist breach events for every deadline that has passed.
+
+        Each deadline is re-checked against the ticket before it is recorded,
+        so a missed update (e.g. from another worker) reschedules instead of
+        firing a false breach. Events are inserted with ``ON CONFLICT DO
+        NOTHING``, so a breach another worker already recorded is skipped
+        without rolling back the others.
+        """
+        now = now or datetime.utcnow()
+        events = []
+        for ticket_id, kind, _ in self.pop_due(now):
+            ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+            if not ticket:
+                continue
+            first_response_due, resolution_due = sla_service.get_due_dates(db, ticket)
+            due_at = first_response_due if kind == FIRST_RESPONSE else resolution_due
+            if due_at is None:
+                continue
+            if due_at > now:
+                self.schedule(ticket_id, kind, due_at)
+                continue
+            values = {
+                "id": str(uuid.uuid4()),
+                "ticket_id": ticket_id,
+                "kind": kind,
+                "priority": ticket.priority,
+                "due_at": due_at,
+                "detected_at": now,
+            }
+            if db.execute(insert_or_ignore(db, SLABreachEvent).values(**values)).rowcount:
+                events.append(SLABreachEvent(**values))
+        if events:
+            db.commit()
+            for event in events:
+                logger.warning(
+                    "SLA breach: ticket=%s kind=%s due_at=%s", event.ticket_id, event.kind, event.due_at
+                )
+        return events
+
+    def rebuild(self, db: Session) -> int:
+        """Reload every running deadline from the indexed due-at columns."""
+        rows = (
+            db.query(Ticket.id, Ticket.first_response_due_at, Ticket.resolution_due_at)
+            .filter(Ticket.sla_due_at.isnot(None))
+            .all()
+        )
+        fired = set(
+            db.query(SLABreachEvent.ticket_id, SLABreachEvent.kind)
+            .join(Ticket, Ticket.id == SLABreachEvent.ticket_id)
+            .filter(Ticket.sla_due_at.isnot(None))
+            .all()
+        )
+        entries = []
+        for ticket_id, first_response_due, resolution_due in rows:
+            for kind, due_at in ((FIRST_RESPONSE, first_response_due), (RESOLUTION, resolution_due)):
+                if due_at is not None and (ticket_id, kind) not in fired:
+                    entries.append((due_at, next(self._counter), ticket_id, kind))
+
+        with self._condition:
+            self._heap = entries
+            heapq.heapify(self._heap)
+            self._deadlines = {(entry[2], entry[3]): entry[0] for entry in entries}
+            self._condition.notify()
+        return len(entries)
+
+    def start(self) -> None:
+        """Rebuild from the database and start the background firing thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="sla-breach-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _reload(self) -> None:
+        db = self._session_factory()
+        try:
+            count = self.rebuild(db)
+            logger.info("SLA scheduler rebuilt with %d deadlines", count)
+        except Exception:
+            logger.exception("SLA scheduler rebuild failed")
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        # Periodic reloads pick up deadlines written by other processes,
+        # e.g. tickets loaded with ``manage.py import-tickets``
+        self._reload()
+        reload_at = time.monotonic() + settings.SLA_SCHEDULER_REBUILD_SECONDS
+
+        while True:
+            with self._condition:
+                if self._stopping:
+                    return
+                next_due = self.next_due()
+                timeout = min(settings.SLA_SCHEDULER_MAX_SLEEP_SECONDS, reload_at - time.monotonic())
+                if next_due is not None:
+                    timeout = min(timeout, (next_due - datetime.utcnow()).total_seconds())
+                if timeout > 0:
+                    self._condition.wait(timeout)
+                if self._stopping:
+                    return
+
+            if time.monotonic() >= reload_at:
+                self._reload()
+                reload_at = time.monotonic() + settings.SLA_SCHEDULER_REBUILD_SECONDS
+
+            db = self._session_factory()
+            try:
+                self.fire_due(db)
+            except Exception:
+                db.rollback()
+                logger.exception("SLA scheduler failed to fire breach events")
+            finally:
+                db.close()
+
+
+scheduler = SLABreachScheduler()
@@ -0,0 +1,446 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import DateTime, String, bindparam, select, type_coerce
+from sqlalchemy.orm import Session
+
+from app.core import telemetry
+from app.models.sla_settings import SLASettings
+from app.models.ticket import Ticket
+from app.services.business_calendar import BusinessCalendar, calendar_for_policy
+
+PRIORITIES = ["LOW", "MEDIUM", "HIGH", "URGENT"]
+OPEN_STATUSES = ["OPEN", "IN_PROGRESS", "WAITING_CUSTOMER"]
+
+# A running clock with less than this share of its target left is AT_RISK
+AT_RISK_RATIO = 0.2
+
+TICKET_COLUMNS = (
+    Ticket.id,
+    Ticket.priority,
+    Ticket.status,
+    Ticket.created_at,
+    Ticket.first_response_at,
+    Ticket.resolved_at,
+    Ticket.waiting_customer_started_at,
+    Ticket.total_waiting_customer_duration,
+)
+
+
+def get_sla_policies(db: Session) -> Dict[str, SLASettings]:
+    """Get SLA settings keyed by priority, cached for the lifetime of the session.
+
+    The cached rows are detached so a commit does not expire them; otherwise
+    every later read would reload each policy with its own SELECT.
+    """
+    policies = db.info.get("sla_policies")
+    telemetry.record_cache("sla_policies", policies is not None)
+    if policies is None:
+        policies = {policy.priority: policy for policy in db.query(SLASettings).all()}
+        for policy in policies.values():
+            db.expunge(policy)
+        db.info["sla_policies"] = policies
+    return policies
+
+
+def invalidate_sla_policies(db: Session) -> None:
+    """Drop the cached SLA settings after they have been changed."""
+    db.info.pop("sla_policies", None)
+
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
+
+
+def _to_seconds(values: List) -> tuple:
+    """Convert naive UTC timestamps to epoch seconds plus a missing-value mask.
+
+    Accepts datetimes or ISO-8601 strings; strings are parsed by NumPy in C,
+    which is an order of magnitude faster than converting datetime objects.
+    """
+    array = np.array([value if value is not None else "NaT" for value in values], dtype="datetime64[s]")
+    missing = np.isnat(array)
+    return np.where(missing, 0, array.astype(np.int64)), missing
+
+
+def _to_datetime(seconds: int) -> datetime:
+    return _EPOCH + timedelta(seconds=int(seconds))
+
+
+def get_sla_calendars(db: Session, policies: Dict[str, SLASettings]) -> Dict[str, BusinessCalendar]:
+    """Get the business calendars of business-hours policies, keyed by priority."""
+    calendars = {}
+    for priority, policy in policies.items():
+        calendar = calendar_for_policy(db, policy)
+        if calendar is not None:
+            calendars[priority] = calendar
+    return calendars
+
+
+def compute_due_dates(
+    ticket: Ticket,
+    policy: Optional[SLASettings],
+    calendar: Optional[BusinessCalendar] = None,
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Get the running (first response, resolution) deadlines of one ticket.
+
+    A deadline is None when its clock is not running: no SLA policy, the
+    ticket is closed out, the first response already happened, or the clock
+    is paused while waiting for the customer.
+    """
+    if policy is None or ticket.status not in OPEN_STATUSES:
+        return None, None
+    paused = (ticket.total_waiting_customer_duration or 0) if policy.pause_on_waiting_customer else 0
+    if policy.pause_on_waiting_customer and ticket.waiting_customer_started_at:
+        return None, None
+
+    def due(target_minutes: int) -> datetime:
+        if calendar is not None:
+            return calendar.add_to(ticket.created_at, target_minutes * 60 + paused)
+        return ticket.created_at + timedelta(minutes=target_minutes, seconds=paused)
+
+    first_response_due = None
+    if not ticket.first_response_at:
+        first_response_due = due(policy.first_response_target_minutes)
+    return first_response_due, due(policy.resolution_target_minutes)
+
+
+def waiting_seconds(db: Session, ticket: Ticket, end: datetime) -> int:
+    """Length of the ticket's current waiting-for-customer span up to ``end``, in SLA seconds.
+
+    Business-hours policies count working seconds only, so the stored
+    ``total_waiting_customer_duration`` is in the same unit as the clock it
+    is subtracted from; a weekend wait adds nothing to such a deadline.
+    """
+    start = ticket.waiting_customer_started_at
+    if start is None:
+        return 0
+    calendar = calendar_for_policy(db, get_sla_policies(db).get(ticket.priority))
+    if calendar is not None:
+        return calendar.elapsed_between(start, end)
+    return int((end - start).total_seconds())
+
+
+def get_due_dates(db: Session, ticket: Ticket) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Get the running deadlines of one ticket under its priority's SLA settings."""
+    policy = get_sla_policies(db).get(ticket.priority)
+    return compute_due_dates(ticket, policy, calendar_for_policy(db, policy))
+
+
+def due_date_values(db: Session, ticket: Ticket) -> dict:
+    """Get the due-at column values for a ticket's running SLA deadlines.
+
+    Deadlines are kept at second precision, as the bulk recompute writes them.
+    """
+    first_response_due, resolution_due = (
+        due.replace(microsecond=0) if due is not None else None for due in get_due_dates(db, ticket)
+    )
+    return {
+        "first_response_due_at": first_response_due,
+        "resolution_due_at": resolution_due,
+        "sla_due_at": min(
+            (due for due in (first_response_due, resolution_due) if due is not None), default=None
+        ),
+    }
+
+
+def apply_due_dates(db: Session, ticket: Ticket) -> Ticket:
+    """Store the ticket's running SLA deadlines on its due-at columns.
+
+    Call before committing any change that moves the clocks: creation,
+    priority changes, status transitions and the first response.
+    """
+    for column, value in due_date_values(db, ticket).items():
+        setattr(ticket, column, value)
+    return ticket
+
+
+def recompute_due_dates(db: Session, priority: Optional[str] = None, batch_size: int = 1000) -> int:
+    """Recompute the due-at columns of every open ticket after SLA settings change.
+
+    Deadlines are computed with the vectorized engine and written back with
+    executemany UPDATEs by primary key, ``batch_size`` rows at a time.
+    """
+    invalidate_sla_policies(db)
+    arrays = compute_open_ticket_sla(db, priority=priority)
+    running = arrays["has_policy"] & ~arrays["paused"]
+    first_running = running & ~arrays["responded"]
+
+    updates = []
+    for i in range(len(arrays["ticket_id"])):
+        first_response_due = _to_datetime(arrays["first_response_due_at"][i]) if first_running[i] else None
+        resolution_due = _to_datetime(arrays["resolution_due_at"][i]) if running[i] else None
+        updates.append({
+            "ticket_id": arrays["ticket_id"][i],
+            "first_response_due_at": first_response_due,
+            "resolution_due_at": resolution_due,
+            "sla_due_at": min(
+                (due for due in (first_response_due, resolution_due) if due is not None), default=None
+            ),
+        })
+
+    # Derived columns: written by primary key without checking or bumping the row version
+    table = Ticket.__table__
+    statement = table.update().where(table.c.id == bindparam("ticket_id"))
+    for start in range(0, len(updates), batch_size):
+        db.execute(statement, updates[start:start + batch_size])
+    db.commit()
+    return len(updates)
+
+
+def compute_sla_arrays(
+    rows: List[tuple],
+    policies: Dict[str, SLASettings],
+    now: datetime,
+    calendars: Optional[Dict[str, BusinessCalendar]] = None,
+) -> dict:
+    """Compute SLA clocks for a batch of ticket rows in one vectorized pass.
+
+    ``rows`` are tuples in the order of ``TICKET_COLUMNS``. All durations in
+    the result are seconds. Time spent in WAITING_CUSTOMER is excluded when
+    the priority's policy pauses on it; a first response that has already
+    happened is measured from creation without subtracting pauses.
+
+    Priorities listed in ``calendars`` count working time only. Their waiting
+    periods are in working time too: the current one is measured here, and
+    earlier ones were stored in working seconds when they ended (see
+    :func:`waiting_seconds`).
+    """
+    count = len(rows)
+    columns = [[row[i] for row in rows] for i in range(len(TICKET_COLUMNS))]
+    ids, priorities, statuses = columns[0], columns[1], columns[2]
+
+    created, _ = _to_seconds(columns[3])
+    first_response, no_first_response = _to_seconds(columns[4])
+    resolved, unresolved = _to_seconds(columns[5])
+    waiting_started, not_waiting = _to_seconds(columns[6])
+    waiting_total = np.fromiter(columns[7], dtype=np.int64, count=count)
+
+    # Per-priority policy lookup tables, indexed by position in PRIORITIES;
+    # the extra last slot stands for priorities without SLA settings
+    priority_array = np.array(priorities, dtype=object)
+    priority_index = {priority: i for i, priority in enumerate(PRIORITIES)}
+    lookup = np.full(count, len(PRIORITIES), dtype=np.int64)
+    for priority, i in priority_index.items():
+        lookup[priority_array == priority] = i
+    first_targets = np.zeros(len(PRIORITIES) + 1, dtype=np.int64)
+    resolution_targets = np.zeros(len(PRIORITIES) + 1, dtype=np.int64)
+    pauses = np.zeros(len(PRIORITIES) + 1, dtype=bool)
+    defined = np.zeros(len(PRIORITIES) + 1, dtype=bool)
+    for priority, policy in policies.items():
+        if priority in priority_index:
+            i = priority_index[priority]
+            first_targets[i] = policy.first_response_target_minutes * 60
+            resolution_targets[i] = policy.resolution_target_minutes * 60
+            pauses[i] = policy.pause_on_waiting_customer
+            defined[i] = True
+
+    first_target = first_targets[lookup]
+    resolution_target = resolution_targets[lookup]
+    pause = pauses[lookup]
+    has_policy = defined[lookup]
+
+    now_s = (now - _EPOCH) // _ONE_SECOND
+    currently_paused = pause & ~not_waiting
+    current_pause = np.where(currently_paused, now_s - waiting_started, 0)
+    paused = np.where(pause, waiting_total + current_pause, 0)
+
+    resolution_end = np.where(unresolved, now_s, resolved)
+    resolution_elapsed = np.maximum(resolution_end - created - paused, 0)
+    first_response_elapsed = np.where(
+        no_first_response,
+        np.maximum(now_s - created - paused, 0),
+        first_response - created,
+    )
+
+    first_response_due = created + first_target + np.where(no_first_response, paused, 0)
+    resolution_due = created + resolution_target + paused
+
+    for priority, calendar in (calendars or {}).items():
+        mask = lookup == priority_index.get(priority, -1)
+        if not mask.any():
+            continue
+        m_created = created[mask]
+        m_no_first_response = no_first_response[mask]
+        # Missing timestamps are swapped for harmless ones so the calendar
+        # never has to cover the epoch
+        m_current_pause = calendar.elapsed(
+            np.where(currently_paused[mask], waiting_started[mask], now_s), now_s
+        )
+        m_paused = np.where(pause[mask], waiting_total[mask] + m_current_pause, 0)
+        paused[mask] = m_paused
+        resolution_elapsed[mask] = np.maximum(
+            calendar.elapsed(m_created, resolution_end[mask]) - m_paused, 0
+        )
+        first_response_elapsed[mask] = np.where(
+            m_no_first_response,
+            np.maximum(calendar.elapsed(m_created, now_s) - m_paused, 0),
+            calendar.elapsed(m_created, np.where(m_no_first_response, m_created, first_response[mask])),
+        )
+        first_response_due[mask] = calendar.add(
+            m_created, first_target[mask] + np.where(m_no_first_response, m_paused, 0)
+        )
+        resolution_due[mask] = calendar.add(m_created, resolution_target[mask] + m_paused)
+
+    first_response_remaining = first_target - first_response_elapsed
+    resolution_remaining = resolution_target - resolution_elapsed
+
+    first_response_state = np.select(
+        [
+            ~has_policy,
+            ~no_first_response & (first_response_remaining >= 0),
+            first_response_remaining < 0,
+            currently_paused,
+            first_response_remaining < first_target * AT_RISK_RATIO,
+        ],
+        ["NONE", "MET", "BREACHED", "PAUSED", "AT_RISK"],
+        default="ON_TRACK",
+    )
+    resolution_state = np.select(
+        [
+            ~has_policy,
+            ~unresolved & (resolution_remaining >= 0),
+            resolution_remaining < 0,
+            currently_paused,
+            resolution_remaining < resolution_target * AT_RISK_RATIO,
+        ],
+        ["NONE", "MET", "BREACHED", "PAUSED", "AT_RISK"],
+        default="ON_TRACK",
+    )
+
+    return {
+        "ticket_id": np.array(ids, dtype=object),
+        "priority": priority_array,
+        "status": np.array(statuses, dtype=object),
+        "has_policy": has_policy,
+        "responded": ~no_first_response,
+        "paused": currently_paused,
+        "paused_seconds": paused,
+        "first_response_due_at": first_response_due,
+        "resolution_due_at": resolution_due,
+        "first_response_elapsed": first_response_elapsed,
+        "first_response_remaining": first_response_remaining,
+        "first_response_state": first_response_state,
+        "resolution_elapsed": resolution_elapsed,
+        "resolution_remaining": resolution_remaining,
+        "resolution_state": resolution_state,
+    }
+
+
+def _load_rows(db: Session, statuses: Optional[Iterable[str]] = None, priority: Optional[str] = None,
+               ticket_ids: Optional[List[str]] = None) -> List[tuple]:
+    columns = TICKET_COLUMNS
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite stores timestamps as ISO strings; skip per-row datetime parsing
+        columns = [
+            type_coerce(column, String).label(column.key)
+            if isinstance(column.type, DateTime) else column
+            for column in TICKET_COLUMNS
+        ]
+    query = select(*columns)
+    if statuses is not None:
+        query = query.where(Ticket.status.in_(list(statuses)))
+    if priority:
+        query = query.where(Ticket.priority == priority)
+    if ticket_ids is not None:
+        query = query.where(Ticket.id.in_(ticket_ids))
+    return db.execute(query).all()
+
+
+def compute_open_ticket_sla(db: Session, now: Optional[datetime] = None, priority: Optional[str] = None) -> dict:
+    """Compute SLA clocks for every open ticket."""
+    rows = _load_rows(db, statuses=OPEN_STATUSES, priority=priority)
+    policies = get_sla_policies(db)
+    return compute_sla_arrays(rows, policies, now or datetime.utcnow(), get_sla_calendars(db, policies))
+
+
+def _ticket_sla(arrays: dict, i: int) -> Optional[dict]:
+    if not arrays["has_policy"][i]:
+        return None
+    return {
+        "paused": bool(arrays["paused"][i]),
+        "paused_seconds": int(arrays["paused_seconds"][i]),
+        "first_response_state": str(arrays["first_response_state"][i]),
+        "first_response_elapsed_seconds": int(arrays["first_response_elapsed"][i]),
+        "first_response_remaining_seconds": int(arrays["first_response_remaining"][i]),
+        "first_response_due_at": _to_datetime(arrays["first_response_due_at"][i]),
+        "resolution_state": str(arrays["resolution_state"][i]),
+        "resolution_elapsed_seconds": int(arrays["resolution_elapsed"][i]),
+        "resolution_remaining_seconds": int(arrays["resolution_remaining"][i]),
+        "resolution_due_at": _to_datetime(arrays["resolution_due_at"][i]),
+    }
+
+
+def attach_sla(db: Session, tickets: List[Ticket], now: Optional[datetime] = None) -> List[Ticket]:
+    """Set a computed ``sla`` attribute on each ticket for serialization."""
+    rows = [
+        tuple(getattr(ticket, column.key) for column in TICKET_COLUMNS)
+        for ticket in tickets
+    ]
+    policies = get_sla_policies(db)
+    arrays = compute_sla_arrays(rows, policies, now or datetime.utcnow(), get_sla_calendars(db, policies))
+    for i, ticket in enumerate(tickets):
+        ticket.sla = _ticket_sla(arrays, i)
+    return tickets
+
+
+def get_sla_status(
+    db: Session,
+    priority: Optional[str] = None,
+    breached_only: bool = False,
+    skip: int = 0,
+    limit: int = 50,
+    now: Optional[datetime] = None,
+) -> dict:
+    """Summarize SLA status of open tickets, most urgent first."""
+    arrays = compute_open_ticket_sla(db, now=now, priority=priority)
+    has_policy = arrays["has_policy"]
+    first_breached = arrays["first_response_state"] == "BREACHED"
+    resolution_breached = arrays["resolution_state"] == "BREACHED"
+    at_risk = (arrays["first_response_state"] == "AT_RISK") | (arrays["resolution_state"] == "AT_RISK")
+
+    by_priority = {}
+    for p in PRIORITIES:
+        mask = arrays["priority"] == p
+        by_priority[p] = {
+            "total": int(mask.sum()),
+            "first_response_breached": int((mask & first_breached).sum()),
+            "resolution_breached": int((mask & resolution_breached).sum()),
+            "at_risk": int((mask & at_risk).sum()),
+        }
+
+    # Running clocks only: a met first response no longer competes for urgency
+    first_remaining = np.where(
+        arrays["first_response_state"] == "MET",
+        np.iinfo(np.int64).max,
+        arrays["first_response_remaining"],
+    )
+    urgency = np.minimum(first_remaining, arrays["resolution_remaining"])
+    selected = has_policy & ~arrays["paused"]
+    if breached_only:
+        selected &= first_breached | resolution_breached
+    indices = np.flatnonzero(selected)
+    indices = indices[np.argsort(urgency[indices], kind="stable")]
+
+    items = []
+    for i in indices[skip:skip + limit]:
+        items.append({
+            "ticket_id": arrays["ticket_id"][i],
+            "priority": arrays["priority"][i],
+            "status": arrays["status"][i],
+            **_ticket_sla(arrays, i),
+        })
+
+    return {
+        "total": int(len(arrays["ticket_id"])),
+        "first_response_breached": int(first_breached.sum()),
+        "resolution_breached": int(resolution_breached.sum()),
+        "at_risk": int(at_risk.sum()),
+        "paused": int(arrays["paused"].sum()),
+        "by_priority": by_priority,
+        "items": items,
+        "matched": int(len(indices)),
+        "skip": skip,
+        "limit": limit,
+    }
@@ -0,0 +1,338 @@
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Set
+from sqlalchemy import bindparam, delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.core import events
+from app.core.concurrency import CONFLICT_DETAIL
+from app.models.audit_log import AuditLog
+from app.models.tag import Tag, ticket_tags
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services import (
+    change_service, dashboard_service, metrics_service, routing_service, sla_service, ticket_service,
+)
+from app.services.sla_scheduler import scheduler as sla_scheduler
+
+# Ticket ids per IN (...) list and rows per executemany batch
+BATCH_SIZE = 500
+
+_COLUMNS = (
+    Ticket.id,
+    Ticket.ticket_number,
+    Ticket.status,
+    Ticket.priority,
+    Ticket.category_id,
+    Ticket.requester_id,
+    Ticket.assignee_id,
+    Ticket.assigned_team_id,
+    Ticket.created_at,
+    Ticket.first_response_at,
+    Ticket.resolved_at,
+    Ticket.closed_at,
+    Ticket.waiting_customer_started_at,
+    Ticket.total_waiting_customer_duration,
+    Ticket.version,
+)
+
+
+def _chunks(items: List, size: int = BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_tickets(db: Session, ticket_ids: List[str]) -> Dict[str, SimpleNamespace]:
+    """Load the columns bulk operations need, without relationships or identity map."""
+    tickets = {}
+    for chunk in _chunks(ticket_ids):
+        for row in db.execute(select(*_COLUMNS).where(Ticket.id.in_(chunk))):
+            tickets[row.id] = SimpleNamespace(**row._mapping)
+    return tickets
+
+
+def _result(ticket_id: str, status_code: int = 200, detail: Optional[str] = None) -> dict:
+    return {
+        "ticket_id": ticket_id,
+        "success": status_code == 200,
+        "status_code": status_code,
+        "detail": detail,
+    }
+
+
+def _audit_row(user_id: str, action: str, ticket_id: str, metadata: dict, now: datetime) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "action": action,
+        "entity_type": "TICKET",
+        "entity_id": ticket_id,
+        "meta_data": metadata,
+        "created_at": now,
+    }
+
+
+def _versioned_update():
+    table = Ticket.__table__
+    return (
+        table.update()
+        .where(table.c.id == bindparam("ticket_id"), table.c.version == bindparam("loaded_version"))
+        .values(version=bindparam("loaded_version") + 1)
+    )
+
+
+def _write(db: Session, updates: List[dict], audit_rows: List[dict]) -> Set[str]:
+    """Apply per-ticket UPDATEs and insert audit rows, in batches.
+
+    Each update only matches its ticket (``ticket_id``) at the version it
+    was loaded at (``loaded_version``), and bumps it. A batch whose UPDATEs
+    all matched stays one executemany; otherwise it is rolled back to its
+    savepoint and replayed row by row to find the tickets someone else
+    changed in between. Those are returned, and their audit rows dropped,
+    so the caller reports them as conflicts and applies the rest.
+    """
+    statement = _versioned_update()
+    batched = db.get_bind().dialect.supports_sane_multi_rowcount
+    stale = set()
+    for chunk in _chunks(updates):
+        if batched:
+            savepoint = db.begin_nested()
+            if db.execute(statement, chunk).rowcount == len(chunk):
+                savepoint.commit()
+                continue
+            savepoint.rollback()
+        for row in chunk:
+            if db.execute(statement, row).rowcount == 0:
+                stale.add(row["ticket_id"])
+    audit_rows = [row for row in audit_rows if row["entity_id"] not in stale]
+    for chunk in _chunks(audit_rows):
+        db.execute(insert(AuditLog), chunk)
+    return stale
+
+
+def _conflicts(results: List[dict], stale: Set[str]) -> List[dict]:
+    """Report the tickets changed by someone else during the operation as 409."""
+    if not stale:
+        return results
+    return [
+        _result(result["ticket_id"], 409, CONFLICT_DETAIL) if result["ticket_id"] in stale else result
+        for result in results
+    ]
+
+
+def _dedupe(ticket_ids: List[str]) -> List[str]:
+    return list(dict.fromkeys(ticket_ids))
+
+
+def bulk_transition(db: Session, ticket_ids: List[str], new_status: str, user: User) -> List[dict]:
+    """Transition many tickets in one transaction.
+
+    Each ticket is checked with the same rules as a single transition and
+    gets its own result. Allowed changes are written with executemany
+    UPDATEs, one audit row per ticket is batch-inserted, and the dashboard,
+    volume and response-time aggregates are updated once per affected cell.
+    """
+    ticket_ids = _dedupe(ticket_ids)
+    tickets = _load_tickets(db, ticket_ids)
+    now = datetime.utcnow()
+
+    results, updates, audit_rows = [], [], []
+    moves, volume_events, resolutions, changed = [], [], [], []
+    for ticket_id in ticket_ids:
+        ticket = tickets.get(ticket_id)
+        if ticket is None:
+            results.append(_result(ticket_id, 404, "Ticket not found"))
+            continue
+        error = ticket_service.check_transition(ticket, new_status, user)
+        if error:
+            results.append(_result(ticket_id, *error))
+            continue
+
+        old_status = ticket.status
+        before = dashboard_service.ticket_cell(ticket)
+        previous = events.ticket_state(ticket)
+        if new_status == "WAITING_CUSTOMER" and old_status != "WAITING_CUSTOMER":
+            ticket.waiting_customer_started_at = now
+        elif old_status == "WAITING_CUSTOMER" and new_status != "WAITING_CUSTOMER":
+            if ticket.waiting_customer_started_at:
+                ticket.total_waiting_customer_duration += sla_service.waiting_seconds(db, ticket, now)
+                ticket.waiting_customer_started_at = None
+        if new_status == "RESOLVED" and not ticket.resolved_at:
+            ticket.resolved_at = now
+            resolutions.append((ticket, now))
+        if new_status == "CLOSED" and not ticket.closed_at:
+            ticket.closed_at = now
+        ticket.status = new_status
+        ticket.updated_at = now
+
+        due_dates = sla_service.due_date_values(db, ticket)
+        vars(ticket).update(due_dates)
+        updates.append({
+            "ticket_id": ticket.id,
+            "loaded_version": ticket.version,
+            "status": new_status,
+            "resolved_at": ticket.resolved_at,
+            "closed_at": ticket.closed_at,
+            "waiting_customer_started_at": ticket.waiting_customer_started_at,
+            "total_waiting_customer_duration": ticket.total_waiting_customer_duration,
+            "updated_at": now,
+            "last_activity_at": now,
+            **due_dates,
+        })
+        audit_rows.append(_audit_row(
+            user.id, "STATUS_CHANGED", ticket.id,
+            {"old_status": old_status, "new_status": new_status}, now,
+        ))
+        moves.append((ticket.id, before, dashboard_service.ticket_cell(ticket)))
+        volume_events.extend(
+            (ticket, event, now) for event in metrics_service.status_volume_events(old_status, new_status)
+        )
+        changed.append((ticket, previous))
+        results.append(_result(ticket_id))
+
+    stale = _write(db, updates, audit_rows)
+    if stale:
+        volume_events = [entry for entry in volume_events if entry[0].id not in stale]
+        resolutions = [entry for entry in resolutions if entry[0].id not in stale]
+        changed = [entry for entry in changed if entry[0].id not in stale]
+    moves = [(before, after) for ticket_id, before, after in moves if ticket_id not in stale]
+    dashboard_service.move_tickets(db, moves)
+    metrics_service.record_volumes(db, volume_events)
+    metrics_service.record_response_times(db, metrics_service.RESOLUTION, resolutions)
+    changes = [events.ticket_event("ticket.status_changed", ticket, previous) for ticket, previous in changed]
+    change_service.record(db, *changes)
+    db.commit()
+    routing_service.balancer.move_many(moves)
+    for ticket, _ in changed:
+        sla_scheduler.update_ticket(ticket)
+    events.publish(*changes)
+    return _conflicts(results, stale)
+
+
+def bulk_assign(
+    db: Session,
+    ticket_ids: List[str],
+    assignee_id: Optional[str],
+    assigned_team_id: Optional[str],
+    user: User,
+) -> List[dict]:
+    """Assign many tickets to a user or team with versioned executemany UPDATEs."""
+    ticket_ids = _dedupe(ticket_ids)
+    tickets = _load_tickets(db, ticket_ids)
+    now = datetime.utcnow()
+
+    results, updates, audit_rows, moves, found, previous = [], [], [], [], [], {}
+    for ticket_id in ticket_ids:
+        ticket = tickets.get(ticket_id)
+        if ticket is None:
+            results.append(_result(ticket_id, 404, "Ticket not found"))
+            continue
+        before = dashboard_service.ticket_cell(ticket)
+        previous[ticket_id] = events.ticket_state(ticket)
+        updates.append({
+            "ticket_id": ticket.id,
+            "loaded_version": ticket.version,
+            "assignee_id": assignee_id,
+            "assigned_team_id": assigned_team_id,
+            "updated_at": now,
+        })
+        audit_rows.append(_audit_row(user.id, "TICKET_ASSIGNED", ticket.id, {
+            "old_assignee_id": ticket.assignee_id,
+            "new_assignee_id": assignee_id,
+            "old_team_id": ticket.assigned_team_id,
+            "new_team_id": assigned_team_id,
+        }, now))
+        ticket.assignee_id = assignee_id
+        ticket.assigned_team_id = assigned_team_id
+        ticket.updated_at = now
+        moves.append((ticket_id, before, dashboard_service.ticket_cell(ticket)))
+        found.append(ticket_id)
+        results.append(_result(ticket_id))
+
+    stale = _write(db, updates, audit_rows)
+    found = [ticket_id for ticket_id in found if ticket_id not in stale]
+    moves = [(before, after) for ticket_id, before, after in moves if ticket_id not in stale]
+    dashboard_service.move_tickets(db, moves)
+    changes = [events.ticket_event("ticket.assigned", tickets[ticket_id], previous[ticket_id]) for ticket_id in found]
+    change_service.record(db, *changes)
+    db.commit()
+    routing_service.balancer.move_many(moves)
+    events.publish(*changes)
+    return _conflicts(results, stale)
+
+
+def _resolve_tags(db: Session, names: List[str], create: bool) -> Dict[str, str]:
+    """Map tag names to ids, creating missing tags when asked to."""
+    tag_ids = dict(db.query(Tag.name, Tag.id).filter(Tag.name.in_(names)).all()) if names else {}
+    if create:
+        for name in names:
+            if name not in tag_ids:
+                tag = Tag(id=str(uuid.uuid4()), name=name, created_at=datetime.utcnow())
+                db.add(tag)
+                tag_ids[name] = tag.id
+    return tag_ids
+
+
+def bulk_tag(
+    db: Session,
+    ticket_ids: List[str],
+    add_tags: List[str],
+    remove_tags: List[str],
+    user: User,
+) -> List[dict]:
+    """Add and remove tags on many tickets with set-based INSERTs and DELETEs."""
+    ticket_ids = _dedupe(ticket_ids)
+    add_tags, remove_tags = _dedupe(add_tags), _dedupe(remove_tags)
+    found = _load_tickets(db, ticket_ids)
+    existing = [ticket_id for ticket_id in ticket_ids if ticket_id in found]
+    if not existing:
+        # Nothing to tag, so no new tag is created either
+        return [_result(ticket_id, 404, "Ticket not found") for ticket_id in ticket_ids]
+    now = datetime.utcnow()
+
+    add_ids = list(_resolve_tags(db, add_tags, create=True).values())
+    remove_ids = list(_resolve_tags(db, remove_tags, create=False).values())
+    db.flush()
+    metadata = {"added_tags": add_tags, "removed_tags": remove_tags}
+    stale = _write(
+        db,
+        [
+            {"ticket_id": ticket_id, "loaded_version": found[ticket_id].version, "updated_at": now}
+            for ticket_id in existing
+        ],
+        [_audit_row(user.id, "TICKET_UPDATED", ticket_id, metadata, now) for ticket_id in existing],
+    )
+    existing = [ticket_id for ticket_id in existing if ticket_id not in stale]
+    for chunk in _chunks(existing):
+        if remove_ids:
+            db.execute(
+                delete(ticket_tags).where(
+                    ticket_tags.c.ticket_id.in_(chunk), ticket_tags.c.tag_id.in_(remove_ids)
+                )
+            )
+        if add_ids:
+            present = set(db.execute(
+                select(ticket_tags.c.ticket_id, ticket_tags.c.tag_id).where(
+                    ticket_tags.c.ticket_id.in_(chunk), ticket_tags.c.tag_id.in_(add_ids)
+                )
+            ).all())
+            pairs = [
+                {"ticket_id": ticket_id, "tag_id": tag_id}
+                for ticket_id in chunk
+                for tag_id in add_ids
+                if (ticket_id, tag_id) not in present
+            ]
+            if pairs:
+                db.execute(insert(ticket_tags), pairs)
+
+    for ticket_id in existing:
+        found[ticket_id].updated_at = now
+    changes = [events.ticket_event("ticket.updated", found[ticket_id]) for ticket_id in existing]
+    change_service.record(db, *changes)
+    db.commit()
+    events.publish(*changes)
+    return _conflicts([
+        _result(ticket_id) if ticket_id in found else _result(ticket_id, 404, "Ticket not found")
+        for ticket_id in ticket_ids
+    ], stale)
@@ -1,25 +1,69 @@
+import base64
+import binascii
 import uuid
 from datetime import datetime
-from typing import Optional, List
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from typing import Iterable, Optional, List, Tuple
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy import Integer, and_, bindparam, cast, func, or_, tuple_, update
 
+from app.core import events
+from app.models.category import Category
 from app.models.ticket import Ticket
 from app.models.comment import Comment
 from app.models.tag import Tag
 from app.models.audit_log import AuditLog
+from app.models.user import User
+from app.models.number_sequence import NumberSequence
+from app.services import change_service, dashboard_service, metrics_service, routing_service, sla_service
+from app.services.sla_scheduler import scheduler as sla_scheduler
+
+VALID_STATUSES = ["OPEN", "IN_PROGRESS", "WAITING_CUSTOMER", "RESOLVED", "CLOSED", "CANCELED"]
+
+# Status changes a requester may make on their own tickets
+REQUESTER_TRANSITIONS = {
+    "WAITING_CUSTOMER": ["IN_PROGRESS"],  # Customer provides additional info
+    "RESOLVED": ["CLOSED"],               # Customer confirms resolution
+}
+
+
+TICKET_NUMBER_SEQUENCE = "ticket_number"
+
+# Relationships a projected ticket list may load, with the columns their response schemas read
+_PROJECTED_RELATIONSHIPS = {
+    "category": (Ticket.category, (Category.id, Category.name, Category.type)),
+    "requester": (Ticket.requester, (User.id, User.name, User.email, User.role)),
+    "assignee": (Ticket.assignee, (User.id, User.name, User.email, User.role)),
+    "tags": (Ticket.tags, (Tag.id, Tag.name)),
+}
+
+
+def allocate_ticket_numbers(db: Session, count: int = 1) -> int:
+    """Reserve a block of ``count`` ticket numbers and return the first one.
+
+    The sequence row is bumped with a relative UPDATE in the caller's
+    transaction; the first use seeds it from the highest existing number.
+    """
+    value = db.execute(
+        update(NumberSequence)
+        .where(NumberSequence.name == TICKET_NUMBER_SEQUENCE)
+        .values(value=NumberSequence.value + count)
+        .returning(NumberSequence.value)
+    ).scalar()
+    if value is None:
+        highest = db.query(func.max(cast(func.substr(Ticket.ticket_number, 5), Integer))).scalar() or 0
+        value = highest + count
+        db.add(NumberSequence(name=TICKET_NUMBER_SEQUENCE, value=value))
+        db.flush()
+    return value - count + 1
+
+
+def format_ticket_number(number: int) -> str:
+    return f"TKT-{number:05d}"
 
 
 def generate_ticket_number(db: Session) -> str:
     """Generate unique ticket number in format TKT-00001."""
-    last_ticket = db.query(Ticket).order_by(Ticket.created_at.desc()).first()
-    if not last_ticket:
-        return "TKT-00001"
-    
-    # Extract number from last ticket
-    last_number = int(last_ticket.ticket_number.split("-")[1])
-    new_number = last_number + 1
-    return f"TKT-{new_number:05d}"
+    return format_ticket_number(allocate_ticket_numbers(db))
 
 
 def create_ticket(
@@ -31,7 +75,7 @@ def create_ticket(
     category_id: Optional[str] = None,
     tag_names: Optional[List[str]] = None,
 ) -> Ticket:
-    """Create a new ticket."""
+    """Create a new ticket, routed to an operator when its category has a routing team."""
     ticket_id = str(uuid.uuid4())
     ticket_number = generate_ticket_number(db)
     
@@ -47,6 +91,7 @@ def create_ticket(
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow(),
     )
+    ticket.last_activity_at = ticket.created_at
     
     # Add tags if provided
     if tag_names:
@@ -57,12 +102,21 @@ def create_ticket(
                 db.add(tag)
             ticket.tags.append(tag)
     
+    routing = routing_service.route_ticket(db, ticket)
+    sla_service.apply_due_dates(db, ticket)
     db.add(ticket)
+    dashboard_service.move_ticket(db, None, ticket)
+    metrics_service.record_volume(db, ticket, "created", ticket.created_at)
+    event = events.ticket_event("ticket.created", ticket)
+    change_service.record(db, event)
     db.commit()
     db.refresh(ticket)
+    routing_service.balancer.move(None, dashboard_service.ticket_cell(ticket))
     
     # Reload ticket with relationships
     ticket = get_ticket(db, ticket.id)
+    sla_scheduler.update_ticket(ticket)
+    events.publish(event)
     
     # Create audit log
     create_audit_log(
@@ -73,6 +127,15 @@ def create_ticket(
         entity_id=ticket.id,
         metadata={"ticket_number": ticket.ticket_number, "title": title},
     )
+    if routing:
+        create_audit_log(
+            db,
+            user_id=requester_id,
+            action="TICKET_ROUTED",
+            entity_type="TICKET",
+            entity_id=ticket.id,
+            metadata=routing,
+        )
     
     return ticket
 
@@ -93,6 +156,30 @@ def get_ticket(db: Session, ticket_id: str) -> Optional[Ticket]:
     )
 
 
+def _by_sla_due(query, by_status: bool, skip: int, limit: int) -> List[Ticket]:
+    """Most urgent running deadline first, then the tickets without one, newest first.
+
+    The tickets with a deadline are read in index order, (status,
+    sla_due_at) when filtered by status and sla_due_at otherwise, so the
+    page comes straight off the index instead of sorting every match with
+    NULLS LAST. The rest fill the page only once the deadlines run out.
+    """
+    running = query.filter(Ticket.sla_due_at.isnot(None))
+    order = (Ticket.status, Ticket.sla_due_at) if by_status else (Ticket.sla_due_at,)
+    tickets = running.order_by(*order).offset(skip).limit(limit).all()
+    if len(tickets) == limit:
+        return tickets
+    # Past the last deadline: skip what the earlier pages showed of the rest
+    skip = 0 if tickets else max(skip - running.order_by(None).count(), 0)
+    return tickets + (
+        query.filter(Ticket.sla_due_at.is_(None))
+        .order_by(Ticket.created_at.desc())
+        .offset(skip)
+        .limit(limit - len(tickets))
+        .all()
+    )
+
+
 def get_tickets(
     db: Session,
     status: Optional[str] = None,
@@ -100,18 +187,40 @@ def get_tickets(
     assignee_id: Optional[str] = None,
     requester_id: Optional[str] = None,
     category_id: Optional[str] = None,
+    sort: str = "created_at",
     skip: int = 0,
     limit: int = 25,
+    fields: Optional[Iterable[str]] = None,
+    ids: Optional[Iterable[str]] = None,
 ) -> List[Ticket]:
-    """Get tickets with filters."""
-    query = db.query(Ticket).options(
-        joinedload(Ticket.category),
-        joinedload(Ticket.requester),
-        joinedload(Ticket.assignee),
-        joinedload(Ticket.assigned_team),
-        joinedload(Ticket.tags),
-    )
+    """Get tickets with filters.
+
+    ``fields`` (names of ``TicketResponse`` fields) limits the SELECT to those
+    columns and loads only the requested relationships; ``description`` and
+    the rest stay deferred. ``sla`` loads the columns its computation needs.
+    ``ids`` restricts the result to those tickets.
+    """
+    if fields is None:
+        options = [
+            joinedload(Ticket.category),
+            joinedload(Ticket.requester),
+            joinedload(Ticket.assignee),
+            joinedload(Ticket.assigned_team),
+            joinedload(Ticket.tags),
+        ]
+    else:
+        fields = set(fields)
+        columns = {Ticket.id} | {column for column in sla_service.TICKET_COLUMNS if "sla" in fields}
+        columns |= {getattr(Ticket, name) for name in fields if name in Ticket.__table__.c}
+        options = [load_only(*columns)] + [
+            joinedload(relationship).load_only(*related_columns)
+            for name, (relationship, related_columns) in _PROJECTED_RELATIONSHIPS.items()
+            if name in fields
+        ]
+    query = db.query(Ticket).options(*options)
     
+    if ids is not None:
+        query = query.filter(Ticket.id.in_(list(ids)))
     if status:
         query = query.filter(Ticket.status == status)
     if priority:
@@ -123,7 +232,15 @@ def get_tickets(
     if category_id:
         query = query.filter(Ticket.category_id == category_id)
     
-    return query.order_by(Ticket.created_at.desc()).offset(skip).limit(limit).all()
+    if sort == "sla_due":
+        return _by_sla_due(query, status is not None, skip, limit)
+    if sort == "last_activity":
+        order = (Ticket.last_activity_at.desc(), Ticket.created_at.desc())
+    elif sort == "comment_count":
+        order = (Ticket.comment_count.desc(), Ticket.last_activity_at.desc())
+    else:
+        order = (Ticket.created_at.desc(),)
+    return query.order_by(*order).offset(skip).limit(limit).all()
 
 
 def count_tickets(
@@ -135,7 +252,7 @@ def count_tickets(
     category_id: Optional[str] = None,
 ) -> int:
     """Count tickets with filters."""
-    query = db.query(Ticket)
+    query = db.query(func.count(Ticket.id))
     
     if status:
         query = query.filter(Ticket.status == status)
@@ -148,7 +265,7 @@ def count_tickets(
     if category_id:
         query = query.filter(Ticket.category_id == category_id)
     
-    return query.count()
+    return query.scalar()
 
 
 def update_ticket(
@@ -159,6 +276,8 @@ def update_ticket(
 ) -> Ticket:
     """Update ticket fields."""
     old_values = {}
+    cell = dashboard_service.ticket_cell(ticket)
+    previous = events.ticket_state(ticket)
     
     for key, value in updates.items():
         if value is not None and hasattr(ticket, key):
@@ -166,8 +285,19 @@ def update_ticket(
             setattr(ticket, key, value)
     
     ticket.updated_at = datetime.utcnow()
+    if "priority" in old_values:
+        sla_service.apply_due_dates(db, ticket)
+    dashboard_service.move_ticket(db, cell, ticket)
+    event = events.ticket_event("ticket.updated", ticket, previous) if old_values else None
+    if event:
+        change_service.record(db, event)
     db.commit()
     db.refresh(ticket)
+    routing_service.balancer.move(cell, dashboard_service.ticket_cell(ticket))
+    if "priority" in old_values:
+        sla_scheduler.update_ticket(ticket)
+    if event:
+        events.publish(event)
     
     # Create audit log
     if old_values:
@@ -183,6 +313,29 @@ def update_ticket(
     return ticket
 
 
+def check_transition(ticket: Ticket, new_status: str, user: User) -> Optional[Tuple[int, str]]:
+    """Check whether a user may move a ticket to a status.
+
+    Returns None when allowed, otherwise the HTTP status code and detail of
+    the refusal.
+    """
+    if user.role == "requester":
+        # Requesters can only change their own tickets
+        if ticket.requester_id != user.id:
+            return 403, "Not authorized to change ticket status"
+        
+        current_status = ticket.status
+        if current_status not in REQUESTER_TRANSITIONS:
+            return 403, f"Cannot change status from {current_status}. Only allowed from WAITING_CUSTOMER or RESOLVED."
+        
+        if new_status not in REQUESTER_TRANSITIONS[current_status]:
+            return 403, f"Cannot transition from {current_status} to {new_status}"
+    
+    if new_status not in VALID_STATUSES:
+        return 400, f"Invalid status. Must be one of: {VALID_STATUSES}"
+    return None
+
+
 def transition_ticket_status(
     db: Session,
     ticket: Ticket,
@@ -191,6 +344,8 @@ def transition_ticket_status(
 ) -> Ticket:
     """Transition ticket status with SLA tracking."""
     old_status = ticket.status
+    cell = dashboard_service.ticket_cell(ticket)
+    previous = events.ticket_state(ticket)
     
     # Track status transitions for SLA
     if new_status == "WAITING_CUSTOMER" and old_status != "WAITING_CUSTOMER":
@@ -199,20 +354,30 @@ def transition_ticket_status(
     elif old_status == "WAITING_CUSTOMER" and new_status != "WAITING_CUSTOMER":
         # Stop waiting timer and add duration
         if ticket.waiting_customer_started_at:
-            duration = (datetime.utcnow() - ticket.waiting_customer_started_at).total_seconds()
-            ticket.total_waiting_customer_duration += int(duration)
+            ticket.total_waiting_customer_duration += sla_service.waiting_seconds(db, ticket, datetime.utcnow())
             ticket.waiting_customer_started_at = None
     
     if new_status == "RESOLVED" and not ticket.resolved_at:
         ticket.resolved_at = datetime.utcnow()
+        metrics_service.record_response_time(db, ticket, metrics_service.RESOLUTION, ticket.resolved_at)
     
     if new_status == "CLOSED" and not ticket.closed_at:
         ticket.closed_at = datetime.utcnow()
     
     ticket.status = new_status
     ticket.updated_at = datetime.utcnow()
+    ticket.last_activity_at = ticket.updated_at
+    for event in metrics_service.status_volume_events(old_status, new_status):
+        metrics_service.record_volume(db, ticket, event, ticket.updated_at)
+    sla_service.apply_due_dates(db, ticket)
+    dashboard_service.move_ticket(db, cell, ticket)
+    event = events.ticket_event("ticket.status_changed", ticket, previous)
+    change_service.record(db, event)
     db.commit()
     db.refresh(ticket)
+    routing_service.balancer.move(cell, dashboard_service.ticket_cell(ticket))
+    sla_scheduler.update_ticket(ticket)
+    events.publish(event)
     
     # Create audit log
     create_audit_log(
@@ -237,12 +402,19 @@ def assign_ticket(
     """Assign ticket to user or team."""
     old_assignee = ticket.assignee_id
     old_team = ticket.assigned_team_id
+    cell = dashboard_service.ticket_cell(ticket)
+    previous = events.ticket_state(ticket)
     
     ticket.assignee_id = assignee_id
     ticket.assigned_team_id = assigned_team_id
     ticket.updated_at = datetime.utcnow()
+    dashboard_service.move_ticket(db, cell, ticket)
+    event = events.ticket_event("ticket.assigned", ticket, previous)
+    change_service.record(db, event)
     db.commit()
     db.refresh(ticket)
+    routing_service.balancer.move(cell, dashboard_service.ticket_cell(ticket))
+    events.publish(event)
     
     # Create audit log
     create_audit_log(
@@ -281,16 +453,43 @@ def create_comment(
     )
     
     db.add(comment)
+    if not is_internal:
+        # Relative UPDATE outside the row version, so concurrent comments are all
+        # counted instead of conflicting
+        db.execute(
+            update(Ticket)
+            .where(Ticket.id == ticket.id)
+            .values(
+                comment_count=Ticket.comment_count + 1,
+                last_public_comment_at=comment.created_at,
+                last_activity_at=comment.created_at,
+            )
+            .execution_options(synchronize_session=False)
+        )
     
     # Track first response time (FRT) - only for public comments by operator/admin
+    first_response = False
     if not is_internal and not ticket.first_response_at:
-        author = db.query(Tag).filter(Tag.id == author_id).first()
+        author = db.get(User, author_id)
         if author and author.role in ["operator", "admin"]:
             ticket.first_response_at = datetime.utcnow()
             ticket.updated_at = datetime.utcnow()
+            metrics_service.record_response_time(
+                db, ticket, metrics_service.FIRST_RESPONSE, ticket.first_response_at
+            )
+            sla_service.apply_due_dates(db, ticket)
+            first_response = True
     
+    changes = [events.comment_event(ticket, comment)]
+    if not is_internal:
+        # The ticket's comment count and activity time changed with it
+        changes.append(events.ticket_event("ticket.updated", ticket))
+    change_service.record(db, *changes)
     db.commit()
     db.refresh(comment)
+    if first_response:
+        sla_scheduler.update_ticket(ticket)
+    events.publish(*changes)
     
     # Create audit log
     create_audit_log(
@@ -305,12 +504,36 @@ def create_comment(
     return comment
 
 
+def encode_comment_cursor(comment: Comment) -> str:
+    """Opaque cursor pointing just after ``comment`` in its ticket's thread."""
+    raw = f"{comment.created_at.isoformat()}|{comment.id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_comment_cursor(cursor: str) -> Tuple[datetime, str]:
+    """The (created_at, id) position of a comment cursor; ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, comment_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), comment_id
+    except (ValueError, UnicodeDecodeError, binascii.Error) as e:
+        raise ValueError(f"Invalid comment cursor: {cursor!r}") from e
+
+
 def get_ticket_comments(
     db: Session,
     ticket_id: str,
     include_internal: bool = False,
+    after: Optional[Tuple[datetime, str]] = None,
+    limit: Optional[int] = None,
 ) -> List[Comment]:
-    """Get comments for a ticket."""
+    """Get comments for a ticket, oldest first.
+
+    ``after`` is a position from :func:`decode_comment_cursor`; only comments
+    after it are returned, at most ``limit`` of them. The keyset on
+    (created_at, id) is served by ``ix_comments_ticket_id_created_at``, so a
+    page costs the same however deep into the thread it is.
+    """
     query = (
         db.query(Comment)
         .options(joinedload(Comment.author))
@@ -319,8 +542,81 @@ def get_ticket_comments(
     
     if not include_internal:
         query = query.filter(Comment.is_internal == False)
+    if after is not None:
+        # A row-value comparison, so the index is entered at the cursor rather than scanned up to it
+        query = query.filter(tuple_(Comment.created_at, Comment.id) > tuple_(*after))
     
-    return query.order_by(Comment.created_at.asc()).all()
+    query = query.order_by(Comment.created_at.asc(), Comment.id.asc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def refresh_ticket_activity(db: Session, ticket_ids: Iterable[str]) -> int:
+    """Recompute the activity columns of some tickets from their comments and history.
+
+    ``last_activity_at`` becomes the latest of creation, resolution, closing,
+    the last public comment and the last status change still in the hot
+    audit log (archived months are not read). The caller commits. Returns
+    the number of tickets updated.
+    """
+    ticket_ids = list(ticket_ids)
+    comments = {
+        ticket_id: (count, last_at)
+        for ticket_id, count, last_at in db.query(
+            Comment.ticket_id, func.count(Comment.id), func.max(Comment.created_at)
+        )
+        .filter(Comment.ticket_id.in_(ticket_ids), Comment.is_internal == False)
+        .group_by(Comment.ticket_id)
+    }
+    status_changes = dict(
+        db.query(AuditLog.entity_id, func.max(AuditLog.created_at))
+        .filter(
+            AuditLog.entity_type == "TICKET",
+            AuditLog.entity_id.in_(ticket_ids),
+            AuditLog.action == "STATUS_CHANGED",
+        )
+        .group_by(AuditLog.entity_id)
+    )
+    updates = []
+    for ticket_id, created_at, resolved_at, closed_at in db.query(
+        Ticket.id, Ticket.created_at, Ticket.resolved_at, Ticket.closed_at
+    ).filter(Ticket.id.in_(ticket_ids)):
+        count, last_comment_at = comments.get(ticket_id, (0, None))
+        updates.append({
+            "ticket_id": ticket_id,
+            "comment_count": count,
+            "last_public_comment_at": last_comment_at,
+            "last_activity_at": max(
+                at for at in (created_at, resolved_at, closed_at, last_comment_at, status_changes.get(ticket_id))
+                if at is not None
+            ),
+        })
+    if updates:
+        # Derived columns: written by primary key without checking or bumping the row version
+        table = Ticket.__table__
+        db.execute(table.update().where(table.c.id == bindparam("ticket_id")), updates)
+    return len(updates)
+
+
+def backfill_ticket_activity(db: Session, batch_size: int = 1000) -> int:
+    """Recompute the activity columns of every ticket, committing ``batch_size`` tickets at a time.
+
+    Each batch is committed on its own, so an interrupted backfill can simply
+    be run again. Returns the number of tickets updated.
+    """
+    total = 0
+    last_id = ""
+    while True:
+        ticket_ids = [
+            ticket_id for ticket_id, in
+            db.query(Ticket.id).filter(Ticket.id > last_id).order_by(Ticket.id).limit(batch_size)
+        ]
+        if not ticket_ids:
+            return total
+        total += refresh_ticket_activity(db, ticket_ids)
+        db.commit()
+        last_id = ticket_ids[-1]
 
 
 def create_audit_log(
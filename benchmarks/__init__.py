@@ -0,0 +1 @@
+"""Performance benchmarks (run with ``python manage.py benchmark``)."""
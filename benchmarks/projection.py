@@ -0,0 +1,74 @@
+"""Full and summary pages of the ticket and article lists.
+
+A page is loaded with the list service and dumped like the endpoint does,
+once with every field and once with the summary projection of
+``?view=summary``. Reported are milliseconds per page and the peak memory
+allocated while building one (``tracemalloc``), so the effect of leaving
+``description``/``content`` and unrequested relationships unloaded shows
+up in both.
+"""
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core.serialization import serializer
+from app.schemas.knowledge_article import ARTICLE_SUMMARY_FIELDS, KnowledgeArticleResponse
+from app.schemas.ticket import TICKET_SUMMARY_FIELDS, TicketResponse
+from app.services import article_service, sla_service, ticket_service
+
+PAGE_SIZE = 100
+
+
+def _ticket_page(db: Session, fields: Optional[Sequence[str]]) -> list:
+    tickets = ticket_service.get_tickets(db, limit=PAGE_SIZE, fields=fields)
+    if fields is None or "sla" in fields:
+        sla_service.attach_sla(db, tickets)
+    return serializer(TicketResponse).subset(fields).dump_many(tickets)
+
+
+def _article_page(db: Session, fields: Optional[Sequence[str]]) -> list:
+    articles = article_service.get_articles(db, limit=PAGE_SIZE, fields=fields)
+    return serializer(KnowledgeArticleResponse).subset(fields).dump_many(articles)
+
+
+LISTS: Dict[str, tuple] = {
+    "GET /api/tickets": (_ticket_page, TICKET_SUMMARY_FIELDS),
+    "GET /api/articles": (_article_page, ARTICLE_SUMMARY_FIELDS),
+}
+
+
+def _measure(engine, page: Callable, fields, iterations: int) -> Dict[str, float]:
+    # A fresh session per page, so every run loads its rows like a request does
+    def load():
+        with Session(engine) as db:
+            return page(db, fields)
+
+    load()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        load()
+    elapsed_ms = (time.perf_counter() - started) / iterations * 1000
+    tracemalloc.start()
+    try:
+        load()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms": round(elapsed_ms, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def run(ctx, iterations: int = 50) -> Dict[str, dict]:
+    """Per list: time and peak memory of a full and a summary page."""
+    results = {}
+    for name, (page, summary) in LISTS.items():
+        full = _measure(ctx.engine, page, None, iterations)
+        projected = _measure(ctx.engine, page, summary, iterations)
+        results[name] = {
+            "full_ms": full["ms"],
+            "summary_ms": projected["ms"],
+            "full_peak_kib": full["peak_kib"],
+            "summary_peak_kib": projected["peak_kib"],
+        }
+    return results
@@ -0,0 +1,96 @@
+"""Response serialization per list endpoint, before and after the fast path.
+
+"validated" is what FastAPI does with a response model: validate the
+returned objects with ``from_attributes``, dump the model in JSON mode and
+encode it with the stdlib ``json`` module like ``JSONResponse``. "fast" is
+:mod:`app.core.serialization`: copy the schema's fields into dicts and
+encode them with orjson. Both run on the same page of loaded rows.
+"""
+import json
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from app.core.serialization import serializer
+from app.schemas.knowledge_article import PaginatedArticleResponse
+from app.schemas.ticket import CommentResponse, PaginatedTicketResponse
+from app.services import article_service, sla_service, ticket_service
+
+PAGE_SIZE = 100
+
+
+@dataclass
+class Endpoint:
+    name: str
+    schema: type
+    load: Callable  # (context, session) -> response content
+    many: bool = False  # the response is a JSON array of ``schema``
+
+
+def _tickets(ctx, db: Session) -> dict:
+    tickets = ticket_service.get_tickets(db, limit=PAGE_SIZE)
+    sla_service.attach_sla(db, tickets)
+    return {"items": tickets, "total": PAGE_SIZE, "skip": 0, "limit": PAGE_SIZE}
+
+
+def _articles(ctx, db: Session) -> dict:
+    articles = article_service.get_articles(db, limit=PAGE_SIZE)
+    return {"items": articles, "total": PAGE_SIZE, "skip": 0, "limit": PAGE_SIZE}
+
+
+def _comments(ctx, db: Session) -> list:
+    return ticket_service.get_ticket_comments(db, ctx.ticket_ids[0], True)
+
+
+ENDPOINTS = [
+    Endpoint("GET /api/tickets", PaginatedTicketResponse, _tickets),
+    Endpoint("GET /api/articles", PaginatedArticleResponse, _articles),
+    Endpoint("GET /api/tickets/{id}/comments", CommentResponse, _comments, many=True),
+]
+
+
+def _validated(adapter: TypeAdapter, content) -> bytes:
+    model = adapter.validate_python(content, from_attributes=True)
+    return json.dumps(
+        adapter.dump_python(model, mode="json"),
+        ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _time(fn: Callable, iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def run(ctx, iterations: int = 200) -> Dict[str, dict]:
+    """Milliseconds per response for both paths, and whether their bodies are identical."""
+    results = {}
+    with Session(ctx.engine) as db:
+        for endpoint in ENDPOINTS:
+            content = endpoint.load(ctx, db)
+            adapter = TypeAdapter(List[endpoint.schema] if endpoint.many else endpoint.schema)
+            fast_serializer = serializer(endpoint.schema)
+            dump = fast_serializer.dump_many if endpoint.many else fast_serializer.dump
+
+            def validated():
+                return _validated(adapter, content)
+
+            def fast():
+                return orjson.dumps(dump(content))
+
+            before, after = _time(validated, iterations), _time(fast, iterations)
+            results[endpoint.name] = {
+                "items": len(content) if endpoint.many else len(content["items"]),
+                "validated_ms": round(before, 3),
+                "fast_ms": round(after, 3),
+                "speedup": round(before / after, 1) if after else None,
+                "identical": validated() == fast(),
+            }
+    return results
@@ -0,0 +1,397 @@
+"""Latency benchmarks of the service layer and the HTTP API.
+
+Every operation runs ``iterations`` times (after ``warmup`` untimed runs)
+against a generated dataset, each run in a fresh session like a request.
+Writes happen inside a transaction that is rolled back at the end of the
+operation, so the dataset is the same for every run and every operation.
+
+For each operation the suite records p50/p95/p99 latency, throughput and
+SQL statements per call; results are stored per dataset in a JSON baseline
+and later runs report regressions beyond a threshold.
+"""
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.orm import Session
+
+from app.core.security import create_access_token
+from app.db.base import Base, get_db
+from app.models.knowledge_article import KnowledgeArticle
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services import article_service, data_generator, ticket_service
+
+DATASETS = {
+    "10k": dict(users=1_000, operators=50, teams=5, categories=12, tags=50, tickets=10_000, articles=500),
+    "1m": dict(users=50_000, operators=500, teams=20, categories=30, tags=300, tickets=1_000_000, articles=5_000),
+    "5m": dict(users=200_000, operators=2_000, teams=40, categories=40, tags=1_000, tickets=5_000_000,
+               articles=20_000),
+}
+SEED = 1
+# Datasets are generated as of a fixed date so they are identical on every machine
+DATASET_NOW = datetime(2026, 1, 1)
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.2
+# Metrics compared against the baseline; higher is worse unless listed in HIGHER_IS_BETTER
+GATED_METRICS = ("p50_ms", "p95_ms", "statements", "throughput_per_s")
+HIGHER_IS_BETTER = ("throughput_per_s",)
+SAMPLE_SIZE = 200
+
+_TRANSACTION_STATEMENTS = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "COMMIT")
+
+
+@dataclass
+class Operation:
+    name: str
+    run: Callable  # (context, session, i) for services, async (context, client, i) for HTTP
+    http: bool = False
+
+
+class StatementCounter:
+    """Count SQL statements sent to the database, ignoring transaction control."""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(_TRANSACTION_STATEMENTS):
+            self.count += 1
+
+
+class BenchmarkContext:
+    """Engine, sampled ids and auth headers of one dataset."""
+
+    def __init__(self, database_url: str, seed: int = SEED):
+        self.engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        if self.engine.dialect.name == "sqlite":
+            # pysqlite needs explicit BEGIN for SAVEPOINTs inside the rolled-back transaction
+            @event.listens_for(self.engine, "connect")
+            def _autocommit_driver(dbapi_connection, connection_record):
+                dbapi_connection.isolation_level = None
+
+            @event.listens_for(self.engine, "begin")
+            def _begin(conn):
+                conn.exec_driver_sql("BEGIN")
+
+        self.statements = StatementCounter(self.engine)
+        self.connection = None
+        self.rng = np.random.default_rng(seed)
+        with Session(self.engine) as db:
+            self._sample(db)
+
+    def _sample(self, db: Session) -> None:
+        def user(role: str) -> User:
+            return db.query(User).filter(User.role == role).order_by(User.email).first()
+
+        self.requester, self.operator, self.admin = user("requester"), user("operator"), user("admin")
+        if self.requester is None or self.operator is None or self.admin is None:
+            raise ValueError("The benchmark database needs at least one requester, operator and admin")
+        self.headers = {
+            role: {"Authorization": f"Bearer {create_access_token(subject=account.id)}"}
+            for role, account in (
+                ("requester", self.requester), ("operator", self.operator), ("admin", self.admin)
+            )
+        }
+
+        # Tickets by number, which is indexed and dense, instead of loading every id
+        highest = db.query(func.max(Ticket.ticket_number)).scalar()
+        numbers = self.rng.integers(1, int(highest[4:]) + 1, size=SAMPLE_SIZE) if highest else []
+        rows = db.query(Ticket.id, Ticket.status).filter(
+            Ticket.ticket_number.in_([ticket_service.format_ticket_number(int(n)) for n in numbers])
+        ).all()
+        self.ticket_ids = [ticket_id for ticket_id, _ in rows]
+        self.open_ticket_ids = [
+            ticket_id for ticket_id, status in rows if status in ("OPEN", "IN_PROGRESS", "WAITING_CUSTOMER")
+        ] or self.ticket_ids
+        self.article_ids = [
+            article_id for (article_id,) in db.query(KnowledgeArticle.id)
+            .filter(KnowledgeArticle.status == "PUBLISHED")
+            .order_by(KnowledgeArticle.id)
+            .limit(SAMPLE_SIZE)
+        ]
+        if not self.ticket_ids or not self.article_ids:
+            raise ValueError("The benchmark database needs tickets and published articles")
+
+    def pick(self, ids: List[str], i: int) -> str:
+        return ids[i % len(ids)]
+
+    @contextmanager
+    def rolled_back(self):
+        """Run everything inside one transaction that is rolled back afterwards."""
+        self.connection = self.engine.connect()
+        transaction = self.connection.begin()
+        try:
+            yield
+        finally:
+            transaction.rollback()
+            self.connection.close()
+            self.connection = None
+
+    def session(self) -> Session:
+        # Commits in the code under test release a SAVEPOINT instead of committing
+        return Session(bind=self.connection, join_transaction_mode="create_savepoint")
+
+
+def _service_operations() -> List[Operation]:
+    def op(name):
+        def decorator(fn):
+            operations.append(Operation(name, fn))
+            return fn
+        return decorator
+
+    operations: List[Operation] = []
+
+    @op("ticket_service.get_tickets")
+    def _(ctx, db, i):
+        ticket_service.get_tickets(db, limit=25)
+
+    @op("ticket_service.get_tickets[sort=sla_due]")
+    def _(ctx, db, i):
+        ticket_service.get_tickets(db, sort="sla_due", limit=25)
+
+    @op("ticket_service.get_tickets[requester]")
+    def _(ctx, db, i):
+        ticket_service.get_tickets(db, requester_id=ctx.requester.id, limit=25)
+
+    @op("ticket_service.count_tickets")
+    def _(ctx, db, i):
+        ticket_service.count_tickets(db, status="OPEN")
+
+    @op("ticket_service.get_ticket")
+    def _(ctx, db, i):
+        ticket_service.get_ticket(db, ctx.pick(ctx.ticket_ids, i))
+
+    @op("ticket_service.get_ticket_comments")
+    def _(ctx, db, i):
+        ticket_service.get_ticket_comments(db, ctx.pick(ctx.ticket_ids, i), include_internal=True)
+
+    @op("ticket_service.create_ticket")
+    def _(ctx, db, i):
+        ticket_service.create_ticket(
+            db, title="ベンチマーク", description="ベンチマーク用のチケット", priority="MEDIUM",
+            requester_id=ctx.requester.id, tag_names=["ベンチマーク"],
+        )
+
+    @op("ticket_service.create_comment")
+    def _(ctx, db, i):
+        ticket = ticket_service.get_ticket(db, ctx.pick(ctx.open_ticket_ids, i))
+        ticket_service.create_comment(db, ticket, ctx.operator.id, "確認いたします。")
+
+    @op("ticket_service.transition_ticket_status")
+    def _(ctx, db, i):
+        ticket = ticket_service.get_ticket(db, ctx.pick(ctx.open_ticket_ids, i))
+        new_status = "WAITING_CUSTOMER" if ticket.status != "WAITING_CUSTOMER" else "IN_PROGRESS"
+        ticket_service.transition_ticket_status(db, ticket, new_status, ctx.operator.id)
+
+    @op("article_service.get_articles")
+    def _(ctx, db, i):
+        article_service.get_articles(db, status="PUBLISHED", limit=25)
+
+    @op("article_service.count_articles")
+    def _(ctx, db, i):
+        article_service.count_articles(db, status="PUBLISHED")
+
+    @op("article_service.get_article")
+    def _(ctx, db, i):
+        article_service.get_article(db, ctx.pick(ctx.article_ids, i))
+
+    @op("article_service.create_article")
+    def _(ctx, db, i):
+        article_service.create_article(
+            db, title="ベンチマーク記事", content="ベンチマーク用の記事です。", author_id=ctx.operator.id
+        )
+
+    return operations
+
+
+def _http_operations() -> List[Operation]:
+    def get(name: str, role: str, path: Callable[[BenchmarkContext, int], str]) -> Operation:
+        async def run(ctx, client, i):
+            response = await client.get(path(ctx, i), headers=ctx.headers[role])
+            response.raise_for_status()
+        return Operation(name, run, http=True)
+
+    def post(name: str, role: str, path: Callable, body: dict) -> Operation:
+        async def run(ctx, client, i):
+            response = await client.post(path(ctx, i), json=body, headers=ctx.headers[role])
+            response.raise_for_status()
+        return Operation(name, run, http=True)
+
+    return [
+        get("GET /api/tickets", "operator", lambda ctx, i: "/api/tickets"),
+        get("GET /api/tickets?sort=sla_due", "operator", lambda ctx, i: "/api/tickets?sort=sla_due"),
+        get("GET /api/tickets[requester]", "requester", lambda ctx, i: "/api/tickets"),
+        get("GET /api/tickets?view=summary", "operator", lambda ctx, i: "/api/tickets?view=summary&limit=100"),
+        get("GET /api/tickets/{id}", "operator", lambda ctx, i: f"/api/tickets/{ctx.pick(ctx.ticket_ids, i)}"),
+        get(
+            "GET /api/tickets/{id}/comments", "operator",
+            lambda ctx, i: f"/api/tickets/{ctx.pick(ctx.ticket_ids, i)}/comments",
+        ),
+        post(
+            "POST /api/tickets", "requester", lambda ctx, i: "/api/tickets",
+            {"title": "ベンチマーク", "description": "ベンチマーク用のチケット", "priority": "MEDIUM"},
+        ),
+        post(
+            "POST /api/tickets/{id}/comments", "operator",
+            lambda ctx, i: f"/api/tickets/{ctx.pick(ctx.open_ticket_ids, i)}/comments",
+            {"content": "確認いたします。"},
+        ),
+        get("GET /api/articles", "requester", lambda ctx, i: "/api/articles"),
+        get("GET /api/articles?view=summary", "requester", lambda ctx, i: "/api/articles?view=summary&limit=100"),
+        get("GET /api/articles/{id}", "requester", lambda ctx, i: f"/api/articles/{ctx.pick(ctx.article_ids, i)}"),
+        get("GET /api/dashboard/summary", "operator", lambda ctx, i: "/api/dashboard/summary"),
+        get("GET /api/sla/status", "operator", lambda ctx, i: "/api/sla/status"),
+        get(
+            "GET /api/metrics/response-times", "operator",
+            lambda ctx, i: "/api/metrics/response-times?from=2025-01-01&to=2025-12-31&group_by=priority",
+        ),
+        get(
+            "GET /api/metrics/volume", "operator",
+            lambda ctx, i: "/api/metrics/volume?bucket=week&from=2025-01-01T00:00:00&to=2026-01-01T00:00:00",
+        ),
+    ]
+
+
+def operations() -> List[Operation]:
+    return _service_operations() + _http_operations()
+
+
+def _stats(latencies: List[float], elapsed: float, statements: int) -> dict:
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "iterations": len(latencies),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "throughput_per_s": round(len(latencies) / elapsed, 2),
+        "statements": round(statements / len(latencies), 2),
+    }
+
+
+def _run_service(ctx: BenchmarkContext, operation: Operation, iterations: int, warmup: int) -> dict:
+    latencies = []
+    with ctx.rolled_back():
+        for i in range(warmup + iterations):
+            if i == warmup:
+                statements, started = ctx.statements.count, time.perf_counter()
+            db = ctx.session()
+            began = time.perf_counter()
+            operation.run(ctx, db, i)
+            if i >= warmup:
+                latencies.append(time.perf_counter() - began)
+            db.close()
+        return _stats(latencies, time.perf_counter() - started, ctx.statements.count - statements)
+
+
+async def _run_http(ctx: BenchmarkContext, operation: Operation, iterations: int, warmup: int) -> dict:
+    from app.main import app
+
+    def override_get_db():
+        db = ctx.session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    latencies = []
+    try:
+        with ctx.rolled_back():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                for i in range(warmup + iterations):
+                    if i == warmup:
+                        statements, started = ctx.statements.count, time.perf_counter()
+                    began = time.perf_counter()
+                    await operation.run(ctx, client, i)
+                    if i >= warmup:
+                        latencies.append(time.perf_counter() - began)
+                return _stats(latencies, time.perf_counter() - started, ctx.statements.count - statements)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+def run(
+    ctx: BenchmarkContext,
+    iterations: int = 50,
+    warmup: int = 5,
+    only: Optional[str] = None,
+    progress: Optional[Callable[[str, dict], None]] = None,
+) -> Dict[str, dict]:
+    """Run the operations (those whose name contains ``only``) and return their stats by name."""
+    results = {}
+    for operation in operations():
+        if only and only not in operation.name:
+            continue
+        if operation.http:
+            stats = asyncio.run(_run_http(ctx, operation, iterations, warmup))
+        else:
+            stats = _run_service(ctx, operation, iterations, warmup)
+        results[operation.name] = stats
+        if progress:
+            progress(operation.name, stats)
+    return results
+
+
+def prepare_dataset(name: str, data_dir: str = DATA_DIR) -> str:
+    """Return the URL of a SQLite database holding the named dataset, generating it once."""
+    if name not in DATASETS:
+        raise ValueError(f"Unknown dataset {name}; choose one of {', '.join(DATASETS)}")
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"tickets-{name}.db")
+    url = f"sqlite:///{path}"
+    if not os.path.exists(path):
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            data_generator.generate(db, seed=SEED, now=DATASET_NOW, **DATASETS[name])
+        engine.dispose()
+    return url
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, dict], dataset: str, path: str = BASELINE_PATH) -> None:
+    """Store results in the baseline of ``dataset``, keeping other operations and datasets."""
+    baseline = load_baseline(path)
+    entry = baseline.setdefault(dataset, {"operations": {}})
+    entry["operations"].update(results)
+    entry["recorded_at"] = datetime.utcnow().isoformat(timespec="seconds")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, ensure_ascii=False, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Describe every gated metric that is worse than the baseline by more than ``threshold``."""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in GATED_METRICS:
+            old, new = base.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (old - new) / old if metric in HIGHER_IS_BETTER else (new - old) / old
+            if change > threshold:
+                regressions.append(f"{name}: {metric} {old} -> {new} ({change:+.0%})")
+    return regressions
@@ -0,0 +1,361 @@
+"""Maintenance commands for the helpdesk backend.
+
+Usage:
+    python manage.py archive-audit-logs [--retain-months N] [--archive-dir DIR]
+    python manage.py recompute-sla-due-dates [--priority PRIORITY]
+    python manage.py backfill-ticket-activity [--batch-size N]
+    python manage.py prune-changes [--retain-days N]
+    python manage.py rebuild-dashboard
+    python manage.py rebuild-response-time-sketches
+    python manage.py backfill-volume-rollups [--since YYYY-MM-DD] [--until YYYY-MM-DD]
+    python manage.py import-tickets PATH [--kind tickets|comments] [--format csv|ndjson]
+                                         [--batch-size N] [--defer-indexes] [--resume JOB_ID]
+                                         [--user-email EMAIL]
+    python manage.py generate-data [--tickets N] [--users N] [--seed N] ...
+    python manage.py benchmark [--dataset 10k|1m|5m] [--iterations N] [--only NAME]
+                               [--threshold 0.2] [--update-baseline]
+    python manage.py benchmark-serialization [--dataset 10k|1m|5m] [--iterations N]
+    python manage.py benchmark-projection [--dataset 10k|1m|5m] [--iterations N]
+    python manage.py benchmark-middleware [--iterations N] [--repeats N] [--budget-us US]
+"""
+import argparse
+import json
+from datetime import datetime
+
+from app.db.base import SessionLocal
+
+
+def archive_audit_logs(args):
+    """Move audit logs older than the retention window into monthly archives."""
+    from app.services import audit_service
+
+    db = SessionLocal()
+    try:
+        partitions = audit_service.archive_audit_logs(
+            db,
+            retain_months=args.retain_months,
+            archive_dir=args.archive_dir,
+        )
+        for partition in partitions:
+            print(f"{partition.month}: {partition.row_count} rows -> {partition.archive_path}")
+        if not partitions:
+            print("Nothing to archive.")
+    finally:
+        db.close()
+
+
+def recompute_sla_due_dates(args):
+    """Recompute the persisted SLA due-at columns of open tickets."""
+    from app.services import sla_service
+
+    db = SessionLocal()
+    try:
+        count = sla_service.recompute_due_dates(db, priority=args.priority)
+        print(f"Recomputed SLA due dates for {count} tickets.")
+    finally:
+        db.close()
+
+
+def backfill_ticket_activity(args):
+    """Recompute comment counts and last-activity times of every ticket."""
+    from app.services import ticket_service
+
+    db = SessionLocal()
+    try:
+        count = ticket_service.backfill_ticket_activity(db, batch_size=args.batch_size)
+        print(f"Backfilled activity of {count} tickets.")
+    finally:
+        db.close()
+
+
+def prune_changes(args):
+    """Delete change log entries older than the retention window."""
+    from datetime import datetime, timedelta
+
+    from app.core.config import settings
+    from app.services import change_service
+
+    days = args.retain_days if args.retain_days is not None else settings.CHANGE_LOG_RETENTION_DAYS
+    db = SessionLocal()
+    try:
+        count = change_service.prune_changes(db, datetime.utcnow() - timedelta(days=days))
+        print(f"Pruned {count} changes older than {days} days.")
+    finally:
+        db.close()
+
+
+def rebuild_dashboard(args):
+    """Recount the dashboard ticket aggregates from the tickets table."""
+    from app.services import dashboard_service
+
+    db = SessionLocal()
+    try:
+        cells = dashboard_service.rebuild_ticket_counts(db)
+        print(f"Rebuilt {cells} dashboard cells.")
+    finally:
+        db.close()
+
+
+def rebuild_response_time_sketches(args):
+    """Recompute the first-response and resolution time sketches from ticket history."""
+    from app.services import metrics_service
+
+    db = SessionLocal()
+    try:
+        sketches = metrics_service.rebuild_response_time_sketches(db)
+        print(f"Rebuilt {sketches} response-time sketches.")
+    finally:
+        db.close()
+
+
+def backfill_volume_rollups(args):
+    """Rebuild the hourly and daily ticket volume rollups, one month at a time."""
+    from app.services import metrics_service
+
+    db = SessionLocal()
+    try:
+        months = metrics_service.backfill_volume_rollups(db, since=args.since, until=args.until)
+        print(f"Backfilled ticket volume rollups for {months} months.")
+    finally:
+        db.close()
+
+
+def import_tickets(args):
+    """Bulk import tickets or comments from a CSV or NDJSON file."""
+    from app.models.user import User
+    from app.services import import_service
+
+    db = SessionLocal()
+    try:
+        user = None
+        if args.user_email:
+            user = db.query(User).filter(User.email == args.user_email).first()
+            if user is None:
+                raise SystemExit(f"Unknown user: {args.user_email}")
+        if args.resume:
+            job = import_service.get_job(db, args.resume)
+            if job is None:
+                raise SystemExit(f"Unknown import job: {args.resume}")
+        else:
+            fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+            job = import_service.create_job(db, args.kind, fmt, source=args.path, user=user)
+            print(f"Started import job {job.id}")
+        with open(args.path, encoding="utf-8-sig", newline="") as stream:
+            import_service.run_import(
+                db, job, stream, user=user, batch_size=args.batch_size, defer_indexes=args.defer_indexes
+            )
+        print(f"Imported {job.imported} {job.kind}, skipped {job.skipped}, failed {job.failed}.")
+    finally:
+        db.close()
+
+
+def generate_data(args):
+    """Generate a large synthetic dataset for load and performance testing."""
+    import time
+    from app.services import data_generator
+
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        written = data_generator.generate(
+            db,
+            users=args.users,
+            operators=args.operators,
+            admins=args.admins,
+            teams=args.teams,
+            categories=args.categories,
+            tags=args.tags,
+            tickets=args.tickets,
+            comments_per_ticket=args.comments_per_ticket,
+            articles=args.articles,
+            days=args.days,
+            seed=args.seed,
+            batch_size=args.batch_size,
+            now=args.now,
+            rebuild_aggregates=not args.skip_aggregates,
+        )
+        elapsed = time.perf_counter() - started
+        for table, count in written.items():
+            print(f"{table}: {count}")
+        total = sum(written.values())
+        print(f"Wrote {total} rows in {elapsed:.1f}s ({total / elapsed * 60:,.0f} rows/min).")
+    finally:
+        db.close()
+
+
+def benchmark(args):
+    """Benchmark services and HTTP endpoints and compare with the stored baseline."""
+    import sys
+    from benchmarks import suite
+
+    url = args.database_url or suite.prepare_dataset(args.dataset)
+    ctx = suite.BenchmarkContext(url)
+    print(f"{'operation':48} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9} {'stmts':>6}")
+
+    def progress(name, stats):
+        print(
+            f"{name:48} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {stats['p99_ms']:9.2f}"
+            f" {stats['throughput_per_s']:9.1f} {stats['statements']:6.1f}"
+        )
+
+    results = suite.run(ctx, iterations=args.iterations, warmup=args.warmup, only=args.only, progress=progress)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({args.dataset: {"operations": results}}, f, indent=2, ensure_ascii=False)
+    if args.update_baseline:
+        suite.save_baseline(results, args.dataset, args.baseline)
+        print(f"Saved baseline for {args.dataset} to {args.baseline}.")
+        return
+
+    baseline = suite.load_baseline(args.baseline).get(args.dataset)
+    if baseline is None:
+        print(f"No baseline for {args.dataset}; run with --update-baseline to record one.")
+        return
+    regressions = suite.compare(results, baseline["operations"], args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions beyond {args.threshold:.0%}.")
+
+
+def benchmark_serialization(args):
+    """Compare validated and fast response serialization of the list endpoints."""
+    from benchmarks import serialization, suite
+
+    url = args.database_url or suite.prepare_dataset(args.dataset)
+    results = serialization.run(suite.BenchmarkContext(url), iterations=args.iterations)
+    print(f"{'endpoint':32} {'items':>6} {'validated ms':>13} {'fast ms':>9} {'speedup':>8} identical")
+    for name, stats in results.items():
+        print(
+            f"{name:32} {stats['items']:6} {stats['validated_ms']:13.3f} {stats['fast_ms']:9.3f}"
+            f" {stats['speedup']:7.1f}x {stats['identical']}"
+        )
+
+
+def benchmark_projection(args):
+    """Compare full and summary pages of the ticket and article lists."""
+    from benchmarks import projection, suite
+
+    url = args.database_url or suite.prepare_dataset(args.dataset)
+    results = projection.run(suite.BenchmarkContext(url), iterations=args.iterations)
+    print(f"{'list':20} {'full ms':>9} {'summary ms':>11} {'full KiB':>9} {'summary KiB':>12}")
+    for name, stats in results.items():
+        print(
+            f"{name:20} {stats['full_ms']:9.2f} {stats['summary_ms']:11.2f}"
+            f" {stats['full_peak_kib']:9.1f} {stats['summary_peak_kib']:12.1f}"
+        )
+
+
+def benchmark_middleware(args):
+    """Measure the per-request cost of the instrumentation middleware."""
+    import sys
+    from benchmarks import middleware
+
+    overhead = middleware.measure(iterations=args.iterations, repeats=args.repeats)
+    over_budget = False
+    for name, microseconds in overhead.items():
+        over = microseconds > args.budget_us
+        over_budget = over_budget or over
+        print(f"{name:16} {microseconds:8.2f} us/request{'  OVER BUDGET' if over else ''}")
+    if over_budget:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Helpdesk maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    archive = subparsers.add_parser("archive-audit-logs", help=archive_audit_logs.__doc__)
+    archive.add_argument("--retain-months", type=int, default=None)
+    archive.add_argument("--archive-dir", default=None)
+    archive.set_defaults(func=archive_audit_logs)
+
+    recompute = subparsers.add_parser("recompute-sla-due-dates", help=recompute_sla_due_dates.__doc__)
+    recompute.add_argument("--priority", default=None)
+    recompute.set_defaults(func=recompute_sla_due_dates)
+
+    activity = subparsers.add_parser("backfill-ticket-activity", help=backfill_ticket_activity.__doc__)
+    activity.add_argument("--batch-size", type=int, default=1000)
+    activity.set_defaults(func=backfill_ticket_activity)
+
+    prune = subparsers.add_parser("prune-changes", help=prune_changes.__doc__)
+    prune.add_argument("--retain-days", type=int, default=None)
+    prune.set_defaults(func=prune_changes)
+
+    dashboard = subparsers.add_parser("rebuild-dashboard", help=rebuild_dashboard.__doc__)
+    dashboard.set_defaults(func=rebuild_dashboard)
+
+    sketches = subparsers.add_parser(
+        "rebuild-response-time-sketches", help=rebuild_response_time_sketches.__doc__
+    )
+    sketches.set_defaults(func=rebuild_response_time_sketches)
+
+    volume = subparsers.add_parser("backfill-volume-rollups", help=backfill_volume_rollups.__doc__)
+    volume.add_argument("--since", type=datetime.fromisoformat, default=None)
+    volume.add_argument("--until", type=datetime.fromisoformat, default=None)
+    volume.set_defaults(func=backfill_volume_rollups)
+
+    imports = subparsers.add_parser("import-tickets", help=import_tickets.__doc__)
+    imports.add_argument("path")
+    imports.add_argument("--kind", choices=["tickets", "comments"], default="tickets")
+    imports.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    imports.add_argument("--batch-size", type=int, default=2000)
+    imports.add_argument("--defer-indexes", action="store_true")
+    imports.add_argument("--resume", default=None, metavar="JOB_ID")
+    imports.add_argument("--user-email", default=None)
+    imports.set_defaults(func=import_tickets)
+
+    generate = subparsers.add_parser("generate-data", help=generate_data.__doc__)
+    generate.add_argument("--users", type=int, default=1000)
+    generate.add_argument("--operators", type=int, default=50)
+    generate.add_argument("--admins", type=int, default=2)
+    generate.add_argument("--teams", type=int, default=5)
+    generate.add_argument("--categories", type=int, default=12)
+    generate.add_argument("--tags", type=int, default=50)
+    generate.add_argument("--tickets", type=int, default=10000)
+    generate.add_argument("--comments-per-ticket", type=float, default=3.0)
+    generate.add_argument("--articles", type=int, default=200)
+    generate.add_argument("--days", type=int, default=365)
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--batch-size", type=int, default=10000)
+    generate.add_argument("--now", type=datetime.fromisoformat, default=None)
+    generate.add_argument("--skip-aggregates", action="store_true")
+    generate.set_defaults(func=generate_data)
+
+    bench = subparsers.add_parser("benchmark", help=benchmark.__doc__)
+    bench.add_argument("--dataset", choices=["10k", "1m", "5m"], default="10k")
+    bench.add_argument("--database-url", default=None, help="benchmark an existing database instead")
+    bench.add_argument("--iterations", type=int, default=50)
+    bench.add_argument("--warmup", type=int, default=5)
+    bench.add_argument("--only", default=None, help="only operations whose name contains this")
+    bench.add_argument("--baseline", default="benchmarks/baseline.json")
+    bench.add_argument("--threshold", type=float, default=0.2)
+    bench.add_argument("--update-baseline", action="store_true")
+    bench.add_argument("--output", default=None)
+    bench.set_defaults(func=benchmark)
+
+    bench_serialization = subparsers.add_parser("benchmark-serialization", help=benchmark_serialization.__doc__)
+    bench_serialization.add_argument("--dataset", choices=["10k", "1m", "5m"], default="10k")
+    bench_serialization.add_argument("--database-url", default=None, help="benchmark an existing database instead")
+    bench_serialization.add_argument("--iterations", type=int, default=200)
+    bench_serialization.set_defaults(func=benchmark_serialization)
+
+    bench_projection = subparsers.add_parser("benchmark-projection", help=benchmark_projection.__doc__)
+    bench_projection.add_argument("--dataset", choices=["10k", "1m", "5m"], default="10k")
+    bench_projection.add_argument("--database-url", default=None, help="benchmark an existing database instead")
+    bench_projection.add_argument("--iterations", type=int, default=50)
+    bench_projection.set_defaults(func=benchmark_projection)
+
+    bench_middleware = subparsers.add_parser("benchmark-middleware", help=benchmark_middleware.__doc__)
+    bench_middleware.add_argument("--iterations", type=int, default=20000)
+    bench_middleware.add_argument("--repeats", type=int, default=5)
+    bench_middleware.add_argument("--budget-us", type=float, default=50.0)
+    bench_middleware.set_defaults(func=benchmark_middleware)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
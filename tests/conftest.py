@@ -5,6 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.core.config import settings
 from app.db.base import Base
 from app.core.deps import get_db
 from app.models.user import User
@@ -13,6 +14,7 @@ from app.models.category import Category
 from app.models.tag import Tag
 from app.models.sla_settings import SLASettings
 from app.core.security import get_password_hash
+from app.services import routing_service
 
 # テスト用インメモリSQLite
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -24,11 +26,18 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# バックグラウンドのSLAスケジューラは本番DBに接続するため無効化
+settings.SLA_SCHEDULER_ENABLED = False
+# キャッシュしたレスポンスがテストをまたいで返らないよう無効化（キャッシュのテストでのみ有効化）
+settings.RESPONSE_CACHE_TTL_SECONDS = 0
+
 
 @pytest.fixture(scope="function")
 def db_session():
     """各テスト関数ごとに新しいDBセッションを作成"""
     Base.metadata.create_all(bind=engine)
+    # 自動割り当ての負荷はテストごとのDBから読み直す
+    routing_service.balancer.invalidate()
     db = TestingSessionLocal()
     try:
         yield db
@@ -198,3 +207,43 @@ def test_sla_settings(db_session):
         db_session.add(sla)
     db_session.commit()
     return sla_settings
+
+
+@pytest.fixture(scope="module")
+def benchmark_database(tmp_path_factory):
+    """ベンチマーク用のデータセットを生成したSQLiteのURL（モジュール内のテストで共有）"""
+    from datetime import datetime
+    from sqlalchemy.orm import Session
+    from app.services import data_generator
+
+    url = f"sqlite:///{tmp_path_factory.mktemp('benchmark') / 'bench.db'}"
+    bench_engine = create_engine(url)
+    Base.metadata.create_all(bind=bench_engine)
+    with Session(bench_engine) as db:
+        data_generator.generate(
+            db, users=20, operators=3, admins=1, teams=2, categories=3, tags=5, tickets=50, articles=10,
+            seed=2, now=datetime(2026, 1, 1),
+        )
+    bench_engine.dispose()
+    return url
+
+
+@pytest.fixture
+def query_budget():
+    """発行されるSQL文の数が上限以内であることを検証する
+
+    with query_budget(5):
+        client.get("/api/tickets", headers=...)
+    """
+    from contextlib import contextmanager
+    from app.core.query_stats import capture_queries
+
+    @contextmanager
+    def budget(max_queries: int):
+        with capture_queries() as statements:
+            yield statements
+        assert len(statements) <= max_queries, (
+            f"{len(statements)} queries (budget {max_queries}):\n" + "\n".join(statements)
+        )
+
+    return budget
@@ -202,3 +202,252 @@ def test_audit_log_filters(client, auth_headers_admin, auth_headers_operator, te
     items = data if isinstance(data, list) else data.get("items", [])
     if len(items) > 0:
         assert all(item["entity_type"] == "ticket" for item in items)
+
+
+def test_archive_audit_logs(client, auth_headers_admin, test_admin, db_session, tmp_path, monkeypatch):
+    """保持期間を過ぎた監査ログをアーカイブし、検索できる"""
+    import uuid
+    from datetime import datetime, timedelta
+    from app.core.config import settings
+    from app.models.audit_log import AuditLog
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_ARCHIVE_DIR", str(tmp_path))
+    old_log = AuditLog(
+        id=str(uuid.uuid4()),
+        user_id=test_admin.id,
+        action="TICKET_CREATED",
+        entity_type="TICKET",
+        entity_id="old-ticket",
+        meta_data={"title": "古いチケット"},
+        created_at=datetime.utcnow() - timedelta(days=400),
+    )
+    recent_log = AuditLog(
+        id=str(uuid.uuid4()),
+        user_id=test_admin.id,
+        action="TICKET_CREATED",
+        entity_type="TICKET",
+        entity_id="recent-ticket",
+        created_at=datetime.utcnow(),
+    )
+    db_session.add_all([old_log, recent_log])
+    db_session.commit()
+
+    response = client.post("/api/admin/audit-logs/archive?retain_months=6", headers=auth_headers_admin)
+    assert response.status_code == 200
+    partitions = response.json()
+    assert len(partitions) == 1
+    assert partitions[0]["row_count"] == 1
+
+    # ホットテーブルには直近のログのみ残る
+    response = client.get("/api/admin/audit-logs?entity_type=TICKET", headers=auth_headers_admin)
+    assert [item["entity_id"] for item in response.json()] == ["recent-ticket"]
+
+    # アーカイブを含めて検索
+    response = client.get(
+        "/api/admin/audit-logs?entity_type=TICKET&include_archived=true",
+        headers=auth_headers_admin
+    )
+    items = response.json()
+    assert [item["entity_id"] for item in items] == ["recent-ticket", "old-ticket"]
+    assert items[1]["meta_data"] == {"title": "古いチケット"}
+
+    response = client.get("/api/admin/audit-logs/partitions", headers=auth_headers_admin)
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+def test_archive_audit_logs_in_batches(test_admin, db_session, tmp_path):
+    """バッチに分けて書き出しても、1か月分のログが順序どおりにアーカイブされる"""
+    import uuid
+    from datetime import datetime
+    from app.models.audit_log import AuditLog
+    from app.services import audit_service
+
+    created = [datetime(2020, 1, day, 9) for day in range(1, 6)]
+    db_session.add_all([
+        AuditLog(id=str(uuid.uuid4()), user_id=test_admin.id, action="TICKET_UPDATED", entity_type="TICKET",
+                 entity_id=f"ticket-{at.day}", meta_data={"day": at.day}, created_at=at)
+        for at in created
+    ])
+    db_session.commit()
+
+    partitions = audit_service.archive_audit_logs(
+        db_session, retain_months=1, archive_dir=str(tmp_path), batch_size=2
+    )
+    assert [(p.month, p.row_count) for p in partitions] == [("2020-01", 5)]
+    assert (partitions[0].first_created_at, partitions[0].last_created_at) == (created[0], created[-1])
+    assert db_session.query(AuditLog).filter(AuditLog.created_at < datetime(2020, 2, 1)).count() == 0
+
+    logs = list(audit_service.iter_archived_audit_logs(db_session, newest_first=False))
+    assert [log.created_at for log in logs] == created
+    assert logs[0].meta_data == {"day": 1}
+    newest = audit_service.iter_archived_audit_logs(db_session)
+    assert next(newest).entity_id == "ticket-5"
+    newest.close()
+
+
+def test_archive_audit_logs_as_operator(client, auth_headers_operator):
+    """オペレーターはアーカイブ実行不可"""
+    response = client.post("/api/admin/audit-logs/archive", headers=auth_headers_operator)
+    assert response.status_code == 403
+
+
+def test_import_tickets_csv(client, auth_headers_admin, auth_headers_operator, test_user, test_operator,
+                            test_category, test_team, test_sla_settings):
+    """CSVからチケットを一括インポートし、集計・SLA期限も反映される"""
+    csv_data = (
+        "external_ref,title,description,status,priority,category,requester_email,assignee_email,team,tags,"
+        "created_at,resolved_at\n"
+        "OLD-1,旧チケット1,説明1,OPEN,HIGH,Test Category,user@example.com,operator@example.com,Test Team,"
+        "移行|請求,2026-01-05T09:00:00,\n"
+        "OLD-2,旧チケット2,説明2,RESOLVED,LOW,,user@example.com,,,移行,2026-01-06T09:00:00,2026-01-06T12:00:00\n"
+        "OLD-3,旧チケット3,説明3,OPEN,LOW,,unknown@example.com,,,,,\n"
+    )
+    response = client.post(
+        "/api/admin/imports?kind=tickets&format=csv",
+        files={"file": ("tickets.csv", csv_data.encode("utf-8"), "text/csv")},
+        headers=auth_headers_admin,
+    )
+    assert response.status_code == 201
+    job = response.json()
+    assert job["status"] == "COMPLETED"
+    assert (job["position"], job["imported"], job["skipped"], job["failed"]) == (3, 2, 0, 1)
+    assert job["errors"][0]["record"] == 2
+
+    response = client.get("/api/tickets?limit=10", headers=auth_headers_admin)
+    tickets = {ticket["title"]: ticket for ticket in response.json()["items"]}
+    first = tickets["旧チケット1"]
+    assert first["ticket_number"] == "TKT-00001"
+    assert tickets["旧チケット2"]["ticket_number"] == "TKT-00002"
+    assert sorted(tag["name"] for tag in first["tags"]) == ["移行", "請求"]
+    assert first["assignee_id"] == test_operator.id
+    assert first["sla_due_at"] is not None
+    assert tickets["旧チケット2"]["sla_due_at"] is None
+
+    # 採番はインポート後の続きから
+    response = client.post(
+        "/api/tickets",
+        json={"title": "新規", "description": "新規チケット", "priority": "LOW"},
+        headers=auth_headers_admin,
+    )
+    assert response.json()["ticket_number"] == "TKT-00003"
+
+    response = client.get("/api/dashboard/summary?include_closed=true", headers=auth_headers_operator)
+    assert response.json()["total"] == 3
+
+    response = client.get(f"/api/admin/imports/{job['id']}", headers=auth_headers_admin)
+    assert response.json()["imported"] == 2
+
+
+def test_import_comments_ndjson_and_resume(client, auth_headers_admin, test_user, test_operator, db_session,
+                                           monkeypatch):
+    """NDJSONでコメントを取り込み、再実行時は取り込み済みのレコードを飛ばす"""
+    import json
+    from app.models.comment import Comment
+    from app.models.import_job import ImportJob
+    from app.services import import_service
+
+    tickets = "\n".join(json.dumps(record, ensure_ascii=False) for record in [
+        {"external_ref": "A-1", "title": "件名1", "description": "本文1", "requester_email": "user@example.com"},
+        {"external_ref": "A-2", "title": "件名2", "description": "本文2", "requester_email": "user@example.com"},
+    ])
+    response = client.post(
+        "/api/admin/imports?kind=tickets&format=ndjson",
+        files={"file": ("tickets.ndjson", tickets.encode("utf-8"))},
+        headers=auth_headers_admin,
+    )
+    assert response.json()["imported"] == 2
+
+    # 同じ external_ref は重複として飛ばされる
+    response = client.post(
+        "/api/admin/imports?kind=tickets&format=ndjson",
+        files={"file": ("tickets.ndjson", tickets.encode("utf-8"))},
+        headers=auth_headers_admin,
+    )
+    assert (response.json()["imported"], response.json()["skipped"]) == (0, 2)
+
+    comments = "\n".join(json.dumps(record, ensure_ascii=False) for record in [
+        {"ticket_ref": "A-1", "author_email": "operator@example.com", "content": "返信1",
+         "created_at": "2026-01-05T10:00:00+09:00"},
+        {"ticket_ref": "A-2", "author_email": "operator@example.com", "content": "メモ", "is_internal": True},
+        {"ticket_ref": "A-1", "author_email": "user@example.com", "content": "追記"},
+    ])
+    # 2バッチ目の書き込み中に障害が起きたことにする
+    import_comments = import_service._import_comments
+
+    def fail_second_batch(db, job, records, errors):
+        if records[0][0] >= 2:
+            raise RuntimeError("database is unavailable")
+        import_comments(db, job, records, errors)
+
+    monkeypatch.setattr(import_service, "_import_comments", fail_second_batch)
+    response = client.post(
+        "/api/admin/imports?kind=comments&format=ndjson&batch_size=2",
+        files={"file": ("comments.ndjson", comments.encode("utf-8"))},
+        headers=auth_headers_admin,
+    )
+    assert response.status_code == 422
+    job = response.json()
+    assert job["status"] == "FAILED"
+    assert job["position"] == 2
+    assert db_session.query(Comment).count() == 2
+    first = db_session.query(Comment).filter(Comment.content == "返信1").one()
+    assert first.created_at.isoformat() == "2026-01-05T01:00:00"
+
+    # 再開すると残りのレコードだけ取り込む
+    monkeypatch.setattr(import_service, "_import_comments", import_comments)
+    response = client.post(
+        f"/api/admin/imports?job_id={job['id']}",
+        files={"file": ("comments.ndjson", comments.encode("utf-8"))},
+        headers=auth_headers_admin,
+    )
+    assert response.json()["status"] == "COMPLETED"
+    assert response.json()["imported"] == 3
+    assert db_session.query(Comment).count() == 3
+    assert db_session.query(ImportJob).count() == 3
+
+    # 取り込んだ公開コメントはチケットのコメント数に反映される（内部メモは数えない）
+    from app.models.ticket import Ticket
+    db_session.expire_all()
+    counts = {t.external_ref: t.comment_count for t in db_session.query(Ticket)}
+    assert counts == {"A-1": 2, "A-2": 0}
+
+
+def _import_ndjson_with(client, headers, bad_line):
+    import json
+
+    records = [json.dumps(
+        {"external_ref": f"B-{n}", "title": f"件名{n}", "description": "本文", "requester_email": "user@example.com"},
+        ensure_ascii=False,
+    ) for n in range(2)]
+    response = client.post(
+        "/api/admin/imports?kind=tickets&format=ndjson",
+        files={"file": ("tickets.ndjson", "\n".join([records[0], bad_line, records[1]]).encode("utf-8"))},
+        headers=headers,
+    )
+    assert response.status_code == 201
+    job = response.json()
+    assert job["status"] == "COMPLETED"
+    assert (job["position"], job["imported"], job["failed"]) == (3, 2, 1)
+    assert job["errors"][0]["record"] == 1
+    return job["errors"][0]["error"]
+
+
+def test_import_ndjson_invalid_json_line(client, auth_headers_admin, test_user):
+    """JSONとして読めない行はその行だけのエラーとして記録し、残りは取り込む"""
+    assert _import_ndjson_with(client, auth_headers_admin, "{broken").startswith("Invalid JSON")
+
+
+def test_import_ndjson_non_object_line(client, auth_headers_admin, test_user):
+    """オブジェクトでない行もその行だけのエラーになる"""
+    assert _import_ndjson_with(client, auth_headers_admin, "[1, 2]") == "Expected a JSON object, got list"
+
+
+def test_import_as_operator_forbidden(client, auth_headers_operator):
+    """オペレーターはインポート不可"""
+    response = client.post(
+        "/api/admin/imports",
+        files={"file": ("tickets.csv", b"title\n")},
+        headers=auth_headers_operator,
+    )
+    assert response.status_code == 403
@@ -231,3 +231,25 @@ def test_view_count_increment(client, auth_headers_user, auth_headers_operator,
     
     # 閲覧数が増加していることを確認
     assert view_count_2 >= view_count_1
+
+
+def test_update_article_if_match(client, auth_headers_user, auth_headers_operator):
+    """閲覧ではバージョンが変わらず、古いIf-Matchでの記事更新は409になる"""
+    article_id = client.post(
+        "/api/articles", json={"title": "手順", "content": "本文"}, headers=auth_headers_operator
+    ).json()["id"]
+    client.post(f"/api/articles/{article_id}/publish", headers=auth_headers_operator)
+    response = client.get(f"/api/articles/{article_id}", headers=auth_headers_user)
+    response = client.get(f"/api/articles/{article_id}", headers=auth_headers_user)
+    assert response.json()["view_count"] == 2
+    assert response.headers["etag"] == '"2"'
+
+    response = client.patch(
+        f"/api/articles/{article_id}", json={"title": "新しい手順"}, headers={**auth_headers_operator, "If-Match": '"2"'}
+    )
+    assert response.status_code == 200 and response.headers["etag"] == '"3"'
+    response = client.patch(
+        f"/api/articles/{article_id}", json={"title": "古い手順"}, headers={**auth_headers_operator, "If-Match": '"2"'}
+    )
+    assert response.status_code == 409
+    assert client.get(f"/api/articles/{article_id}", headers=auth_headers_operator).json()["title"] == "新しい手順"
@@ -0,0 +1,61 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.ticket import Ticket
+from benchmarks import projection, serialization, suite
+
+
+def test_compare_reports_regressions_beyond_threshold():
+    """しきい値を超えて悪化した指標だけを回帰として報告する"""
+    baseline = {
+        "GET /api/tickets": {"p50_ms": 10.0, "p95_ms": 20.0, "statements": 4.0, "throughput_per_s": 100.0},
+        "GET /api/articles": {"p50_ms": 5.0, "p95_ms": 8.0, "statements": 3.0, "throughput_per_s": 200.0},
+    }
+    results = {
+        "GET /api/tickets": {"p50_ms": 11.0, "p95_ms": 30.0, "statements": 6.0, "throughput_per_s": 70.0},
+        "GET /api/articles": {"p50_ms": 2.0, "p95_ms": 4.0, "statements": 3.0, "throughput_per_s": 400.0},
+        "GET /api/new": {"p50_ms": 1.0},
+    }
+    regressions = suite.compare(results, baseline, threshold=0.2)
+    assert len(regressions) == 3
+    assert all(regression.startswith("GET /api/tickets:") for regression in regressions)
+    assert any("statements 4.0 -> 6.0" in regression for regression in regressions)
+    assert suite.compare(results, baseline, threshold=1.0) == []
+
+
+def test_benchmark_run_records_stats_and_rolls_back(benchmark_database, tmp_path):
+    """サービス層とHTTPの計測を行い、書き込みはロールバックされる"""
+    ctx = suite.BenchmarkContext(benchmark_database)
+    results = suite.run(ctx, iterations=3, warmup=1, only="ticket")
+    assert "POST /api/tickets" in results
+    stats = results["ticket_service.create_ticket"]
+    assert stats["iterations"] == 3
+    assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+    assert stats["statements"] > 1
+    assert results["ticket_service.get_tickets"]["statements"] == 1
+
+    # 書き込み系の計測後もデータセットは変わらない
+    engine = create_engine(benchmark_database)
+    with Session(engine) as db:
+        assert db.query(Ticket).count() == 50
+    engine.dispose()
+
+    path = tmp_path / "baseline.json"
+    suite.save_baseline(results, "10k", str(path))
+    assert suite.compare(results, suite.load_baseline(str(path))["10k"]["operations"]) == []
+
+
+def test_serialization_benchmark_compares_paths(benchmark_database):
+    """一覧APIのシリアライズを検証ありと高速パスで計測し、同じJSONになることを確認する"""
+    results = serialization.run(suite.BenchmarkContext(benchmark_database), iterations=2)
+    assert set(results) == {endpoint.name for endpoint in serialization.ENDPOINTS}
+    assert results["GET /api/tickets"]["items"] == 50
+    assert all(stats["identical"] for stats in results.values())
+
+
+def test_projection_benchmark_reports_full_and_summary_pages(benchmark_database):
+    """一覧の全項目とsummaryの1ページあたりの時間とメモリを計測する"""
+    results = projection.run(suite.BenchmarkContext(benchmark_database), iterations=2)
+    assert set(results) == set(projection.LISTS)
+    for stats in results.values():
+        assert stats["summary_peak_kib"] < stats["full_peak_kib"]
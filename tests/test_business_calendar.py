@@ -0,0 +1,170 @@
+"""Test business-hours calendar"""
+import random
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+
+from app.services.business_calendar import BusinessCalendar, to_seconds
+
+# 2026-01-05 は月曜日。JSTはDSTなし（UTC+9）
+HOLIDAY = date(2026, 1, 12)  # 成人の日（月曜日）
+
+
+def jst(day, hour, minute=0):
+    """JSTの日時をナイーブなUTC日時に変換"""
+    return datetime.combine(day, time(hour, minute)) - timedelta(hours=9)
+
+
+def make_calendar(holidays=()):
+    return BusinessCalendar("Asia/Tokyo", time(9, 0), time(18, 0), (0, 1, 2, 3, 4), tuple(holidays))
+
+
+def test_elapsed_within_business_day():
+    """同じ営業日内の経過時間"""
+    calendar = make_calendar()
+    assert calendar.elapsed_between(jst(date(2026, 1, 5), 10), jst(date(2026, 1, 5), 12)) == 2 * 3600
+
+
+def test_elapsed_skips_nights_and_weekends():
+    """夜間と週末は営業時間に含まれない"""
+    calendar = make_calendar()
+    # 月曜17:00 → 火曜10:00
+    assert calendar.elapsed_between(jst(date(2026, 1, 5), 17), jst(date(2026, 1, 6), 10)) == 2 * 3600
+    # 金曜17:00 → 月曜10:00
+    assert calendar.elapsed_between(jst(date(2026, 1, 9), 17), jst(date(2026, 1, 12), 10)) == 2 * 3600
+    # 土曜中は0
+    assert calendar.elapsed_between(jst(date(2026, 1, 10), 9), jst(date(2026, 1, 10), 17)) == 0
+
+
+def test_elapsed_skips_holidays():
+    """祝日は営業時間に含まれない"""
+    calendar = make_calendar([HOLIDAY])
+    # 金曜17:00 → 火曜10:00（月曜は祝日）
+    assert calendar.elapsed_between(jst(date(2026, 1, 9), 17), jst(date(2026, 1, 13), 10)) == 2 * 3600
+
+
+def test_add_business_time():
+    """営業時間での期限計算"""
+    calendar = make_calendar([HOLIDAY])
+    # 金曜17:00 + 2時間 → 火曜10:00
+    assert calendar.add_to(jst(date(2026, 1, 9), 17), 2 * 3600) == jst(date(2026, 1, 13), 10)
+    # 土曜開始 + 1時間 → 月曜10:00
+    assert calendar.add_to(jst(date(2026, 1, 3), 12), 3600) == jst(date(2026, 1, 5), 10)
+    # 始業 + 9時間 → 同日の終業
+    assert calendar.add_to(jst(date(2026, 1, 5), 9), 9 * 3600) == jst(date(2026, 1, 5), 18)
+    # 0秒加算は開始時刻のまま
+    assert calendar.add_to(jst(date(2026, 1, 3), 12), 0) == jst(date(2026, 1, 3), 12)
+
+
+def test_matches_minute_by_minute_iteration():
+    """1分刻みの素朴な計算と一致し、配列でもスカラーと同じ結果になる"""
+    calendar = make_calendar([HOLIDAY])
+    rng = random.Random(42)
+    base = jst(date(2026, 1, 1), 0)
+    starts, ends = [], []
+    for _ in range(30):
+        start = base + timedelta(minutes=rng.randrange(0, 20 * 24 * 60))
+        starts.append(start)
+        ends.append(start + timedelta(minutes=rng.randrange(0, 5 * 24 * 60)))
+
+    def naive(start, end):
+        minutes = 0
+        current = start
+        while current < end:
+            local = current + timedelta(hours=9)
+            if local.weekday() < 5 and local.date() != HOLIDAY and 9 <= local.hour < 18:
+                minutes += 1
+            current += timedelta(minutes=1)
+        return minutes * 60
+
+    elapsed = calendar.elapsed(
+        np.array([to_seconds(s) for s in starts]), np.array([to_seconds(e) for e in ends])
+    )
+    assert list(elapsed) == [naive(s, e) for s, e in zip(starts, ends)]
+
+    # 期限計算は経過時間の逆関数
+    for start, seconds in zip(starts, elapsed):
+        if seconds:
+            assert calendar.elapsed_between(start, calendar.add_to(start, int(seconds))) == seconds
+
+
+def test_business_hours_sla(client, auth_headers_admin, auth_headers_user, db_session):
+    """営業時間SLAの期限は営業時間で計算される"""
+    from app.models.ticket import Ticket
+
+    response = client.post(
+        "/api/admin/holidays",
+        json={"date": "2026-01-12", "name": "成人の日"},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 201
+    response = client.post(
+        "/api/admin/sla-settings",
+        json={
+            "priority": "HIGH",
+            "first_response_target_minutes": 120,
+            "resolution_target_minutes": 540,
+            "business_hours_only": True,
+        },
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 201
+
+    response = client.post(
+        "/api/tickets",
+        json={"title": "営業時間SLA", "description": "test", "priority": "HIGH"},
+        headers=auth_headers_user
+    )
+    ticket = db_session.query(Ticket).filter(Ticket.id == response.json()["id"]).first()
+    ticket.created_at = jst(date(2026, 1, 9), 17)  # 金曜17:00
+    db_session.commit()
+
+    response = client.get(f"/api/tickets/{ticket.id}", headers=auth_headers_user)
+    sla = response.json()["sla"]
+    assert sla["first_response_due_at"].startswith(jst(date(2026, 1, 13), 10).isoformat())
+    assert sla["resolution_due_at"].startswith(jst(date(2026, 1, 13), 17).isoformat())
+
+
+def test_business_hours_sla_weekend_wait(client, auth_headers_admin, auth_headers_user, auth_headers_operator,
+                                         db_session):
+    """営業時間SLAでは顧客回答待ちの時間も営業時間で数え、週末の待ちで期限が延びない"""
+    from app.models.ticket import Ticket
+    from app.services import sla_service
+
+    client.post(
+        "/api/admin/sla-settings",
+        json={
+            "priority": "HIGH",
+            "first_response_target_minutes": 120,
+            "resolution_target_minutes": 600,
+            "business_hours_only": True,
+        },
+        headers=auth_headers_admin
+    )
+    response = client.post(
+        "/api/tickets",
+        json={"title": "週末の待ち", "description": "test", "priority": "HIGH"},
+        headers=auth_headers_user
+    )
+    ticket = db_session.query(Ticket).filter(Ticket.id == response.json()["id"]).first()
+    ticket.created_at = jst(date(2026, 1, 9), 17)  # 金曜17:00
+    ticket.status = "WAITING_CUSTOMER"
+    ticket.waiting_customer_started_at = jst(date(2026, 1, 9), 17, 30)
+    db_session.commit()
+
+    # 金曜17:30〜月曜9:30の待ちは営業時間では1時間
+    assert sla_service.waiting_seconds(db_session, ticket, jst(date(2026, 1, 12), 9, 30)) == 3600
+
+    response = client.post(
+        f"/api/tickets/{ticket.id}/transition", json={"status": "IN_PROGRESS"}, headers=auth_headers_operator
+    )
+    paused = response.json()["total_waiting_customer_duration"]
+    calendar = sla_service.calendar_for_policy(db_session, sla_service.get_sla_policies(db_session)["HIGH"])
+    business = calendar.elapsed_between(jst(date(2026, 1, 9), 17, 30), datetime.utcnow())
+    assert business - 120 <= paused <= business
+    sla = response.json()["sla"]
+    assert sla["paused_seconds"] == paused
+    # 経過時間は営業時間から待ち時間を引いたもので、0に切り詰められない
+    elapsed = calendar.elapsed_between(jst(date(2026, 1, 9), 17), datetime.utcnow())
+    assert abs(sla["resolution_elapsed_seconds"] - (elapsed - paused)) <= 120
+    assert sla["resolution_elapsed_seconds"] >= 1800
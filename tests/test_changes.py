@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+from app.services import change_service
+
+
+def _create_ticket(client, headers, title):
+    return client.post(
+        "/api/tickets", json={"title": title, "description": "本文", "priority": "MEDIUM"}, headers=headers,
+    ).json()
+
+
+def _sync(client, headers, cursor, limit=100):
+    """has_more が false になるまでページをたどり、変更と最後のカーソルを返す"""
+    changes = []
+    while True:
+        page = client.get(f"/api/changes?cursor={cursor}&limit={limit}", headers=headers).json()
+        changes.extend(page["changes"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            return changes, cursor
+
+
+def test_change_feed_in_commit_order(client, auth_headers_user, auth_headers_operator, query_budget):
+    """カーソル以降の変更をコミット順に返し、同じページ内の同じエンティティは最新の1件にまとめる"""
+    start = client.get("/api/changes", headers=auth_headers_operator).json()
+    assert start["changes"] == [] and start["has_more"] is False
+
+    ticket = _create_ticket(client, auth_headers_user, "同期")
+    client.post(f"/api/tickets/{ticket['id']}/transition", json={"status": "IN_PROGRESS"}, headers=auth_headers_operator)
+    comment = client.post(
+        f"/api/tickets/{ticket['id']}/comments", json={"content": "内部メモ", "is_internal": True},
+        headers=auth_headers_operator,
+    ).json()
+    article = client.post(
+        "/api/articles", json={"title": "記事", "content": "本文"}, headers=auth_headers_operator,
+    ).json()
+    archived = client.post(
+        "/api/articles", json={"title": "削除", "content": "本文"}, headers=auth_headers_operator,
+    ).json()
+    client.delete(f"/api/articles/{archived['id']}", headers=auth_headers_operator)
+
+    with query_budget(8):
+        response = client.get(f"/api/changes?cursor={start['next_cursor']}", headers=auth_headers_operator)
+    page = response.json()
+    assert [(change["entity_type"], change["entity_id"]) for change in page["changes"]] == [
+        ("ticket", ticket["id"]), ("comment", comment["id"]), ("article", article["id"]), ("article", archived["id"]),
+    ]
+    seqs = [change["seq"] for change in page["changes"]]
+    assert seqs == sorted(seqs) and page["next_cursor"] == seqs[-1]
+    assert page["changes"][0]["ticket"]["status"] == "IN_PROGRESS"
+    assert page["changes"][1]["comment"]["content"] == "内部メモ"
+    assert page["changes"][2]["article"]["title"] == "記事"
+    assert page["changes"][3] == {
+        "seq": seqs[3], "entity_type": "article", "entity_id": archived["id"], "deleted": True,
+        "ticket": None, "comment": None, "article": None,
+    }
+
+    # 小さいページでたどっても変更を取りこぼさず、最後は空のページになる
+    changes, cursor = _sync(client, auth_headers_operator, start["next_cursor"], limit=2)
+    assert {change["entity_id"] for change in changes} == {ticket["id"], comment["id"], article["id"], archived["id"]}
+    assert cursor == page["next_cursor"]
+    assert client.get(f"/api/changes?cursor={cursor}", headers=auth_headers_operator).json()["changes"] == []
+
+
+def test_requester_change_feed(client, auth_headers_user, auth_headers_operator, auth_headers_admin):
+    """依頼者には自分のチケットと公開コメント・公開記事の変更だけを返し、非公開になった記事は削除として返す"""
+    cursor = client.get("/api/changes", headers=auth_headers_user).json()["next_cursor"]
+    own = _create_ticket(client, auth_headers_user, "自分の")
+    _create_ticket(client, auth_headers_admin, "他人の")
+    client.post(
+        f"/api/tickets/{own['id']}/comments", json={"content": "内部メモ", "is_internal": True},
+        headers=auth_headers_operator,
+    )
+    reply = client.post(
+        f"/api/tickets/{own['id']}/comments", json={"content": "回答", "is_internal": False},
+        headers=auth_headers_operator,
+    ).json()
+    draft = client.post(
+        "/api/articles", json={"title": "下書き", "content": "本文"}, headers=auth_headers_operator,
+    ).json()
+    article = client.post(
+        "/api/articles", json={"title": "公開", "content": "本文"}, headers=auth_headers_operator,
+    ).json()
+    client.post(f"/api/articles/{article['id']}/publish", headers=auth_headers_operator)
+
+    changes, cursor = _sync(client, auth_headers_user, cursor)
+    assert [(change["entity_type"], change["entity_id"]) for change in changes] == [
+        ("comment", reply["id"]), ("ticket", own["id"]), ("article", article["id"]),
+    ]
+    assert changes[1]["ticket"]["comment_count"] == 1
+    assert draft["id"] not in {change["entity_id"] for change in changes}
+
+    client.post(f"/api/articles/{article['id']}/unpublish", headers=auth_headers_operator)
+    changes, _ = _sync(client, auth_headers_user, cursor)
+    assert [(change["entity_id"], change["deleted"]) for change in changes] == [(article["id"], True)]
+    changes, _ = _sync(client, auth_headers_operator, cursor)
+    assert changes[0]["deleted"] is False and changes[0]["article"]["status"] == "DRAFT"
+
+
+def test_pruned_cursor_expires(client, db_session, auth_headers_user):
+    """保持期間を過ぎて削除された変更より前のカーソルは410を返す"""
+    cursor = client.get("/api/changes", headers=auth_headers_user).json()["next_cursor"]
+    _create_ticket(client, auth_headers_user, "古い")
+    _create_ticket(client, auth_headers_user, "新しい")
+    head = client.get("/api/changes", headers=auth_headers_user).json()["next_cursor"]
+
+    assert change_service.prune_changes(db_session, datetime.utcnow() + timedelta(seconds=1)) == 2
+    assert client.get(f"/api/changes?cursor={cursor}", headers=auth_headers_user).status_code == 410
+    response = client.get(f"/api/changes?cursor={head}", headers=auth_headers_user)
+    assert response.status_code == 200 and response.json()["changes"] == []
+
+    # ログが空になっても、新しく始めるクライアントには有効なカーソルを返す
+    start = client.get("/api/changes", headers=auth_headers_user).json()
+    assert start["next_cursor"] == head
+    response = client.get(f"/api/changes?cursor={start['next_cursor']}", headers=auth_headers_user)
+    assert response.status_code == 200
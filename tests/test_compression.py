@@ -0,0 +1,135 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core import compression, response_cache
+from app.core.compression import CompressionMiddleware, uncompressed
+from app.core.config import settings
+from app.services import dashboard_service
+
+
+def test_negotiate_prefers_configured_order_and_q_values(monkeypatch):
+    """Accept-Encodingのq値と設定の優先順で圧縮方式を選び、使えない方式は選ばない"""
+    monkeypatch.setitem(compression.CODECS, "br", compression.CODECS["gzip"])
+    assert compression.negotiate("gzip, br") == "br"
+    assert compression.negotiate("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert compression.negotiate("identity") is None
+    assert compression.negotiate("*") == "br"
+    assert compression.negotiate("br;q=0, gzip;q=0") is None
+    monkeypatch.delitem(compression.CODECS, "br")
+    assert compression.negotiate("br, gzip;q=0.1") == "gzip"
+    assert compression.negotiate(None) is None
+
+
+def test_large_responses_are_gzipped(client, auth_headers_user, test_sla_settings):
+    """しきい値以上のJSONはgzipで返し、小さいレスポンスや非対応のクライアントには圧縮しない"""
+    for i in range(10):
+        client.post(
+            "/api/tickets", json={"title": f"圧縮{i}", "description": "本文", "priority": "LOW"},
+            headers=auth_headers_user,
+        )
+    response = client.get("/api/tickets", headers={**auth_headers_user, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json()["total"] == 10
+
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/api/tickets", headers={**auth_headers_user, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json()["total"] == 10
+
+
+def test_streams_compressed_unless_opted_out():
+    """ストリーミングはチャンクごとに圧縮し、除外したエンドポイントとSSEは圧縮しない"""
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+    chunks = [b"line %d " % i * 50 for i in range(20)]
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter(chunks), media_type="text/plain")
+
+    @app.get("/raw")
+    @uncompressed
+    def raw():
+        return StreamingResponse(iter(chunks), media_type="text/plain")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter(chunks), media_type="text/event-stream")
+
+    @app.get("/plain")
+    def plain():
+        return PlainTextResponse("x" * 5000)
+
+    with TestClient(app) as test_client:
+        with test_client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw_body = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw_body) == b"".join(chunks)
+
+        for path in ("/raw", "/events"):
+            response = test_client.get(path, headers={"Accept-Encoding": "gzip"})
+            assert "content-encoding" not in response.headers
+            assert response.content == b"".join(chunks)
+
+        response = test_client.get("/plain", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.text == "x" * 5000
+
+
+def test_cached_responses_are_stored_compressed(
+    client, auth_headers_user, auth_headers_operator, db_session, monkeypatch
+):
+    """キャッシュしたレスポンスは圧縮済みの本文を保持し、ヒット時は再圧縮しない"""
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_TTL_SECONDS", 60.0)
+    monkeypatch.setattr(settings, "COMPRESSION_MIN_SIZE", 0)
+    response_cache.clear()
+    client.post(
+        "/api/tickets", json={"title": "集計", "description": "本文", "priority": "HIGH"}, headers=auth_headers_user
+    )
+    headers = {**auth_headers_operator, "Accept-Encoding": "gzip"}
+
+    first = client.get("/api/dashboard/summary", headers=headers)
+    assert first.headers["x-cache"] == "MISS"
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.json()["by_priority"] == {"HIGH": 1}
+
+    compressed = []
+    original = compression.compress
+
+    def counting_compress(data, encoding):
+        compressed.append(encoding)
+        return original(data, encoding)
+
+    monkeypatch.setattr(compression, "compress", counting_compress)
+    second = client.get("/api/dashboard/summary", headers=headers)
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == first.json()
+    assert compressed == []
+    (key, (size, encodings)), = response_cache.entries().items()
+    assert key == "/api/dashboard/summary?"
+    assert encodings == ("gzip",)
+
+    # 圧縮しないクライアントには元の本文を返す
+    third = client.get("/api/dashboard/summary", headers={**auth_headers_operator, "Accept-Encoding": "identity"})
+    assert third.headers["x-cache"] == "HIT"
+    assert "content-encoding" not in third.headers
+    assert third.json() == first.json()
+
+    # 集計を再構築するとキャッシュは破棄される
+    client.post(
+        "/api/tickets", json={"title": "集計2", "description": "本文", "priority": "HIGH"}, headers=auth_headers_user
+    )
+    dashboard_service.rebuild_ticket_counts(db_session)
+    assert response_cache.entries() == {}
+    response = client.get("/api/dashboard/summary", headers=headers)
+    assert response.headers["x-cache"] == "MISS"
+    assert response.json()["by_priority"] == {"HIGH": 2}
+    response_cache.clear()
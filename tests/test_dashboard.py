@@ -0,0 +1,74 @@
+"""Test dashboard endpoints"""
+from app.services import dashboard_service
+
+
+def _create_ticket(client, headers, priority="HIGH"):
+    response = client.post(
+        "/api/tickets",
+        json={"title": "Dashboard Ticket", "description": "Dashboard", "priority": priority},
+        headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_dashboard_summary(client, auth_headers_user, auth_headers_operator, test_operator, test_team):
+    """作成・割り当て・ステータス遷移がダッシュボード集計に反映される"""
+    first = _create_ticket(client, auth_headers_user, priority="HIGH")
+    second = _create_ticket(client, auth_headers_user, priority="LOW")
+    third = _create_ticket(client, auth_headers_user, priority="LOW")
+
+    client.post(
+        f"/api/tickets/{first['id']}/assign",
+        params={"assignee_id": test_operator.id, "assigned_team_id": test_team.id},
+        headers=auth_headers_operator
+    )
+    client.post(
+        f"/api/tickets/{second['id']}/transition",
+        json={"status": "IN_PROGRESS"},
+        headers=auth_headers_operator
+    )
+    client.post(
+        f"/api/tickets/{third['id']}/transition",
+        json={"status": "RESOLVED"},
+        headers=auth_headers_operator
+    )
+
+    response = client.get("/api/dashboard/summary", headers=auth_headers_operator)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert data["by_status"] == {"OPEN": 1, "IN_PROGRESS": 1}
+    assert data["by_priority"] == {"HIGH": 1, "LOW": 1}
+    assignees = {item["assignee_id"]: item for item in data["by_assignee"]}
+    assert assignees[test_operator.id]["assignee_name"] == "Test Operator"
+    assert assignees[test_operator.id]["count"] == 1
+    teams = {item["team_id"]: item["count"] for item in data["by_team"]}
+    assert teams == {test_team.id: 1, None: 1}
+
+    response = client.get("/api/dashboard/summary?include_closed=true", headers=auth_headers_operator)
+    assert response.json()["total"] == 3
+    assert response.json()["by_status"]["RESOLVED"] == 1
+
+
+def test_dashboard_rebuild_matches_incremental(client, auth_headers_user, auth_headers_operator, db_session):
+    """再構築した集計は差分更新の集計と一致する"""
+    for priority in ["LOW", "HIGH", "HIGH"]:
+        ticket = _create_ticket(client, auth_headers_user, priority=priority)
+    client.patch(
+        f"/api/tickets/{ticket['id']}",
+        json={"priority": "URGENT"},
+        headers=auth_headers_operator
+    )
+    incremental = client.get("/api/dashboard/summary", headers=auth_headers_operator).json()
+    assert incremental["by_priority"] == {"LOW": 1, "HIGH": 1, "URGENT": 1}
+
+    assert dashboard_service.rebuild_ticket_counts(db_session) == 3
+    rebuilt = client.get("/api/dashboard/summary", headers=auth_headers_operator).json()
+    assert rebuilt == incremental
+
+
+def test_dashboard_summary_as_requester(client, auth_headers_user):
+    """一般ユーザーはダッシュボード取得不可"""
+    response = client.get("/api/dashboard/summary", headers=auth_headers_user)
+    assert response.status_code == 403
@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.base import Base
+from app.models.comment import Comment
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services import data_generator
+
+NOW = datetime(2026, 6, 1, 12, 0, 0)
+SIZES = dict(users=50, operators=6, admins=1, teams=3, categories=5, tags=10, tickets=300, articles=20, days=60)
+
+
+def _snapshot(db):
+    return db.query(Ticket.id, Ticket.ticket_number, Ticket.title, Ticket.status, Ticket.created_at).order_by(
+        Ticket.ticket_number
+    ).all()
+
+
+def test_generate_is_deterministic_and_consistent(db_session, client, auth_headers_admin):
+    """同じシードからは同じデータが生成され、状態とタイムラインが整合する"""
+    written = data_generator.generate(db_session, seed=7, now=NOW, batch_size=128, **SIZES)
+    assert written["tickets"] == 300
+    assert written["users"] == 57
+    assert db_session.query(Comment).count() == written["comments"]
+
+    other_engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+    Base.metadata.create_all(bind=other_engine)
+    other = sessionmaker(bind=other_engine)()
+    data_generator.generate(other, seed=7, now=NOW, batch_size=300, **SIZES)
+    assert _snapshot(other) == _snapshot(db_session)
+    other.close()
+
+    tickets = db_session.query(Ticket).all()
+    for ticket in tickets:
+        assert ticket.created_at <= NOW
+        if ticket.status == "OPEN":
+            assert ticket.first_response_at is None and ticket.assignee_id is None
+        if ticket.status in ("RESOLVED", "CLOSED"):
+            assert ticket.first_response_at <= ticket.resolved_at <= NOW
+        if ticket.status == "CLOSED":
+            assert ticket.closed_at <= NOW
+    assert {ticket.status for ticket in tickets} >= {"CLOSED", "CANCELED"}
+
+    # 依頼者の分布は偏る（上位1割で半分以上）
+    counts = sorted(
+        (count for _, count in db_session.query(Ticket.requester_id, func.count()).group_by(Ticket.requester_id)),
+        reverse=True,
+    )
+    assert sum(counts[:5]) > 150
+
+    # 生成したユーザーでログインでき、集計も作り直されている
+    response = client.post(
+        "/api/auth/login", json={"email": "operator0001@gen7.example.com", "password": "testpass123"}
+    )
+    assert response.status_code == 200
+    response = client.get("/api/dashboard/summary?include_closed=true", headers=auth_headers_admin)
+    assert response.json()["total"] == 300
+
+
+def test_generate_refuses_existing_seed(db_session):
+    """同じシードのデータが既にあれば生成しない"""
+    import pytest
+
+    data_generator.generate(db_session, seed=3, now=NOW, **{**SIZES, "tickets": 10, "articles": 0})
+    with pytest.raises(ValueError):
+        data_generator.generate(db_session, seed=3, now=NOW, **{**SIZES, "tickets": 10})
+    assert db_session.query(User).filter(User.email.like("%@gen3.example.com")).count() == 57
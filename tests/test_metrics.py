@@ -0,0 +1,209 @@
+"""Test metrics endpoints"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.models.response_time_sketch import ResponseTimeSketch
+from app.models.ticket import Ticket
+from app.services import metrics_service
+from app.services.quantile_sketch import QuantileSketch, RELATIVE_ACCURACY
+
+
+def _create_ticket(client, headers, priority="HIGH"):
+    response = client.post(
+        "/api/tickets",
+        json={"title": "Metrics Ticket", "description": "Metrics", "priority": priority},
+        headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _backdate(db_session, ticket_id, minutes):
+    ticket = db_session.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket.created_at = datetime.utcnow() - timedelta(minutes=minutes)
+    db_session.commit()
+
+
+def test_quantile_sketch_merge():
+    """分割して作ったスケッチをマージしても相対誤差内の分位数になる"""
+    values = np.random.default_rng(0).lognormal(8, 1.5, 20000)
+    left = QuantileSketch().add(values[:10000])
+    right = QuantileSketch.from_bytes(QuantileSketch().add(values[10000:]).to_bytes())
+    merged = left.merge(right)
+    assert merged.count == 20000
+    for estimate, exact in zip(merged.quantiles([0.5, 0.9, 0.99]), np.quantile(values, [0.5, 0.9, 0.99])):
+        assert abs(estimate - exact) / exact < RELATIVE_ACCURACY * 3
+
+
+def test_response_times(client, auth_headers_user, auth_headers_operator, db_session):
+    """初回応答と解決時間の分位数が優先度別に集計される"""
+    _create_ticket(client, auth_headers_user, priority="LOW")
+    tickets = [_create_ticket(client, auth_headers_user, priority="HIGH") for _ in range(3)]
+    for ticket, minutes in zip(tickets, [10, 20, 30]):
+        _backdate(db_session, ticket["id"], minutes)
+        client.post(
+            f"/api/tickets/{ticket['id']}/comments",
+            json={"content": "確認します"},
+            headers=auth_headers_operator
+        )
+    client.post(
+        f"/api/tickets/{ticket['id']}/transition",
+        json={"status": "RESOLVED"},
+        headers=auth_headers_operator
+    )
+
+    response = client.get("/api/metrics/response-times", headers=auth_headers_operator)
+    assert response.status_code == 200
+    groups = response.json()["groups"]
+    assert [group["priority"] for group in groups] == ["HIGH"]
+    first_response = groups[0]["first_response"]
+    assert first_response["count"] == 3
+    assert abs(first_response["p50_seconds"] - 1200) / 1200 < 0.02
+    assert first_response["p99_seconds"] <= 1800
+    assert groups[0]["resolution"]["count"] == 1
+
+    # 月単位のスケッチと日単位のスケッチを組み合わせても同じ件数になる
+    first_of_month = datetime.utcnow().date().replace(day=1)
+    date_from = (first_of_month - timedelta(days=1)).isoformat()
+    date_to = (first_of_month + timedelta(days=62)).isoformat()
+    response = client.get(
+        f"/api/metrics/response-times?from={date_from}&to={date_to}",
+        headers=auth_headers_operator
+    )
+    assert response.json()["groups"][0]["first_response"]["count"] == 3
+
+    # 再構築しても同じ結果になる
+    metrics_service.rebuild_response_time_sketches(db_session)
+    rebuilt = client.get("/api/metrics/response-times", headers=auth_headers_operator).json()["groups"]
+    assert rebuilt == groups
+
+
+def test_response_time_sketch_created_concurrently(db_session, monkeypatch):
+    """スケッチ行を他のトランザクションが先に作成していても値を失わずにマージする"""
+    now = datetime.utcnow()
+    ticket = Ticket(priority="HIGH", created_at=now - timedelta(minutes=10))
+    metrics_service.record_response_time(db_session, ticket, metrics_service.FIRST_RESPONSE, now)
+    db_session.commit()
+
+    # 読み取り時点ではまだ行が無かったことにして、INSERTを競合させる
+    locked = metrics_service._locked_sketch
+    missed = set()
+
+    def racing(db, key):
+        if key not in missed:
+            missed.add(key)
+            return None
+        return locked(db, key)
+
+    monkeypatch.setattr(metrics_service, "_locked_sketch", racing)
+    metrics_service.record_response_time(db_session, ticket, metrics_service.FIRST_RESPONSE, now)
+    db_session.commit()
+
+    sketches = db_session.query(ResponseTimeSketch).all()
+    assert len(sketches) == 2
+    assert [sketch.count for sketch in sketches] == [2, 2]
+    assert all(QuantileSketch.from_bytes(sketch.bins).count == 2 for sketch in sketches)
+
+
+def test_response_times_group_by(client, auth_headers_user, auth_headers_operator):
+    """group_byで日別に集計でき、不正な値は400"""
+    ticket = _create_ticket(client, auth_headers_user)
+    client.post(
+        f"/api/tickets/{ticket['id']}/comments",
+        json={"content": "確認します"},
+        headers=auth_headers_operator
+    )
+    today = datetime.utcnow().date().isoformat()
+
+    response = client.get(
+        f"/api/metrics/response-times?from={today}&to={today}&group_by=priority,day",
+        headers=auth_headers_operator
+    )
+    assert response.status_code == 200
+    groups = response.json()["groups"]
+    assert [(group["priority"], group["day"]) for group in groups] == [("HIGH", today)]
+
+    response = client.get("/api/metrics/response-times?group_by=category", headers=auth_headers_operator)
+    assert response.status_code == 400
+
+
+def test_response_times_as_requester(client, auth_headers_user):
+    """一般ユーザーはメトリクス取得不可"""
+    response = client.get("/api/metrics/response-times", headers=auth_headers_user)
+    assert response.status_code == 403
+
+
+def test_volume(client, auth_headers_user, auth_headers_operator, db_session):
+    """作成・解決・クローズ・再オープン件数が時間バケットごとに集計される"""
+    ticket = _create_ticket(client, auth_headers_user, priority="HIGH")
+    _create_ticket(client, auth_headers_user, priority="LOW")
+    for status in ["RESOLVED", "IN_PROGRESS", "RESOLVED", "CLOSED"]:
+        client.post(
+            f"/api/tickets/{ticket['id']}/transition",
+            json={"status": status},
+            headers=auth_headers_operator
+        )
+
+    response = client.get("/api/metrics/volume?bucket=hour", headers=auth_headers_operator)
+    assert response.status_code == 200
+    buckets = response.json()["buckets"]
+    totals = {key: sum(item[key] for item in buckets) for key in ["created", "resolved", "closed", "reopened"]}
+    assert totals == {"created": 2, "resolved": 2, "closed": 1, "reopened": 1}
+
+    response = client.get(
+        "/api/metrics/volume?bucket=week&group_by=priority", headers=auth_headers_operator
+    )
+    by_priority = {item["priority"]: item for item in response.json()["buckets"]}
+    assert by_priority["HIGH"]["resolved"] == 2
+    assert by_priority["LOW"]["created"] == 1
+    assert datetime.fromisoformat(by_priority["HIGH"]["bucket_start"]).weekday() == 0
+
+    # 監査ログからのバックフィルは差分更新と一致する
+    daily = client.get("/api/metrics/volume?bucket=day", headers=auth_headers_operator).json()["buckets"]
+    assert metrics_service.backfill_volume_rollups(db_session) == 1
+    rebuilt = client.get("/api/metrics/volume?bucket=day", headers=auth_headers_operator).json()["buckets"]
+    assert rebuilt == daily
+
+
+def test_volume_weeks_cross_boundary(db_session):
+    """週単位の集計は月曜始まりで、範囲の両端の週も丸ごと数える"""
+    ticket = Ticket(priority="HIGH")
+    # 2026-03-02と03-09は月曜、03-08は日曜
+    for day in (2, 8, 9, 12):
+        metrics_service.record_volume(db_session, ticket, "created", datetime(2026, 3, day, 23, 30))
+    db_session.commit()
+
+    buckets = metrics_service.get_volume(
+        db_session, datetime(2026, 3, 4, 12), datetime(2026, 3, 10, 12), bucket="week"
+    )
+    assert [(item["bucket_start"], item["created"]) for item in buckets] == [
+        (datetime(2026, 3, 2), 2), (datetime(2026, 3, 9), 2),
+    ]
+    # 月曜0時ちょうどまでの範囲は、その週を含まない
+    buckets = metrics_service.get_volume(
+        db_session, datetime(2026, 3, 8), datetime(2026, 3, 9), bucket="week"
+    )
+    assert [(item["bucket_start"], item["created"]) for item in buckets] == [(datetime(2026, 3, 2), 2)]
+
+
+def test_volume_hours_unaligned_range(db_session):
+    """時間単位の集計も、範囲の始まりを含む時間のバケットを丸ごと数える"""
+    ticket = Ticket(priority="HIGH")
+    for minute in (5, 40):
+        metrics_service.record_volume(db_session, ticket, "created", datetime(2026, 3, 2, 9, minute))
+    metrics_service.record_volume(db_session, ticket, "created", datetime(2026, 3, 2, 10, 15))
+    db_session.commit()
+
+    buckets = metrics_service.get_volume(
+        db_session, datetime(2026, 3, 2, 9, 30), datetime(2026, 3, 2, 10, 30), bucket="hour"
+    )
+    assert [(item["bucket_start"], item["created"]) for item in buckets] == [
+        (datetime(2026, 3, 2, 9), 2), (datetime(2026, 3, 2, 10), 1),
+    ]
+
+
+def test_volume_invalid_bucket(client, auth_headers_operator):
+    """不正なバケット指定は422"""
+    response = client.get("/api/metrics/volume?bucket=month", headers=auth_headers_operator)
+    assert response.status_code == 422
@@ -0,0 +1,72 @@
+import time
+
+from app.core import profiling
+from app.core.config import settings
+from app.services import ticket_service
+
+get_tickets = ticket_service.get_tickets
+
+
+def _slow(function, seconds):
+    def wrapper(*args, **kwargs):
+        time.sleep(seconds)
+        return function(*args, **kwargs)
+    return wrapper
+
+
+def test_on_demand_profile(client, auth_headers_admin, monkeypatch):
+    """管理者がX-Profileヘッダーを付けたリクエストはフレームグラフ形式でプロファイルが保存される"""
+    profiling.reset()
+    monkeypatch.setattr(ticket_service, "get_tickets", _slow(get_tickets, 0.05))
+    response = client.get("/api/tickets", headers={**auth_headers_admin, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    listed = client.get("/api/admin/profiles", headers=auth_headers_admin).json()
+    assert listed[0]["id"] == profile_id
+    assert listed[0]["mode"] == "on-demand"
+    assert listed[0]["route"] == "/api/tickets"
+    assert listed[0]["status"] == 200
+    assert listed[0]["samples"] > 0
+
+    folded = client.get(f"/api/admin/profiles/{profile_id}", headers=auth_headers_admin).text
+    lines = folded.splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    # スレッドプールで動くエンドポイントからの呼び出し階層がスタックとして記録される
+    assert any(
+        line.startswith("[threadpool];")
+        and "app.routers.tickets.list_tickets;" in line
+        and line.rsplit(" ", 1)[0].endswith("_slow.<locals>.wrapper")
+        for line in lines
+    )
+
+
+def test_profile_requires_admin(client, auth_headers_operator, auth_headers_admin, monkeypatch):
+    """管理者以外のリクエストはプロファイルを要求してもサンプリングが始まらず、保存もされない"""
+    profiling.reset()
+    started = []
+    start = profiling._start
+    monkeypatch.setattr(profiling, "_start", lambda profile: (started.append(profile), start(profile)))
+    assert client.get("/api/tickets", headers={"X-Profile": "1"}).status_code in (401, 403)
+    response = client.get("/api/tickets?profile=1", headers=auth_headers_operator)
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert started == []
+    assert client.get("/api/admin/profiles", headers=auth_headers_admin).json() == []
+    assert client.get("/api/admin/profiles", headers=auth_headers_operator).status_code == 403
+
+
+def test_sampled_profiles_keep_slowest(client, auth_headers_operator, auth_headers_admin, monkeypatch):
+    """ランダムサンプリングでは最も遅いN件だけが残る"""
+    profiling.reset()
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILE_KEEP", 2)
+    for delay in (0.0, 0.03, 0.0, 0.02, 0.0):
+        monkeypatch.setattr(ticket_service, "get_tickets", _slow(get_tickets, delay))
+        client.get("/api/tickets", headers=auth_headers_operator)
+    monkeypatch.setattr(settings, "PROFILE_SAMPLE_RATE", 0.0)
+
+    sampled = client.get("/api/admin/profiles?mode=sampled", headers=auth_headers_admin).json()
+    assert len(sampled) == 2
+    assert sampled[0]["duration_ms"] >= sampled[1]["duration_ms"] >= 20
+
@@ -0,0 +1,60 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.query_stats import QueryStatsMiddleware
+from app.models.user import User
+
+
+def test_query_headers(client, auth_headers_operator, test_sla_settings):
+    """レスポンスにSQL文の数と所要時間のヘッダーが付く"""
+    response = client.get("/api/tickets", headers=auth_headers_operator)
+    assert response.status_code == 200
+    count = int(response.headers["X-DB-Queries"])
+    assert count >= 2
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+    assert f'desc="{count} queries"' in response.headers["Server-Timing"]
+    assert "X-DB-Repeated-Queries" not in response.headers
+
+
+def test_repeated_queries_are_flagged(db_session, caplog):
+    """同じ形のSQL文を繰り返すリクエストはN+1の疑いとして記録される"""
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/n-plus-one")
+    def n_plus_one():
+        for _ in range(12):
+            db_session.query(User).filter(User.email == "nobody@example.com").first()
+        return {}
+
+    with caplog.at_level(logging.WARNING, logger="app.core.query_stats"):
+        response = TestClient(app).get("/n-plus-one")
+    assert response.headers["X-DB-Queries"] == "12"
+    assert response.headers["X-DB-Repeated-Queries"] == "12"
+    assert "Possible N+1 queries in GET /n-plus-one" in caplog.text
+
+
+def test_ticket_endpoint_query_budgets(client, auth_headers_user, auth_headers_operator, test_sla_settings,
+                                       test_tag, query_budget):
+    """主要なチケットAPIの発行SQL数が上限を超えない"""
+    # 変更ログの採番とINSERT（初回は連番の行の作成も）を含む
+    with query_budget(23):
+        response = client.post(
+            "/api/tickets",
+            json={"title": "予算", "description": "クエリ数の確認", "priority": "HIGH", "tags": ["test-tag"]},
+            headers=auth_headers_user,
+        )
+    ticket_id = response.json()["id"]
+
+    with query_budget(3):
+        client.get("/api/tickets", headers=auth_headers_operator)
+    with query_budget(2):
+        client.get(f"/api/tickets/{ticket_id}", headers=auth_headers_operator)
+    # 変更ログの採番とINSERT、初回応答（行バージョンつき）とコメント数の2つのUPDATE、
+    # 応答時間スケッチの日・月の行ごとのINSERT ... ON CONFLICT DO NOTHINGを含む
+    with query_budget(17):
+        client.post(f"/api/tickets/{ticket_id}/comments", json={"content": "確認します"}, headers=auth_headers_operator)
+    with query_budget(3):
+        client.get(f"/api/tickets/{ticket_id}/comments", headers=auth_headers_operator)
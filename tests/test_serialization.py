@@ -0,0 +1,96 @@
+import orjson
+
+from app.core.query_stats import capture_queries
+from app.core.serialization import serializer
+from app.schemas.knowledge_article import ARTICLE_SUMMARY_FIELDS, PaginatedArticleResponse
+from app.schemas.ticket import TICKET_SUMMARY_FIELDS, PaginatedTicketResponse
+from app.services import article_service, sla_service, ticket_service
+
+
+def test_fast_path_matches_validated_json(
+    client, db_session, auth_headers_user, auth_headers_operator, test_category, test_tag, test_sla_settings
+):
+    """検証を省いたシリアライズがレスポンスモデルで検証した場合と同じJSONを返す"""
+    for priority in ("LOW", "URGENT"):
+        client.post(
+            "/api/tickets",
+            json={"title": "一覧", "description": "高速化", "priority": priority, "category_id": test_category.id,
+                  "tags": ["test-tag", "新しいタグ"]},
+            headers=auth_headers_user,
+        )
+    client.post(
+        "/api/articles",
+        json={"title": "記事", "content": "本文", "category_id": test_category.id, "tags": ["test-tag"]},
+        headers=auth_headers_operator,
+    )
+
+    tickets = ticket_service.get_tickets(db_session)
+    sla_service.attach_sla(db_session, tickets)
+    page = {"items": tickets, "total": len(tickets), "skip": 0, "limit": 25}
+    tickets_serializer = serializer(PaginatedTicketResponse)
+    dumped = tickets_serializer.dump(page)
+    assert len(dumped["items"][0]["tags"]) == 2
+    assert dumped["items"][0]["category"]["name"] == "Test Category"
+    assert orjson.dumps(dumped) == tickets_serializer.dump_validated(page)
+
+    articles = article_service.get_articles(db_session)
+    page = {"items": articles, "total": len(articles), "skip": 0, "limit": 25}
+    articles_serializer = serializer(PaginatedArticleResponse)
+    assert orjson.dumps(articles_serializer.dump(page)) == articles_serializer.dump_validated(page)
+
+
+def test_list_endpoints_return_json(client, auth_headers_user, test_sla_settings):
+    """一覧APIはorjsonで組み立てたJSONを返す"""
+    client.post(
+        "/api/tickets", json={"title": "一覧", "description": "JSON", "priority": "HIGH"}, headers=auth_headers_user
+    )
+    response = client.get("/api/tickets", headers=auth_headers_user)
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["total"] == 1
+    assert body["items"][0]["requester"]["email"] == "user@example.com"
+    assert body["items"][0]["sla"]["first_response_state"] == "ON_TRACK"
+
+
+def test_ticket_list_fields_are_projected_in_sql(client, auth_headers_user, auth_headers_operator, test_sla_settings):
+    """fields指定の一覧は指定項目だけを返し、descriptionや不要な関連はSQLで読み込まない"""
+    client.post(
+        "/api/tickets", json={"title": "射影", "description": "長い本文" * 100, "priority": "LOW"},
+        headers=auth_headers_user,
+    )
+    with capture_queries() as statements:
+        response = client.get("/api/tickets?fields=title,status", headers=auth_headers_operator)
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert set(item) == {"id", "title", "status"}
+    assert item["title"] == "射影"
+    ticket_selects = [s for s in statements if "FROM tickets" in s and "count(" not in s]
+    assert ticket_selects
+    assert all("tickets.description" not in s and "JOIN users" not in s for s in ticket_selects)
+
+    response = client.get("/api/tickets?view=summary", headers=auth_headers_operator)
+    assert set(response.json()["items"][0]) == set(TICKET_SUMMARY_FIELDS)
+
+    # SLAを指定したときだけSLAの計算に必要な列を読む
+    response = client.get("/api/tickets?fields=sla", headers=auth_headers_operator)
+    assert response.json()["items"][0]["sla"]["first_response_state"] == "ON_TRACK"
+
+    response = client.get("/api/tickets?fields=title,secret", headers=auth_headers_operator)
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
+
+
+def test_article_list_summary_skips_content(client, auth_headers_operator, test_category):
+    """記事一覧のsummaryは本文を読み込まずに返す"""
+    client.post(
+        "/api/articles", json={"title": "記事", "content": "本文" * 500, "category_id": test_category.id},
+        headers=auth_headers_operator,
+    )
+    with capture_queries() as statements:
+        response = client.get("/api/articles?view=summary", headers=auth_headers_operator)
+    item = response.json()["items"][0]
+    assert set(item) == set(ARTICLE_SUMMARY_FIELDS)
+    assert all("knowledge_articles.content" not in s for s in statements)
+
+    response = client.get("/api/articles?fields=title,tags", headers=auth_headers_operator)
+    assert set(response.json()["items"][0]) == {"id", "title", "tags"}
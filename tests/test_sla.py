@@ -0,0 +1,259 @@
+"""Test SLA status endpoints"""
+from datetime import datetime, timedelta
+
+from app.models.ticket import Ticket
+from app.services import sla_service
+
+
+def _create_ticket(client, headers, priority="HIGH"):
+    response = client.post(
+        "/api/tickets",
+        json={"title": "SLA Ticket", "description": "SLA", "priority": priority},
+        headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _backdate(db_session, ticket_id, minutes):
+    ticket = db_session.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket.created_at = datetime.utcnow() - timedelta(minutes=minutes)
+    sla_service.apply_due_dates(db_session, ticket)
+    db_session.commit()
+
+
+def test_ticket_includes_sla(client, auth_headers_user, test_sla_settings):
+    """チケット詳細にSLA情報が含まれる"""
+    ticket = _create_ticket(client, auth_headers_user, priority="HIGH")
+    assert ticket["sla"]["first_response_state"] == "ON_TRACK"
+    # HIGH: 初回応答60分
+    assert 3500 < ticket["sla"]["first_response_remaining_seconds"] <= 3600
+
+
+def test_ticket_without_sla_settings(client, auth_headers_user):
+    """SLA設定がない優先度ではSLA情報はnull"""
+    ticket = _create_ticket(client, auth_headers_user)
+    assert ticket["sla"] is None
+
+
+def test_sla_status_breached(client, auth_headers_user, auth_headers_operator, db_session, test_sla_settings):
+    """SLA違反チケットが集計され、緊急度順に並ぶ"""
+    breached = _create_ticket(client, auth_headers_user, priority="HIGH")
+    on_track = _create_ticket(client, auth_headers_user, priority="LOW")
+    _backdate(db_session, breached["id"], minutes=90)
+
+    response = client.get("/api/sla/status", headers=auth_headers_operator)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert data["first_response_breached"] == 1
+    assert data["by_priority"]["HIGH"]["first_response_breached"] == 1
+    assert [item["ticket_id"] for item in data["items"]] == [breached["id"], on_track["id"]]
+
+    response = client.get("/api/sla/status?breached_only=true", headers=auth_headers_operator)
+    assert [item["ticket_id"] for item in response.json()["items"]] == [breached["id"]]
+
+
+def test_sla_paused_while_waiting_customer(client, auth_headers_user, auth_headers_operator, db_session, test_sla_settings):
+    """顧客回答待ちの間はSLAが一時停止する"""
+    ticket = _create_ticket(client, auth_headers_user, priority="HIGH")
+    response = client.post(
+        f"/api/tickets/{ticket['id']}/transition",
+        json={"status": "WAITING_CUSTOMER"},
+        headers=auth_headers_operator
+    )
+    assert response.status_code == 200
+    assert response.json()["sla"]["resolution_state"] == "PAUSED"
+
+    response = client.get("/api/sla/status", headers=auth_headers_operator)
+    data = response.json()
+    assert data["paused"] == 1
+    assert data["items"] == []
+
+
+def test_sla_status_as_requester(client, auth_headers_user):
+    """一般ユーザーはSLAステータス取得不可"""
+    response = client.get("/api/sla/status", headers=auth_headers_user)
+    assert response.status_code == 403
+
+
+def test_breach_scheduler_fires_events(client, auth_headers_user, auth_headers_operator, db_session, test_sla_settings):
+    """期限を過ぎたチケットのSLA違反イベントが記録される"""
+    from app.services.sla_scheduler import SLABreachScheduler, FIRST_RESPONSE
+
+    breached = _create_ticket(client, auth_headers_user, priority="HIGH")
+    _create_ticket(client, auth_headers_user, priority="LOW")
+    _backdate(db_session, breached["id"], minutes=90)
+
+    scheduler = SLABreachScheduler()
+    assert scheduler.rebuild(db_session) == 4
+    events = scheduler.fire_due(db_session)
+    assert [(event.ticket_id, event.kind) for event in events] == [(breached["id"], FIRST_RESPONSE)]
+
+    # 再構築しても同じ違反は二重に記録されない
+    scheduler.rebuild(db_session)
+    assert scheduler.fire_due(db_session) == []
+
+    response = client.get("/api/sla/breaches", headers=auth_headers_operator)
+    assert response.status_code == 200
+    assert [item["ticket_id"] for item in response.json()] == [breached["id"]]
+
+    # 他のワーカーが先に記録した違反は飛ばし、同じ回の他の違反はそのまま記録する
+    from app.models.sla_breach_event import SLABreachEvent
+    recorded, missed = (_create_ticket(client, auth_headers_user, priority="HIGH") for _ in range(2))
+    for ticket in (recorded, missed):
+        _backdate(db_session, ticket["id"], minutes=90)
+    scheduler.rebuild(db_session)
+    db_session.add(SLABreachEvent(
+        id="other-worker", ticket_id=recorded["id"], kind=FIRST_RESPONSE, priority="HIGH",
+        due_at=datetime.utcnow(), detected_at=datetime.utcnow(),
+    ))
+    db_session.commit()
+    events = scheduler.fire_due(db_session)
+    assert [(event.ticket_id, event.kind) for event in events] == [(missed["id"], FIRST_RESPONSE)]
+
+
+def test_breach_scheduler_follows_ticket_events(client, auth_headers_user, auth_headers_operator, db_session, test_sla_settings):
+    """初回応答・顧客回答待ちでスケジュールが更新される"""
+    from app.services.sla_scheduler import SLABreachScheduler
+
+    created = _create_ticket(client, auth_headers_user, priority="HIGH")
+    ticket = db_session.query(Ticket).filter(Ticket.id == created["id"]).first()
+    scheduler = SLABreachScheduler()
+    scheduler.update_ticket(ticket)
+    assert len(scheduler) == 2
+
+    # オペレーターの公開コメントで初回応答が記録される
+    response = client.post(
+        f"/api/tickets/{created['id']}/comments",
+        json={"content": "確認します"},
+        headers=auth_headers_operator
+    )
+    assert response.status_code == 201
+    db_session.refresh(ticket)
+    assert ticket.first_response_at is not None
+    scheduler.update_ticket(ticket)
+    assert len(scheduler) == 1
+
+    # 顧客回答待ちの間は期限がない
+    client.post(
+        f"/api/tickets/{created['id']}/transition",
+        json={"status": "WAITING_CUSTOMER"},
+        headers=auth_headers_operator
+    )
+    db_session.refresh(ticket)
+    scheduler.update_ticket(ticket)
+    assert len(scheduler) == 0
+    assert scheduler.next_due() is None
+
+
+def test_breach_scheduler_reloads_periodically(client, auth_headers_user, db_session, test_sla_settings,
+                                               monkeypatch):
+    """別プロセス（CLIのインポートなど）で書き込まれた期限も、定期的な再構築で読み込む"""
+    import time
+    from sqlalchemy.orm import sessionmaker
+    from app.core.config import settings
+    from app.services.sla_scheduler import SLABreachScheduler
+
+    monkeypatch.setattr(settings, "SLA_SCHEDULER_REBUILD_SECONDS", 0.05)
+    scheduler = SLABreachScheduler(sessionmaker(bind=db_session.get_bind()))
+    scheduler.start()
+    try:
+        # このスケジューラを経由せずに作られたチケット
+        _create_ticket(client, auth_headers_user, priority="HIGH")
+        deadline = time.monotonic() + 5
+        while len(scheduler) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        scheduler.stop()
+    assert len(scheduler) == 2
+
+
+def test_due_dates_persisted(client, auth_headers_user, auth_headers_operator, test_sla_settings):
+    """SLA期限がチケットに保存され、顧客回答待ちの間は外れる"""
+    ticket = _create_ticket(client, auth_headers_user, priority="HIGH")
+    created_at = datetime.fromisoformat(ticket["created_at"]).replace(microsecond=0)
+    assert datetime.fromisoformat(ticket["first_response_due_at"]) == created_at + timedelta(minutes=60)
+    assert datetime.fromisoformat(ticket["resolution_due_at"]) == created_at + timedelta(minutes=480)
+    assert ticket["sla_due_at"] == ticket["first_response_due_at"]
+
+    response = client.post(
+        f"/api/tickets/{ticket['id']}/transition",
+        json={"status": "WAITING_CUSTOMER"},
+        headers=auth_headers_operator
+    )
+    data = response.json()
+    assert data["first_response_due_at"] is None
+    assert data["sla_due_at"] is None
+
+    response = client.post(
+        f"/api/tickets/{ticket['id']}/transition",
+        json={"status": "IN_PROGRESS"},
+        headers=auth_headers_operator
+    )
+    data = response.json()
+    assert datetime.fromisoformat(data["sla_due_at"]) >= created_at + timedelta(minutes=60)
+
+
+def test_due_dates_follow_priority(client, auth_headers_user, auth_headers_operator, test_sla_settings):
+    """優先度変更でSLA期限が再計算される"""
+    ticket = _create_ticket(client, auth_headers_user, priority="LOW")
+    response = client.patch(
+        f"/api/tickets/{ticket['id']}",
+        json={"priority": "URGENT"},
+        headers=auth_headers_operator
+    )
+    assert response.status_code == 200
+    created_at = datetime.fromisoformat(ticket["created_at"]).replace(microsecond=0)
+    assert datetime.fromisoformat(response.json()["sla_due_at"]) == created_at + timedelta(minutes=15)
+
+
+def test_due_dates_recomputed_on_settings_update(
+    client, auth_headers_user, auth_headers_admin, db_session, test_sla_settings
+):
+    """SLA設定の変更で未完了チケットの期限が一括再計算される"""
+    tickets = [_create_ticket(client, auth_headers_user, priority="HIGH") for _ in range(3)]
+    high = next(sla for sla in test_sla_settings if sla.priority == "HIGH")
+
+    response = client.patch(
+        f"/api/admin/sla-settings/{high.id}",
+        json={"first_response_target_minutes": 30},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == 200
+
+    db_session.expire_all()
+    for ticket in tickets:
+        stored = db_session.query(Ticket).filter(Ticket.id == ticket["id"]).first()
+        assert stored.first_response_due_at == stored.created_at.replace(microsecond=0) + timedelta(minutes=30)
+        assert stored.sla_due_at == stored.first_response_due_at
+
+
+def test_list_tickets_sorted_by_sla_due(client, auth_headers_user, auth_headers_operator, test_sla_settings):
+    """sort=sla_dueで期限の近い順に並び、期限のないチケットは最後になる"""
+    low = _create_ticket(client, auth_headers_user, priority="LOW")
+    urgent = _create_ticket(client, auth_headers_user, priority="URGENT")
+    high = _create_ticket(client, auth_headers_user, priority="HIGH")
+    client.post(
+        f"/api/tickets/{urgent['id']}/transition",
+        json={"status": "WAITING_CUSTOMER"},
+        headers=auth_headers_operator
+    )
+
+    response = client.get("/api/tickets?sort=sla_due", headers=auth_headers_operator)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()["items"]] == [high["id"], low["id"], urgent["id"]]
+
+    # 期限のあるチケットとないチケットの境目をまたいでページングしても同じ順になる
+    pages = [
+        client.get(f"/api/tickets?sort=sla_due&skip={skip}&limit=1", headers=auth_headers_operator).json()
+        for skip in range(4)
+    ]
+    assert [item["id"] for page in pages for item in page["items"]] == [high["id"], low["id"], urgent["id"]]
+    assert pages[0]["total"] == 3
+
+    response = client.get("/api/tickets?sort=sla_due&status=OPEN", headers=auth_headers_operator)
+    assert [item["id"] for item in response.json()["items"]] == [high["id"], low["id"]]
+
+    response = client.get("/api/tickets?sort=unknown", headers=auth_headers_operator)
+    assert response.status_code == 422
@@ -0,0 +1,46 @@
+import logging
+
+from app.core import slow_queries
+from app.core.config import settings
+
+
+def test_slow_queries_are_logged_and_listed(
+    client, auth_headers_user, auth_headers_operator, auth_headers_admin, test_sla_settings, monkeypatch, caplog
+):
+    """しきい値を超えたSQL文が実行計画付きで記録され、合計時間順に一覧できる"""
+    client.post(
+        "/api/tickets", json={"title": "遅い", "description": "一覧", "priority": "HIGH"}, headers=auth_headers_user
+    )
+    slow_queries.reset()
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.0001)
+    with caplog.at_level(logging.WARNING, logger="app.core.slow_queries"):
+        client.get("/api/tickets?status=OPEN&priority=HIGH", headers=auth_headers_operator)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0.0)
+
+    assert "Slow query" in caplog.text
+    assert "from GET /api/tickets in ticket_service.get_tickets" in caplog.text
+
+    response = client.get("/api/admin/slow-queries", headers=auth_headers_admin)
+    assert response.status_code == 200
+    entries = response.json()
+    totals = [entry["total_ms"] for entry in entries]
+    assert totals == sorted(totals, reverse=True)
+    tickets = next(entry for entry in entries if "ticket_service.get_tickets" in entry["services"])
+    assert tickets["routes"] == {"GET /api/tickets": tickets["count"]}
+    assert tickets["statement"].startswith("SELECT")
+    # パラメータは型だけが記録される
+    assert "str" in tickets["parameters"] and "OPEN" not in tickets["parameters"]
+    assert tickets["plan"] and ("SCAN" in tickets["plan"] or "SEARCH" in tickets["plan"])
+
+    assert client.get("/api/admin/slow-queries", headers=auth_headers_operator).status_code == 403
+    assert client.delete("/api/admin/slow-queries", headers=auth_headers_admin).status_code == 204
+    assert client.get("/api/admin/slow-queries", headers=auth_headers_admin).json() == []
+
+
+def test_fingerprint_collapses_in_lists():
+    """IN句のプレースホルダー数が違っても同じフィンガープリントになる"""
+    assert slow_queries.fingerprint("SELECT * FROM t WHERE id IN (?, ?)") == slow_queries.fingerprint(
+        "SELECT *\n  FROM t WHERE id IN (?, ?, ?, ?)"
+    )
+    assert slow_queries.parameter_shapes(("a", "b", "c", 1, None)) == "(str*3, int, NULL)"
+    assert slow_queries.parameter_shapes([(1,), (2,)], executemany=True) == "2 x (int)"
@@ -0,0 +1,190 @@
+import asyncio
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core import events
+from app.core.config import settings
+from app.routers.stream import event_stream
+
+
+def _token(headers):
+    return headers["Authorization"].split()[1]
+
+
+def _wait_until_unsubscribed():
+    # TestClientはWebSocketを閉じた後、サーバー側の終了を待たずに戻る
+    deadline = time.monotonic() + 5
+    while events.broker.connections() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return events.broker.connections()
+
+
+def test_requester_stream_only_has_own_public_events(client, auth_headers_user, auth_headers_operator):
+    """依頼者には自分のチケットの公開イベントと公開記事のイベントだけが届く"""
+    with client.websocket_connect(f"/api/stream/ws?access_token={_token(auth_headers_user)}") as ws:
+        assert ws.receive_json()["type"] == "ready"
+
+        ticket = client.post(
+            "/api/tickets", json={"title": "配信", "description": "本文", "priority": "HIGH"},
+            headers=auth_headers_user,
+        ).json()
+        message = ws.receive_json()
+        assert message["type"] == "ticket.created"
+        assert message["data"]["ticket_id"] == ticket["id"]
+        assert message["data"]["status"] == "OPEN"
+
+        client.post(
+            f"/api/tickets/{ticket['id']}/comments",
+            json={"content": "内部メモ", "is_internal": True}, headers=auth_headers_operator,
+        )
+        client.post(
+            f"/api/tickets/{ticket['id']}/comments",
+            json={"content": "回答です", "is_internal": False}, headers=auth_headers_operator,
+        )
+        message = ws.receive_json()
+        assert message["type"] == "comment.created"
+        assert message["data"]["is_internal"] is False
+        # 公開コメントでチケットのコメント数・最終活動日時も変わる
+        message = ws.receive_json()
+        assert message["type"] == "ticket.updated"
+        assert message["data"]["ticket_id"] == ticket["id"]
+
+        article = client.post(
+            "/api/articles", json={"title": "下書き", "content": "本文"}, headers=auth_headers_operator,
+        ).json()
+        client.post(f"/api/articles/{article['id']}/publish", headers=auth_headers_operator)
+        message = ws.receive_json()
+        assert message["type"] == "article.published"
+        assert message["data"]["article_id"] == article["id"]
+    assert _wait_until_unsubscribed() == 0
+
+
+def test_operator_stream_filters_and_auth(client, auth_headers_user, auth_headers_operator):
+    """購読フィルタに合うイベントだけが届き、不正なトークンは接続を拒否する"""
+    with pytest.raises(WebSocketDisconnect) as refused:
+        with client.websocket_connect("/api/stream/ws?access_token=invalid") as ws:
+            ws.receive_json()
+    assert refused.value.code == 1008
+
+    tickets = [
+        client.post(
+            "/api/tickets", json={"title": f"フィルタ{i}", "description": "本文", "priority": "LOW"},
+            headers=auth_headers_user,
+        ).json()
+        for i in range(2)
+    ]
+    url = f"/api/stream/ws?access_token={_token(auth_headers_operator)}&types=comment&ticket_id={tickets[1]['id']}"
+    with client.websocket_connect(url) as ws:
+        assert ws.receive_json()["type"] == "ready"
+        client.patch(f"/api/tickets/{tickets[1]['id']}", json={"priority": "HIGH"}, headers=auth_headers_operator)
+        for ticket in tickets:
+            client.post(
+                f"/api/tickets/{ticket['id']}/comments",
+                json={"content": "内部メモ", "is_internal": True}, headers=auth_headers_operator,
+            )
+        message = ws.receive_json()
+        assert message["type"] == "comment.created"
+        assert message["data"]["ticket_id"] == tickets[1]["id"]
+        assert message["data"]["is_internal"] is True
+
+
+def test_filters_match_previous_values(client, auth_headers_user, auth_headers_operator):
+    """フィルタは変更前の値にも一致し、フィルタから外れた変更も届く。コメントはチケットの値で絞り込まれる"""
+    ticket = client.post(
+        "/api/tickets", json={"title": "移動", "description": "本文", "priority": "LOW"},
+        headers=auth_headers_user,
+    ).json()
+    url = f"/api/stream/ws?access_token={_token(auth_headers_operator)}&status=OPEN"
+    with client.websocket_connect(url) as ws:
+        assert ws.receive_json()["type"] == "ready"
+        client.post(
+            f"/api/tickets/{ticket['id']}/comments",
+            json={"content": "内部メモ", "is_internal": True}, headers=auth_headers_operator,
+        )
+        message = ws.receive_json()
+        assert message["type"] == "comment.created"
+        assert message["data"]["status"] == "OPEN"
+
+        client.post(
+            f"/api/tickets/{ticket['id']}/transition",
+            json={"status": "IN_PROGRESS"}, headers=auth_headers_operator,
+        )
+        message = ws.receive_json()
+        assert message["type"] == "ticket.status_changed"
+        assert message["data"]["status"] == "IN_PROGRESS"
+        assert message["data"]["previous"] == {"status": "OPEN"}
+
+        # OPENでなくなったチケットの変更はもう届かない
+        client.patch(f"/api/tickets/{ticket['id']}", json={"priority": "HIGH"}, headers=auth_headers_operator)
+        client.post(
+            "/api/tickets/bulk",
+            json={"ticket_ids": [ticket["id"]], "operation": "transition", "status": "OPEN"},
+            headers=auth_headers_operator,
+        )
+        message = ws.receive_json()
+        assert message["type"] == "ticket.status_changed"
+        assert message["data"]["previous"] == {"status": "IN_PROGRESS"}
+
+
+def test_slow_subscriber_is_told_to_resync(monkeypatch):
+    """バッファがあふれた購読は溜まったイベントを捨ててresyncを通知され、その後は通常どおり受け取る"""
+    monkeypatch.setattr(settings, "STREAM_BUFFER_SIZE", 3)
+
+    def event(number):
+        return events.Event(type="ticket.updated", data={"ticket_id": str(number)})
+
+    async def scenario():
+        subscription = events.Subscription("op", operator=True)
+        assert events.broker.subscribe(subscription)
+        try:
+            events.publish(*(event(i) for i in range(5)))
+            pending, resync = await subscription.next(1)
+            assert resync and subscription.dropped == 3
+            assert [e.data["ticket_id"] for e in pending] == ["4"]
+
+            events.publish(event(5))
+            pending, resync = await subscription.next(1)
+            assert not resync
+            assert [e.data["ticket_id"] for e in pending] == ["5"]
+            assert await subscription.next(0.01) is None
+        finally:
+            events.broker.unsubscribe(subscription)
+
+    asyncio.run(scenario())
+
+
+def test_sse_stream(client, auth_headers_user, monkeypatch):
+    """SSEは認証と接続数の上限を確認し、イベントとキープアライブをフレームで送る"""
+    assert client.get("/api/stream").status_code == 401
+    monkeypatch.setattr(settings, "STREAM_MAX_CONNECTIONS", 0)
+    response = client.get(f"/api/stream?access_token={_token(auth_headers_user)}")
+    assert response.status_code == 503
+    monkeypatch.setattr(settings, "STREAM_MAX_CONNECTIONS", 10)
+    monkeypatch.setattr(settings, "STREAM_HEARTBEAT_SECONDS", 0.01)
+
+    async def scenario():
+        stream = event_stream(events.Subscription("user-1", operator=False))
+        ready = await stream.__anext__()
+        assert ready.startswith(b"retry: 5000\nevent: ready\n")
+        assert events.broker.connections() == 1
+        assert await stream.__anext__() == b": keepalive\n\n"
+
+        events.publish(
+            events.Event(type="ticket.updated", data={"ticket_id": "t1"}, audience=events.REQUESTER,
+                         requester_id="user-2"),
+            events.Event(type="ticket.updated", data={"ticket_id": "t2"}, audience=events.REQUESTER,
+                         requester_id="user-1"),
+        )
+        frame = await stream.__anext__()
+        assert frame == b'event: ticket.updated\ndata: {"ticket_id":"t2"}\n\n'
+
+        # 変更ログに記録されたイベントは連番をidとして送る
+        numbered = events.Event(type="ticket.updated", data={"ticket_id": "t3"}, audience=events.EVERYONE, id=42)
+        events.publish(numbered)
+        assert await stream.__anext__() == b'id: 42\nevent: ticket.updated\ndata: {"ticket_id":"t3"}\n\n'
+        await stream.aclose()
+        assert events.broker.connections() == 0
+
+    asyncio.run(scenario())
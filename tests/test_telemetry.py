@@ -0,0 +1,70 @@
+import re
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from app.core import telemetry
+from benchmarks import middleware
+
+
+def _value(text, name, **labels):
+    """Prometheus形式のテキストから1系列の値を取り出す"""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = "^" + re.escape(f"{name}{{{label_text}}}" if labels else name) + r" (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_metrics_endpoint(client, auth_headers_user, test_sla_settings):
+    """ルートテンプレート・ステータスコードごとのリクエスト数とレイテンシを返す"""
+    telemetry.reset()
+    response = client.post(
+        "/api/tickets", json={"title": "計測", "description": "メトリクス", "priority": "HIGH"},
+        headers=auth_headers_user,
+    )
+    ticket_id = response.json()["id"]
+    client.get(f"/api/tickets/{ticket_id}", headers=auth_headers_user)
+    client.get(f"/api/tickets/{ticket_id}", headers=auth_headers_user)
+    client.get("/api/tickets/missing", headers=auth_headers_user)
+    client.get("/no-such-path")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    route = "/api/tickets/{ticket_id}"
+    assert _value(text, "helpdesk_http_requests_total", method="GET", route=route, status=200) == 2
+    assert _value(text, "helpdesk_http_requests_total", method="GET", route=route, status=404) == 1
+    assert _value(text, "helpdesk_http_requests_total", method="POST", route="/api/tickets", status=201) == 1
+    assert _value(text, "helpdesk_http_requests_total", method="GET", route="<unmatched>", status=404) == 1
+    assert _value(text, "helpdesk_http_request_duration_seconds_count", method="GET", route=route) == 3
+    assert _value(text, "helpdesk_http_request_duration_seconds_bucket", method="GET", route=route, le="+Inf") == 3
+    # /metrics自身のリクエストは処理中として数えられる
+    assert _value(text, "helpdesk_http_requests_in_flight") == 1
+    assert _value(text, "helpdesk_threadpool_threads_max") > 0
+    assert _value(text, "helpdesk_threadpool_queue_depth") == 0
+    assert _value(text, "helpdesk_cache_requests_total", cache="sla_policies", result="hit") > 0
+    assert 0 < _value(text, "helpdesk_cache_hit_ratio", cache="sla_policies") <= 1
+
+
+def test_pool_checkout_wait_is_recorded(client, monkeypatch):
+    """コネクションプールからの取得時間がヒストグラムに記録される"""
+    # 計測対象のプール一覧はモジュール全体で共有されるため、テスト後に元へ戻す
+    monkeypatch.setattr(telemetry, "_pools", list(telemetry._pools))
+    engine = create_engine("sqlite://", poolclass=QueuePool)
+    telemetry.instrument_pool(engine.pool)
+    before = _value(client.get("/metrics").text, "helpdesk_db_pool_checkout_wait_seconds_count")
+    with engine.connect():
+        pass
+    with engine.connect():
+        pass
+    text = client.get("/metrics").text
+    assert _value(text, "helpdesk_db_pool_checkout_wait_seconds_count") == before + 2
+    assert _value(text, "helpdesk_db_pool_connections_checked_out") == 0
+    engine.dispose()
+
+
+def test_middleware_overhead_within_budget():
+    """計測ミドルウェアの1リクエストあたりのコストが予算内に収まる"""
+    overhead = middleware.measure(iterations=2000, repeats=3)
+    assert overhead["telemetry"] < middleware.OVERHEAD_BUDGET_US
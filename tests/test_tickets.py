@@ -1,5 +1,13 @@
 """Test ticket endpoints"""
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import update
+
+from app.models.audit_log import AuditLog
+from app.models.tag import Tag
+from app.models.ticket import Ticket
+from app.services import routing_service, ticket_bulk_service, ticket_service
 
 
 def test_create_ticket_as_user(client, auth_headers_user, test_category):
@@ -256,3 +264,414 @@ def test_get_ticket_comments(client, auth_headers_user, test_category):
     data = response.json()
     assert len(data) >= 1
     assert data[0]["content"] == "Comment 1"
+
+
+def test_ticket_activity_fields(client, auth_headers_user, auth_headers_operator, db_session):
+    """コメント数と最終活動日時はコメント追加時に更新され、一覧で並べ替えられ、再計算と一致する"""
+    quiet, busy = _create_tickets(client, auth_headers_user, 2)
+    ticket = client.get(f"/api/tickets/{busy}", headers=auth_headers_user).json()
+    assert ticket["comment_count"] == 0
+    assert ticket["last_public_comment_at"] is None
+    assert ticket["last_activity_at"] == ticket["created_at"]
+
+    for content in ("1", "2"):
+        client.post(f"/api/tickets/{busy}/comments", json={"content": content}, headers=auth_headers_user)
+    client.post(
+        f"/api/tickets/{busy}/comments", json={"content": "内部", "is_internal": True}, headers=auth_headers_operator
+    )
+    comments = client.get(f"/api/tickets/{busy}/comments", headers=auth_headers_user).json()
+    ticket = client.get(f"/api/tickets/{busy}", headers=auth_headers_user).json()
+    # 内部コメントは数えない
+    assert ticket["comment_count"] == 2
+    assert ticket["last_public_comment_at"] == comments[-1]["created_at"]
+    assert ticket["last_activity_at"] == comments[-1]["created_at"]
+
+    response = client.get("/api/tickets?sort=comment_count", headers=auth_headers_operator)
+    assert [t["id"] for t in response.json()["items"]] == [busy, quiet]
+    response = client.get("/api/tickets?sort=last_activity", headers=auth_headers_operator)
+    assert [t["id"] for t in response.json()["items"]] == [busy, quiet]
+
+    # ステータス変更も活動として扱う
+    client.post(f"/api/tickets/{quiet}/transition", json={"status": "IN_PROGRESS"}, headers=auth_headers_operator)
+    response = client.get("/api/tickets?view=summary&sort=last_activity", headers=auth_headers_operator)
+    items = response.json()["items"]
+    assert [t["id"] for t in items] == [quiet, busy]
+    assert items[1]["comment_count"] == 2
+
+    expected = {t["id"]: t for t in client.get("/api/tickets", headers=auth_headers_operator).json()["items"]}
+    db_session.execute(update(Ticket).values(comment_count=0, last_public_comment_at=None))
+    db_session.commit()
+    assert ticket_service.backfill_ticket_activity(db_session, batch_size=1) == 2
+    db_session.expire_all()
+    for ticket in client.get("/api/tickets", headers=auth_headers_operator).json()["items"]:
+        for field in ("comment_count", "last_public_comment_at"):
+            assert ticket[field] == expected[ticket["id"]][field]
+        # ステータス変更の時刻は監査ログから復元するため、記録の時刻差だけずれうる
+        drift = datetime.fromisoformat(ticket["last_activity_at"]) - datetime.fromisoformat(
+            expected[ticket["id"]]["last_activity_at"]
+        )
+        assert timedelta(0) <= drift < timedelta(seconds=1)
+
+
+def test_get_ticket_comments_keyset_pages(client, auth_headers_user, auth_headers_operator):
+    """コメント一覧はカーソルでページ送りでき、afterで新着だけを取得できる"""
+    ticket_id = _create_tickets(client, auth_headers_user, 1)[0]
+    for i in range(7):
+        client.post(
+            f"/api/tickets/{ticket_id}/comments",
+            json={"content": f"Comment {i}", "is_internal": i == 3},
+            headers=auth_headers_operator
+        )
+    url = f"/api/tickets/{ticket_id}/comments"
+    everything = [c["id"] for c in client.get(url, headers=auth_headers_operator).json()]
+    assert len(everything) == 7
+
+    pages, cursor = [], None
+    while True:
+        response = client.get(url, params={"limit": 3, "after": cursor}, headers=auth_headers_operator)
+        pages.append([c["id"] for c in response.json()])
+        cursor = response.headers["x-next-cursor"]
+        if response.headers["x-has-more"] == "false":
+            break
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == everything
+
+    # 新着がなければ空のまま同じカーソルを返す
+    response = client.get(url, params={"after": cursor}, headers=auth_headers_operator)
+    assert response.json() == []
+    assert response.headers["x-next-cursor"] == cursor
+
+    client.post(url, json={"content": "New"}, headers=auth_headers_user)
+    response = client.get(url, params={"after": cursor}, headers=auth_headers_operator)
+    assert [c["content"] for c in response.json()] == ["New"]
+
+    # 内部コメントは一般ユーザーのページに含まれない
+    response = client.get(url, params={"limit": 100}, headers=auth_headers_user)
+    assert len(response.json()) == 7
+
+    response = client.get(url, params={"after": "not-a-cursor"}, headers=auth_headers_operator)
+    assert response.status_code == 400
+
+
+def _create_tickets(client, headers, count, priority="HIGH"):
+    ids = []
+    for i in range(count):
+        response = client.post(
+            "/api/tickets",
+            json={"title": f"Bulk Ticket {i}", "description": "Bulk", "priority": priority},
+            headers=headers
+        )
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_bulk_transition(client, auth_headers_user, auth_headers_operator, auth_headers_admin):
+    """一括ステータス遷移は存在しないチケットを個別に失敗として返す"""
+    ticket_ids = _create_tickets(client, auth_headers_user, 3)
+    response = client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ticket_ids + ["missing"], "operation": "transition", "status": "RESOLVED"},
+        headers=auth_headers_operator
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["succeeded"] == 3
+    assert data["failed"] == 1
+    assert data["results"][-1] == {
+        "ticket_id": "missing", "success": False, "status_code": 404, "detail": "Ticket not found"
+    }
+
+    ticket = client.get(f"/api/tickets/{ticket_ids[0]}", headers=auth_headers_operator).json()
+    assert ticket["status"] == "RESOLVED"
+    assert ticket["resolved_at"] is not None
+    assert ticket["last_activity_at"] == ticket["updated_at"] > ticket["created_at"]
+
+    summary = client.get("/api/dashboard/summary?include_closed=true", headers=auth_headers_operator).json()
+    assert summary["by_status"] == {"RESOLVED": 3}
+
+    logs = client.get(
+        f"/api/admin/audit-logs?entity_id={ticket_ids[0]}&action=STATUS_CHANGED",
+        headers=auth_headers_admin
+    ).json()
+    assert logs[0]["meta_data"] == {"old_status": "OPEN", "new_status": "RESOLVED"}
+
+
+def test_bulk_transition_requester_rules(client, auth_headers_user, auth_headers_operator):
+    """一般ユーザーの一括遷移は単体と同じ遷移ルールでチケットごとに判定される"""
+    ticket_ids = _create_tickets(client, auth_headers_user, 2)
+    client.post(
+        f"/api/tickets/{ticket_ids[0]}/transition",
+        json={"status": "RESOLVED"},
+        headers=auth_headers_operator
+    )
+    response = client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ticket_ids, "operation": "transition", "status": "CLOSED"},
+        headers=auth_headers_user
+    )
+    results = response.json()["results"]
+    assert [result["status_code"] for result in results] == [200, 403]
+
+
+def test_bulk_assign_and_tag(client, db_session, auth_headers_user, auth_headers_operator, test_operator, test_team):
+    """一括割り当てと一括タグ付け"""
+    ticket_ids = _create_tickets(client, auth_headers_user, 2)
+    response = client.post(
+        "/api/tickets/bulk",
+        json={
+            "ticket_ids": ticket_ids,
+            "operation": "assign",
+            "assignee_id": test_operator.id,
+            "assigned_team_id": test_team.id,
+        },
+        headers=auth_headers_operator
+    )
+    assert response.json()["succeeded"] == 2
+
+    response = client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ticket_ids, "operation": "tag", "add_tags": ["outage", "network"]},
+        headers=auth_headers_operator
+    )
+    assert response.json()["succeeded"] == 2
+    client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ticket_ids[:1], "operation": "tag", "remove_tags": ["network"]},
+        headers=auth_headers_operator
+    )
+
+    first = client.get(f"/api/tickets/{ticket_ids[0]}", headers=auth_headers_operator).json()
+    second = client.get(f"/api/tickets/{ticket_ids[1]}", headers=auth_headers_operator).json()
+    assert first["assignee_id"] == test_operator.id
+    assert [tag["name"] for tag in first["tags"]] == ["outage"]
+    assert sorted(tag["name"] for tag in second["tags"]) == ["network", "outage"]
+
+    # 該当するチケットがなければタグも作らない
+    response = client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ["missing"], "operation": "tag", "add_tags": ["orphan"]},
+        headers=auth_headers_operator
+    )
+    assert response.json()["results"][0]["status_code"] == 404
+    assert db_session.query(Tag).filter(Tag.name == "orphan").count() == 0
+
+
+def test_bulk_assign_as_requester(client, auth_headers_user):
+    """一般ユーザーは一括割り当て不可"""
+    ticket_ids = _create_tickets(client, auth_headers_user, 1)
+    response = client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ticket_ids, "operation": "assign"},
+        headers=auth_headers_user
+    )
+    assert response.status_code == 403
+
+
+def test_ticket_if_match(client, auth_headers_user, auth_headers_operator):
+    """ETagは行バージョンで、古いIf-Matchでの更新・ステータス変更・割り当ては409になる"""
+    ticket_id = _create_tickets(client, auth_headers_user, 1)[0]
+    response = client.get(f"/api/tickets/{ticket_id}", headers=auth_headers_operator)
+    assert response.headers["etag"] == '"1"' and response.json()["version"] == 1
+
+    response = client.patch(
+        f"/api/tickets/{ticket_id}", json={"priority": "HIGH"}, headers={**auth_headers_operator, "If-Match": '"1"'}
+    )
+    assert response.status_code == 200 and response.headers["etag"] == '"2"'
+
+    stale = {**auth_headers_operator, "If-Match": '"1"'}
+    response = client.patch(f"/api/tickets/{ticket_id}", json={"priority": "LOW"}, headers=stale)
+    assert response.status_code == 409
+    assert client.post(f"/api/tickets/{ticket_id}/transition", json={"status": "RESOLVED"}, headers=stale).status_code == 409
+    assert client.post(f"/api/tickets/{ticket_id}/assign", headers=stale).status_code == 409
+    ticket = client.get(f"/api/tickets/{ticket_id}", headers=auth_headers_operator).json()
+    assert ticket["priority"] == "HIGH" and ticket["status"] == "OPEN"
+
+    # 公開コメント（コメント数の更新）ではバージョンは変わらず、圧縮時の弱いETagも受け付ける
+    client.post(f"/api/tickets/{ticket_id}/comments", json={"content": "追記"}, headers=auth_headers_user)
+    response = client.post(
+        f"/api/tickets/{ticket_id}/transition", json={"status": "IN_PROGRESS"},
+        headers={**auth_headers_operator, "If-Match": 'W/"2"'},
+    )
+    assert response.status_code == 200 and response.json()["version"] == 3
+
+    # 一括操作もバージョンを進める
+    client.post(
+        "/api/tickets/bulk", json={"ticket_ids": [ticket_id], "operation": "tag", "add_tags": ["vpn"]},
+        headers=auth_headers_operator,
+    )
+    assert client.get(f"/api/tickets/{ticket_id}", headers=auth_headers_operator).json()["version"] == 4
+
+
+def test_concurrent_update_conflict(client, db_session, auth_headers_user, auth_headers_operator, monkeypatch):
+    """読み込んでから書き込むまでに他の更新がコミットされると、上書きせず409を返す"""
+    ticket_id = _create_tickets(client, auth_headers_user, 1)[0]
+    get_ticket = ticket_service.get_ticket
+
+    def get_ticket_then_lose_race(db, ticket_id):
+        ticket = get_ticket(db, ticket_id)
+        db.execute(
+            update(Ticket).where(Ticket.id == ticket_id)
+            .values(priority="URGENT", version=Ticket.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return ticket
+
+    monkeypatch.setattr(ticket_service, "get_ticket", get_ticket_then_lose_race)
+    response = client.patch(f"/api/tickets/{ticket_id}", json={"priority": "LOW"}, headers=auth_headers_operator)
+    assert response.status_code == 409
+    db_session.rollback()
+
+
+def test_bulk_transition_stale_ticket(client, db_session, auth_headers_user, auth_headers_operator, monkeypatch):
+    """一括ステータス変更中に他の人が変更したチケットだけが409になり、残りは適用される"""
+    ticket_ids = _create_tickets(client, auth_headers_user, 3)
+    load_tickets = ticket_bulk_service._load_tickets
+
+    def load_then_lose_race(db, ids):
+        tickets = load_tickets(db, ids)
+        db.execute(
+            update(Ticket).where(Ticket.id == ticket_ids[1])
+            .values(priority="URGENT", version=Ticket.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return tickets
+
+    monkeypatch.setattr(ticket_bulk_service, "_load_tickets", load_then_lose_race)
+    response = client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ticket_ids, "operation": "transition", "status": "IN_PROGRESS"},
+        headers=auth_headers_operator,
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (2, 1)
+    assert [result["status_code"] for result in body["results"]] == [200, 409, 200]
+
+    db_session.expire_all()
+    statuses = [db_session.get(Ticket, ticket_id).status for ticket_id in ticket_ids]
+    assert statuses == ["IN_PROGRESS", "OPEN", "IN_PROGRESS"]
+    assert db_session.query(AuditLog).filter(
+        AuditLog.entity_id == ticket_ids[1], AuditLog.action == "STATUS_CHANGED"
+    ).count() == 0
+    dashboard = client.get("/api/dashboard/summary", headers=auth_headers_operator).json()
+    assert dashboard["by_status"]["OPEN"] == 1
+    assert dashboard["by_status"]["IN_PROGRESS"] == 2
+
+
+def test_bulk_assign_and_tag_stale_ticket(client, db_session, auth_headers_user, auth_headers_operator,
+                                          test_operator, test_team, monkeypatch):
+    """一括割り当て・一括タグ付け中に他の人が変更したチケットは409になり、集計にも反映されない"""
+    ticket_ids = _create_tickets(client, auth_headers_user, 3)
+    load_tickets = ticket_bulk_service._load_tickets
+
+    def load_then_lose_race(db, ids):
+        tickets = load_tickets(db, ids)
+        db.execute(
+            update(Ticket).where(Ticket.id == ticket_ids[1])
+            .values(priority="URGENT", version=Ticket.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+        return tickets
+
+    monkeypatch.setattr(ticket_bulk_service, "_load_tickets", load_then_lose_race)
+    response = client.post(
+        "/api/tickets/bulk",
+        json={
+            "ticket_ids": ticket_ids,
+            "operation": "assign",
+            "assignee_id": test_operator.id,
+            "assigned_team_id": test_team.id,
+        },
+        headers=auth_headers_operator,
+    )
+    assert [result["status_code"] for result in response.json()["results"]] == [200, 409, 200]
+    response = client.post(
+        "/api/tickets/bulk",
+        json={"ticket_ids": ticket_ids, "operation": "tag", "add_tags": ["outage"]},
+        headers=auth_headers_operator,
+    )
+    assert [result["status_code"] for result in response.json()["results"]] == [200, 409, 200]
+
+    db_session.expire_all()
+    stale = db_session.get(Ticket, ticket_ids[1])
+    assert (stale.assignee_id, stale.assigned_team_id, stale.tags) == (None, None, [])
+    assert [tag.name for tag in db_session.get(Ticket, ticket_ids[0]).tags] == ["outage"]
+    assert db_session.query(AuditLog).filter(
+        AuditLog.entity_id == ticket_ids[1], AuditLog.action.in_(["TICKET_ASSIGNED", "TICKET_UPDATED"])
+    ).count() == 0
+    dashboard = client.get("/api/dashboard/summary", headers=auth_headers_operator).json()
+    assert {item["team_id"]: item["count"] for item in dashboard["by_team"]} == {test_team.id: 2, None: 1}
+
+
+def test_auto_routing(client, db_session, auth_headers_user, auth_headers_operator, auth_headers_admin,
+                      test_operator, test_team, monkeypatch):
+    """カテゴリの担当チームで重み付き負荷の最も小さいオペレーターに自動で割り当て、判断を監査ログに残す"""
+    other = client.post(
+        "/api/admin/users",
+        json={"email": "operator2@example.com", "name": "Operator 2", "password": "testpass123",
+              "role": "operator", "team_id": test_team.id},
+        headers=auth_headers_admin,
+    ).json()
+    category = client.post(
+        "/api/admin/categories", json={"name": "ネットワーク", "type": "TICKET", "team_id": test_team.id},
+        headers=auth_headers_admin,
+    ).json()
+
+    def create(priority):
+        return client.post(
+            "/api/tickets",
+            json={"title": priority, "description": "本文", "priority": priority, "category_id": category["id"]},
+            headers=auth_headers_user,
+        ).json()
+
+    urgent = create("URGENT")
+    first = urgent["assignee_id"]
+    second = ({test_operator.id, other["id"]} - {first}).pop()
+    assert urgent["assigned_team_id"] == test_team.id
+    # URGENT(8)を持つオペレーターより、LOW(1)を2件持つオペレーターの方が空いている
+    assert [create("LOW")["assignee_id"] for _ in range(2)] == [second, second]
+    assert create("HIGH")["assignee_id"] == second
+
+    # クローズすると負荷が減り、次のチケットはそちらへ
+    client.post(f"/api/tickets/{urgent['id']}/transition", json={"status": "CLOSED"}, headers=auth_headers_operator)
+    assert create("MEDIUM")["assignee_id"] == first
+    workloads = routing_service.balancer.workloads()
+    assert workloads == {first: 2, second: 6}
+    routing_service.balancer.invalidate()
+    routing_service.balancer.rebuild(db_session)
+    assert routing_service.balancer.workloads() == workloads
+
+    logs = db_session.query(AuditLog).filter(AuditLog.action == "TICKET_ROUTED").order_by(AuditLog.created_at).all()
+    assert len(logs) == 5
+    assert logs[-1].meta_data == {
+        "strategy": "least_loaded", "category_id": category["id"], "team_id": test_team.id, "assignee_id": first,
+        "priority": "MEDIUM", "workload": 0, "candidates": 2,
+    }
+
+    # コミットされなかったチケットは負荷に数えない
+    def fail(*args):
+        raise RuntimeError("commit failed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(ticket_service.change_service, "record", fail)
+        with pytest.raises(RuntimeError):
+            create("URGENT")
+    db_session.rollback()
+    assert routing_service.balancer.workloads() == workloads
+
+    # 存在しないチームは担当チームに設定できない
+    response = client.post(
+        "/api/admin/categories", json={"name": "不明", "type": "TICKET", "team_id": "missing"},
+        headers=auth_headers_admin,
+    )
+    assert response.status_code == 422
+    response = client.patch(
+        f"/api/admin/categories/{category['id']}", json={"team_id": "missing"}, headers=auth_headers_admin
+    )
+    assert response.status_code == 422
+
+    # オペレーターのいないチームにはチームだけを割り当てる
+    empty = client.post("/api/admin/teams", json={"name": "空のチーム"}, headers=auth_headers_admin).json()
+    client.patch(f"/api/admin/categories/{category['id']}", json={"team_id": empty["id"]}, headers=auth_headers_admin)
+    ticket = create("LOW")
+    assert ticket["assigned_team_id"] == empty["id"] and ticket["assignee_id"] is None